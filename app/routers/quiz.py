@@ -1,23 +1,34 @@
 """
 Router for quiz-related endpoints.
 """
-from fastapi import APIRouter, Request, UploadFile, File, Form, Depends, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, Request, UploadFile, File, Form, HTTPException, Query
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from typing import List, Optional
-import pandas as pd
-import os
+import json
+import time
 from pathlib import Path
 
 from app.models.quiz_data import QuizParameters
-from app.services.file_service import process_file
-from app.services.quiz_service import convert_scores, verify_conversion, generate_output_data
+from app.services.file_service import process_file, read_upload_dataframe
+from app.services.quiz_service import LONG_COLUMNS, convert_score_matrix, verify_conversion, generate_output_data
+from app.services.pipeline import ConvertedBatch, iter_long_frames
+from app.services.score_matrix import ScoreMatrix
+from app.services.item_analysis import analyze_items
+from app.services.results_store import results_store
+from app.services.run_diff import converted_from_frame, diff_runs
+from app.services.incremental import incremental_convert, conversion_history
+from app.services.results_db import configured_results_db
+from app.services.admission import AdmissionRejected, upload_admission
+from app.services.metrics import metrics
 
 # Create router with prefix
 router = APIRouter(prefix="/quiz")
 
-# Set up templates
+# Set up templates; compiled templates are cached by the Jinja environment and
+# not re-checked on disk for every request
 templates = Jinja2Templates(directory="app/templates")
+templates.env.auto_reload = False
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -32,6 +43,32 @@ async def upload_form(request: Request):
     return templates.TemplateResponse("upload.html", {"request": request})
 
 
+def _release_after(chunks, ticket, render_seconds: float = 0.0):
+    """Yield the rendered page and release the upload's capacity once it is sent or abandoned."""
+    try:
+        # Only the time spent producing chunks is rendering; waits for the client are not counted
+        chunks = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            chunk = next(chunks, None)
+            render_seconds += time.perf_counter() - start
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        metrics.observe_stage("render", render_seconds)
+        ticket.release()
+
+
+async def _admit(*files: UploadFile):
+    """Wait for processing capacity for the uploaded files; a full queue is answered with 503 and Retry-After."""
+    try:
+        return await upload_admission.acquire_files([(file.size, file.filename) for file in files])
+    except AdmissionRejected as e:
+        metrics.rejected_uploads.inc()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
 @router.post("/upload")
 async def upload_file(
     request: Request,
@@ -55,6 +92,7 @@ async def upload_file(
     Returns:
         Redirect to results page
     """
+    ticket = await _admit(file)
     try:
         # Create quiz parameters
         quiz_params = QuizParameters(
@@ -71,46 +109,62 @@ async def upload_file(
                 detail="Calculation verification failed. Please check your parameters."
             )
 
-        # Process the file
-        student_responses, question_numbers = await process_file(file)
+        # Process the file (the sheet name is not needed for the web results)
+        student_responses, question_numbers, _, fingerprints = await process_file(file)
 
-        # Convert scores
-        processed_responses = convert_scores(student_responses, quiz_params)
+        # Convert scores; rows unchanged since the last upload of this quiz are reused
+        with metrics.time_stage("convert"):
+            processed_responses, conversion_delta = incremental_convert(student_responses, quiz_params,
+                                                                        conversion_history, fingerprints)
+        metrics.rows_processed.inc(len(processed_responses))
+        metrics.cache_hits.inc(conversion_delta.unchanged, "conversion")
+        metrics.cache_misses.inc(conversion_delta.converted, "conversion")
 
         # Verify conversion
-        if not verify_conversion(processed_responses):
+        with metrics.time_stage("verify"):
+            verified = verify_conversion(processed_responses)
+        if not verified:
             raise HTTPException(
                 status_code=400, 
                 detail="Conversion verification failed. Please check your data."
             )
 
         # Generate output data
+        render_start = time.perf_counter()
         output_data = generate_output_data(processed_responses, question_numbers)
+        render_seconds = time.perf_counter() - render_start
 
-        # Debug: Print output data
-        print("Output data to be passed to template:")
-        for i, student in enumerate(output_data):
-            print(f"Student {i+1}:")
-            for key, value in student.items():
-                print(f"  {key}: {value}")
+        # Keep the results across restarts when persistence is enabled
+        results_db = configured_results_db()
+        if results_db is not None:
+            with metrics.time_stage("export"):
+                results_db.store_output_data(quiz_params, output_data, question_numbers)
 
-        # Debug: Print question numbers
-        print("Question numbers to be passed to template:", question_numbers)
+        # Keep the full payload for the on-demand debug view instead of embedding it in the page
+        result_id = results_store.put({
+            "quiz_name": quiz_params.quiz_name,
+            "output_data": output_data,
+            "question_numbers": question_numbers,
+            "conversion_delta": conversion_delta.to_dict()
+        })
 
-        # Store data in session or temporary storage
-        # For simplicity, we'll pass it directly to the template
-        return templates.TemplateResponse(
-            "results.html", 
-            {
-                "request": request,
-                "quiz_params": quiz_params,
-                "output_data": output_data,
-                "question_numbers": question_numbers
-            }
-        )
+        # Stream the page so the browser can start painting before every row is rendered
+        template = templates.get_template("results.html")
+        context = {
+            "request": request,
+            "quiz_params": quiz_params,
+            "calculation_verified": quiz_params.verify_calculation(),
+            "output_data": output_data,
+            "question_numbers": question_numbers,
+            "conversion_delta": conversion_delta,
+            "result_id": result_id
+        }
+        return StreamingResponse(_release_after(template.generate(context), ticket, render_seconds),
+                                 media_type="text/html")
 
     except Exception as e:
         # Handle errors
+        ticket.release()
         return templates.TemplateResponse(
             "upload.html", 
             {
@@ -120,9 +174,241 @@ async def upload_file(
         )
 
 
+@router.get("/results/{result_id}/debug", response_class=JSONResponse)
+async def results_debug(result_id: str):
+    """
+    Return the full result payload for the debug view of the results page.
+
+    Args:
+        result_id: Identifier of the processed result
+
+    Returns:
+        JSON with the output data and question numbers
+    """
+    payload = results_store.get(result_id)
+    if payload is None:
+        metrics.cache_misses.inc(1, "results")
+        raise HTTPException(status_code=404, detail="Result not found or expired.")
+    metrics.cache_hits.inc(1, "results")
+
+    return {
+        "quiz_name": payload["quiz_name"],
+        "question_numbers": payload["question_numbers"],
+        "output_data_length": len(payload["output_data"]),
+        "output_data": payload["output_data"]
+    }
+
+
 @router.get("/results", response_class=HTMLResponse)
 async def results(request: Request):
     """Render the results page."""
     # This endpoint would normally retrieve data from session or storage
     # For now, it just redirects to the upload form
     return RedirectResponse(url="/quiz/upload")
+
+
+@router.get("/admission", response_class=JSONResponse)
+async def admission_stats():
+    """
+    Report the upload admission state.
+
+    Returns:
+        JSON with the uploads in flight, reserved memory, queue depth and wait times
+    """
+    return upload_admission.stats()
+
+
+def _require_results_db():
+    """Return the configured results database or fail with 404 when persistence is disabled."""
+    results_db = configured_results_db()
+    if results_db is None:
+        raise HTTPException(status_code=404, detail="Result persistence is not enabled.")
+    return results_db
+
+
+@router.get("/stored", response_class=JSONResponse)
+async def stored_quizzes():
+    """
+    List the quizzes stored in the results database.
+
+    Returns:
+        JSON with the name, number of students and mean converted score of each quiz
+    """
+    return {"quizzes": _require_results_db().quizzes()}
+
+
+@router.get("/students/{student_id}/results", response_class=JSONResponse)
+async def student_results(student_id: str, quiz: Optional[List[str]] = Query(None)):
+    """
+    Look up the stored results of one student.
+
+    Args:
+        student_id: Student ID
+        quiz: Only these quizzes (repeat the parameter for several quizzes)
+
+    Returns:
+        JSON with one entry per stored quiz result
+    """
+    return {"student_id": student_id, "results": _require_results_db().student_results(student_id, quiz)}
+
+
+@router.get("/teams/{team}/results", response_class=JSONResponse)
+async def team_results(team: str, quiz: Optional[List[str]] = Query(None)):
+    """
+    Look up the stored results of every student of a team.
+
+    Args:
+        team: Team name
+        quiz: Only these quizzes (repeat the parameter for several quizzes)
+
+    Returns:
+        JSON with one entry per stored quiz result of the team's students
+    """
+    return {"team": team, "results": _require_results_db().team_results(team, quiz)}
+
+
+@router.post("/item-analysis", response_class=JSONResponse)
+async def item_analysis(
+    file: UploadFile = File(...),
+    original_question_value: Optional[float] = Form(None)
+):
+    """
+    Compute item analysis statistics for an uploaded file.
+
+    Args:
+        file: The uploaded file
+        original_question_value: Value of each question on the original scale
+            (defaults to the highest observed score of each question)
+
+    Returns:
+        JSON with the number of students and the statistics of each question
+    """
+    ticket = await _admit(file)
+    try:
+        df, _ = await read_upload_dataframe(file)
+        matrix = ScoreMatrix.from_dataframe(df)
+        analysis = analyze_items(matrix, original_question_value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        ticket.release()
+
+    return {
+        "num_students": analysis.num_students,
+        "questions": analysis.to_records()
+    }
+
+
+def _long_json(quiz_name: str, frames, ticket):
+    """Yield the long output table as one JSON document, a block of rows at a time, then release the ticket."""
+    export_seconds = 0.0
+    try:
+        yield f'{{"quiz_name": {json.dumps(quiz_name)}, "columns": {json.dumps(LONG_COLUMNS)}, "rows": ['
+        separator = ""
+        frames = iter(frames)
+        while True:
+            start = time.perf_counter()
+            frame = next(frames, None)
+            # to_json writes a JSON array of row arrays; its brackets are dropped to join the blocks
+            block = frame.to_json(orient="values")[1:-1] if frame is not None and len(frame) else ""
+            export_seconds += time.perf_counter() - start
+            if frame is None:
+                break
+            if block:
+                yield separator + block
+                separator = ","
+        yield "]}"
+    finally:
+        metrics.observe_stage("export", export_seconds)
+        ticket.release()
+
+
+@router.post("/export/long")
+async def export_long_json(
+    file: UploadFile = File(...),
+    quiz_name: str = Form(...),
+    original_max_score: float = Form(...),
+    new_max_score: float = Form(...),
+    original_question_value: float = Form(...)
+):
+    """
+    Convert an uploaded file and return the long output table: one row per student and question.
+
+    Args:
+        file: The uploaded file
+        quiz_name: Name of the quiz
+        original_max_score: Original maximum quiz score
+        new_max_score: New desired maximum score
+        original_question_value: Value of each question on the original scale
+
+    Returns:
+        Streamed JSON with the quiz name, the column names and the rows as arrays
+    """
+    ticket = await _admit(file)
+    try:
+        quiz_params = QuizParameters(
+            quiz_name=quiz_name,
+            original_max_score=original_max_score,
+            new_max_score=new_max_score,
+            original_question_value=original_question_value
+        )
+        df, _ = await read_upload_dataframe(file)
+        with metrics.time_stage("convert"):
+            matrix = ScoreMatrix.from_dataframe(df)
+            question_new_scores, new_scores = convert_score_matrix(matrix, quiz_params)
+        metrics.rows_processed.inc(matrix.num_students)
+    except ValueError as e:
+        ticket.release()
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        ticket.release()
+        raise
+
+    # The ticket is held until the last block is streamed
+    frames = iter_long_frames([ConvertedBatch(matrix, question_new_scores, new_scores)])
+    return StreamingResponse(_long_json(quiz_params.quiz_name, frames, ticket), media_type="application/json")
+
+
+@router.post("/diff", response_class=JSONResponse)
+async def diff_results(
+    before: UploadFile = File(...),
+    after: UploadFile = File(...),
+    original_max_score: Optional[float] = Form(None),
+    new_max_score: Optional[float] = Form(None),
+    original_question_value: Optional[float] = Form(None)
+):
+    """
+    Compare the converted scores of two runs of the same quiz.
+
+    Args:
+        before: First run: a results file, or a quiz export
+        after: Second run: a results file, or a quiz export
+        original_max_score: Original maximum quiz score (needed to convert exports)
+        new_max_score: New desired maximum score (needed to convert exports)
+        original_question_value: Value of each question on the original scale (needed to convert exports)
+
+    Returns:
+        JSON with the counts, the added and removed students and the changed cells
+    """
+    # Both files are parsed at once, so they are admitted together
+    ticket = await _admit(before, after)
+    try:
+        quiz_params = None
+        if None not in (original_max_score, new_max_score, original_question_value):
+            quiz_params = QuizParameters(
+                quiz_name=Path(before.filename or "diff").stem,
+                original_max_score=original_max_score,
+                new_max_score=new_max_score,
+                original_question_value=original_question_value
+            )
+        runs = []
+        for upload in (before, after):
+            df, _ = await read_upload_dataframe(upload)
+            runs.append(converted_from_frame(df, quiz_params, upload.filename or "The upload"))
+        run_diff = diff_runs(*runs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        ticket.release()
+
+    return run_diff.to_dict()
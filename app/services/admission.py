@@ -0,0 +1,252 @@
+"""
+Admission control for uploads.
+
+Each upload is parsed fully in memory, so a burst of large workbooks can
+exhaust the server. The controller admits an upload only while fewer than
+`max_in_flight` uploads are processed and their estimated memory fits the
+budget; the others wait in a bounded FIFO queue. When the queue is full, or an
+upload waits longer than `max_wait`, it is rejected with a Retry-After hint.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+# Parsed data takes several times the size of the file; zipped workbooks expand the most
+MEMORY_FACTORS = {'.xlsx': 20, '.xls': 10}
+DEFAULT_MEMORY_FACTOR = 8
+
+# Size assumed for uploads whose size is unknown
+DEFAULT_UPLOAD_SIZE = 10 * 1024 * 1024
+
+# Number of recent wait times kept for the statistics
+WAIT_HISTORY = 256
+
+
+def estimate_memory(upload_size: Optional[int], filename: Optional[str] = None) -> int:
+    """
+    Estimate the memory needed to process an upload.
+
+    Args:
+        upload_size: Size of the upload in bytes (None when unknown)
+        filename: Name of the uploaded file, used to pick the expansion factor
+
+    Returns:
+        Estimated memory in bytes
+    """
+    suffix = Path(filename or "").suffix.lower()
+    size = upload_size if upload_size else DEFAULT_UPLOAD_SIZE
+    return size * MEMORY_FACTORS.get(suffix, DEFAULT_MEMORY_FACTOR)
+
+
+class AdmissionRejected(Exception):
+    """Raised when an upload cannot be admitted; retry_after is the suggested delay in seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """Reservation of an admitted upload; release it once the upload is processed."""
+
+    def __init__(self, controller: "AdmissionController", cost: int):
+        self._controller = controller
+        self.cost = cost
+        self.admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self):
+        """Return the reservation to the controller (only the first call has an effect)."""
+        if not self._released:
+            self._released = True
+            self._controller._release(self.cost, time.monotonic() - self.admitted_at)
+
+
+class AdmissionController:
+    """Limits the uploads processed at once by count and by estimated memory."""
+
+    def __init__(self, max_in_flight: int = 2, memory_budget: int = 2 * 1024 ** 3, max_queue: int = 8,
+                 max_wait: float = 30.0):
+        """
+        Create a controller.
+
+        Args:
+            max_in_flight: Maximum number of uploads processed at once
+            memory_budget: Maximum estimated memory, in bytes, of the uploads processed at once
+            max_queue: Maximum number of uploads waiting for admission; more are rejected at once
+            max_wait: Seconds an upload may wait before it is rejected
+        """
+        if max_in_flight < 1:
+            raise ValueError("At least one upload must be allowed at a time.")
+        if memory_budget <= 0:
+            raise ValueError("The memory budget must be positive.")
+        self.max_in_flight = max_in_flight
+        self.memory_budget = memory_budget
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._reserved = 0
+        # Waiters are futures of the event loop of the request that queued them
+        self._waiters: Deque[Any] = deque()
+        self._admitted = 0
+        self._rejected = 0
+        self._waits: Deque[float] = deque(maxlen=WAIT_HISTORY)
+        self._service_time = 0.0
+        self._served = 0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """
+        Create a controller configured by environment variables.
+
+        QUIZ_MAX_UPLOADS, QUIZ_UPLOAD_MEMORY_MB, QUIZ_UPLOAD_QUEUE and QUIZ_UPLOAD_WAIT
+        override the defaults of max_in_flight, memory_budget, max_queue and max_wait.
+
+        Returns:
+            Configured AdmissionController
+        """
+        return cls(
+            max_in_flight=int(os.environ.get("QUIZ_MAX_UPLOADS", 2)),
+            memory_budget=int(float(os.environ.get("QUIZ_UPLOAD_MEMORY_MB", 2048)) * 1024 ** 2),
+            max_queue=int(os.environ.get("QUIZ_UPLOAD_QUEUE", 8)),
+            max_wait=float(os.environ.get("QUIZ_UPLOAD_WAIT", 30))
+        )
+
+    def _fits(self, cost: int) -> bool:
+        return self._in_flight < self.max_in_flight and self._reserved + cost <= self.memory_budget
+
+    def _retry_after(self) -> int:
+        """Seconds until a slot is likely free: the mean processing time per queued round."""
+        mean_service = self._service_time / self._served if self._served else 1.0
+        rounds = (len(self._waiters) + self.max_in_flight) / self.max_in_flight
+        return max(1, int(round(mean_service * rounds)))
+
+    def _reject(self, message: str) -> AdmissionRejected:
+        self._rejected += 1
+        return AdmissionRejected(message, self._retry_after())
+
+    async def acquire(self, upload_size: Optional[int], filename: Optional[str] = None) -> AdmissionTicket:
+        """
+        Wait until an upload may be processed.
+
+        Args:
+            upload_size: Size of the upload in bytes (None when unknown)
+            filename: Name of the uploaded file
+
+        Returns:
+            Ticket to release once the upload is processed
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait exceeds max_wait
+        """
+        return await self.acquire_files([(upload_size, filename)])
+
+    async def acquire_files(self, uploads: Iterable[Tuple[Optional[int], Optional[str]]]) -> AdmissionTicket:
+        """
+        Wait until a request processing several uploaded files together may run.
+
+        The files take a single slot and the sum of their estimated memory.
+
+        Args:
+            uploads: Size in bytes (None when unknown) and name of each uploaded file
+
+        Returns:
+            Ticket to release once the files are processed
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait exceeds max_wait
+        """
+        # A request larger than the whole budget is admitted when it runs alone
+        cost = min(sum(estimate_memory(size, filename) for size, filename in uploads), self.memory_budget)
+        loop = asyncio.get_running_loop()
+        enqueued_at = time.monotonic()
+
+        with self._lock:
+            if not self._waiters and self._fits(cost):
+                return self._admit(cost, 0.0)
+            if len(self._waiters) >= self.max_queue:
+                raise self._reject("The server is busy processing other uploads. Please try again shortly.")
+            future = loop.create_future()
+            waiter = (future, loop, cost, enqueued_at)
+            self._waiters.append(waiter)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.max_wait)
+        except asyncio.TimeoutError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise self._reject("The upload waited too long for processing capacity. Please try again.")
+            # Admitted just as the wait ran out
+            return await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # Capacity was granted to a request that went away; a pending grant releases it in _grant
+            if not future.cancel():
+                future.result().release()
+            raise
+
+    def _admit(self, cost: int, waited: float) -> AdmissionTicket:
+        """Reserve capacity for an upload; the lock must be held."""
+        self._in_flight += 1
+        self._reserved += cost
+        self._admitted += 1
+        self._waits.append(waited)
+        return AdmissionTicket(self, cost)
+
+    def _release(self, cost: int, duration: float):
+        """Return capacity and admit the waiting uploads that now fit, in arrival order."""
+        with self._lock:
+            self._in_flight -= 1
+            self._reserved -= cost
+            self._service_time += duration
+            self._served += 1
+            while self._waiters and self._fits(self._waiters[0][2]):
+                future, loop, waiter_cost, enqueued_at = self._waiters.popleft()
+                ticket = self._admit(waiter_cost, time.monotonic() - enqueued_at)
+                loop.call_soon_threadsafe(_grant, future, ticket)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Current load and wait times.
+
+        Returns:
+            Dictionary with the uploads in flight, reserved memory, queue depth, counters and wait times
+        """
+        with self._lock:
+            waits = list(self._waits)
+            now = time.monotonic()
+            return {
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "reserved_bytes": self._reserved,
+                "memory_budget_bytes": self.memory_budget,
+                "queue_depth": len(self._waiters),
+                "max_queue": self.max_queue,
+                "oldest_wait_seconds": now - self._waiters[0][3] if self._waiters else 0.0,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "mean_wait_seconds": sum(waits) / len(waits) if waits else 0.0,
+                "max_wait_seconds": max(waits) if waits else 0.0,
+                "mean_processing_seconds": self._service_time / self._served if self._served else 0.0
+            }
+
+
+def _grant(future: "asyncio.Future", ticket: AdmissionTicket):
+    """Hand a ticket to a waiting request, or give it back if the request stopped waiting."""
+    if future.done():
+        ticket.release()
+    else:
+        future.set_result(ticket)
+
+
+# Controller shared by the upload endpoints
+upload_admission = AdmissionController.from_env()
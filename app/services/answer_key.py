@@ -0,0 +1,216 @@
+"""
+Answer-key regrading from the response columns.
+
+An answer key lists the accepted answers of each question with the credit each
+one earns (1 for a fully correct answer, a fraction for partial credit).
+Regrading recomputes the question scores from the `N_Response` columns instead
+of trusting the exported `N_Score` columns. The key is matched once against
+each question's response vocabulary, so every student's credit is a single
+table lookup by response code; questions the key does not list keep their
+exported scores.
+"""
+import csv
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.models.quiz_data import QuizParameters, StudentResponse
+from app.services.score_matrix import ScoreMatrix
+
+
+def normalize_answer(text: str) -> str:
+    """Answer text as compared with the key: surrounding spaces and letter case are ignored."""
+    return str(text).strip().casefold()
+
+
+class AnswerKey:
+    """Accepted answers of each question, with the credit each one earns."""
+
+    def __init__(self, answers: Dict[int, Dict[str, float]]):
+        """
+        Create an answer key.
+
+        Args:
+            answers: Question number -> (answer text -> credit between 0 and 1)
+        """
+        problems = []
+        self.answers: Dict[int, Dict[str, float]] = {}
+        for q_num, credits in answers.items():
+            if not credits:
+                problems.append(f"question {q_num} has no accepted answer")
+            invalid = [answer for answer, credit in credits.items() if not 0 <= credit <= 1]
+            if invalid:
+                problems.append(f"question {q_num} gives credit outside 0-1 to {', '.join(invalid)}")
+            self.answers[int(q_num)] = {normalize_answer(answer): float(credit) for answer, credit in credits.items()}
+        if problems:
+            raise ValueError(f"Invalid answer key: {'; '.join(problems)}.")
+
+    @property
+    def question_numbers(self) -> List[int]:
+        """Questions listed in the key, in order."""
+        return sorted(self.answers)
+
+    def validate(self, question_numbers: List[int]):
+        """
+        Check that every question of the key exists in the data.
+
+        Args:
+            question_numbers: Questions found in the data
+        """
+        unknown = [q_num for q_num in self.question_numbers if q_num not in set(question_numbers)]
+        if unknown:
+            raise ValueError(f"The answer key lists questions that are not in the data: "
+                             f"{', '.join(str(q_num) for q_num in unknown)}.")
+
+    def credit_table(self, question_number: int, vocabulary: List[str]) -> np.ndarray:
+        """
+        Credit of each response of one question, indexed by response code.
+
+        Args:
+            question_number: Question number
+            vocabulary: Distinct responses of the question, indexed by code
+
+        Returns:
+            Array of len(vocabulary) + 1 credits; the last entry, reached by MISSING_CODE, is 0
+        """
+        credits = self.answers[question_number]
+        return np.array([credits.get(normalize_answer(text), 0.0) for text in vocabulary] + [0.0])
+
+    def regrade(self, matrix: ScoreMatrix, question_value: float) -> ScoreMatrix:
+        """
+        Recompute the question scores of the keyed questions from the responses.
+
+        The total original score of each student moves by the same amount as the
+        regraded question scores, so points outside the question columns are kept.
+
+        Args:
+            matrix: Score matrix with the exported scores and encoded responses
+            question_value: Points of a fully correct answer
+
+        Returns:
+            ScoreMatrix with the regraded scores (the responses and identities are shared)
+        """
+        if matrix.responses is None:
+            raise ValueError("Regrading needs the response columns of the export.")
+        self.validate(matrix.question_numbers)
+
+        scores = matrix.scores.copy()
+        codes = matrix.responses.codes
+        for j, q_num in enumerate(matrix.question_numbers):
+            if q_num in self.answers:
+                # MISSING_CODE (-1) indexes the table's last entry, so a missing response earns nothing
+                table = self.credit_table(q_num, matrix.responses.vocabularies[j])
+                scores[:, j] = table[codes[:, j]] * question_value
+
+        original_scores = matrix.original_scores + (scores.sum(axis=1) - matrix.scores.sum(axis=1))
+        return ScoreMatrix(matrix.identity, matrix.question_numbers, scores, original_scores, matrix.responses)
+
+
+def regrade_matrix(matrix: ScoreMatrix, quiz_params: QuizParameters) -> ScoreMatrix:
+    """
+    Regrade a score matrix with the answer key of the quiz parameters, if there is one.
+
+    Args:
+        matrix: Score matrix with the exported scores
+        quiz_params: Quiz parameters
+
+    Returns:
+        The regraded matrix, or the matrix itself when the parameters have no answer key
+    """
+    if not quiz_params.answer_key:
+        return matrix
+    return AnswerKey(quiz_params.answer_key).regrade(matrix, quiz_params.original_question_value)
+
+
+def regrade_responses(student_responses: List[StudentResponse], quiz_params: QuizParameters) -> List[StudentResponse]:
+    """
+    Regrade parsed student responses with the answer key of the quiz parameters.
+
+    Args:
+        student_responses: List of student responses
+        quiz_params: Quiz parameters with an answer key
+
+    Returns:
+        Copies of the responses with the regraded question scores and totals
+    """
+    question_numbers = sorted({q_num for response in student_responses for q_num in response.responses})
+    matrix = regrade_matrix(ScoreMatrix.from_responses(student_responses, question_numbers), quiz_params)
+    keyed = set(quiz_params.answer_key)
+    regraded = []
+    for response, row, original_score in zip(student_responses, matrix.scores.tolist(),
+                                             matrix.original_scores.tolist()):
+        question_scores = dict(response.question_scores)
+        question_scores.update({q_num: row[j] for j, q_num in enumerate(question_numbers) if q_num in keyed})
+        regraded.append(response.model_copy(update={"question_scores": question_scores,
+                                                    "original_score": original_score}))
+    return regraded
+
+
+def _parse_credits(value, q_num: int, source: str) -> Dict[str, float]:
+    """Accepted answers of one question from a JSON value: "B", ["A", "C"] or {"A": 1, "B": 0.5}."""
+    if isinstance(value, str):
+        return {value: 1.0}
+    if isinstance(value, list):
+        return {str(answer): 1.0 for answer in value}
+    if isinstance(value, dict):
+        try:
+            return {str(answer): float(credit) for answer, credit in value.items()}
+        except (TypeError, ValueError):
+            raise ValueError(f"Question {q_num} in {source} has a non-numeric credit.")
+    raise ValueError(f"Unsupported answers for question {q_num} in {source}.")
+
+
+def load_answer_key(file_path: str) -> AnswerKey:
+    """
+    Load an answer key from a file.
+
+    CSV files have one "question,answer[,credit]" row per accepted answer (a header row
+    is optional; the credit defaults to 1). JSON files map each question number to its
+    answer ("B"), its accepted answers (["A", "C"]) or answer -> credit ({"A": 1, "B": 0.5}).
+
+    Args:
+        file_path: Path to the CSV or JSON file
+
+    Returns:
+        The loaded AnswerKey
+    """
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+
+    answers: Dict[int, Dict[str, float]] = {}
+    if path.suffix.lower() == '.json':
+        with open(path, 'r', encoding='utf-8') as json_file:
+            data = json.load(json_file)
+        if not isinstance(data, dict):
+            raise ValueError(f"Unsupported answer key format in {path}.")
+        for raw_q_num, value in data.items():
+            q_num = _parse_question(raw_q_num, str(path))
+            answers[q_num] = _parse_credits(value, q_num, str(path))
+    elif path.suffix.lower() == '.csv':
+        with open(path, 'r', newline='', encoding='utf-8') as csv_file:
+            rows = [row for row in csv.reader(csv_file) if row and any(cell.strip() for cell in row)]
+        if rows and not rows[0][0].strip().lstrip('Qq').isdigit():
+            rows = rows[1:]  # Header row
+        if any(len(row) < 2 for row in rows):
+            raise ValueError(f"Each row of {path} needs a question number and an answer.")
+        for row in rows:
+            q_num = _parse_question(row[0], str(path))
+            credit: Optional[str] = row[2].strip() if len(row) > 2 and row[2].strip() else None
+            try:
+                answers.setdefault(q_num, {})[row[1]] = float(credit) if credit is not None else 1.0
+            except ValueError:
+                raise ValueError(f"Question {q_num} in {path} has a non-numeric credit: {credit}.")
+    else:
+        raise ValueError(f"Unsupported answer key format: {path.suffix}. Please provide a CSV or JSON file.")
+
+    return AnswerKey(answers)
+
+
+def _parse_question(value: str, source: str) -> int:
+    try:
+        return int(str(value).strip().lstrip('Qq'))
+    except ValueError:
+        raise ValueError(f"Invalid question number in {source}: {value}.")
@@ -0,0 +1,232 @@
+"""
+Curves applied to the converted totals of a whole cohort.
+
+A curve maps each student's converted total (0 to new_max_score) to a curved
+total; the student's question scores are then rescaled to keep their share of
+the total, so they still add up. Curves that depend on the cohort (add-to-top,
+z-score, percentile rank) are fitted first: `observe` is fed every converted
+total, in one call for an in-memory cohort or chunk by chunk in a first pass
+over a streamed file, and `apply` maps the totals afterwards.
+"""
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from app.models.quiz_data import QuizParameters
+from app.services.summary_stats import SummaryAccumulator
+
+
+class Curve:
+    """Linear conversion only; the base of every curve."""
+
+    # Whether the curve needs statistics of the whole cohort before it can be applied
+    needs_cohort = False
+
+    def __init__(self, quiz_params: QuizParameters):
+        """
+        Create a curve.
+
+        Args:
+            quiz_params: Quiz parameters with the curve settings
+        """
+        self.max_score = quiz_params.new_max_score
+        self.moments = SummaryAccumulator()
+
+    def observe(self, new_scores: np.ndarray):
+        """
+        Add converted totals of the cohort.
+
+        Args:
+            new_scores: Converted totals of some students
+        """
+        if len(new_scores):
+            self.moments.update(new_scores)
+
+    def apply(self, new_scores: np.ndarray) -> np.ndarray:
+        """
+        Curve converted totals.
+
+        Args:
+            new_scores: Converted totals
+
+        Returns:
+            Curved totals
+        """
+        return new_scores
+
+    def _require_cohort(self):
+        if self.moments.count == 0:
+            raise ValueError(f"The {CURVE_NAMES[type(self)]} curve needs the converted scores of the whole cohort.")
+
+
+class SqrtCurve(Curve):
+    """Square-root curve: new_max × √(score / new_max)."""
+
+    def apply(self, new_scores: np.ndarray) -> np.ndarray:
+        return self.max_score * np.sqrt(np.clip(new_scores, 0.0, None) / self.max_score)
+
+
+class AddToTopCurve(Curve):
+    """Adds the gap between the top score and new_max to every score."""
+
+    needs_cohort = True
+
+    def apply(self, new_scores: np.ndarray) -> np.ndarray:
+        self._require_cohort()
+        return new_scores + (self.max_score - self.moments.maximum)
+
+
+class ZScoreCurve(Curve):
+    """Moves the cohort to a target mean and standard deviation, within 0 and new_max."""
+
+    needs_cohort = True
+
+    def __init__(self, quiz_params: QuizParameters):
+        super().__init__(quiz_params)
+        if quiz_params.curve_target_mean is None or quiz_params.curve_target_sd is None:
+            raise ValueError("The zscore curve requires a target mean and a target standard deviation.")
+        self.target_mean = quiz_params.curve_target_mean
+        self.target_sd = quiz_params.curve_target_sd
+
+    def apply(self, new_scores: np.ndarray) -> np.ndarray:
+        self._require_cohort()
+        std = self.moments.std
+        z_scores = (new_scores - self.moments.mean) / std if std > 0 else np.zeros_like(new_scores)
+        return np.clip(self.target_mean + self.target_sd * z_scores, 0.0, self.max_score)
+
+
+class PercentileCurve(Curve):
+    """Maps each score to its percentile rank in the cohort, ties sharing the mid rank, times new_max."""
+
+    needs_cohort = True
+
+    def __init__(self, quiz_params: QuizParameters):
+        super().__init__(quiz_params)
+        self._chunks: List[np.ndarray] = []
+        self._sorted = None
+
+    def observe(self, new_scores: np.ndarray):
+        super().observe(new_scores)
+        self._chunks.append(np.asarray(new_scores, dtype=np.float64))
+        self._sorted = None
+
+    def apply(self, new_scores: np.ndarray) -> np.ndarray:
+        self._require_cohort()
+        if self._sorted is None:
+            # One global sort of the cohort's totals, then a binary search per score
+            self._sorted = np.sort(np.concatenate(self._chunks))
+            self._chunks = [self._sorted]
+        below = np.searchsorted(self._sorted, new_scores, side='left')
+        at_or_below = np.searchsorted(self._sorted, new_scores, side='right')
+        return self.max_score * (below + at_or_below) / (2 * len(self._sorted))
+
+
+# Curve of each QuizParameters.curve name
+CURVES: Dict[str, Type[Curve]] = {
+    'linear': Curve,
+    'sqrt': SqrtCurve,
+    'add_to_top': AddToTopCurve,
+    'zscore': ZScoreCurve,
+    'percentile': PercentileCurve,
+}
+
+CURVE_NAMES = {curve: name for name, curve in CURVES.items()}
+
+
+def curve_for(quiz_params: QuizParameters) -> Curve:
+    """
+    Create the curve selected in the quiz parameters.
+
+    Args:
+        quiz_params: Quiz parameters
+
+    Returns:
+        Unfitted curve
+    """
+    return CURVES[quiz_params.curve](quiz_params)
+
+
+def without_curve(quiz_params: QuizParameters) -> QuizParameters:
+    """
+    Parameters for the linear conversion that precedes the curve.
+
+    Args:
+        quiz_params: Quiz parameters
+
+    Returns:
+        The same parameters with the linear curve
+    """
+    return quiz_params.model_copy(update={"curve": "linear"})
+
+
+def rescale_questions(question_new_scores: np.ndarray, curved_scores: np.ndarray,
+                      fixed_point_scale: Optional[int] = None, answered: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Rescale question scores so that each row keeps its shares and adds up to its curved total.
+
+    Rows whose question scores add up to 0 share the curved total equally between their answered questions.
+
+    Args:
+        question_new_scores: Converted question scores (students × questions)
+        curved_scores: Curved totals (students)
+        fixed_point_scale: Units per point when the scores are fixed-point
+        answered: Which questions each student has a score for (defaults to all)
+
+    Returns:
+        Rescaled question scores
+    """
+    if question_new_scores.shape[1] == 0:
+        return question_new_scores
+    if fixed_point_scale:
+        from app.services.fixed_point import to_units
+
+        question_units = to_units(question_new_scores, fixed_point_scale)
+        curved_units = to_units(curved_scores, fixed_point_scale)
+        sums = question_units.sum(axis=1)
+    else:
+        sums = question_new_scores.sum(axis=1)
+    # Rows without any answered question keep nothing of the total; there is nowhere to put it
+    empty = np.flatnonzero(sums == 0)
+    if answered is None:
+        equal_shares = np.ones((len(empty), question_new_scores.shape[1]), dtype=np.int64)
+    else:
+        equal_shares = answered[empty].astype(np.int64)
+    num_answered = np.maximum(equal_shares.sum(axis=1), 1)
+
+    if fixed_point_scale:
+        from app.services.fixed_point import apportion, from_units
+
+        # Shares are exact fractions of integer units, apportioned to the curved total
+        question_units[empty] = equal_shares
+        sums[empty] = num_answered
+        return from_units(apportion(question_units * curved_units[:, np.newaxis], sums[:, np.newaxis], curved_units),
+                          fixed_point_scale)
+
+    ratios = np.divide(curved_scores, sums, out=np.zeros_like(curved_scores), where=sums != 0)
+    rescaled = question_new_scores * ratios[:, np.newaxis]
+    rescaled[empty] = equal_shares / num_answered[:, np.newaxis] * curved_scores[empty, np.newaxis]
+    return rescaled
+
+
+def curve_scores(curve: Curve, question_new_scores: np.ndarray, new_scores: np.ndarray,
+                 fixed_point_scale: Optional[int] = None,
+                 answered: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Apply a fitted curve to converted scores.
+
+    Args:
+        curve: Curve fitted on the cohort (if it needs one)
+        question_new_scores: Converted question scores (students × questions)
+        new_scores: Converted totals (students)
+        fixed_point_scale: Units per point when the scores are fixed-point
+        answered: Which questions each student has a score for (defaults to all)
+
+    Returns:
+        Tuple of curved question scores and curved totals
+    """
+    curved_scores = curve.apply(new_scores)
+    if fixed_point_scale:
+        from app.services.fixed_point import from_units, to_units
+
+        curved_scores = from_units(to_units(curved_scores, fixed_point_scale), fixed_point_scale)
+    return rescale_questions(question_new_scores, curved_scores, fixed_point_scale, answered), curved_scores
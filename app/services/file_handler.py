@@ -2,12 +2,15 @@
 File handler for importing and exporting quiz data.
 """
 import os
-import pandas as pd
 import csv
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 
-from app.models.quiz_data import QuizParameters, StudentResponse
+if TYPE_CHECKING:
+    # pandas and pydantic are imported by the methods that need them, keeping startup fast
+    import pandas as pd
+    from app.models.quiz_data import QuizParameters
+    from app.services.header_schema import HeaderSchema
 
 
 class FileHandler:
@@ -24,48 +27,45 @@ class FileHandler:
         Returns:
             Tuple containing list of student responses, list of question numbers, and sheet name (if applicable)
         """
+        from app.services.header_schema import read_header
+
+        # Reject a wrong file from its header row before the data is parsed
+        schema = read_header(file_path)
+        df, sheet_name = FileHandler.read_dataframe(file_path, schema)
+        student_responses, question_numbers = FileHandler.process_dataframe(df, schema)
+        return student_responses, question_numbers, sheet_name
+
+    @staticmethod
+    def read_dataframe(file_path: str, schema: Optional["HeaderSchema"] = None) -> tuple:
+        """
+        Read the quiz export into a DataFrame without building student responses.
+
+        Args:
+            file_path: Path to the file
+            schema: Header analysis of the file; when given, only the used columns are
+                loaded, with explicit dtypes, from the sheet chosen by the header read
+
+        Returns:
+            Tuple containing the DataFrame and sheet name (if applicable)
+        """
+        import pandas as pd
+        from app.services.readers import read_table
+
         try:
-            # Check if file exists
-            file_path = Path(file_path)
-            if not file_path.exists():
-                raise FileNotFoundError(f"File not found: {file_path}")
-
-            # Determine file type and read accordingly
-            sheet_name = None
-            if file_path.suffix.lower() in ['.xlsx', '.xls']:
-                try:
-                    # Try to read from the "Team Analysis" sheet
-                    df = pd.read_excel(file_path, sheet_name="Team Analysis")
-                    sheet_name = "Team Analysis"
-                    print("Reading data from 'Team Analysis' sheet...")
-                except ValueError as e:
-                    # If the Team Analysis sheet doesn't exist, try Student Analysis sheet
-                    if "Worksheet named 'Team Analysis' not found" in str(e):
-                        try:
-                            # Try to read from the "Student Analysis" sheet
-                            df = pd.read_excel(file_path, sheet_name="Student Analysis")
-                            sheet_name = "Student Analysis"
-                            print("Reading data from 'Student Analysis' sheet...")
-                        except ValueError as e2:
-                            # If neither sheet exists, inform the user and raise an error
-                            if "Worksheet named 'Student Analysis' not found" in str(e2):
-                                raise ValueError("Neither 'Team Analysis' nor 'Student Analysis' sheets were found in the Excel file.")
-                            else:
-                                raise e2
-                    else:
-                        raise
-            elif file_path.suffix.lower() == '.csv':
-                df = pd.read_csv(file_path)
+            # The format is detected from the content and read with the fastest installed engine
+            if schema is not None and schema.source is not None:
+                sheet_name = schema.sheet_name
+                if sheet_name is not None:
+                    print(f"Reading data from '{sheet_name}' sheet...")
+                df = schema.read_data()
             else:
-                raise ValueError(f"Unsupported file format: {file_path.suffix}. Please provide an Excel (.xlsx, .xls) or CSV (.csv) file.")
+                df, sheet_name = read_table(file_path)
 
             # Check if dataframe is empty
             if df.empty:
                 raise ValueError("The file contains no data.")
 
-            # Process the dataframe
-            student_responses, question_numbers = FileHandler.process_dataframe(df)
-            return student_responses, question_numbers, sheet_name
+            return df, sheet_name
 
         except pd.errors.EmptyDataError:
             raise ValueError("The file contains no data.")
@@ -78,50 +78,74 @@ class FileHandler:
             raise
 
     @staticmethod
-    def process_dataframe(df: pd.DataFrame) -> tuple:
+    def iter_dataframe_chunks(file_path: str, chunk_size: int = 10000, schema: Optional["HeaderSchema"] = None):
+        """
+        Read the quiz export in chunks of rows.
+
+        CSV files (plain, compressed or inside a zip archive) are streamed with the pandas chunked reader;
+        other formats cannot be streamed, so they are read whole and then sliced.
+
+        Args:
+            file_path: Path to the file
+            chunk_size: Maximum number of rows per chunk
+            schema: Header analysis of the file; when given, only the used columns are loaded
+
+        Yields:
+            DataFrame chunks in file order
+        """
+        import pandas as pd
+        from app.services.readers import open_table
+
+        source = schema.source if schema is not None and schema.source is not None else open_table(file_path)
+        if source.file_format != 'csv':
+            df, _ = FileHandler.read_dataframe(file_path, schema)
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size]
+            return
+
+        try:
+            options = {}
+            if schema is not None:
+                # A bad score cell may only show up in a late chunk, so the score types are inferred per chunk
+                options.update(usecols=schema.usecols, dtype=schema.dtypes(numeric_scores=False))
+            with source.open_csv() as stream:
+                for chunk in pd.read_csv(stream, chunksize=chunk_size, **options):
+                    yield chunk
+        except pd.errors.EmptyDataError:
+            raise ValueError("The file contains no data.")
+        except pd.errors.ParserError:
+            raise ValueError("Error parsing the file. Please check the file format.")
+
+    @staticmethod
+    def process_dataframe(df: "pd.DataFrame", schema: Optional["HeaderSchema"] = None) -> tuple:
         """
         Process the dataframe and extract student responses.
 
         Args:
             df: Pandas DataFrame containing quiz data
+            schema: Header analysis of the file, if already done (the columns are validated otherwise)
 
         Returns:
             Tuple containing list of student responses and list of question numbers
         """
-        try:
-            # Check for required columns
-            required_columns = ['Student Name', 'First Name', 'Last Name', 'Student ID', 'Score']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
-
-            # Identify question columns
-            question_columns = [col for col in df.columns if col.endswith('_Response')]
-            if not question_columns:
-                raise ValueError("No question response columns found. Column names should end with '_Response'.")
-
-            # Extract question numbers, handling potential format issues
-            question_numbers = []
-            for col in question_columns:
-                try:
-                    # Extract the part before '_Response' and convert to int
-                    q_num = int(col.split('_')[0])
-                    question_numbers.append(q_num)
-                except (ValueError, IndexError):
-                    # Skip columns with invalid format
-                    print(f"Warning: Skipping column '{col}' - could not extract question number.")
-                    continue
+        from app.models.quiz_data import StudentResponse
+        from app.services.header_schema import analyze_header
+        from app.services.response_encoding import EncodedResponses, format_memory_report
 
-            if not question_numbers:
-                raise ValueError("No valid question numbers found in column names.")
+        try:
+            # Required columns, question numbers and score columns come from the header
+            if schema is None:
+                schema = analyze_header(list(df.columns))
+            question_numbers = schema.question_numbers
 
-            # Identify score columns
-            score_columns = [f"{num}_Score" for num in question_numbers]
+            # Dictionary-encode the responses so each distinct answer is stored once per question
+            encoded_responses = EncodedResponses.encode([df[f"{q_num}_Response"] for q_num in question_numbers])
+            print(format_memory_report(encoded_responses.memory_report()))
 
             # Create student responses
             student_responses = []
 
-            for idx, row in df.iterrows():
+            for position, (idx, row) in enumerate(df.iterrows()):
                 try:
                     # Create a student response object
                     student_response = StudentResponse(
@@ -136,11 +160,9 @@ class FileHandler:
                         question_scores={}
                     )
 
-                    # Add responses and scores for each question
-                    for q_num, q_col in zip(question_numbers, question_columns):
-                        if q_col in df.columns:
-                            student_response.responses[q_num] = str(row.get(q_col, ''))
-
+                    # Responses are decoded from the shared vocabulary, scores are added per question
+                    student_response.responses.update(encoded_responses.decode_row(position, question_numbers))
+                    for q_num in question_numbers:
                         score_col = f"{q_num}_Score"
                         if score_col in df.columns:
                             try:
@@ -211,7 +233,7 @@ class FileHandler:
                 continue
 
     @staticmethod
-    def export_to_excel(quiz_params: QuizParameters, output_data: List[Dict[str, Any]], 
+    def export_to_excel(quiz_params: "QuizParameters", output_data: List[Dict[str, Any]], 
                         question_numbers: List[int], output_folder: str = "", sheet_name: str = None):
         """
         Export the results to an Excel file.
@@ -231,6 +253,8 @@ class FileHandler:
         else:
             file_path = Path(filename)
 
+        import pandas as pd
+
         # Convert the output data to a pandas DataFrame
         df = pd.DataFrame(output_data)
 
@@ -243,7 +267,7 @@ class FileHandler:
         print(f"\nResults exported to {file_path}")
 
     @staticmethod
-    def export_to_csv(quiz_params: QuizParameters, output_data: List[Dict[str, Any]], 
+    def export_to_csv(quiz_params: "QuizParameters", output_data: List[Dict[str, Any]], 
                       question_numbers: List[int], output_folder: str = ""):
         """
         Export the results to a CSV file.
@@ -2,6 +2,7 @@
 File service for handling file uploads and processing.
 """
 from typing import List, Dict, Any, Tuple, Optional
+import numpy as np
 import pandas as pd
 from fastapi import UploadFile
 import os
@@ -9,6 +10,11 @@ import tempfile
 from pathlib import Path
 
 from app.models.quiz_data import StudentResponse
+from app.services.file_handler import FileHandler
+from app.services.header_schema import HeaderSchema, read_header
+from app.services.incremental import row_fingerprints
+from app.services.metrics import metrics
+from app.services.readers import read_table
 
 
 async def save_upload_file_temp(upload_file: UploadFile) -> Path:
@@ -23,16 +29,19 @@ async def save_upload_file_temp(upload_file: UploadFile) -> Path:
     """
     try:
         suffix = Path(upload_file.filename).suffix
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp:
+        with metrics.time_stage("receive"), tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp:
             content = await upload_file.read()
             temp.write(content)
             temp_path = Path(temp.name)
+        metrics.bytes_ingested.inc(len(content))
         return temp_path
     except Exception:
         raise Exception("Failed to save file")
 
 
-async def process_file(file: UploadFile) -> Tuple[List[StudentResponse], List[int], str]:
+async def process_file(
+    file: UploadFile
+) -> Tuple[List[StudentResponse], List[int], Optional[str], Optional[np.ndarray]]:
     """
     Process the uploaded Excel/CSV file and extract student responses.
 
@@ -40,119 +49,61 @@ async def process_file(file: UploadFile) -> Tuple[List[StudentResponse], List[in
         file: The uploaded file
 
     Returns:
-        Tuple containing list of student responses, list of question numbers, and sheet name (if applicable)
+        Tuple containing list of student responses, list of question numbers, sheet name (if applicable)
+        and the fingerprint of each input row (None if some rows could not be processed)
     """
     temp_file = await save_upload_file_temp(file)
     try:
-        # Determine file type and read accordingly
-        sheet_name = None
-        if temp_file.suffix.lower() in ['.xlsx', '.xls']:
-            try:
-                # Try to read from the "Team Analysis" sheet
-                df = pd.read_excel(temp_file, sheet_name="Team Analysis")
-                sheet_name = "Team Analysis"
-                print("Reading data from 'Team Analysis' sheet...")
-            except ValueError as e:
-                # If the Team Analysis sheet doesn't exist, try Student Analysis sheet
-                if "Worksheet named 'Team Analysis' not found" in str(e):
-                    try:
-                        # Try to read from the "Student Analysis" sheet
-                        df = pd.read_excel(temp_file, sheet_name="Student Analysis")
-                        sheet_name = "Student Analysis"
-                        print("Reading data from 'Student Analysis' sheet...")
-                    except ValueError as e2:
-                        # If neither sheet exists, try the first sheet
-                        if "Worksheet named 'Student Analysis' not found" in str(e2):
-                            # Get the first sheet name
-                            xl = pd.ExcelFile(temp_file)
-                            first_sheet_name = xl.sheet_names[0]
-                            df = pd.read_excel(temp_file, sheet_name=first_sheet_name)
-                            sheet_name = first_sheet_name
-                            print(f"Reading data from the first sheet: '{first_sheet_name}'...")
-                        else:
-                            raise e2
-                else:
-                    raise
-        elif temp_file.suffix.lower() == '.csv':
-            df = pd.read_csv(temp_file)
-        else:
-            raise ValueError("Unsupported file format. Please upload an Excel or CSV file.")
-
-        # Process the dataframe
-        student_responses, question_numbers = process_dataframe(df)
-        return student_responses, question_numbers, sheet_name
+        # Reading the table and building the student responses are both timed as parsing
+        with metrics.time_stage("parse"):
+            df, sheet_name, schema = _read_temp_table(temp_file, validate_header=True)
+            student_responses, question_numbers = FileHandler.process_dataframe(df, schema)
+            # Rows are hashed from the table, in one pass, for incremental reconversion
+            fingerprints = row_fingerprints(df) if len(df) == len(student_responses) else None
+        return student_responses, question_numbers, sheet_name, fingerprints
     finally:
         # Clean up the temp file
         os.unlink(temp_file)
 
 
-def process_dataframe(df: pd.DataFrame) -> Tuple[List[StudentResponse], List[int]]:
+async def read_upload_dataframe(file: UploadFile, validate_header: bool = False) -> Tuple[pd.DataFrame, Optional[str]]:
     """
-    Process the dataframe and extract student responses.
+    Read the uploaded quiz export into a DataFrame.
 
     Args:
-        df: Pandas DataFrame containing quiz data
+        file: The uploaded file
+        validate_header: Check the header row of the quiz export before the data is read, then load
+            only the used columns with explicit dtypes
 
     Returns:
-        Tuple containing list of student responses and list of question numbers
+        Tuple containing the DataFrame and sheet name (if applicable)
     """
-    # Debug: Print dataframe columns
-    print("DataFrame columns:", df.columns.tolist())
-
-    # Debug: Print first few rows of dataframe
-    print("DataFrame head:")
-    print(df.head())
-
-    # Identify question columns
-    question_columns = [col for col in df.columns if col.endswith('_Response')]
-    question_numbers = [int(col.split('_')[0]) for col in question_columns]
-
-    # Debug: Print question columns and numbers
-    print("Question columns:", question_columns)
-    print("Question numbers:", question_numbers)
-
-    # Identify score columns
-    score_columns = [f"{num}_Score" for num in question_numbers]
-
-    # Debug: Print score columns
-    print("Score columns:", score_columns)
-
-    # Check if all required columns exist
-    required_columns = ['Team', 'Student Name', 'First Name', 'Last Name', 
-                        'Email Address', 'Student ID', 'Score']
-
-    # Filter out columns that don't exist in the dataframe
-    existing_required_columns = [col for col in required_columns if col in df.columns]
-
-    # Debug: Print existing required columns
-    print("Existing required columns:", existing_required_columns)
-
-    # Create student responses
-    student_responses = []
-
-    for _, row in df.iterrows():
-        # Create a student response object
-        student_response = StudentResponse(
-            team=row.get('Team') if 'Team' in df.columns else None,
-            student_name=row.get('Student Name', ''),
-            first_name=row.get('First Name', ''),
-            last_name=row.get('Last Name', ''),
-            email=row.get('Email Address') if 'Email Address' in df.columns else None,
-            student_id=str(row.get('Student ID', '')),
-            original_score=float(row.get('Score', 0)),
-            responses={},
-            question_scores={}
-        )
-
-        # Add responses and scores for each question
-        for q_num, q_col in zip(question_numbers, question_columns):
-            if q_col in df.columns:
-                student_response.responses[q_num] = str(row.get(q_col, ''))
-
-            score_col = f"{q_num}_Score"
-            if score_col in df.columns:
-                student_response.question_scores[q_num] = float(row.get(score_col, 0))
-
-        student_responses.append(student_response)
-
-    return student_responses, question_numbers
+    temp_file = await save_upload_file_temp(file)
+    try:
+        with metrics.time_stage("parse"):
+            df, sheet_name, _ = _read_temp_table(temp_file, validate_header)
+            return df, sheet_name
+    finally:
+        # Clean up the temp file
+        os.unlink(temp_file)
+
+
+def _read_temp_table(
+    temp_file: Path,
+    validate_header: bool
+) -> Tuple[pd.DataFrame, Optional[str], Optional[HeaderSchema]]:
+    """Read a saved upload (see read_upload_dataframe); the header schema is returned when it was validated."""
+    # The format is detected from the content, through the same readers as the CLI
+    if validate_header:
+        # A wrong file is rejected from its header row, before the data is parsed
+        schema = read_header(temp_file, fallback_to_first_sheet=True)
+        sheet_name = schema.sheet_name
+        if sheet_name is not None:
+            print(f"Reading data from '{sheet_name}' sheet...")
+        df = schema.read_data()
+    else:
+        schema = None
+        df, sheet_name = read_table(temp_file, fallback_to_first_sheet=True)
+
+    return df, sheet_name, schema
+
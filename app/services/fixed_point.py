@@ -0,0 +1,190 @@
+"""
+Exact fixed-point score conversion.
+
+Scores are scaled to integer units (1/scale of a point) and every conversion
+factor is turned into an exact fraction, so a converted question score is an
+integer numerator over one common denominator. Each student's total is rounded
+once, and the question scores are rounded down and then topped up by largest
+remainder until they add up to that total. Verification is then an exact
+integer comparison instead of a floating-point tolerance.
+"""
+from fractions import Fraction
+from math import lcm
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from app.models.quiz_data import QuizParameters
+
+# Largest denominator accepted when a parameter is turned into a fraction
+MAX_DENOMINATOR = 10 ** 6
+
+# Products above this bound could overflow int64 while summing a row
+SAFE_UNITS = 2 ** 62
+
+
+def to_units(values: np.ndarray, scale: int) -> np.ndarray:
+    """
+    Convert point values to integer units.
+
+    Args:
+        values: Scores in points
+        scale: Units per point
+
+    Returns:
+        int64 array of scores in units
+    """
+    return np.rint(np.asarray(values, dtype=np.float64) * scale).astype(np.int64)
+
+
+def from_units(units: np.ndarray, scale: int) -> np.ndarray:
+    """
+    Convert integer units back to points.
+
+    Args:
+        units: Scores in units
+        scale: Units per point
+
+    Returns:
+        float64 array of scores in points
+    """
+    return units / scale
+
+
+def _fraction(value: float) -> Fraction:
+    return Fraction(value).limit_denominator(MAX_DENOMINATOR)
+
+
+def exact_factors(quiz_params: QuizParameters, question_numbers: List[int]) -> Tuple[np.ndarray, int, int]:
+    """
+    Express the conversion factors as integer numerators over one common denominator.
+
+    Args:
+        quiz_params: Quiz parameters for conversion
+        question_numbers: Question numbers, one per matrix column
+
+    Returns:
+        Tuple of the question numerators, the numerator of the total-score factor and the common denominator
+    """
+    new_max = _fraction(quiz_params.new_max_score)
+    total_factor = new_max / _fraction(quiz_params.original_max_score)
+    if quiz_params.use_weighted_questions:
+        total_weight = sum(_fraction(weight) for weight in quiz_params.question_weights.values())
+        if total_weight <= 0:
+            raise ValueError("Weighted questions require at least one positive question weight.")
+        question_value = _fraction(quiz_params.original_question_value)
+        factors = [new_max * _fraction(quiz_params.get_question_weight(q_num)) / total_weight / question_value
+                   for q_num in question_numbers]
+    else:
+        factors = [total_factor] * len(question_numbers)
+
+    denominator = lcm(total_factor.denominator, *(factor.denominator for factor in factors))
+    numerators = np.array([factor.numerator * (denominator // factor.denominator) for factor in factors],
+                          dtype=np.int64)
+    total_numerator = total_factor.numerator * (denominator // total_factor.denominator)
+    return numerators, total_numerator, denominator
+
+
+def apportion(exact: np.ndarray, denominator: Union[int, np.ndarray], totals: np.ndarray) -> np.ndarray:
+    """
+    Round each row of exact values so that it adds up to its total (largest-remainder method).
+
+    Every value is rounded down, then the values with the largest remainders are raised
+    by one unit until the row reaches its total; ties go to the earlier question. A row
+    whose total cannot be reached by rounding alone keeps its rounded-down values, so
+    verification reports it.
+
+    Args:
+        exact: Numerators of the exact values (students × questions)
+        denominator: Common denominator of the exact values, or one per row (as a column)
+        totals: Target total of each row, in units
+
+    Returns:
+        int64 array of rounded values, in units
+    """
+    floors, remainders = np.divmod(exact, denominator)
+    num_questions = exact.shape[1]
+    shortfall = totals - floors.sum(axis=1)
+    raised = np.where((shortfall >= 0) & (shortfall <= num_questions), shortfall, 0)
+
+    # Only rows that fall short are sorted; their first `raised` questions by remainder get one more unit
+    rows = np.flatnonzero(raised)
+    order = np.argsort(-remainders[rows], axis=1, kind='stable')
+    bumps = np.zeros(order.shape, dtype=np.int64)
+    np.put_along_axis(bumps, order, np.arange(num_questions) < raised[rows, np.newaxis], axis=1)
+    floors[rows] += bumps
+    return floors
+
+
+def convert_units(scores: np.ndarray, original_scores: np.ndarray, quiz_params: QuizParameters,
+                  question_numbers: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert a score matrix exactly, in integer units.
+
+    Args:
+        scores: Original question scores in points (students × questions)
+        original_scores: Original total scores in points (students)
+        quiz_params: Quiz parameters for conversion, with fixed_point_scale set
+        question_numbers: Question numbers, one per matrix column
+
+    Returns:
+        Tuple of converted question scores and converted totals, in units
+    """
+    scale = quiz_params.fixed_point_scale
+    numerators, total_numerator, denominator = exact_factors(quiz_params, question_numbers)
+    score_units = to_units(scores, scale)
+    original_units = to_units(original_scores, scale)
+
+    row_bound = int(np.abs(score_units).max(initial=0)) * int(numerators.max(initial=0)) * len(question_numbers)
+    total_bound = int(np.abs(original_units).max(initial=0)) * total_numerator
+    if max(row_bound, total_bound) >= SAFE_UNITS:
+        raise ValueError(f"Scores are too large for fixed-point scale {scale}; use a smaller scale.")
+
+    exact = score_units * numerators[np.newaxis, :]
+    if quiz_params.use_weighted_questions:
+        exact_totals = exact.sum(axis=1)
+    else:
+        exact_totals = original_units * total_numerator
+    # Totals are rounded half up, once per student
+    total_units = (exact_totals + denominator // 2) // denominator
+    return apportion(exact, denominator, total_units), total_units
+
+
+def round_for_display(question_scores: np.ndarray, totals: np.ndarray, scale: int,
+                      decimals: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Round fixed-point scores for display so that each row still adds up to its displayed total.
+
+    The totals are rounded half up to `decimals`, and the question scores are apportioned
+    to them with the same largest-remainder step as the conversion.
+
+    Args:
+        question_scores: Converted question scores in points (students × questions)
+        totals: Converted totals in points (students)
+        scale: Units per point of the scores
+        decimals: Decimals shown
+
+    Returns:
+        Tuple of the displayed question scores and totals, in points
+    """
+    display_scale = 10 ** decimals
+    question_units = to_units(question_scores, scale)
+    total_units = to_units(totals, scale)
+    # Exact display values are units × display_scale / scale
+    total_display = (total_units * display_scale + scale // 2) // scale
+    question_display = apportion(question_units * display_scale, scale, total_display)
+    return from_units(question_display, display_scale), from_units(total_display, display_scale)
+
+
+def verify_units(question_units: np.ndarray, total_units: np.ndarray) -> np.ndarray:
+    """
+    Check that every student's question scores add up exactly to the total.
+
+    Args:
+        question_units: Converted question scores in units (students × questions)
+        total_units: Converted totals in units (students)
+
+    Returns:
+        Boolean array, True for each student whose scores add up
+    """
+    return question_units.sum(axis=1) == total_units
@@ -0,0 +1,185 @@
+"""
+Header-first validation of quiz exports.
+
+Only the header row of a file is read and checked before the data is parsed:
+required columns, question numbers from the `N_Response` columns and their
+`N_Score` pairs. A wrong file is rejected in milliseconds with every problem
+listed at once, and the full read reuses the analysis.
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.readers import TableSource, open_table
+from app.services.score_matrix import find_question_numbers
+
+# Columns every export must have
+REQUIRED_COLUMNS = ['Student Name', 'First Name', 'Last Name', 'Student ID', 'Score']
+
+# Identity columns kept by the full read, as text so IDs with leading zeros survive
+TEXT_COLUMNS = ['Team', 'Student Name', 'First Name', 'Last Name', 'Email Address', 'Student ID']
+
+
+class HeaderSchema:
+    """Validated layout of an export, derived from its header row."""
+
+    def __init__(self, columns: List[str], question_numbers: List[int], sheet_name: Optional[str] = None,
+                 source: Optional[TableSource] = None):
+        """
+        Create a schema.
+
+        Args:
+            columns: Column names of the header row
+            question_numbers: Question numbers in column order
+            sheet_name: Sheet the header was read from (Excel only)
+            source: File the header was read from, with its detected format and engine
+        """
+        self.columns = list(columns)
+        self.question_numbers = list(question_numbers)
+        self.sheet_name = sheet_name
+        self.source = source
+
+    @property
+    def response_columns(self) -> List[str]:
+        """`N_Response` column of each question."""
+        return [f"{q_num}_Response" for q_num in self.question_numbers]
+
+    @property
+    def score_columns(self) -> List[str]:
+        """`N_Score` column of each question."""
+        return [f"{q_num}_Score" for q_num in self.question_numbers]
+
+    @property
+    def usecols(self) -> List[str]:
+        """Columns the full read loads: identity, total score and the question columns, in file order."""
+        keep = set(TEXT_COLUMNS + ['Score'] + self.response_columns + self.score_columns)
+        return [col for col in self.columns if col in keep]
+
+    def dtypes(self, numeric_scores: bool = True) -> Dict[str, Any]:
+        """
+        Explicit dtypes of the loaded columns, so the readers skip type inference.
+
+        Args:
+            numeric_scores: Read the score columns as floats (otherwise their type is inferred)
+
+        Returns:
+            Column name -> dtype mapping
+        """
+        present = set(self.columns)
+        dtypes: Dict[str, Any] = {col: str for col in TEXT_COLUMNS if col in present}
+        # Responses repeat a handful of answers per question
+        dtypes.update({col: 'category' for col in self.response_columns})
+        if numeric_scores:
+            dtypes.update({col: np.float64 for col in self.score_columns})
+            if 'Score' in present:
+                dtypes['Score'] = np.float64
+        return dtypes
+
+    def read_frame(self, read: Callable[..., pd.DataFrame], *args, **options) -> pd.DataFrame:
+        """
+        Read the data with column projection and explicit dtypes.
+
+        Args:
+            read: Reader accepting usecols and dtype (e.g. pd.read_csv or TableSource.read)
+            *args: Positional reader arguments (e.g. a file path or buffer)
+            **options: Further reader options
+
+        Returns:
+            DataFrame with only the used columns
+        """
+        try:
+            return read(*args, usecols=self.usecols, dtype=self.dtypes(), **options)
+        except ValueError:
+            # A non-numeric score cell; read the scores untyped, they are coerced to numbers later
+            print("Warning: Non-numeric values found in the score columns.")
+            for buffer in args:
+                if hasattr(buffer, 'seek'):
+                    buffer.seek(0)
+            return read(*args, usecols=self.usecols, dtype=self.dtypes(numeric_scores=False), **options)
+
+    def read_data(self) -> pd.DataFrame:
+        """
+        Read the whole file the header came from, with column projection and explicit dtypes.
+
+        Returns:
+            DataFrame with only the used columns
+        """
+        if self.source is None:
+            raise ValueError("The header was not read from a file.")
+        return self.read_frame(self.source.read)
+
+
+def analyze_header(columns: List[str], sheet_name: Optional[str] = None,
+                   required_columns: Optional[List[str]] = None,
+                   source: Optional[TableSource] = None) -> HeaderSchema:
+    """
+    Validate the column names of an export.
+
+    Args:
+        columns: Column names of the header row
+        sheet_name: Sheet the header was read from (Excel only)
+        required_columns: Columns that must be present (defaults to REQUIRED_COLUMNS)
+        source: File the header was read from
+
+    Returns:
+        HeaderSchema of the export
+
+    Raises:
+        ValueError: Listing every problem of the header
+    """
+    columns = [str(col) for col in columns]
+    present = set(columns)
+    problems = []
+
+    missing_columns = [col for col in (required_columns or REQUIRED_COLUMNS) if col not in present]
+    if missing_columns:
+        problems.append(f"Missing required columns: {', '.join(missing_columns)}")
+
+    question_numbers = find_question_numbers(columns)
+    if not any(col.endswith('_Response') for col in columns):
+        problems.append("No question response columns found. Column names should end with '_Response'.")
+    elif not question_numbers:
+        problems.append("No valid question numbers found in column names.")
+
+    duplicates = sorted({q_num for q_num in question_numbers if question_numbers.count(q_num) > 1})
+    if duplicates:
+        problems.append(f"Questions listed more than once: {', '.join(str(q_num) for q_num in duplicates)}")
+
+    unpaired = [q_num for q_num in question_numbers if f"{q_num}_Score" not in present]
+    if unpaired:
+        problems.append(f"Missing score columns for questions {', '.join(str(q_num) for q_num in unpaired)} "
+                        f"(expected {', '.join(f'{q_num}_Score' for q_num in unpaired)})")
+
+    if problems:
+        raise ValueError("; ".join(problems))
+
+    answered = set(question_numbers)
+    for col in columns:
+        if col.endswith('_Score') and col.split('_')[0].isdigit() and int(col.split('_')[0]) not in answered:
+            print(f"Warning: Ignoring column '{col}' - it has no matching response column.")
+
+    return HeaderSchema(columns, question_numbers, sheet_name, source)
+
+
+def read_header(file_path: str, fallback_to_first_sheet: bool = False, member: Optional[str] = None) -> HeaderSchema:
+    """
+    Read and validate only the header row of a file.
+
+    Args:
+        file_path: Path to the quiz export
+        fallback_to_first_sheet: Use the first sheet of a workbook when no preferred sheet exists
+        member: Name of the export inside the zip archive at `file_path`
+
+    Returns:
+        HeaderSchema of the file
+    """
+    source = open_table(file_path, fallback_to_first_sheet, member=member)
+    try:
+        columns = source.columns()
+    except pd.errors.EmptyDataError:
+        raise ValueError("The file contains no data.")
+    except pd.errors.ParserError:
+        raise ValueError("Error parsing the file. Please check the file format.")
+
+    return analyze_header(columns, source.sheet_name, source=source)
@@ -0,0 +1,334 @@
+"""
+Incremental reconversion of re-uploaded quiz exports.
+
+The previous run of each quiz is remembered as one 64-bit fingerprint per
+input row (keyed by student ID) together with the converted row. Fingerprints
+are hashed from the input table in one vectorized pass. When the same quiz is
+uploaded again, only rows that were added or changed go through
+convert_scores; unchanged rows reuse their earlier result and rows that are no
+longer in the export are dropped. The history is bounded by quizzes and by
+rows, so it never holds more than a fixed number of converted rows.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.models.quiz_data import QuizParameters, StudentResponse, ProcessedResponse
+from app.services.quiz_service import convert_scores
+
+
+def input_frame(student_responses: List[StudentResponse]) -> pd.DataFrame:
+    """
+    Lay parsed rows out as a table, one column per field, question score and response.
+
+    Args:
+        student_responses: Parsed input rows
+
+    Returns:
+        DataFrame with one row per student
+    """
+    question_numbers = sorted({q_num for response in student_responses
+                               for q_num in (*response.question_scores, *response.responses)})
+    columns: Dict[str, Any] = {
+        field: [getattr(response, field) for response in student_responses]
+        for field in StudentResponse.model_fields if field not in ("responses", "question_scores")
+    }
+    for q_num in question_numbers:
+        columns[f"{q_num}_Score"] = [response.question_scores.get(q_num) for response in student_responses]
+        columns[f"{q_num}_Response"] = [response.responses.get(q_num) for response in student_responses]
+    return pd.DataFrame(columns)
+
+
+def row_fingerprints(frame: pd.DataFrame) -> np.ndarray:
+    """
+    Hash every row of an input table in one vectorized pass.
+
+    Args:
+        frame: Input table, as read from the export (or laid out by input_frame)
+
+    Returns:
+        One uint64 per row that changes whenever any cell of the row, or the set of columns, changes
+    """
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    # Row hashes do not cover the column names; they are folded in so a renamed question changes every row
+    layout = hashlib.blake2b("\x1f".join(map(str, frame.columns)).encode('utf-8'), digest_size=8).digest()
+    return hashes ^ np.uint64(int.from_bytes(layout, 'little'))
+
+
+def parameters_fingerprint(quiz_params: QuizParameters) -> str:
+    """
+    Hash the conversion parameters; a different hash means no earlier result can be reused.
+
+    Args:
+        quiz_params: Quiz parameters
+
+    Returns:
+        Hex digest of the parameters
+    """
+    return hashlib.blake2b(quiz_params.model_dump_json().encode('utf-8'), digest_size=16).hexdigest()
+
+
+def row_keys(student_responses: List[StudentResponse]) -> List[str]:
+    """
+    Key every row by its student ID; repeated IDs are numbered in file order.
+
+    Args:
+        student_responses: Parsed input rows
+
+    Returns:
+        One unique key per row
+    """
+    seen: Dict[str, int] = {}
+    keys = []
+    for response in student_responses:
+        occurrence = seen.get(response.student_id, 0)
+        seen[response.student_id] = occurrence + 1
+        keys.append(response.student_id if occurrence == 0 else f"{response.student_id}#{occurrence + 1}")
+    return keys
+
+
+class ConversionDelta:
+    """Rows added, changed, removed and reused compared with the previous run of a quiz."""
+
+    def __init__(self, added: List[str], changed: List[str], removed: List[str], unchanged: int,
+                 previous_run: bool, parameters_changed: bool, cohort_reconverted: int = 0):
+        """
+        Create a delta report.
+
+        Args:
+            added: Keys of rows that were not in the previous run
+            changed: Keys of rows whose cells changed
+            removed: Keys of rows of the previous run that are no longer present
+            unchanged: Number of rows reused without conversion
+            previous_run: Whether a previous run of the quiz was found
+            parameters_changed: Whether the previous run used different parameters (full reconversion)
+            cohort_reconverted: Number of unchanged rows reconverted because a cohort curve moved them
+        """
+        self.added = added
+        self.changed = changed
+        self.removed = removed
+        self.unchanged = unchanged
+        self.previous_run = previous_run
+        self.parameters_changed = parameters_changed
+        self.cohort_reconverted = cohort_reconverted
+
+    @property
+    def converted(self) -> int:
+        """Number of rows that went through the conversion."""
+        return len(self.added) + len(self.changed) + self.cohort_reconverted
+
+    def summary(self) -> str:
+        """One-line description of the delta."""
+        if not self.previous_run:
+            return f"First run of this quiz: {self.converted} rows converted."
+        if self.parameters_changed:
+            return f"Quiz parameters changed: all {self.converted} rows reconverted."
+        if self.cohort_reconverted:
+            return (f"The cohort curve moved every row: all {self.converted} rows reconverted "
+                    f"({len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed).")
+        return (f"Reconverted {self.converted} rows ({len(self.added)} added, {len(self.changed)} changed), "
+                f"reused {self.unchanged}, dropped {len(self.removed)} removed.")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the delta into a JSON-serializable dictionary.
+
+        Returns:
+            Dictionary with the row keys and counts of the delta
+        """
+        return {
+            "previous_run": self.previous_run,
+            "parameters_changed": self.parameters_changed,
+            "added": self.added,
+            "changed": self.changed,
+            "removed": self.removed,
+            "unchanged": self.unchanged,
+            "converted": self.converted,
+            "cohort_reconverted": self.cohort_reconverted,
+            "summary": self.summary()
+        }
+
+
+class QuizRun:
+    """Last run of a quiz: row keys and fingerprints, with the processed row of each key."""
+
+    def __init__(self, parameters_key: str, keys: List[str], fingerprints: np.ndarray,
+                 processed_responses: List[ProcessedResponse]):
+        """
+        Create the record of a run.
+
+        Args:
+            parameters_key: Fingerprint of the parameters used
+            keys: Row key of each row
+            fingerprints: Row fingerprint of each row
+            processed_responses: Processed row of each row
+        """
+        self.parameters_key = parameters_key
+        self.keys = pd.Index(keys, dtype=object)
+        self.fingerprints = fingerprints
+        self.processed_responses = processed_responses
+
+    @property
+    def num_rows(self) -> int:
+        """Number of rows of the run."""
+        return len(self.processed_responses)
+
+
+class ConversionHistory:
+    """Thread-safe store of the last run of each quiz, by quiz name, bounded by quizzes and by rows."""
+
+    def __init__(self, max_quizzes: int = 64, max_rows: int = 100_000):
+        """
+        Create an empty history.
+
+        Args:
+            max_quizzes: Maximum number of quizzes remembered; the least recently used are evicted first
+            max_rows: Maximum number of rows remembered over all quizzes; a larger run is not remembered
+        """
+        self.max_quizzes = max_quizzes
+        self.max_rows = max_rows
+        self._runs: "OrderedDict[str, QuizRun]" = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ConversionHistory":
+        """
+        Create a history bounded by the QUIZ_HISTORY_ROWS environment variable (default 100000 rows).
+
+        Returns:
+            Configured ConversionHistory
+        """
+        return cls(max_rows=int(os.environ.get("QUIZ_HISTORY_ROWS", 100_000)))
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    @property
+    def num_rows(self) -> int:
+        """Number of rows remembered over all quizzes."""
+        return self._rows
+
+    def get(self, quiz_name: str) -> Optional[QuizRun]:
+        """
+        Fetch the last run of a quiz.
+
+        Args:
+            quiz_name: Name of the quiz
+
+        Returns:
+            QuizRun of the quiz, or None
+        """
+        with self._lock:
+            run = self._runs.get(quiz_name)
+            if run is not None:
+                self._runs.move_to_end(quiz_name)
+            return run
+
+    def put(self, quiz_name: str, run: QuizRun):
+        """
+        Remember the run of a quiz, replacing the previous one.
+
+        Args:
+            quiz_name: Name of the quiz
+            run: Record of the run
+        """
+        with self._lock:
+            previous = self._runs.pop(quiz_name, None)
+            if previous is not None:
+                self._rows -= previous.num_rows
+            if run.num_rows > self.max_rows:
+                return
+            self._runs[quiz_name] = run
+            self._rows += run.num_rows
+            while len(self._runs) > self.max_quizzes or self._rows > self.max_rows:
+                self._rows -= self._runs.popitem(last=False)[1].num_rows
+
+
+def incremental_convert(
+    student_responses: List[StudentResponse],
+    quiz_params: QuizParameters,
+    history: ConversionHistory,
+    fingerprints: Optional[np.ndarray] = None
+) -> Tuple[List[ProcessedResponse], ConversionDelta]:
+    """
+    Convert student scores, reusing the results of unchanged rows from the previous run of the quiz.
+
+    The result is identical to convert_scores on all rows, in input order.
+
+    Args:
+        student_responses: List of student responses
+        quiz_params: Quiz parameters for conversion
+        history: Store of previous runs; updated with this run
+        fingerprints: Row fingerprints of the input table the responses were parsed from (see
+            row_fingerprints); computed from the responses when not given
+
+    Returns:
+        Tuple of the processed responses and the delta against the previous run
+    """
+    if fingerprints is None:
+        fingerprints = row_fingerprints(input_frame(student_responses))
+    if len(fingerprints) != len(student_responses):
+        raise ValueError("Expected one fingerprint per student response.")
+    keys = row_keys(student_responses)
+    parameters_key = parameters_fingerprint(quiz_params)
+
+    previous = history.get(quiz_params.quiz_name)
+    parameters_changed = previous is not None and previous.parameters_key != parameters_key
+    previous_run = previous if previous is not None and not parameters_changed else None
+
+    # Hash join of the row keys against the previous run; a row is reused when its fingerprint is unchanged
+    if previous_run is not None:
+        positions = previous_run.keys.get_indexer(keys)
+    else:
+        positions = np.full(len(keys), -1, dtype=np.intp)
+    found = positions >= 0
+    unchanged = np.zeros(len(keys), dtype=bool)
+    if previous_run is not None:
+        unchanged[found] = previous_run.fingerprints[positions[found]] == fingerprints[found]
+    pending = np.flatnonzero(~unchanged).tolist()
+    added = [keys[i] for i in np.flatnonzero(~found)]
+    changed = [keys[i] for i in np.flatnonzero(found & ~unchanged)]
+    removed = []
+    if previous_run is not None:
+        present = np.zeros(previous_run.num_rows, dtype=bool)
+        present[positions[found]] = True
+        removed = previous_run.keys[~present].tolist()
+
+    processed: List[Optional[ProcessedResponse]] = [None] * len(student_responses)
+    for index in np.flatnonzero(unchanged):
+        processed[index] = previous_run.processed_responses[positions[index]]
+
+    cohort_reconverted = 0
+    if (pending or removed) and quiz_params.curve != 'linear':
+        from app.services.curves import CURVES
+
+        # A curve fitted on the cohort moves every row as soon as one row is added, changed or removed
+        if CURVES[quiz_params.curve].needs_cohort:
+            cohort_reconverted = len(student_responses) - len(pending)
+            pending = list(range(len(student_responses)))
+
+    # Only the new and changed rows go through the conversion
+    for index, response in zip(pending, convert_scores([student_responses[i] for i in pending], quiz_params)):
+        processed[index] = response
+    history.put(quiz_params.quiz_name, QuizRun(parameters_key, keys, fingerprints, processed))
+
+    delta = ConversionDelta(
+        added=added,
+        changed=changed,
+        removed=removed,
+        unchanged=len(student_responses) - len(pending),
+        previous_run=previous is not None,
+        parameters_changed=parameters_changed,
+        cohort_reconverted=cohort_reconverted
+    )
+    return processed, delta
+
+
+# Shared history used by the web routes
+conversion_history = ConversionHistory.from_env()
@@ -0,0 +1,144 @@
+"""
+Item analysis statistics over the question score matrix.
+
+All statistics are computed column-wise on the ScoreMatrix, so a single pass
+over the data covers every question at once.
+"""
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from app.services.response_encoding import EncodedResponses
+from app.services.score_matrix import ScoreMatrix
+
+# Response values that count as "no response" (the object path stores str(nan))
+MISSING_RESPONSES = ['', 'nan', 'None']
+
+
+class ItemAnalysis:
+    """Per-question difficulty, discrimination, response distribution and non-response rate."""
+
+    def __init__(self, question_numbers: List[int], question_values: np.ndarray, mean_scores: np.ndarray,
+                 difficulty: np.ndarray, discrimination: np.ndarray, non_response_rate: np.ndarray,
+                 distributions: List[Dict[str, int]], num_students: int):
+        """
+        Create an item analysis result.
+
+        Args:
+            question_numbers: Question numbers, one per statistic entry
+            question_values: Maximum value of each question on the original scale
+            mean_scores: Mean original score per question
+            difficulty: Mean score divided by the question value
+            discrimination: Point-biserial correlation of each question with the total
+            non_response_rate: Fraction of students without a response per question
+            distributions: Response -> count mapping per question
+            num_students: Number of students analysed
+        """
+        self.question_numbers = question_numbers
+        self.question_values = question_values
+        self.mean_scores = mean_scores
+        self.difficulty = difficulty
+        self.discrimination = discrimination
+        self.non_response_rate = non_response_rate
+        self.distributions = distributions
+        self.num_students = num_students
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Convert the statistics into one JSON-serializable dictionary per question.
+
+        Returns:
+            List of dictionaries with the statistics of each question
+        """
+        records = []
+        for j, q_num in enumerate(self.question_numbers):
+            difficulty = self.difficulty[j]
+            discrimination = self.discrimination[j]
+            records.append({
+                "question": q_num,
+                "question_value": float(self.question_values[j]),
+                "mean_score": float(self.mean_scores[j]),
+                "difficulty": None if np.isnan(difficulty) else float(difficulty),
+                "discrimination": None if np.isnan(discrimination) else float(discrimination),
+                "non_response_rate": float(self.non_response_rate[j]),
+                "response_distribution": self.distributions[j]
+            })
+        return records
+
+
+def _response_statistics(responses: Optional[EncodedResponses], num_questions: int) -> tuple:
+    """
+    Compute the non-response rate and the response distribution of every question.
+
+    Args:
+        responses: Dictionary-encoded responses, or None if responses are unavailable
+        num_questions: Number of questions
+
+    Returns:
+        Tuple of the non-response rate array and the list of distributions
+    """
+    if responses is None or responses.num_students == 0:
+        return np.zeros(num_questions), [{} for _ in range(num_questions)]
+
+    non_response_rate = np.zeros(num_questions)
+    distributions = []
+    for j in range(num_questions):
+        # Counting integer codes replaces a string comparison per cell
+        counts = responses.counts(j)
+        answered = {
+            text: int(count)
+            for text, count in zip(responses.vocabularies[j], counts)
+            if text not in MISSING_RESPONSES and count > 0
+        }
+        non_response_rate[j] = 1.0 - sum(answered.values()) / responses.num_students
+        distributions.append(dict(sorted(answered.items(), key=lambda item: -item[1])))
+    return non_response_rate, distributions
+
+
+def analyze_items(matrix: ScoreMatrix, question_value: Optional[float] = None) -> ItemAnalysis:
+    """
+    Compute item analysis statistics for every question in the score matrix.
+
+    Args:
+        matrix: Score matrix with the original question scores
+        question_value: Value of each question on the original scale. When omitted the
+            highest observed score of each question is used.
+
+    Returns:
+        ItemAnalysis with one entry per question
+    """
+    scores = matrix.scores
+    num_students, num_questions = scores.shape
+    if num_students == 0:
+        raise ValueError("No student responses available for item analysis.")
+
+    if question_value is not None:
+        question_values = np.full(num_questions, float(question_value))
+    else:
+        question_values = scores.max(axis=0)
+
+    # Column sums and cross products against the total, without centered copies of the matrix
+    totals = scores.sum(axis=1)
+    mean_scores = scores.mean(axis=0)
+    mean_total = totals.mean()
+    var_items = np.einsum('ij,ij->j', scores, scores) / num_students - mean_scores ** 2
+    var_total = totals @ totals / num_students - mean_total ** 2
+    covariance = totals @ scores / num_students - mean_scores * mean_total
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        difficulty = np.where(question_values > 0, mean_scores / question_values, np.nan)
+        denominator = np.sqrt(np.clip(var_items, 0, None) * max(var_total, 0.0))
+        discrimination = np.where(denominator > 1e-12, covariance / denominator, np.nan)
+
+    non_response_rate, distributions = _response_statistics(matrix.responses, num_questions)
+
+    return ItemAnalysis(
+        question_numbers=matrix.question_numbers,
+        question_values=question_values,
+        mean_scores=mean_scores,
+        difficulty=difficulty,
+        discrimination=discrimination,
+        non_response_rate=non_response_rate,
+        distributions=distributions,
+        num_students=num_students
+    )
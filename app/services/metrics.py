@@ -0,0 +1,220 @@
+"""
+Request metrics of the web app in the Prometheus text format.
+
+Each processing stage of an upload (receive, parse, convert, verify, render,
+export) is timed into a latency histogram, and counters track the rows
+processed, bytes ingested, cache hits and misses and rejected uploads.
+Recording only finds the bucket outside the lock and then adds a few numbers
+under a per-metric lock, so it is safe from the event loop and from worker
+threads and costs a few microseconds per request stage.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Upper bounds of the latency buckets, in seconds (+Inf is implied)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Stages timed for every upload
+STAGES = ("receive", "parse", "convert", "verify", "render", "export")
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    """Sample value as Prometheus writes it: integers without a fraction, infinity as +Inf."""
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Label set of a sample, e.g. {stage="parse"}; empty without labels."""
+    if not names:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        """
+        Create a counter.
+
+        Args:
+            name: Metric name
+            documentation: Help text of the metric
+            label_names: Names of the labels that split the counter
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *label_values: str):
+        """
+        Add to the counter.
+
+        Args:
+            amount: Non-negative amount to add
+            label_values: One value per label name
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase.")
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Current value for the given label values."""
+        with self._lock:
+            return self._values.get(label_values, 0.0)
+
+    def samples(self) -> List[str]:
+        """Sample lines of the exposition format."""
+        with self._lock:
+            values = sorted(self._values.items())
+        if not values and not self.label_names:
+            values = [((), 0.0)]
+        return [f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+                for labels, value in values]
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, optionally split by labels."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Create a histogram.
+
+        Args:
+            name: Metric name
+            documentation: Help text of the metric
+            label_names: Names of the labels that split the histogram
+            buckets: Increasing upper bounds of the buckets
+        """
+        if list(buckets) != sorted(buckets):
+            raise ValueError("Histogram buckets must be in increasing order.")
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(float(bound) for bound in buckets)
+        # Per label set: count in each bucket (the last one is +Inf), sum of the observations
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        """
+        Record one observation.
+
+        Args:
+            value: Observed value
+            label_values: One value per label name
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(label_values)
+            if counts is None:
+                counts = self._counts[label_values] = [0] * (len(self.buckets) + 1)
+                self._sums[label_values] = 0.0
+            counts[index] += 1
+            self._sums[label_values] += value
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        """
+        Observe the duration of a block, in seconds.
+
+        Args:
+            label_values: One value per label name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def count(self, *label_values: str) -> int:
+        """Number of observations for the given label values."""
+        with self._lock:
+            return sum(self._counts.get(label_values, ()))
+
+    def samples(self) -> List[str]:
+        """Sample lines of the exposition format: cumulative buckets, sum and count per label set."""
+        with self._lock:
+            snapshot = sorted((labels, list(counts), self._sums[labels]) for labels, counts in self._counts.items())
+        lines = []
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.label_names + ("le",), labels + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics of the web app, rendered together for the /metrics endpoint."""
+
+    def __init__(self):
+        """Create the stage histogram and the counters."""
+        self.stage_seconds = Histogram("quiz_stage_duration_seconds", "Time spent in each processing stage",
+                                       ("stage",))
+        self.rows_processed = Counter("quiz_rows_processed_total", "Student rows converted")
+        self.bytes_ingested = Counter("quiz_bytes_ingested_total", "Bytes of uploaded files received")
+        self.cache_hits = Counter("quiz_cache_hits_total", "Lookups answered from a cache", ("cache",))
+        self.cache_misses = Counter("quiz_cache_misses_total", "Lookups that missed a cache", ("cache",))
+        self.rejected_uploads = Counter("quiz_uploads_rejected_total", "Uploads rejected by admission control")
+        self._metrics = [self.stage_seconds, self.rows_processed, self.bytes_ingested, self.cache_hits,
+                         self.cache_misses, self.rejected_uploads]
+
+    def time_stage(self, stage: str):
+        """
+        Time a block as one processing stage.
+
+        Args:
+            stage: One of STAGES
+
+        Returns:
+            Context manager that records the duration of the block
+        """
+        return self.stage_seconds.time(stage)
+
+    def observe_stage(self, stage: str, seconds: float):
+        """
+        Record the duration of a stage measured by the caller (e.g. across the chunks of a streamed page).
+
+        Args:
+            stage: One of STAGES
+            seconds: Duration of the stage
+        """
+        self.stage_seconds.observe(seconds, stage)
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            Exposition text, ending with a newline
+        """
+        lines = []
+        for metric in self._metrics:
+            kind = "histogram" if isinstance(metric, Histogram) else "counter"
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Metrics shared by the endpoints
+metrics = MetricsRegistry()
@@ -0,0 +1,304 @@
+"""
+Sharded parallel processing of a single large CSV file.
+
+The file is split into byte ranges that start and end on record boundaries
+(newlines outside quoted fields), each shard is parsed and converted in a
+worker process with the shared QuizParameters, and the results are merged
+back in the original row order. Workers hand the score matrix, response codes
+and converted scores back through shared memory; only identities, response
+vocabularies and summaries are pickled.
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.models.quiz_data import QuizParameters
+from app.services.answer_key import regrade_matrix
+from app.services.curves import curve_for, curve_scores, without_curve
+from app.services.pipeline import ConvertedBatch
+from app.services.header_schema import HeaderSchema, analyze_header
+from app.services.quiz_service import convert_score_matrix
+from app.services.response_encoding import EncodedResponses
+from app.services.score_matrix import ScoreMatrix
+from app.services.shared_buffers import SharedArray, SharedSegmentRun, attach_arrays, share_arrays
+from app.services.summary_stats import SummaryAccumulator
+
+# Bytes read at a time while scanning for record boundaries
+SCAN_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Arrays a worker hands back through shared memory
+SHARED_FIELDS = ('scores', 'original_scores', 'codes', 'question_new_scores', 'new_scores')
+
+
+class SharedShard:
+    """Converted shard whose arrays live in shared memory."""
+
+    def __init__(self, identity: pd.DataFrame, question_numbers: List[int], vocabularies: List[List[str]],
+                 arrays: Dict[str, SharedArray]):
+        """
+        Create a shared shard.
+
+        Args:
+            identity: Identity columns of the shard's students
+            question_numbers: Question numbers of the matrix columns
+            vocabularies: Response vocabulary of each question
+            arrays: Shared-memory descriptor of each field in SHARED_FIELDS
+        """
+        self.identity = identity
+        self.question_numbers = question_numbers
+        self.vocabularies = vocabularies
+        self.arrays = arrays
+
+    def to_batch(self, views: Dict[str, np.ndarray]) -> ConvertedBatch:
+        """
+        Rebuild the converted shard on top of attached array views (no copy).
+
+        Args:
+            views: Array view of each field, from attach_arrays
+
+        Returns:
+            ConvertedBatch backed by the shared memory
+        """
+        matrix = ScoreMatrix(self.identity, self.question_numbers, views['scores'], views['original_scores'],
+                             EncodedResponses(views['codes'], self.vocabularies))
+        return ConvertedBatch(matrix, views['question_new_scores'], views['new_scores'])
+
+
+def _next_record_start(block: bytes, block_start: int, quotes_before: int, position: int) -> Optional[int]:
+    """
+    Find the first record start at or after a position inside a block.
+
+    Args:
+        block: Bytes of the current block
+        block_start: File offset of the block
+        quotes_before: Number of quote characters in the file before the block
+        position: File offset to start searching from
+
+    Returns:
+        File offset right after the first newline outside quotes, or None if the block has none
+    """
+    index = position - block_start
+    while True:
+        newline = block.find(b'\n', index)
+        if newline < 0:
+            return None
+        # An even number of quotes before the newline means it is not inside a quoted field
+        if (quotes_before + block.count(b'"', 0, newline)) % 2 == 0:
+            return block_start + newline + 1
+        index = newline + 1
+
+
+def find_record_boundaries(file_path: str, num_shards: int) -> Tuple[int, List[Tuple[int, int]]]:
+    """
+    Split a CSV file into byte ranges aligned to record boundaries.
+
+    Quoted fields may contain newlines; quote parity is tracked from the start of
+    the file (escaped quotes are doubled in CSV, so parity stays correct).
+
+    Args:
+        file_path: Path to the CSV file
+        num_shards: Desired number of shards
+
+    Returns:
+        Tuple of the header length in bytes and the list of (start, end) byte ranges
+    """
+    file_size = os.path.getsize(file_path)
+    targets: List[int] = []
+    starts: List[int] = []
+    header_end: Optional[int] = None
+
+    with open(file_path, 'rb') as csv_file:
+        block_start = 0
+        quotes_before = 0
+        pending_from: Optional[int] = 0
+        while block_start < file_size:
+            block = csv_file.read(SCAN_BLOCK_SIZE)
+            if not block:
+                break
+            block_end = block_start + len(block)
+
+            while pending_from is not None and pending_from < block_end:
+                record_start = _next_record_start(block, block_start, quotes_before, max(pending_from, block_start))
+                if record_start is None:
+                    break
+                if header_end is None:
+                    # The first record is the header; shard targets are spread over the rest
+                    header_end = record_start
+                    data_size = file_size - header_end
+                    targets = [header_end + data_size * k // num_shards for k in range(1, num_shards)]
+                starts.append(record_start)
+                # Targets that fall inside the record just passed need no boundary of their own
+                targets = [target for target in targets if target >= record_start]
+                pending_from = targets.pop(0) if targets else None
+
+            quotes_before += block.count(b'"')
+            block_start = block_end
+
+    if header_end is None:
+        # Header without a trailing newline: no data rows
+        return file_size, []
+
+    boundaries = starts + [file_size]
+    shards = [(start, end) for start, end in zip(boundaries[:-1], boundaries[1:]) if end > start]
+    return header_end, shards
+
+
+def read_shard(file_path: str, header: bytes, start: int, end: int,
+               schema: Optional[HeaderSchema] = None) -> pd.DataFrame:
+    """
+    Parse one shard of a CSV file.
+
+    Args:
+        file_path: Path to the CSV file
+        header: Header record bytes, prepended so every shard parses with the same columns
+        start: Byte offset of the first record of the shard
+        end: Byte offset right after the last record of the shard
+        schema: Header analysis; when given, only the used columns are loaded, with explicit dtypes
+
+    Returns:
+        DataFrame with the rows of the shard
+    """
+    with open(file_path, 'rb') as csv_file:
+        csv_file.seek(start)
+        data = csv_file.read(end - start)
+    if schema is not None:
+        return schema.read_frame(pd.read_csv, io.BytesIO(header + data))
+    return pd.read_csv(io.BytesIO(header + data))
+
+
+def convert_shard(file_path: str, header: bytes, start: int, end: int, quiz_params: QuizParameters,
+                  schema: HeaderSchema, bins: int = 10) -> Tuple[ConvertedBatch, SummaryAccumulator]:
+    """
+    Parse and convert one shard; runs inside a worker process.
+
+    Args:
+        file_path: Path to the CSV file
+        header: Header record bytes
+        start: Byte offset of the first record of the shard
+        end: Byte offset right after the last record of the shard
+        quiz_params: Quiz parameters for conversion
+        schema: Header analysis of the file
+        bins: Number of histogram bins of the shard summary
+
+    Returns:
+        Tuple of the converted shard and the summary of its converted totals
+    """
+    matrix = ScoreMatrix.from_dataframe(read_shard(file_path, header, start, end, schema), schema.question_numbers)
+    matrix = regrade_matrix(matrix, quiz_params)
+    question_new_scores, new_scores = convert_score_matrix(matrix, quiz_params)
+    accumulator = SummaryAccumulator.for_scale(quiz_params.new_max_score, bins)
+    accumulator.update(new_scores)
+    return ConvertedBatch(matrix, question_new_scores, new_scores), accumulator
+
+
+def convert_shard_shared(file_path: str, header: bytes, start: int, end: int, quiz_params: QuizParameters,
+                         schema: HeaderSchema, bins: int,
+                         names: Dict[str, str]) -> Tuple[SharedShard, SummaryAccumulator]:
+    """
+    Parse and convert one shard and write its arrays to shared memory; runs inside a worker process.
+
+    Args:
+        file_path: Path to the CSV file
+        header: Header record bytes
+        start: Byte offset of the first record of the shard
+        end: Byte offset right after the last record of the shard
+        quiz_params: Quiz parameters for conversion
+        schema: Header analysis of the file
+        bins: Number of histogram bins of the shard summary
+        names: Shared-memory segment name of each field in SHARED_FIELDS
+
+    Returns:
+        Tuple of the shared shard descriptor and the summary of its converted totals
+    """
+    batch, accumulator = convert_shard(file_path, header, start, end, quiz_params, schema, bins)
+    matrix = batch.matrix
+    arrays = share_arrays({
+        'scores': matrix.scores,
+        'original_scores': matrix.original_scores,
+        'codes': matrix.responses.codes,
+        'question_new_scores': batch.question_new_scores,
+        'new_scores': batch.new_scores
+    }, names)
+    return SharedShard(matrix.identity, matrix.question_numbers, matrix.responses.vocabularies, arrays), accumulator
+
+
+def _merge_batches(batches: List[ConvertedBatch]) -> ConvertedBatch:
+    """Concatenate converted shards in order; the result owns its memory."""
+    return ConvertedBatch(
+        ScoreMatrix.concat([batch.matrix for batch in batches]),
+        np.concatenate([batch.question_new_scores for batch in batches]),
+        np.concatenate([batch.new_scores for batch in batches])
+    )
+
+
+def parallel_convert_csv(file_path: str, quiz_params: QuizParameters, workers: Optional[int] = None,
+                         num_shards: Optional[int] = None, bins: int = 10) -> Tuple[ConvertedBatch, SummaryAccumulator]:
+    """
+    Parse and convert a large CSV file using several worker processes.
+
+    Args:
+        file_path: Path to the CSV file
+        quiz_params: Quiz parameters for conversion
+        workers: Number of worker processes (defaults to the number of CPUs)
+        num_shards: Number of shards (defaults to the number of workers)
+        bins: Number of histogram bins of the summary
+
+    Returns:
+        Tuple of the converted rows in original file order and the merged summary of the converted totals
+    """
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+
+    workers = workers or os.cpu_count() or 1
+    header_size, shards = find_record_boundaries(str(path), num_shards or workers)
+    if not shards:
+        raise ValueError("The file contains no data.")
+
+    with open(path, 'rb') as csv_file:
+        header = csv_file.read(header_size)
+    columns = pd.read_csv(io.BytesIO(header), nrows=0).columns
+    schema = analyze_header(list(columns))
+
+    # Shards are converted linearly; a curve is fitted on the merged cohort afterwards
+    linear_params = without_curve(quiz_params)
+    if workers > 1 and len(shards) > 1:
+        with SharedSegmentRun(SHARED_FIELDS) as run:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(convert_shard_shared, str(path), header, start, end, linear_params,
+                                    schema, bins, run.names(slot))
+                    for slot, (start, end) in enumerate(shards)
+                ]
+                # Collect in submission order so the merged rows keep the file order
+                results = [future.result() for future in futures]
+
+            with ExitStack() as stack:
+                batches = [shard.to_batch(stack.enter_context(attach_arrays(shard.arrays)))
+                           for shard, _ in results]
+                merged = _merge_batches(batches)
+                # Drop the views before the segments are closed
+                del batches
+    else:
+        results = [convert_shard(str(path), header, start, end, linear_params, schema, bins)
+                   for start, end in shards]
+        merged = _merge_batches([batch for batch, _ in results])
+
+    accumulator = SummaryAccumulator.for_scale(quiz_params.new_max_score, bins)
+    if quiz_params.curve != 'linear':
+        curve = curve_for(quiz_params)
+        curve.observe(merged.new_scores)
+        merged.question_new_scores, merged.new_scores = curve_scores(
+            curve, merged.question_new_scores, merged.new_scores, quiz_params.fixed_point_scale)
+        accumulator.update(merged.new_scores)
+        return merged, accumulator
+
+    for _, shard_accumulator in results:
+        accumulator.merge(shard_accumulator)
+    return merged, accumulator
@@ -0,0 +1,315 @@
+"""
+Streaming conversion pipeline.
+
+Reads an input file in chunks, converts each chunk as a ScoreMatrix and feeds
+optional summary accumulators, so large cohorts never have to be materialized
+as ProcessedResponse objects.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from app.models.quiz_data import QuizParameters
+from app.services.answer_key import regrade_matrix
+from app.services.curves import curve_for, curve_scores, without_curve
+from app.services.file_handler import FileHandler
+from app.services.header_schema import read_header
+from app.services.quiz_service import LONG_COLUMNS, convert_score_matrix, generate_long_frame, generate_output_frame
+from app.services.readers import archive_members
+from app.services.score_matrix import ScoreMatrix
+from app.services.summary_stats import SummaryAccumulator
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Rows of the long output table built at a time (students × questions)
+LONG_FRAME_ROWS = 500000
+
+
+class ConvertedBatch:
+    """One converted chunk of the input."""
+
+    def __init__(self, matrix: ScoreMatrix, question_new_scores: np.ndarray, new_scores: np.ndarray):
+        """
+        Create a converted batch.
+
+        Args:
+            matrix: Score matrix of the chunk
+            question_new_scores: Converted question scores (students × questions)
+            new_scores: Converted totals (students)
+        """
+        self.matrix = matrix
+        self.question_new_scores = question_new_scores
+        self.new_scores = new_scores
+
+
+def iter_score_matrices(file_path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[ScoreMatrix]:
+    """
+    Read a file as a sequence of score matrices.
+
+    Args:
+        file_path: Path to the quiz data file
+        batch_size: Maximum number of students per matrix
+
+    Yields:
+        ScoreMatrix per chunk, in file order
+    """
+    # The header is validated before the first chunk is parsed
+    schema = read_header(file_path)
+    for chunk in FileHandler.iter_dataframe_chunks(file_path, batch_size, schema):
+        yield ScoreMatrix.from_dataframe(chunk, schema.question_numbers)
+
+
+def stream_convert(file_path: str, quiz_params: QuizParameters, batch_size: int = DEFAULT_BATCH_SIZE,
+                   accumulator: Optional[SummaryAccumulator] = None) -> Iterator[ConvertedBatch]:
+    """
+    Convert a file chunk by chunk.
+
+    A curve that depends on the cohort is fitted in a first pass over the file, so the file is read twice.
+
+    Args:
+        file_path: Path to the quiz data file
+        quiz_params: Quiz parameters for conversion
+        batch_size: Maximum number of students per chunk
+        accumulator: Optional summary accumulator fed with the converted totals of every chunk
+
+    Yields:
+        ConvertedBatch per chunk, in file order
+    """
+    curve = curve_for(quiz_params)
+    linear_params = without_curve(quiz_params)
+    if curve.needs_cohort:
+        # First pass: fit the curve on the converted totals of the whole file
+        for matrix in iter_score_matrices(file_path, batch_size):
+            curve.observe(convert_score_matrix(regrade_matrix(matrix, quiz_params), linear_params)[1])
+
+    for matrix in iter_score_matrices(file_path, batch_size):
+        matrix = regrade_matrix(matrix, quiz_params)
+        question_new_scores, new_scores = convert_score_matrix(matrix, linear_params)
+        if quiz_params.curve != 'linear':
+            question_new_scores, new_scores = curve_scores(curve, question_new_scores, new_scores,
+                                                           quiz_params.fixed_point_scale)
+        if accumulator is not None:
+            accumulator.update(new_scores)
+        yield ConvertedBatch(matrix, question_new_scores, new_scores)
+
+
+def summarize_file(file_path: str, quiz_params: QuizParameters, batch_size: int = DEFAULT_BATCH_SIZE,
+                   bins: int = 10) -> SummaryAccumulator:
+    """
+    Stream a file through the conversion and summarize the converted totals.
+
+    Args:
+        file_path: Path to the quiz data file
+        quiz_params: Quiz parameters for conversion
+        batch_size: Maximum number of students per chunk
+        bins: Number of histogram bins between 0 and the new maximum score
+
+    Returns:
+        SummaryAccumulator for the whole file
+    """
+    accumulator = SummaryAccumulator.for_scale(quiz_params.new_max_score, bins)
+    for _ in stream_convert(file_path, quiz_params, batch_size, accumulator):
+        pass
+    return accumulator
+
+
+def summarize_files(file_paths: List[str], quiz_params: QuizParameters, batch_size: int = DEFAULT_BATCH_SIZE,
+                    bins: int = 10, workers: int = 1) -> Tuple[SummaryAccumulator, List[SummaryAccumulator]]:
+    """
+    Summarize several files, optionally in parallel worker processes, and merge the results.
+
+    Args:
+        file_paths: Paths to the quiz data files
+        quiz_params: Quiz parameters for conversion
+        batch_size: Maximum number of students per chunk
+        bins: Number of histogram bins between 0 and the new maximum score
+        workers: Number of worker processes (1 processes the files sequentially)
+
+    Returns:
+        Tuple of the merged accumulator and the per-file accumulators
+    """
+    if workers > 1 and len(file_paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(summarize_file, path, quiz_params, batch_size, bins) for path in file_paths]
+            per_file = [future.result() for future in futures]
+    else:
+        per_file = [summarize_file(path, quiz_params, batch_size, bins) for path in file_paths]
+
+    merged = SummaryAccumulator.for_scale(quiz_params.new_max_score, bins)
+    for accumulator in per_file:
+        merged.merge(accumulator)
+    return merged, per_file
+
+
+def convert_file(file_path: str, quiz_params: QuizParameters, workers: int = 1,
+                 member: Optional[str] = None) -> ConvertedBatch:
+    """
+    Convert a whole file; uncompressed CSV files are split across worker processes.
+
+    Args:
+        file_path: Path to the quiz data file
+        quiz_params: Quiz parameters for conversion
+        workers: Number of worker processes for CSV files
+        member: Name of the export inside the zip archive at `file_path`
+
+    Returns:
+        ConvertedBatch with every student of the file, in file order
+    """
+    schema = read_header(file_path, member=member)
+    source = schema.source
+    if source.file_format == 'csv' and source.compression is None and source.member is None:
+        # Imported here: the parallel reader builds on ConvertedBatch from this module
+        from app.services.parallel_reader import parallel_convert_csv
+
+        batch, _ = parallel_convert_csv(file_path, quiz_params, workers=workers)
+        return batch
+
+    df, _ = FileHandler.read_dataframe(file_path, schema)
+    matrix = regrade_matrix(ScoreMatrix.from_dataframe(df, schema.question_numbers), quiz_params)
+    question_new_scores, new_scores = convert_score_matrix(matrix, quiz_params)
+    return ConvertedBatch(matrix, question_new_scores, new_scores)
+
+
+def convert_with_max_points_row(file_path: str, quiz_params: QuizParameters,
+                                member: Optional[str] = None) -> Tuple[QuizParameters, ConvertedBatch]:
+    """
+    Convert a whole file whose max-points row holds the question weights.
+
+    The row is located in the score matrix, turned into the weights and dropped before anything
+    is converted, so it is never converted as a student. The file is read whole in this process.
+
+    Args:
+        file_path: Path to the quiz data file
+        quiz_params: Quiz parameters for conversion (their weights are replaced)
+        member: Name of the export inside the zip archive at `file_path`
+
+    Returns:
+        Tuple of the weighted quiz parameters and the ConvertedBatch of the students
+    """
+    from app.services.weight_profiles import profile_from_max_points_matrix, validate_question_weights
+
+    schema = read_header(file_path, member=member)
+    df, _ = FileHandler.read_dataframe(file_path, schema)
+    profile, matrix = profile_from_max_points_matrix(ScoreMatrix.from_dataframe(df, schema.question_numbers),
+                                                     quiz_params.quiz_name)
+    quiz_params = profile.apply(quiz_params)
+    validate_question_weights(quiz_params, schema.question_numbers)
+
+    matrix = regrade_matrix(matrix, quiz_params)
+    question_new_scores, new_scores = convert_score_matrix(matrix, quiz_params)
+    return quiz_params, ConvertedBatch(matrix, question_new_scores, new_scores)
+
+
+def convert_archive(file_path: str, quiz_params: QuizParameters,
+                    workers: int = 1) -> List[Tuple[str, ConvertedBatch]]:
+    """
+    Convert every export inside a zip archive, one export per worker process.
+
+    Args:
+        file_path: Path to the zip archive
+        quiz_params: Quiz parameters for conversion
+        workers: Number of worker processes
+
+    Returns:
+        (member name, ConvertedBatch) per export, in archive order
+    """
+    members = archive_members(file_path)
+    if not members:
+        raise ValueError(f"No quiz exports found in {Path(file_path).name}.")
+
+    if workers <= 1 or len(members) == 1:
+        return [(member, convert_file(file_path, quiz_params, member=member)) for member in members]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(members))) as executor:
+        futures = [executor.submit(convert_file, file_path, quiz_params, 1, member) for member in members]
+        return [(member, future.result()) for member, future in zip(members, futures)]
+
+
+def export_converted(batch: ConvertedBatch, output_path: str, fixed_point_scale: Optional[int] = None) -> None:
+    """
+    Write the output table of a converted file (.xlsx or .csv, by extension).
+
+    Args:
+        batch: Converted students
+        output_path: Path of the output file
+        fixed_point_scale: Units per point when the batch was converted in fixed point
+    """
+    output_frame = generate_output_frame(batch.matrix, batch.question_new_scores, batch.new_scores,
+                                         fixed_point_scale)
+    if Path(output_path).suffix.lower() == '.xlsx':
+        output_frame.to_excel(output_path, index=False)
+    else:
+        output_frame.to_csv(output_path, index=False)
+
+
+def iter_long_frames(batches: Iterable[ConvertedBatch], frame_rows: int = LONG_FRAME_ROWS,
+                     fixed_point_scale: Optional[int] = None) -> Iterator["pd.DataFrame"]:
+    """
+    Turn converted batches into the long output table, a block of students at a time.
+
+    Args:
+        batches: Converted students, in order
+        frame_rows: Approximate number of (student, question) rows per yielded frame
+        fixed_point_scale: Units per point when the batches were converted in fixed point
+
+    Yields:
+        DataFrame with LONG_COLUMNS for a block of students
+    """
+    for batch in batches:
+        students_per_frame = max(1, frame_rows // max(1, batch.matrix.num_questions))
+        for start in range(0, batch.matrix.num_students, students_per_frame):
+            rows = slice(start, start + students_per_frame)
+            yield generate_long_frame(batch.matrix.take(rows), batch.question_new_scores[rows],
+                                      batch.new_scores[rows], fixed_point_scale)
+
+
+def export_long(batches: Iterable[ConvertedBatch], output_path: str, frame_rows: int = LONG_FRAME_ROWS,
+                fixed_point_scale: Optional[int] = None) -> int:
+    """
+    Write the long output table (one row per student and question) as CSV or Parquet, by extension.
+
+    The table is written a block at a time, so it is never held in memory as a whole.
+
+    Args:
+        batches: Converted students, in order
+        output_path: Path of the output file (.csv or .parquet)
+        frame_rows: Approximate number of rows written at a time
+        fixed_point_scale: Units per point when the batches were converted in fixed point
+
+    Returns:
+        Number of rows written
+    """
+    suffix = Path(output_path).suffix.lower()
+    if suffix not in ('.csv', '.parquet'):
+        raise ValueError(f"Unsupported long output format: {suffix}. Please use a .csv or .parquet file.")
+
+    written = 0
+    if suffix == '.parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Writing Parquet files requires the 'pyarrow' package.")
+        schema = pa.schema([(name, pa.string()) for name in LONG_COLUMNS[:5]] + [
+            ("Question", pa.int64()), ("Response", pa.dictionary(pa.int32(), pa.string())),
+            ("Original Score", pa.float64()), ("Converted Score", pa.float64())
+        ])
+        with pq.ParquetWriter(output_path, schema) as writer:
+            for frame in iter_long_frames(batches, frame_rows, fixed_point_scale):
+                # Identity columns are written as text whatever dtype they were read with
+                frame = frame.astype({name: "string" for name in LONG_COLUMNS[:5]})
+                writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+                written += len(frame)
+        return written
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as csv_file:
+        csv_file.write(",".join(LONG_COLUMNS) + "\n")
+        for frame in iter_long_frames(batches, frame_rows, fixed_point_scale):
+            frame.to_csv(csv_file, index=False, header=False)
+            written += len(frame)
+    return written
@@ -1,9 +1,16 @@
 """
 Quiz service for handling quiz score conversion.
 """
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, TYPE_CHECKING
+
 from app.models.quiz_data import QuizParameters, StudentResponse, ProcessedResponse
 
+if TYPE_CHECKING:
+    # numpy/pandas are only needed by the matrix-based conversion
+    import numpy as np
+    import pandas as pd
+    from app.services.score_matrix import ScoreMatrix
+
 
 def convert_scores(
     student_responses: List[StudentResponse], 
@@ -19,11 +26,28 @@ def convert_scores(
     Returns:
         List of processed responses with converted scores
     """
+    if quiz_params.answer_key:
+        from app.services.answer_key import regrade_responses
+
+        # The exported question scores are replaced before anything is converted
+        student_responses = regrade_responses(student_responses, quiz_params)
+        quiz_params = quiz_params.model_copy(update={"answer_key": {}})
+    if quiz_params.curve != 'linear':
+        from app.services.curves import without_curve
+
+        return _curve_responses(convert_scores(student_responses, without_curve(quiz_params)), quiz_params)
+    if quiz_params.fixed_point_scale:
+        return _convert_scores_fixed_point(student_responses, quiz_params)
+
     processed_responses = []
 
     # Conversion factor for total score (used for non-weighted questions)
     conversion_factor = quiz_params.new_max_score / quiz_params.original_max_score
 
+    # Per-question factors are computed once per question instead of once per student;
+    # calculate_new_question_score is linear in the score, so the results are identical
+    question_factors: Dict[int, float] = {}
+
     for student_response in student_responses:
         # Initialize processed response with placeholder for new_score
         processed_response = ProcessedResponse(
@@ -35,7 +59,10 @@ def convert_scores(
         # Convert individual question scores using the appropriate method
         for question_num, original_score in student_response.question_scores.items():
             # Use the method to calculate question scores based on weights
-            new_score = quiz_params.calculate_new_question_score(question_num, original_score)
+            factor = question_factors.get(question_num)
+            if factor is None:
+                factor = question_factors[question_num] = quiz_params.calculate_new_question_score(question_num, 1.0)
+            new_score = original_score * factor
             processed_response.question_new_scores[question_num] = new_score
 
         # If using weighted questions, set the total score as the sum of individual scores
@@ -50,38 +77,156 @@ def convert_scores(
     return processed_responses
 
 
-def verify_conversion(processed_responses: List[ProcessedResponse], quiz_params: QuizParameters) -> bool:
+def _convert_scores_fixed_point(
+    student_responses: List[StudentResponse],
+    quiz_params: QuizParameters
+) -> List[ProcessedResponse]:
+    """Convert student responses exactly, in integer units, as one matrix of every answered question."""
+    import numpy as np
+    from app.services.fixed_point import convert_units, from_units
+
+    question_numbers = sorted({q_num for response in student_responses for q_num in response.question_scores})
+    scores = np.array(
+        [[response.question_scores.get(q_num, 0.0) for q_num in question_numbers] for response in student_responses],
+        dtype=np.float64
+    ).reshape(len(student_responses), len(question_numbers))
+    original_scores = np.array([response.original_score for response in student_responses], dtype=np.float64)
+
+    question_units, total_units = convert_units(scores, original_scores, quiz_params, question_numbers)
+    question_new_scores = from_units(question_units, quiz_params.fixed_point_scale).tolist()
+    new_scores = from_units(total_units, quiz_params.fixed_point_scale).tolist()
+
+    return [
+        ProcessedResponse(
+            **student_response.model_dump(),
+            new_score=new_score,
+            question_new_scores={q_num: row[j] for j, q_num in enumerate(question_numbers)
+                                 if q_num in student_response.question_scores}
+        )
+        for student_response, row, new_score in zip(student_responses, question_new_scores, new_scores)
+    ]
+
+
+def _curve_responses(
+    processed_responses: List[ProcessedResponse],
+    quiz_params: QuizParameters
+) -> List[ProcessedResponse]:
+    """Curve linearly converted responses, fitting the curve on all of them as one cohort."""
+    import numpy as np
+    from app.services.curves import curve_for, curve_scores
+
+    question_numbers = sorted({q_num for response in processed_responses for q_num in response.question_new_scores})
+    question_new_scores = np.array(
+        [[response.question_new_scores.get(q_num, 0.0) for q_num in question_numbers]
+         for response in processed_responses],
+        dtype=np.float64
+    ).reshape(len(processed_responses), len(question_numbers))
+    answered = np.array(
+        [[q_num in response.question_new_scores for q_num in question_numbers] for response in processed_responses],
+        dtype=bool
+    ).reshape(question_new_scores.shape)
+    new_scores = np.array([response.new_score for response in processed_responses], dtype=np.float64)
+
+    curve = curve_for(quiz_params)
+    curve.observe(new_scores)
+    curved_questions, curved_totals = curve_scores(curve, question_new_scores, new_scores,
+                                                   quiz_params.fixed_point_scale, answered)
+    for response, row, total in zip(processed_responses, curved_questions.tolist(), curved_totals.tolist()):
+        response.new_score = total
+        response.question_new_scores = {q_num: row[j] for j, q_num in enumerate(question_numbers)
+                                        if q_num in response.question_new_scores}
+    return processed_responses
+
+
+def convert_score_matrix(matrix: "ScoreMatrix", quiz_params: QuizParameters) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Convert a whole score matrix at once, mirroring convert_scores.
+
+    A curve is fitted on the matrix, so the matrix must hold the whole cohort; chunked
+    callers convert with without_curve(quiz_params) and apply the curve themselves.
+
+    Args:
+        matrix: Score matrix with the original question scores
+        quiz_params: Quiz parameters for conversion
+
+    Returns:
+        Tuple of converted question scores (students × questions) and converted totals (students)
+    """
+    import numpy as np
+
+    if quiz_params.curve != 'linear':
+        # The matrix is the whole cohort the curve is fitted on
+        from app.services.curves import curve_for, curve_scores, without_curve
+
+        question_new_scores, new_scores = convert_score_matrix(matrix, without_curve(quiz_params))
+        curve = curve_for(quiz_params)
+        curve.observe(new_scores)
+        return curve_scores(curve, question_new_scores, new_scores, quiz_params.fixed_point_scale)
+
+    if quiz_params.fixed_point_scale:
+        from app.services.fixed_point import convert_units, from_units
+
+        question_units, total_units = convert_units(matrix.scores, matrix.original_scores, quiz_params,
+                                                    matrix.question_numbers)
+        return (from_units(question_units, quiz_params.fixed_point_scale),
+                from_units(total_units, quiz_params.fixed_point_scale))
+
+    factors = np.asarray(quiz_params.conversion_factors(matrix.question_numbers), dtype=np.float64)
+    question_new_scores = matrix.scores * factors
+
+    if quiz_params.use_weighted_questions:
+        new_scores = question_new_scores.sum(axis=1)
+    else:
+        new_scores = matrix.original_scores * (quiz_params.new_max_score / quiz_params.original_max_score)
+
+    return question_new_scores, new_scores
+
+
+def verify_conversion(processed_responses: List[ProcessedResponse], quiz_params: Optional[QuizParameters] = None) -> bool:
     """
     Verify that the sum of converted question scores equals the total converted score.
 
     Args:
         processed_responses: List of processed responses
-        quiz_params: Quiz parameters used for conversion
+        quiz_params: Quiz parameters used for conversion; when omitted only the
+            per-student summary is printed, without the calculation details
 
     Returns:
         True if verification passes for all students, False otherwise
     """
     all_valid = True
+    exact_checks = None
+    if quiz_params is not None and quiz_params.fixed_point_scale:
+        # Fixed-point results are checked exactly, in integer units, for all students at once
+        exact_checks = _verify_fixed_point(processed_responses, quiz_params.fixed_point_scale)
 
     print("\nVERIFICATION DETAILS:")
     print("-" * 80)
     print(f"{'Student Name':<20} {'Sum of Question Scores':<25} {'Total Score':<15} {'Difference':<15} {'Status':<10}")
     print("-" * 80)
 
-    for response in processed_responses:
+    for index, response in enumerate(processed_responses):
         # Sum of converted question scores
         sum_question_scores = sum(response.question_new_scores.values())
 
         # Calculate the difference
         difference = abs(sum_question_scores - response.new_score)
 
-        # Check if the sum equals the total converted score (with small tolerance for floating point errors)
-        is_valid = difference <= 0.0001
+        if exact_checks is not None:
+            is_valid = bool(exact_checks[index])
+        else:
+            # Check if the sum equals the total converted score (with small tolerance for floating point errors)
+            is_valid = difference <= 0.0001
+        if not is_valid:
+            all_valid = False
 
         # Print verification details for this student
         status = "✓ PASS" if is_valid else "✗ FAIL"
         print(f"{response.student_name:<20} {sum_question_scores:<25.4f} {response.new_score:<15.4f} {difference:<15.4f} {status:<10}")
 
+        if quiz_params is None:
+            continue
+
         # Print detailed calculation information for all students
         print(f"  Calculation details for {response.student_name}:")
 
@@ -127,9 +272,77 @@ def verify_conversion(processed_responses: List[ProcessedResponse], quiz_params:
     return all_valid
 
 
+def _verify_fixed_point(processed_responses: List[ProcessedResponse], scale: int) -> "np.ndarray":
+    """
+    Check fixed-point results exactly: the question scores of each student must add up to the total in integer units.
+
+    Args:
+        processed_responses: Responses converted with a fixed-point scale
+        scale: Units per point
+
+    Returns:
+        Boolean array, True for each student whose scores add up
+    """
+    import numpy as np
+    from app.services.fixed_point import to_units, verify_units
+
+    width = max((len(response.question_new_scores) for response in processed_responses), default=0)
+    question_scores = np.zeros((len(processed_responses), width), dtype=np.float64)
+    for i, response in enumerate(processed_responses):
+        question_scores[i, :len(response.question_new_scores)] = list(response.question_new_scores.values())
+    totals = np.array([response.new_score for response in processed_responses], dtype=np.float64)
+    return verify_units(to_units(question_scores, scale), to_units(totals, scale))
+
+
+def verify_matrix_conversion(
+    matrix: "ScoreMatrix",
+    question_new_scores: "np.ndarray",
+    new_scores: "np.ndarray",
+    quiz_params: QuizParameters,
+    limit: int = 20
+) -> bool:
+    """
+    Verify a converted score matrix: every student's converted question scores must add up to the total.
+
+    All students are checked at once (exactly, in integer units, for fixed-point results); only the
+    students that fail are listed.
+
+    Args:
+        matrix: Score matrix of the students
+        question_new_scores: Converted question scores (students × questions)
+        new_scores: Converted totals (students)
+        quiz_params: Quiz parameters used for conversion
+        limit: Maximum number of failing students listed
+
+    Returns:
+        True if verification passes for all students, False otherwise
+    """
+    import numpy as np
+
+    sums = question_new_scores.sum(axis=1)
+    if quiz_params.fixed_point_scale:
+        from app.services.fixed_point import to_units, verify_units
+
+        valid = verify_units(to_units(question_new_scores, quiz_params.fixed_point_scale),
+                             to_units(new_scores, quiz_params.fixed_point_scale))
+    else:
+        valid = np.abs(sums - new_scores) <= 0.0001
+    failed = np.flatnonzero(~valid)
+
+    print(f"\nVERIFICATION: {matrix.num_students - len(failed)} of {matrix.num_students} students passed "
+          f"{'✓' if not len(failed) else '✗'}")
+    names = matrix.identity['Student Name'].to_numpy()
+    for index in failed[:limit]:
+        print(f"  {names[index]:<20} sum of question scores {sums[index]:.4f} != total {new_scores[index]:.4f}")
+    if len(failed) > limit:
+        print(f"  ... {len(failed) - limit} more students failed")
+    return not len(failed)
+
+
 def generate_output_data(
     processed_responses: List[ProcessedResponse], 
-    question_numbers: List[int]
+    question_numbers: List[int],
+    fixed_point_scale: Optional[int] = None
 ) -> List[Dict]:
     """
     Generate output data for display or export.
@@ -137,6 +350,8 @@ def generate_output_data(
     Args:
         processed_responses: List of processed responses
         question_numbers: List of question numbers
+        fixed_point_scale: Units per point when the scores were converted in fixed point; the displayed
+            question scores are then rounded so that they add up to the displayed total
 
     Returns:
         List of dictionaries with formatted output data
@@ -161,7 +376,21 @@ def generate_output_data(
 
     output_data = []
 
-    for response in processed_responses:
+    displayed_questions = displayed_totals = None
+    if fixed_point_scale and processed_responses:
+        import numpy as np
+        from app.services.fixed_point import round_for_display
+
+        # Questions a student has no score for count as 0 and stay 0 when apportioned
+        question_new_scores = np.array([[response.question_new_scores.get(q_num, 0.0) for q_num in question_numbers]
+                                        for response in processed_responses], dtype=np.float64)
+        new_scores = np.array([response.new_score for response in processed_responses], dtype=np.float64)
+        displayed_questions, displayed_totals = round_for_display(
+            question_new_scores.reshape(len(new_scores), len(question_numbers)), new_scores, fixed_point_scale)
+        displayed_questions = displayed_questions.tolist()
+        displayed_totals = displayed_totals.tolist()
+
+    for i, response in enumerate(processed_responses):
         student_data = {
             "Team": response.team or "",
             "Student Name": response.student_name,
@@ -169,7 +398,7 @@ def generate_output_data(
             "Last Name": response.last_name,
             "Student ID": response.student_id,
             "Original Score": response.original_score,
-            "Converted Score": round(response.new_score, 2)
+            "Converted Score": round(response.new_score, 2) if displayed_totals is None else displayed_totals[i]
         }
 
         # Debug: Print student data
@@ -177,7 +406,7 @@ def generate_output_data(
         print(student_data)
 
         # Add question-specific data
-        for q_num in question_numbers:
+        for j, q_num in enumerate(question_numbers):
             if q_num in response.responses:
                 student_data[f"Q{q_num} Response"] = response.responses[q_num]
 
@@ -185,8 +414,115 @@ def generate_output_data(
                 student_data[f"Q{q_num} Original Score"] = response.question_scores[q_num]
 
             if q_num in response.question_new_scores:
-                student_data[f"Q{q_num} Converted Score"] = round(response.question_new_scores[q_num], 2)
+                student_data[f"Q{q_num} Converted Score"] = (
+                    round(response.question_new_scores[q_num], 2) if displayed_questions is None
+                    else displayed_questions[i][j]
+                )
 
         output_data.append(student_data)
 
     return output_data
+
+
+def generate_output_frame(
+    matrix: "ScoreMatrix",
+    question_new_scores: "np.ndarray",
+    new_scores: "np.ndarray",
+    fixed_point_scale: Optional[int] = None
+) -> "pd.DataFrame":
+    """
+    Generate the output table of a converted score matrix, with the same columns as generate_output_data.
+
+    Args:
+        matrix: Score matrix with the original question scores
+        question_new_scores: Converted question scores (students × questions)
+        new_scores: Converted totals (students)
+        fixed_point_scale: Units per point when the scores were converted in fixed point; the displayed
+            question scores are then rounded so that they add up to the displayed total
+
+    Returns:
+        DataFrame with one row per student
+    """
+    import numpy as np
+    import pandas as pd
+
+    if fixed_point_scale:
+        from app.services.fixed_point import round_for_display
+
+        displayed_questions, displayed_totals = round_for_display(question_new_scores, new_scores, fixed_point_scale)
+    else:
+        displayed_questions, displayed_totals = np.round(question_new_scores, 2), np.round(new_scores, 2)
+
+    columns = {
+        "Team": matrix.identity['Team'].fillna("").to_numpy(),
+        "Student Name": matrix.identity['Student Name'].to_numpy(),
+        "First Name": matrix.identity['First Name'].to_numpy(),
+        "Last Name": matrix.identity['Last Name'].to_numpy(),
+        "Student ID": matrix.identity['Student ID'].to_numpy(),
+        "Original Score": matrix.original_scores,
+        "Converted Score": displayed_totals
+    }
+    for j, q_num in enumerate(matrix.question_numbers):
+        if matrix.responses is not None:
+            columns[f"Q{q_num} Response"] = matrix.responses.decode_column(j)
+        columns[f"Q{q_num} Original Score"] = matrix.scores[:, j]
+        columns[f"Q{q_num} Converted Score"] = displayed_questions[:, j]
+
+    return pd.DataFrame(columns)
+
+
+# Columns of the long output table: one row per (student, question)
+LONG_COLUMNS = ["Team", "Student Name", "First Name", "Last Name", "Student ID", "Question", "Response",
+                "Original Score", "Converted Score"]
+
+
+def generate_long_frame(
+    matrix: "ScoreMatrix",
+    question_new_scores: "np.ndarray",
+    new_scores: Optional["np.ndarray"] = None,
+    fixed_point_scale: Optional[int] = None
+) -> "pd.DataFrame":
+    """
+    Generate the long output table of a converted score matrix: one row per student and question.
+
+    The identity columns are the keys of each row; responses stay dictionary-encoded
+    (a categorical column) and missing responses are left empty.
+
+    Args:
+        matrix: Score matrix with the original question scores
+        question_new_scores: Converted question scores (students × questions)
+        new_scores: Converted totals (students); needed with fixed_point_scale
+        fixed_point_scale: Units per point when the scores were converted in fixed point; each student's
+            question scores are then rounded so that they add up to the total shown in the wide output
+
+    Returns:
+        DataFrame with LONG_COLUMNS and num_students × num_questions rows, student by student
+    """
+    import numpy as np
+    import pandas as pd
+
+    if fixed_point_scale:
+        from app.services.fixed_point import round_for_display
+
+        if new_scores is None:
+            raise ValueError("The converted totals are needed to round fixed-point scores for display.")
+        displayed_questions = round_for_display(question_new_scores, new_scores, fixed_point_scale)[0]
+    else:
+        displayed_questions = np.round(question_new_scores, 2)
+
+    num_questions = matrix.num_questions
+    rows = np.repeat(np.arange(matrix.num_students), num_questions)
+    identity = matrix.identity.iloc[rows]
+    columns = {
+        "Team": identity['Team'].fillna("").to_numpy(),
+        "Student Name": identity['Student Name'].to_numpy(),
+        "First Name": identity['First Name'].to_numpy(),
+        "Last Name": identity['Last Name'].to_numpy(),
+        "Student ID": identity['Student ID'].to_numpy(),
+        "Question": np.tile(np.asarray(matrix.question_numbers, dtype=np.int64), matrix.num_students),
+        "Response": (matrix.responses.flatten() if matrix.responses is not None
+                     else pd.Categorical.from_codes(np.full(len(rows), -1), categories=[])),
+        "Original Score": matrix.scores.ravel(),
+        "Converted Score": displayed_questions.ravel()
+    }
+    return pd.DataFrame(columns, columns=LONG_COLUMNS)
@@ -0,0 +1,435 @@
+"""
+Reader registry for quiz exports.
+
+The format of a file is detected from its first bytes rather than trusted from
+its name, so a workbook saved as .csv or a legacy .xls renamed to .xlsx is read
+with the right parser. Each format lists its engines fastest first; the first
+one whose package is installed is used, and the next one is tried when an
+optional engine turns out to be unavailable. The CLI and the web app both read
+through `read_table`.
+
+Compressed CSV exports (gzip, bzip2, zstd) are decompressed as they are parsed,
+never to a file on disk. A zip archive holds several exports; each one is
+opened as its own table with `open_table(archive, member=name)`.
+"""
+import bz2
+import gzip
+import importlib.util
+import io
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+# File name suffixes accepted as quiz exports
+SUPPORTED_SUFFIXES = ['.csv', '.xlsx', '.xls', '.gz', '.bz2', '.zst', '.parquet', '.zip']
+
+# Leading bytes of each binary format; anything else that decodes as text is CSV
+MAGIC_BYTES = [
+    (b'PK\x03\x04', 'zip'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'xls'),
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+    (b'PAR1', 'parquet'),
+]
+
+# Stream compressions of CSV exports
+COMPRESSIONS = ['gzip', 'bz2', 'zstd']
+
+# Bytes inspected when sniffing
+SNIFF_SIZE = 4096
+
+# Format a suffix promises, to warn about mis-named files
+SUFFIX_FORMATS = {'.csv': 'csv', '.xlsx': 'xlsx', '.xls': 'xls', '.gz': 'gzip', '.bz2': 'bz2', '.zst': 'zstd',
+                  '.parquet': 'parquet', '.zip': 'zip'}
+
+# Sheets searched, in order, in Excel workbooks
+PREFERRED_SHEETS = ['Team Analysis', 'Student Analysis']
+
+
+def _unsupported(path: Path) -> ValueError:
+    return ValueError(f"Unsupported file format: {path.suffix}. Please provide an Excel (.xlsx, .xls), "
+                      f"CSV (.csv, .csv.gz, .csv.bz2, .csv.zst), Parquet (.parquet) or zip file.")
+
+
+def _sniff_head(head: bytes, name: str) -> str:
+    """Format of content starting with `head`."""
+    if not head:
+        raise ValueError("The file contains no data.")
+    for magic, file_format in MAGIC_BYTES:
+        if head.startswith(magic):
+            return file_format
+    # Text files (UTF-8 or a single-byte encoding) never contain NUL bytes
+    if b'\x00' not in head:
+        return 'csv'
+    raise ValueError(f"Unrecognized content in {name}; expected an Excel, CSV or Parquet file.")
+
+
+def _is_workbook(archive: zipfile.ZipFile) -> bool:
+    """Whether a zip file is an Office workbook rather than an archive of exports."""
+    return '[Content_Types].xml' in archive.namelist()
+
+
+def open_decompressed(file_path: str, compression: str) -> BinaryIO:
+    """
+    Open a compressed file as a stream of its decompressed bytes.
+
+    Args:
+        file_path: Path to the compressed file
+        compression: One of COMPRESSIONS
+
+    Returns:
+        Readable binary stream
+    """
+    if compression == 'gzip':
+        return gzip.open(file_path, 'rb')
+    if compression == 'bz2':
+        return bz2.open(file_path, 'rb')
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("Reading zstd-compressed files requires the zstandard package (pip install zstandard).")
+    return zstandard.ZstdDecompressor().stream_reader(open(file_path, 'rb'), closefd=True)
+
+
+def sniff_format(file_path: str) -> str:
+    """
+    Detect the format of a file from its content.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        One of 'csv', 'xlsx', 'xls', 'parquet', 'zip' (an archive of exports) or a compression in COMPRESSIONS
+    """
+    path = Path(file_path)
+    with open(path, 'rb') as source:
+        head = source.read(SNIFF_SIZE)
+    file_format = _sniff_head(head, path.name)
+    if file_format == 'zip':
+        with zipfile.ZipFile(path) as archive:
+            if _is_workbook(archive):
+                return 'xlsx'
+    return file_format
+
+
+class ReaderEngine:
+    """One way of reading one format, backed by an optional package."""
+
+    def __init__(self, file_format: str, name: str, module: Optional[str]):
+        """
+        Create an engine.
+
+        Args:
+            file_format: Format the engine reads
+            name: Engine name, as passed to pandas
+            module: Package the engine needs (None when pandas alone suffices)
+        """
+        self.file_format = file_format
+        self.name = name
+        self.module = module
+
+    @property
+    def available(self) -> bool:
+        """Whether the engine's package is installed."""
+        return self.module is None or importlib.util.find_spec(self.module) is not None
+
+    def sheet_names(self, source: Any) -> List[Optional[str]]:
+        """Sheets of a workbook; [None] for formats without sheets."""
+        if self.file_format in ('xlsx', 'xls'):
+            with pd.ExcelFile(source, engine=self.name) as workbook:
+                return list(workbook.sheet_names)
+        return [None]
+
+    def read(self, source: Any, sheet_name: Optional[str] = None, nrows: Optional[int] = None,
+             usecols: Optional[List[str]] = None, dtype: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """
+        Read a table.
+
+        Args:
+            source: File path or buffer
+            sheet_name: Sheet to read (Excel only)
+            nrows: Read at most this many data rows (0 reads only the header)
+            usecols: Columns to load
+            dtype: Explicit dtypes of the loaded columns
+
+        Returns:
+            DataFrame with the data
+        """
+        if self.file_format in ('xlsx', 'xls'):
+            return pd.read_excel(source, sheet_name=sheet_name, engine=self.name, nrows=nrows,
+                                 usecols=usecols, dtype=dtype)
+        if self.file_format == 'parquet' and nrows == 0:
+            # The column names come from the file metadata, without reading any data
+            if self.name == 'pyarrow':
+                import pyarrow.parquet as pq
+
+                return pd.DataFrame(columns=pq.read_schema(source).names)
+            import fastparquet
+
+            return pd.DataFrame(columns=fastparquet.ParquetFile(source).columns)
+        if self.file_format == 'parquet':
+            df = pd.read_parquet(source, engine=self.name, columns=usecols)
+            if dtype:
+                df = df.astype({col: kind for col, kind in dtype.items() if col in df.columns})
+            return df.head(nrows) if nrows is not None else df
+        # The pyarrow engine cannot stop after a few rows; header reads use the C parser
+        engine = 'c' if nrows is not None else self.name
+        return pd.read_csv(source, engine=engine, nrows=nrows, usecols=usecols, dtype=dtype)
+
+
+# Engines of each format, fastest first
+ENGINES: Dict[str, List[ReaderEngine]] = {
+    'csv': [ReaderEngine('csv', 'pyarrow', 'pyarrow'), ReaderEngine('csv', 'c', None)],
+    'xlsx': [ReaderEngine('xlsx', 'calamine', 'python_calamine'), ReaderEngine('xlsx', 'openpyxl', 'openpyxl')],
+    'xls': [ReaderEngine('xls', 'calamine', 'python_calamine'), ReaderEngine('xls', 'xlrd', 'xlrd')],
+    'parquet': [ReaderEngine('parquet', 'pyarrow', 'pyarrow'), ReaderEngine('parquet', 'fastparquet', 'fastparquet')],
+}
+
+
+def available_engines(file_format: str) -> List[ReaderEngine]:
+    """
+    Installed engines of a format, fastest first.
+
+    Args:
+        file_format: Format name
+
+    Returns:
+        Engines whose packages are installed
+    """
+    return [engine for engine in ENGINES[file_format] if engine.available]
+
+
+def choose_engine(file_format: str, preferred: Optional[str] = None) -> ReaderEngine:
+    """
+    Pick the engine used for a format.
+
+    Args:
+        file_format: Format name
+        preferred: Engine to use instead of the fastest installed one
+
+    Returns:
+        The engine
+    """
+    engines = available_engines(file_format)
+    if preferred is not None:
+        engines = [engine for engine in engines if engine.name == preferred]
+    if not engines:
+        packages = ", ".join(engine.module for engine in ENGINES[file_format]
+                             if engine.module and (preferred is None or engine.name == preferred))
+        raise ValueError(f"No reader installed for {file_format} files. Install one of: {packages}.")
+    return engines[0]
+
+
+def choose_sheet(sheet_names: List[str], fallback_to_first_sheet: bool = False) -> str:
+    """
+    Pick the sheet holding the quiz data.
+
+    Args:
+        sheet_names: Sheets of the workbook
+        fallback_to_first_sheet: Use the first sheet when no preferred sheet exists
+
+    Returns:
+        Name of the sheet to read
+    """
+    for sheet_name in PREFERRED_SHEETS:
+        if sheet_name in sheet_names:
+            return sheet_name
+    if fallback_to_first_sheet and sheet_names:
+        return sheet_names[0]
+    raise ValueError("Neither 'Team Analysis' nor 'Student Analysis' sheets were found in the Excel file.")
+
+
+class TableSource:
+    """A file, or an export inside a zip archive, resolved to its detected format, engine and data sheet."""
+
+    def __init__(self, path: Path, file_format: str, engine: ReaderEngine, sheet_name: Optional[str],
+                 compression: Optional[str] = None, member: Optional[str] = None):
+        """
+        Create a table source.
+
+        Args:
+            path: Path to the file
+            file_format: Detected format of the (decompressed) data
+            engine: Engine used to read it
+            sheet_name: Sheet holding the data (Excel only)
+            compression: Stream compression of a CSV file, one of COMPRESSIONS
+            member: Name of the export inside the zip archive at `path`
+        """
+        self.path = path
+        self.file_format = file_format
+        self.engine = engine
+        self.sheet_name = sheet_name
+        self.compression = compression
+        self.member = member
+
+    @property
+    def name(self) -> str:
+        """File name, or the member name of an archived export."""
+        return self.member or self.path.name
+
+    @contextmanager
+    def open_csv(self) -> Iterator[BinaryIO]:
+        """
+        Open the CSV text of the source, decompressing or inflating it as it is read.
+
+        Yields:
+            Readable binary stream of the CSV text
+        """
+        if self.member is not None:
+            with zipfile.ZipFile(self.path) as archive, archive.open(self.member) as stream:
+                yield stream
+        elif self.compression is not None:
+            with open_decompressed(str(self.path), self.compression) as stream:
+                yield stream
+        else:
+            with open(self.path, 'rb') as stream:
+                yield stream
+
+    def _apply(self, action):
+        """Run `action(engine, source)` on the file, its decompressed stream or the archived export."""
+        def on_source(engine: ReaderEngine):
+            if self.member is None and self.compression is None:
+                return action(engine, self.path)
+            if self.file_format == 'csv':
+                # Parsed as it is decompressed, so the plain text never touches the disk
+                with self.open_csv() as stream:
+                    return action(engine, stream)
+            # Workbooks and Parquet need random access, so those members are inflated into memory
+            with zipfile.ZipFile(self.path) as archive:
+                return action(engine, io.BytesIO(archive.read(self.member)))
+
+        return _with_fallback(self, on_source)
+
+    def read(self, nrows: Optional[int] = None, usecols: Optional[List[str]] = None,
+             dtype: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Read the data sheet (see ReaderEngine.read)."""
+        return self._apply(lambda engine, source: engine.read(source, self.sheet_name, nrows, usecols, dtype))
+
+    def sheet_names(self) -> List[Optional[str]]:
+        """Sheets of the workbook; [None] for formats without sheets."""
+        return self._apply(lambda engine, source: engine.sheet_names(source))
+
+    def columns(self) -> List[str]:
+        """Column names of the header row."""
+        return [str(col) for col in self.read(nrows=0).columns]
+
+
+def _with_fallback(source: TableSource, read):
+    """Run a read, moving on to the next installed engine if the chosen one cannot be loaded."""
+    engines = available_engines(source.file_format)
+    start = engines.index(source.engine) if source.engine in engines else 0
+    for engine in engines[start:]:
+        try:
+            result = read(engine)
+            source.engine = engine
+            return result
+        except ImportError as e:
+            print(f"Warning: The {engine.name} reader is unavailable ({e}); trying the next one.")
+    raise ValueError(f"No working reader for {source.file_format} files.")
+
+
+def archive_members(file_path: str) -> List[str]:
+    """
+    List the quiz exports inside a zip archive.
+
+    Args:
+        file_path: Path to the zip archive
+
+    Returns:
+        Member names with a supported suffix, in archive order; folders, hidden files and
+        macOS resource forks are skipped
+    """
+    members = []
+    with zipfile.ZipFile(file_path) as archive:
+        for info in archive.infolist():
+            parts = Path(info.filename).parts
+            if info.is_dir() or any(part.startswith('.') or part == '__MACOSX' for part in parts):
+                continue
+            if Path(info.filename).suffix.lower() in SUPPORTED_SUFFIXES:
+                members.append(info.filename)
+    return members
+
+
+def _sniff_member(path: Path, member: str) -> str:
+    """Format of an export inside a zip archive."""
+    with zipfile.ZipFile(path) as archive:
+        try:
+            with archive.open(member) as stream:
+                head = stream.read(SNIFF_SIZE)
+        except KeyError:
+            raise ValueError(f"{member} not found in {path.name}.")
+        file_format = _sniff_head(head, member)
+        if file_format == 'zip':
+            with zipfile.ZipFile(io.BytesIO(archive.read(member))) as inner:
+                file_format = 'xlsx' if _is_workbook(inner) else 'zip'
+    if file_format in COMPRESSIONS or file_format == 'zip':
+        raise ValueError(f"{member} in {path.name} is compressed again; archive the exports uncompressed.")
+    return file_format
+
+
+def open_table(file_path: str, fallback_to_first_sheet: bool = False, engine: Optional[str] = None,
+               member: Optional[str] = None) -> TableSource:
+    """
+    Resolve a file, or an export inside a zip archive, to its format, engine and data sheet.
+
+    Args:
+        file_path: Path to the file
+        fallback_to_first_sheet: Use the first sheet of a workbook when no preferred sheet exists
+        engine: Engine to use instead of the fastest installed one
+        member: Name of the export inside the zip archive at `file_path`
+
+    Returns:
+        TableSource for the file
+    """
+    path = Path(file_path)
+    named = Path(member) if member is not None else path
+    if named.suffix.lower() not in SUPPORTED_SUFFIXES:
+        raise _unsupported(named)
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+
+    compression = None
+    if member is not None:
+        file_format = _sniff_member(path, member)
+    else:
+        file_format = sniff_format(str(path))
+        if file_format != SUFFIX_FORMATS[path.suffix.lower()]:
+            print(f"Warning: {path.name} contains {file_format} data; reading it as {file_format}.")
+        if file_format == 'zip':
+            raise ValueError(f"{path.name} is an archive of {len(archive_members(str(path)))} exports; "
+                             f"convert it with the command line (python main.py convert {path.name}).")
+        if file_format in COMPRESSIONS:
+            compression = file_format
+            with open_decompressed(str(path), compression) as stream:
+                file_format = _sniff_head(stream.read(SNIFF_SIZE), path.name)
+            if file_format != 'csv':
+                raise ValueError(f"Only CSV exports can be compressed; {path.name} contains {file_format} data.")
+
+    source = TableSource(path, file_format, choose_engine(file_format, engine), None, compression, member)
+    if file_format in ('xlsx', 'xls'):
+        source.sheet_name = choose_sheet(source.sheet_names(), fallback_to_first_sheet)
+    return source
+
+
+def read_table(file_path: str, fallback_to_first_sheet: bool = False, engine: Optional[str] = None,
+               member: Optional[str] = None) -> Tuple[pd.DataFrame, Optional[str]]:
+    """
+    Read a whole quiz export through the registry.
+
+    Args:
+        file_path: Path to the file
+        fallback_to_first_sheet: Use the first sheet of a workbook when no preferred sheet exists
+        engine: Engine to use instead of the fastest installed one
+        member: Name of the export inside the zip archive at `file_path`
+
+    Returns:
+        Tuple containing the DataFrame and sheet name (if applicable)
+    """
+    source = open_table(file_path, fallback_to_first_sheet, engine, member)
+    if source.sheet_name is not None:
+        print(f"Reading data from '{source.sheet_name}' sheet...")
+    return source.read(), source.sheet_name
@@ -0,0 +1,243 @@
+"""
+Dictionary-encoded storage for question responses.
+
+Each question column is stored as small integer codes into a per-question
+vocabulary of distinct answers, so "A"/"B"/"C" are kept once per question
+instead of once per student. Responses are compared as integers and only
+decoded to strings for display or export.
+"""
+import sys
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Code used for a missing response
+MISSING_CODE = -1
+
+# Text a missing response decodes to (matches str() of a missing pandas cell)
+MISSING_TEXT = 'nan'
+
+
+def _code_dtype(max_vocabulary_size: int) -> np.dtype:
+    """Smallest signed integer dtype that can hold the codes and the missing marker."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_vocabulary_size <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class EncodedResponses:
+    """Students × questions matrix of response codes with a vocabulary per question."""
+
+    def __init__(self, codes: np.ndarray, vocabularies: List[List[str]]):
+        """
+        Create encoded responses.
+
+        Args:
+            codes: Integer array of shape (students, questions); MISSING_CODE marks a missing response
+            vocabularies: Distinct response strings of each question, indexed by code
+        """
+        self.codes = codes
+        self.vocabularies = vocabularies
+
+    @property
+    def num_students(self) -> int:
+        """Number of students (rows)."""
+        return self.codes.shape[0]
+
+    @property
+    def num_questions(self) -> int:
+        """Number of questions (columns)."""
+        return self.codes.shape[1]
+
+    @classmethod
+    def encode(cls, columns: Sequence[Sequence]) -> "EncodedResponses":
+        """
+        Encode response columns.
+
+        Args:
+            columns: One sequence (or pandas Series) of raw responses per question, all of the same length
+
+        Returns:
+            EncodedResponses for the columns
+        """
+        num_students = len(columns[0]) if len(columns) else 0
+        encoded_columns = []
+        vocabularies = []
+        for column in columns:
+            # Factorize pandas columns in their own dtype; plain sequences as objects
+            series = column if isinstance(column, pd.Series) else pd.Series(column, dtype=object)
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            vocabulary = [sys.intern(str(value)) for value in uniques]
+            # Distinct raw values can share a text form (1 and "1"); keep one code per text
+            if len(set(vocabulary)) != len(vocabulary):
+                first_code = {}
+                remap = np.array([first_code.setdefault(text, len(first_code)) for text in vocabulary])
+                codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], MISSING_CODE)
+                vocabulary = list(first_code)
+            # Missing text that came in as a string is treated as missing as well
+            if MISSING_TEXT in vocabulary:
+                missing_index = vocabulary.index(MISSING_TEXT)
+                vocabulary.pop(missing_index)
+                codes = np.where(codes == missing_index, MISSING_CODE, np.where(codes > missing_index, codes - 1, codes))
+            encoded_columns.append(codes)
+            vocabularies.append(vocabulary)
+
+        dtype = _code_dtype(max((len(vocabulary) for vocabulary in vocabularies), default=0))
+        codes = np.empty((num_students, len(encoded_columns)), dtype=dtype)
+        for j, column_codes in enumerate(encoded_columns):
+            codes[:, j] = column_codes
+        return cls(codes, vocabularies)
+
+    @classmethod
+    def concat(cls, parts: List["EncodedResponses"]) -> "EncodedResponses":
+        """
+        Stack encoded responses of consecutive row blocks, merging their vocabularies.
+
+        Args:
+            parts: Encoded responses with the same questions, in row order
+
+        Returns:
+            EncodedResponses for all rows
+        """
+        num_questions = parts[0].num_questions
+        vocabularies = []
+        remapped = [[] for _ in parts]
+        for j in range(num_questions):
+            merged = {}
+            for index, part in enumerate(parts):
+                # Translate this part's codes into the merged vocabulary (missing stays missing)
+                remap = np.array([merged.setdefault(text, len(merged)) for text in part.vocabularies[j]] + [MISSING_CODE])
+                remapped[index].append(remap[part.codes[:, j]])
+            vocabularies.append(list(merged))
+
+        dtype = _code_dtype(max((len(vocabulary) for vocabulary in vocabularies), default=0))
+        codes = np.concatenate([
+            np.column_stack(columns).astype(dtype) if columns else np.empty((part.num_students, 0), dtype=dtype)
+            for part, columns in zip(parts, remapped)
+        ])
+        return cls(codes, vocabularies)
+
+    def code_of(self, question_index: int, text: str) -> int:
+        """
+        Look up the code of a response text for one question.
+
+        Args:
+            question_index: Column index of the question
+            text: Response text
+
+        Returns:
+            Code of the response, or MISSING_CODE if nobody gave that response
+        """
+        try:
+            return self.vocabularies[question_index].index(text)
+        except ValueError:
+            return MISSING_CODE
+
+    def decode_column(self, question_index: int) -> List[str]:
+        """
+        Decode the responses of one question.
+
+        Args:
+            question_index: Column index of the question
+
+        Returns:
+            List with the response text of every student
+        """
+        lookup = self.vocabularies[question_index] + [MISSING_TEXT]
+        return [lookup[code] for code in self.codes[:, question_index].tolist()]
+
+    def flatten(self) -> pd.Categorical:
+        """
+        Responses of every cell in row-major order (student by student), still dictionary-encoded.
+
+        The per-question vocabularies are merged into one, so the result is a single
+        categorical column; missing responses are missing values.
+
+        Returns:
+            Categorical with num_students × num_questions values
+        """
+        merged = {}
+        flat = np.empty(self.codes.shape, dtype=np.int32)
+        for j, vocabulary in enumerate(self.vocabularies):
+            remap = np.array([merged.setdefault(text, len(merged)) for text in vocabulary] + [MISSING_CODE],
+                             dtype=np.int32)
+            flat[:, j] = remap[self.codes[:, j]]
+        return pd.Categorical.from_codes(flat.ravel(), categories=list(merged))
+
+    def decode_row(self, student_index: int, question_numbers: List[int]) -> Dict[int, str]:
+        """
+        Decode the responses of one student.
+
+        Args:
+            student_index: Row index of the student
+            question_numbers: Question numbers of the columns
+
+        Returns:
+            Dictionary of question number -> response text
+        """
+        row = self.codes[student_index].tolist()
+        return {
+            q_num: self.vocabularies[j][code] if code >= 0 else MISSING_TEXT
+            for j, (q_num, code) in enumerate(zip(question_numbers, row))
+        }
+
+    def take(self, rows: np.ndarray) -> "EncodedResponses":
+        """
+        Select a subset of students; the vocabularies are shared, not copied.
+
+        Args:
+            rows: Row indices or boolean mask
+
+        Returns:
+            EncodedResponses for the selected students
+        """
+        return EncodedResponses(self.codes[rows], self.vocabularies)
+
+    def counts(self, question_index: int) -> np.ndarray:
+        """
+        Count how many students gave each response of one question.
+
+        Args:
+            question_index: Column index of the question
+
+        Returns:
+            Array with one count per vocabulary entry
+        """
+        column = self.codes[:, question_index]
+        return np.bincount(column[column >= 0], minlength=len(self.vocabularies[question_index]))
+
+    def memory_report(self) -> Dict[str, int]:
+        """
+        Compare the encoded storage with one Python string per response cell.
+
+        Returns:
+            Dictionary with the string storage size, the encoded size and the number of cells (bytes)
+        """
+        pointer_size = 8
+        encoded_bytes = self.codes.nbytes
+        string_bytes = self.codes.size * pointer_size
+        for j, vocabulary in enumerate(self.vocabularies):
+            sizes = np.array([sys.getsizeof(text) for text in vocabulary], dtype=np.int64)
+            encoded_bytes += int(sizes.sum()) + len(vocabulary) * pointer_size
+            string_bytes += int(self.counts(j) @ sizes) if len(sizes) else 0
+            string_bytes += int((self.codes[:, j] < 0).sum()) * sys.getsizeof(MISSING_TEXT)
+        return {"string_bytes": string_bytes, "encoded_bytes": encoded_bytes, "cells": int(self.codes.size)}
+
+
+def format_memory_report(report: Dict[str, int]) -> str:
+    """
+    Format a memory report for the ingest output.
+
+    Args:
+        report: Dictionary produced by EncodedResponses.memory_report
+
+    Returns:
+        One-line description of the memory reduction
+    """
+    string_bytes = report["string_bytes"]
+    encoded_bytes = report["encoded_bytes"]
+    reduction = (1 - encoded_bytes / string_bytes) * 100 if string_bytes else 0.0
+    return (f"Response storage: {report['cells']} cells, {string_bytes / 1024:.1f} KB as strings -> "
+            f"{encoded_bytes / 1024:.1f} KB dictionary-encoded ({reduction:.0f}% smaller)")
@@ -0,0 +1,174 @@
+"""
+Buffered rendering of the console results.
+
+The results are formatted into one string and written at once instead of one
+print call per line. Large cohorts are shown as a page of the first students
+plus a summary; the complete tables can be sent to a pager or a file.
+"""
+import io
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.models.quiz_data import QuizParameters
+
+# Number of students shown in the console before the tables are truncated
+DEFAULT_PAGE_SIZE = 50
+
+
+def _write_parameters(out: io.StringIO, quiz_params: "QuizParameters"):
+    """Write the quiz parameters, the weighted questions and the verification."""
+    out.write("\n" + "="*80 + "\n")
+    out.write(f"QUIZ RESULTS: {quiz_params.quiz_name}\n")
+    out.write("="*80 + "\n")
+
+    out.write("\nQUIZ PARAMETERS:\n")
+    out.write(f"Original Maximum Score: {quiz_params.original_max_score}\n")
+    out.write(f"New Maximum Score: {quiz_params.new_max_score}\n")
+    out.write(f"Original Question Value: {quiz_params.original_question_value}\n")
+    out.write(f"Total Questions: {quiz_params.total_questions}\n")
+    out.write(f"New Question Value: {quiz_params.new_question_value}\n")
+
+    # Weighted question information if applicable
+    if quiz_params.use_weighted_questions:
+        out.write("\nWEIGHTED QUESTIONS:\n")
+        out.write("-"*80 + "\n")
+        out.write(f"{'Question':<10} {'Weight':<10} {'% of Total':<15} {'New Max Score':<15}\n")
+        out.write("-"*80 + "\n")
+
+        total_weight = sum(quiz_params.question_weights.values())
+        for q_num in sorted(quiz_params.question_weights.keys()):
+            weight = quiz_params.question_weights[q_num]
+            percentage = (weight / total_weight) * 100
+            new_max = (weight / total_weight) * quiz_params.new_max_score
+            out.write(f"{q_num:<10} {weight:<10.2f} {percentage:<15.2f}% {new_max:<15.2f}\n")
+
+        out.write(f"{'Total':<10} {total_weight:<10.2f} {'100.00':<15}% {quiz_params.new_max_score:<15.2f}\n")
+
+    out.write("\nVERIFICATION:\n")
+    out.write(f"Total Questions × New Question Value = New Maximum Score\n")
+    out.write(f"{quiz_params.total_questions} × {quiz_params.new_question_value} = "
+              f"{quiz_params.total_questions * quiz_params.new_question_value}\n")
+
+    # verify_calculation prints its details; keep them in the buffer, in order
+    with redirect_stdout(out):
+        verified = quiz_params.verify_calculation()
+    out.write("✓ Calculation verified successfully!\n" if verified else "✗ Calculation verification failed!\n")
+
+
+def _write_student_table(out: io.StringIO, rows: List[Dict[str, Any]]):
+    """Write the student information and total scores."""
+    out.write("\nSTUDENT INFORMATION AND TOTAL SCORES:\n")
+    out.write("-"*80 + "\n")
+    out.write(f"{'Team':<10} {'Student Name':<20} {'First Name':<15} {'Last Name':<15} {'Student ID':<10} "
+              f"{'Original':<10} {'Converted':<10}\n")
+    out.write("-"*80 + "\n")
+    out.write("".join(
+        f"{student['Team']:<10} {student['Student Name']:<20} {student['First Name']:<15} {student['Last Name']:<15} "
+        f"{student['Student ID']:<10} {student['Original Score']:<10} {student['Converted Score']:<10}\n"
+        for student in rows
+    ))
+
+
+def _write_response_grid(out: io.StringIO, rows: List[Dict[str, Any]], question_numbers: List[int]):
+    """Write the responses and scores of every question."""
+    out.write("\nQUESTION RESPONSES AND SCORES:\n")
+    out.write("-"*80 + "\n")
+    out.write("Student Name" + "".join(
+        f" | Q{q_num} Resp | Q{q_num} Orig | Q{q_num} Conv" for q_num in question_numbers
+    ) + "\n")
+    out.write("-"*80 + "\n")
+
+    keys = [(f"Q{q_num} Response", f"Q{q_num} Original Score", f"Q{q_num} Converted Score")
+            for q_num in question_numbers]
+    for student in rows:
+        out.write(f"{student['Student Name']:<12}")
+        out.write("".join(
+            f" | {student.get(response_key, ''):<8} | {student.get(original_key, ''):<9} | "
+            f"{student.get(converted_key, ''):<9}"
+            for response_key, original_key, converted_key in keys
+        ))
+        out.write("\n")
+
+
+def _summary_line(output_data: List[Dict[str, Any]], shown: int) -> str:
+    """Describe the students left out of a truncated table."""
+    converted = [student['Converted Score'] for student in output_data]
+    return (f"... {len(output_data) - shown} more students not shown ({len(output_data)} in total; "
+            f"converted score min {min(converted):.2f}, mean {sum(converted) / len(converted):.2f}, "
+            f"max {max(converted):.2f})\n")
+
+
+def render_results(quiz_params: "QuizParameters", output_data: List[Dict[str, Any]], question_numbers: List[int],
+                   max_rows: Optional[int] = DEFAULT_PAGE_SIZE) -> str:
+    """
+    Render the results as one string.
+
+    Args:
+        quiz_params: Quiz parameters
+        output_data: List of dictionaries with formatted output data
+        question_numbers: List of question numbers
+        max_rows: Number of students shown in each table (None shows every student)
+
+    Returns:
+        The rendered results
+    """
+    out = io.StringIO()
+    _write_parameters(out, quiz_params)
+
+    truncated = max_rows is not None and len(output_data) > max_rows
+    rows = output_data[:max_rows] if truncated else output_data
+
+    _write_student_table(out, rows)
+    if truncated:
+        out.write(_summary_line(output_data, len(rows)))
+    _write_response_grid(out, rows, question_numbers)
+    if truncated:
+        out.write(_summary_line(output_data, len(rows)))
+    return out.getvalue()
+
+
+def render_full_tables(output_data: List[Dict[str, Any]], question_numbers: List[int]) -> str:
+    """
+    Render the complete student table and response grid, without truncation.
+
+    Args:
+        output_data: List of dictionaries with formatted output data
+        question_numbers: List of question numbers
+
+    Returns:
+        The rendered tables
+    """
+    out = io.StringIO()
+    _write_student_table(out, output_data)
+    _write_response_grid(out, output_data, question_numbers)
+    return out.getvalue()
+
+
+def show_in_pager(text: str):
+    """
+    Show text in the system pager ($PAGER, or less/more when available).
+
+    Args:
+        text: Text to show
+    """
+    import pydoc
+
+    pydoc.pager(text)
+
+
+def save_text(text: str, file_path: str) -> Path:
+    """
+    Write rendered text to a file.
+
+    Args:
+        text: Text to write
+        file_path: Output path
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(file_path)
+    path.write_text(text, encoding='utf-8')
+    return path
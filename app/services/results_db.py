@@ -0,0 +1,227 @@
+"""
+Optional SQLite persistence of converted results.
+
+Every converted student of a quiz is stored as one row, indexed by quiz,
+student ID and team, so per-student and per-team lookups stay fast over
+millions of stored rows. Rows are inserted in bulk with executemany inside one
+transaction; storing a quiz again replaces its earlier rows.
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.models.quiz_data import QuizParameters
+    from app.services.pipeline import ConvertedBatch
+
+# Environment variable with the database path that enables persistence in the web app
+RESULTS_DB_ENV = "QUIZ_RESULTS_DB"
+
+# Rows sent to executemany at a time
+INSERT_BATCH_SIZE = 50000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    quiz TEXT NOT NULL,
+    student_id TEXT NOT NULL,
+    team TEXT NOT NULL DEFAULT '',
+    student_name TEXT NOT NULL,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    original_score REAL NOT NULL,
+    converted_score REAL NOT NULL,
+    new_max_score REAL NOT NULL,
+    questions TEXT NOT NULL,
+    stored_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_quiz ON results (quiz);
+CREATE INDEX IF NOT EXISTS idx_results_student ON results (student_id, quiz);
+CREATE INDEX IF NOT EXISTS idx_results_team ON results (team, quiz);
+"""
+
+RESULT_COLUMNS = ['quiz', 'student_id', 'team', 'student_name', 'first_name', 'last_name',
+                  'original_score', 'converted_score', 'new_max_score', 'questions', 'stored_at']
+
+
+class ResultsDatabase:
+    """SQLite database of converted quiz results."""
+
+    def __init__(self, db_path: str):
+        """
+        Open (and create if needed) a results database.
+
+        Args:
+            db_path: Path to the SQLite file
+        """
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            # WAL lets the web routes read while a quiz is being stored
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one operation; commits on success, rolls back on error."""
+        connection = sqlite3.connect(self.db_path)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _replace_quiz(self, quiz_name: str, rows: Iterable[Tuple]) -> int:
+        """Delete the earlier rows of a quiz and insert the new ones in a single transaction."""
+        placeholders = ", ".join("?" for _ in RESULT_COLUMNS)
+        statement = f"INSERT INTO results ({', '.join(RESULT_COLUMNS)}) VALUES ({placeholders})"
+        count = 0
+        with self._connect() as connection:
+            connection.execute("DELETE FROM results WHERE quiz = ?", (quiz_name,))
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    connection.executemany(statement, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                connection.executemany(statement, batch)
+                count += len(batch)
+        return count
+
+    def store_output_data(self, quiz_params: "QuizParameters", output_data: List[Dict[str, Any]],
+                          question_numbers: List[int]) -> int:
+        """
+        Store the output rows of a converted quiz, replacing earlier rows of the same quiz.
+
+        Args:
+            quiz_params: Quiz parameters used for the conversion
+            output_data: List of dictionaries with formatted output data
+            question_numbers: List of question numbers
+
+        Returns:
+            Number of stored rows
+        """
+        stored_at = datetime.now().isoformat(timespec="seconds")
+        # Column names are built once, not once per student and question
+        keys = [(str(q_num), f"Q{q_num} Response", f"Q{q_num} Original Score", f"Q{q_num} Converted Score")
+                for q_num in question_numbers]
+        encode = json.JSONEncoder(separators=(",", ":")).encode
+
+        def rows():
+            for student in output_data:
+                get = student.get
+                questions = {q_key: [get(response_key), get(original_key), get(converted_key)]
+                             for q_key, response_key, original_key, converted_key in keys}
+                yield (quiz_params.quiz_name, str(student["Student ID"]), get("Team") or "",
+                       student["Student Name"], student["First Name"], student["Last Name"],
+                       float(student["Original Score"]), float(student["Converted Score"]),
+                       quiz_params.new_max_score, encode(questions), stored_at)
+
+        return self._replace_quiz(quiz_params.quiz_name, rows())
+
+    def store_batch(self, quiz_params: "QuizParameters", batch: "ConvertedBatch") -> int:
+        """
+        Store a converted score matrix, replacing earlier rows of the same quiz.
+
+        Args:
+            quiz_params: Quiz parameters used for the conversion
+            batch: Converted students
+
+        Returns:
+            Number of stored rows
+        """
+        from app.services.quiz_service import generate_output_frame
+
+        frame = generate_output_frame(batch.matrix, batch.question_new_scores, batch.new_scores,
+                                      quiz_params.fixed_point_scale)
+        return self.store_output_data(quiz_params, frame.to_dict('records'), batch.matrix.question_numbers)
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        record["questions"] = {
+            int(q_num): {"response": values[0], "original_score": values[1], "converted_score": values[2]}
+            for q_num, values in json.loads(record["questions"]).items()
+        }
+        return record
+
+    def _select(self, where: str, parameters: List[Any], quizzes: Optional[List[str]]) -> List[Dict[str, Any]]:
+        if quizzes:
+            where += f" AND quiz IN ({', '.join('?' for _ in quizzes)})"
+            parameters = parameters + list(quizzes)
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT {', '.join(RESULT_COLUMNS)} FROM results WHERE {where} ORDER BY quiz, student_name, id",
+                parameters
+            ).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def student_results(self, student_id: str, quizzes: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Look up the stored results of one student.
+
+        Args:
+            student_id: Student ID
+            quizzes: Only these quizzes (all quizzes when omitted)
+
+        Returns:
+            One record per stored quiz result of the student
+        """
+        return self._select("student_id = ?", [str(student_id)], quizzes)
+
+    def team_results(self, team: str, quizzes: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Look up the stored results of every student of a team.
+
+        Args:
+            team: Team name
+            quizzes: Only these quizzes (all quizzes when omitted)
+
+        Returns:
+            One record per stored quiz result of the team's students
+        """
+        return self._select("team = ?", [team], quizzes)
+
+    def quizzes(self) -> List[Dict[str, Any]]:
+        """
+        List the stored quizzes.
+
+        Returns:
+            Quiz name, number of students, mean converted score and storage time of each quiz
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT quiz, COUNT(*) AS students, AVG(converted_score) AS mean_score, MAX(stored_at) AS stored_at "
+                "FROM results GROUP BY quiz ORDER BY quiz"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+_configured_db: Optional[ResultsDatabase] = None
+_configured_lock = threading.Lock()
+
+
+def configured_results_db() -> Optional[ResultsDatabase]:
+    """
+    Database named by the QUIZ_RESULTS_DB environment variable, opened on first use.
+
+    Returns:
+        The database, or None when persistence is not enabled
+    """
+    global _configured_db
+    db_path = os.environ.get(RESULTS_DB_ENV)
+    if not db_path:
+        return None
+    with _configured_lock:
+        if _configured_db is None or _configured_db.db_path != db_path:
+            _configured_db = ResultsDatabase(db_path)
+        return _configured_db
@@ -0,0 +1,65 @@
+"""
+In-memory store for recently processed results.
+
+The results page only renders the tables; the full payload is kept here so the
+debug view can fetch it on demand instead of embedding it in every page.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class ResultsStore:
+    """Thread-safe, bounded least-recently-used store of result payloads."""
+
+    def __init__(self, max_entries: int = 32):
+        """
+        Create an empty store.
+
+        Args:
+            max_entries: Maximum number of results kept; the least recently used are evicted first
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, payload: Dict[str, Any]) -> str:
+        """
+        Store a result payload.
+
+        Args:
+            payload: Result data to keep
+
+        Returns:
+            Identifier to fetch the payload with
+        """
+        result_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[result_id] = payload
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result_id
+
+    def get(self, result_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a stored result payload.
+
+        Args:
+            result_id: Identifier returned by put
+
+        Returns:
+            The payload, or None if it is unknown or was evicted
+        """
+        with self._lock:
+            payload = self._entries.get(result_id)
+            if payload is not None:
+                self._entries.move_to_end(result_id)
+            return payload
+
+
+# Shared store used by the web routes
+results_store = ResultsStore()
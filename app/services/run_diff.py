@@ -0,0 +1,282 @@
+"""
+Differences between two processed runs of the same quiz.
+
+Each run is reduced to its converted scores (a students × questions matrix and
+the totals), either from a results file written by `convert` or by converting a
+quiz export. The runs are aligned on the student ID with a hash join, the
+totals and question scores are compared column-wise, and only the students and
+cells that changed are reported.
+"""
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from app.models.quiz_data import QuizParameters
+
+if TYPE_CHECKING:
+    from app.services.score_matrix import ScoreMatrix
+
+# Converted scores are compared as exported, rounded to this many decimals
+DECIMALS = 2
+
+# Field name of the converted total in the changed cells
+TOTAL_FIELD = "Total"
+
+
+class ConvertedScores:
+    """Converted totals and question scores of one run, keyed by student ID."""
+
+    def __init__(self, student_ids: np.ndarray, question_numbers: List[int], question_scores: np.ndarray,
+                 totals: np.ndarray):
+        """
+        Create the converted scores of a run.
+
+        Args:
+            student_ids: Student ID of each row (unique)
+            question_numbers: Question numbers, one per matrix column
+            question_scores: Converted question scores (students × questions); NaN where a student has no score
+            totals: Converted totals (students)
+        """
+        duplicated = pd.Index(student_ids)[pd.Index(student_ids).duplicated()]
+        if len(duplicated):
+            raise ValueError(f"Student IDs must be unique to compare runs; repeated: "
+                             f"{', '.join(map(str, duplicated.unique()[:5]))}.")
+        self.student_ids = student_ids
+        self.question_numbers = list(question_numbers)
+        self.question_scores = np.round(question_scores, DECIMALS)
+        self.totals = np.round(totals, DECIMALS)
+
+    @classmethod
+    def from_output_frame(cls, df: pd.DataFrame) -> "ConvertedScores":
+        """
+        Read the converted scores from a results table written by `convert` or the console app.
+
+        Args:
+            df: Output table with "Student ID", "Converted Score" and "Q{n} Converted Score" columns
+
+        Returns:
+            ConvertedScores of the table
+        """
+        question_columns = {_question_of(str(column)): column for column in df.columns
+                            if _question_of(str(column)) is not None}
+        question_numbers = sorted(question_columns)
+        scores = np.column_stack([pd.to_numeric(df[question_columns[q_num]], errors='coerce').to_numpy(np.float64)
+                                  for q_num in question_numbers]) if question_numbers else np.empty((len(df), 0))
+        return cls(_student_ids(df["Student ID"]), question_numbers, scores,
+                   pd.to_numeric(df["Converted Score"], errors='coerce').to_numpy(np.float64))
+
+    @classmethod
+    def from_converted(cls, matrix: "ScoreMatrix", question_new_scores: np.ndarray,
+                       new_scores: np.ndarray) -> "ConvertedScores":
+        """
+        Take the converted scores of a converted score matrix.
+
+        Args:
+            matrix: Score matrix of the students
+            question_new_scores: Converted question scores (students × questions)
+            new_scores: Converted totals (students)
+
+        Returns:
+            ConvertedScores of the students
+        """
+        return cls(_student_ids(matrix.identity["Student ID"]), matrix.question_numbers, question_new_scores,
+                   new_scores)
+
+
+def _question_of(column: str) -> Optional[int]:
+    """Question number of a "Q{n} Converted Score" column, None for any other column."""
+    suffix = " Converted Score"
+    if column.startswith("Q") and column.endswith(suffix) and column[1:-len(suffix)].isdigit():
+        return int(column[1:-len(suffix)])
+    return None
+
+
+def _student_ids(column: pd.Series) -> np.ndarray:
+    """Student IDs as stripped text, so "1001" read as a number still matches "1001" read as text."""
+    return column.astype(str).str.strip().to_numpy(dtype=object)
+
+
+def is_output_frame(columns: List[str]) -> bool:
+    """
+    Check whether a table is a results table rather than a quiz export.
+
+    Args:
+        columns: Column names of the table
+
+    Returns:
+        True if the table has the converted score columns of a results table
+    """
+    return "Student ID" in columns and "Converted Score" in columns
+
+
+def load_converted(file_path: str, quiz_params: Optional[QuizParameters] = None,
+                   workers: int = 1) -> ConvertedScores:
+    """
+    Load the converted scores of a run from a results file, or by converting a quiz export.
+
+    Args:
+        file_path: Path to a results file written by `convert`, or to a quiz export
+        quiz_params: Quiz parameters used to convert a quiz export
+        workers: Number of worker processes when a CSV export is converted
+
+    Returns:
+        ConvertedScores of the run
+    """
+    from app.services.readers import open_table
+
+    source = open_table(file_path, fallback_to_first_sheet=True)
+    columns = source.columns()
+    if is_output_frame(columns):
+        # Only the IDs and the converted scores are loaded
+        used = [column for column in columns
+                if column in ("Student ID", "Converted Score") or _question_of(column) is not None]
+        return ConvertedScores.from_output_frame(source.read(usecols=used, dtype={"Student ID": str}))
+    if quiz_params is None:
+        raise ValueError(f"{file_path} is a quiz export; the quiz parameters are needed to convert it.")
+
+    from app.services.pipeline import convert_file
+
+    batch = convert_file(file_path, quiz_params, workers=workers)
+    return ConvertedScores.from_converted(batch.matrix, batch.question_new_scores, batch.new_scores)
+
+
+def converted_from_frame(df: pd.DataFrame, quiz_params: Optional[QuizParameters] = None,
+                         name: str = "The table") -> ConvertedScores:
+    """
+    Get the converted scores of a run from a table already in memory (an upload).
+
+    Args:
+        df: Results table, or quiz export to convert
+        quiz_params: Quiz parameters used to convert a quiz export
+        name: Name of the table in error messages
+
+    Returns:
+        ConvertedScores of the run
+    """
+    if is_output_frame([str(column) for column in df.columns]):
+        return ConvertedScores.from_output_frame(df)
+    if quiz_params is None:
+        raise ValueError(f"{name} is a quiz export; the quiz parameters are needed to convert it.")
+
+    from app.services.answer_key import regrade_matrix
+    from app.services.quiz_service import convert_score_matrix
+    from app.services.score_matrix import ScoreMatrix
+
+    matrix = regrade_matrix(ScoreMatrix.from_dataframe(df), quiz_params)
+    return ConvertedScores.from_converted(matrix, *convert_score_matrix(matrix, quiz_params))
+
+
+class RunDiff:
+    """Students and converted scores that differ between two runs."""
+
+    def __init__(self, num_compared: int, added: List[str], removed: List[str], changed: pd.DataFrame):
+        """
+        Create a run comparison.
+
+        Args:
+            num_compared: Number of students present in both runs
+            added: Student IDs only in the second run
+            removed: Student IDs only in the first run
+            changed: One row per changed cell: Student ID, Field, Before, After, Change
+        """
+        self.num_compared = num_compared
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    @property
+    def changed_students(self) -> List[str]:
+        """Student IDs with at least one changed cell, in the order of the first run."""
+        return self.changed["Student ID"].drop_duplicates().tolist()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Describe the comparison as a JSON-serializable dictionary.
+
+        Returns:
+            Dictionary with the counts, the added and removed students and the changed cells
+        """
+        changed = self.changed.astype(object).where(self.changed.notna(), None)
+        return {
+            "num_compared": self.num_compared,
+            "num_changed_students": len(self.changed_students),
+            "added": self.added,
+            "removed": self.removed,
+            "changed": changed.to_dict(orient="records")
+        }
+
+
+def diff_runs(before: ConvertedScores, after: ConvertedScores) -> RunDiff:
+    """
+    Compare the converted scores of two runs of the same quiz.
+
+    Students are aligned on their ID with a hash join; every total and question score
+    of the aligned students is compared at once, and a cell that exists in only one run
+    (a question added or removed) counts as changed.
+
+    Args:
+        before: Converted scores of the first run
+        after: Converted scores of the second run
+
+    Returns:
+        RunDiff with the changed cells, in the order of the first run
+    """
+    # Hash join: each ID of the first run is looked up in a hash table of the second run's IDs
+    positions = pd.Index(after.student_ids).get_indexer(before.student_ids)
+    matched = positions >= 0
+    before_rows = np.flatnonzero(matched)
+    after_rows = positions[matched]
+    added_mask = np.ones(len(after.student_ids), dtype=bool)
+    added_mask[after_rows] = False
+
+    # Both runs are laid out on the union of their questions; a missing question is NaN
+    question_numbers = sorted(set(before.question_numbers) | set(after.question_numbers))
+    fields = [TOTAL_FIELD] + [f"Q{q_num}" for q_num in question_numbers]
+    before_values = _aligned(before, before_rows, question_numbers)
+    after_values = _aligned(after, after_rows, question_numbers)
+
+    both_missing = np.isnan(before_values) & np.isnan(after_values)
+    differs = (before_values != after_values) & ~both_missing
+    rows, columns = np.nonzero(differs)
+    before_changed = before_values[rows, columns]
+    after_changed = after_values[rows, columns]
+    changed = pd.DataFrame({
+        "Student ID": before.student_ids[before_rows[rows]],
+        "Field": np.asarray(fields, dtype=object)[columns],
+        "Before": before_changed,
+        "After": after_changed,
+        "Change": np.round(after_changed - before_changed, DECIMALS)
+    })
+    return RunDiff(len(before_rows), after.student_ids[added_mask].tolist(),
+                   before.student_ids[~matched].tolist(), changed)
+
+
+def _aligned(scores: ConvertedScores, rows: np.ndarray, question_numbers: List[int]) -> np.ndarray:
+    """Totals followed by the question scores of the selected rows, one column per question of the union."""
+    values = np.full((len(rows), len(question_numbers) + 1), np.nan)
+    values[:, 0] = scores.totals[rows]
+    column_of = {q_num: j for j, q_num in enumerate(question_numbers)}
+    columns = [column_of[q_num] + 1 for q_num in scores.question_numbers]
+    values[:, columns] = scores.question_scores[rows]
+    return values
+
+
+def format_diff(run_diff: RunDiff, limit: int = 20) -> str:
+    """
+    Format a run comparison for the command line.
+
+    Args:
+        run_diff: Comparison of two runs
+        limit: Maximum number of changed cells listed
+
+    Returns:
+        Summary line followed by the first changed cells
+    """
+    lines = [f"{run_diff.num_compared} students compared: {len(run_diff.changed_students)} changed, "
+             f"{len(run_diff.added)} added, {len(run_diff.removed)} removed"]
+    for record in run_diff.changed.head(limit).itertuples(index=False):
+        lines.append(f"  {record[0]:<15} {record[1]:<8} {record[2]:>8.2f} -> {record[3]:>8.2f} ({record[4]:+.2f})")
+    if len(run_diff.changed) > limit:
+        lines.append(f"  ... {len(run_diff.changed) - limit} more changed cells")
+    return "\n".join(lines)
@@ -0,0 +1,188 @@
+"""
+Dense score matrix representation of parsed quiz data.
+
+The object model (`StudentResponse`) is convenient for display, but batch
+operations such as parameter sweeps are far cheaper on a students × questions
+array built straight from the `N_Score` columns.
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.models.quiz_data import StudentResponse
+from app.services.response_encoding import EncodedResponses
+
+# Identity columns carried alongside the matrix, in output order
+IDENTITY_COLUMNS = ['Team', 'Student Name', 'First Name', 'Last Name', 'Student ID']
+
+
+def find_question_numbers(columns: List[str]) -> List[int]:
+    """
+    Extract question numbers from the `N_Response` column names.
+
+    Args:
+        columns: Column names of the input data
+
+    Returns:
+        List of question numbers in column order
+    """
+    question_numbers = []
+    for col in columns:
+        if not str(col).endswith('_Response'):
+            continue
+        try:
+            question_numbers.append(int(str(col).split('_')[0]))
+        except (ValueError, IndexError):
+            print(f"Warning: Skipping column '{col}' - could not extract question number.")
+    return question_numbers
+
+
+class ScoreMatrix:
+    """Students × questions matrix of original question scores."""
+
+    def __init__(self, identity: pd.DataFrame, question_numbers: List[int],
+                 scores: np.ndarray, original_scores: np.ndarray,
+                 responses: Optional[EncodedResponses] = None):
+        """
+        Create a score matrix.
+
+        Args:
+            identity: DataFrame with one row per student and the identity columns
+            question_numbers: Question numbers, one per matrix column
+            scores: Float array of shape (students, questions)
+            original_scores: Float array with the total original score per student
+            responses: Optional dictionary-encoded responses, one column per question
+        """
+        self.identity = identity.reset_index(drop=True)
+        self.question_numbers = list(question_numbers)
+        self.scores = scores
+        self.original_scores = original_scores
+        self.responses = responses
+
+    @property
+    def num_students(self) -> int:
+        """Number of students (matrix rows)."""
+        return self.scores.shape[0]
+
+    @property
+    def num_questions(self) -> int:
+        """Number of questions (matrix columns)."""
+        return self.scores.shape[1]
+
+    def take(self, rows) -> "ScoreMatrix":
+        """
+        Select a subset of students.
+
+        Args:
+            rows: Row indices, slice or boolean mask
+
+        Returns:
+            ScoreMatrix for the selected students
+        """
+        return ScoreMatrix(
+            self.identity.iloc[rows],
+            self.question_numbers,
+            self.scores[rows],
+            self.original_scores[rows],
+            self.responses.take(rows) if self.responses is not None else None
+        )
+
+    @classmethod
+    def concat(cls, matrices: List["ScoreMatrix"]) -> "ScoreMatrix":
+        """
+        Stack score matrices of consecutive row blocks of the same quiz.
+
+        Args:
+            matrices: Score matrices with the same question numbers, in row order
+
+        Returns:
+            ScoreMatrix for all rows
+        """
+        if not matrices:
+            raise ValueError("No score matrices to combine.")
+        responses = None
+        if all(matrix.responses is not None for matrix in matrices):
+            responses = EncodedResponses.concat([matrix.responses for matrix in matrices])
+        return cls(
+            pd.concat([matrix.identity for matrix in matrices], ignore_index=True),
+            matrices[0].question_numbers,
+            np.concatenate([matrix.scores for matrix in matrices]),
+            np.concatenate([matrix.original_scores for matrix in matrices]),
+            responses
+        )
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, question_numbers: Optional[List[int]] = None) -> "ScoreMatrix":
+        """
+        Build a score matrix directly from the input DataFrame.
+
+        Missing or non-numeric score cells are treated as 0.
+
+        Args:
+            df: Pandas DataFrame containing quiz data
+            question_numbers: Question numbers to use (detected from the columns if omitted)
+
+        Returns:
+            ScoreMatrix for the DataFrame
+        """
+        if question_numbers is None:
+            question_numbers = find_question_numbers(list(df.columns))
+        if not question_numbers:
+            raise ValueError("No valid question numbers found in column names.")
+
+        n_rows = len(df)
+        scores = np.zeros((n_rows, len(question_numbers)), dtype=np.float64)
+        response_columns = []
+        for j, q_num in enumerate(question_numbers):
+            score_col = f"{q_num}_Score"
+            if score_col in df.columns:
+                scores[:, j] = pd.to_numeric(df[score_col], errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+            response_col = f"{q_num}_Response"
+            response_columns.append(df[response_col] if response_col in df.columns else [None] * n_rows)
+        responses = EncodedResponses.encode(response_columns)
+
+        if 'Score' in df.columns:
+            original_scores = pd.to_numeric(df['Score'], errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+        else:
+            original_scores = scores.sum(axis=1)
+
+        identity = pd.DataFrame(index=range(n_rows))
+        for col in IDENTITY_COLUMNS:
+            if col in df.columns:
+                values = df[col].to_numpy()
+                identity[col] = values.astype(str) if col == 'Student ID' else values
+            else:
+                identity[col] = ""
+
+        return cls(identity, question_numbers, scores, original_scores, responses)
+
+    @classmethod
+    def from_responses(cls, student_responses: List[StudentResponse], question_numbers: List[int]) -> "ScoreMatrix":
+        """
+        Build a score matrix from already parsed student responses.
+
+        Args:
+            student_responses: List of student responses
+            question_numbers: Question numbers, one per matrix column
+
+        Returns:
+            ScoreMatrix for the responses
+        """
+        scores = np.array(
+            [[response.question_scores.get(q_num, 0.0) for q_num in question_numbers]
+             for response in student_responses],
+            dtype=np.float64
+        ).reshape(len(student_responses), len(question_numbers))
+        original_scores = np.array([response.original_score for response in student_responses], dtype=np.float64)
+        responses = EncodedResponses.encode([
+            [response.responses.get(q_num) for response in student_responses] for q_num in question_numbers
+        ])
+        identity = pd.DataFrame({
+            'Team': [response.team or "" for response in student_responses],
+            'Student Name': [response.student_name for response in student_responses],
+            'First Name': [response.first_name for response in student_responses],
+            'Last Name': [response.last_name for response in student_responses],
+            'Student ID': [response.student_id for response in student_responses],
+        })
+        return cls(identity, question_numbers, scores, original_scores, responses)
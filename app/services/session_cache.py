@@ -0,0 +1,109 @@
+"""
+State of the interactive console session.
+
+Reading and parsing a large workbook is by far the slowest step of the console
+flow. The session keeps the most recently used files parsed, as score
+matrices, between iterations, so processing the same file again with different
+parameters skips the read and converts the cached matrix directly. An entry is
+only reused while the file's size and modification time are unchanged. The
+parameters and file of the previous iteration are offered as defaults.
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.models.quiz_data import QuizParameters
+    from app.services.score_matrix import ScoreMatrix
+
+
+class ParsedInput:
+    """One parsed input file."""
+
+    def __init__(self, matrix: "ScoreMatrix", sheet_name: Optional[str]):
+        """
+        Create a parsed input.
+
+        Args:
+            matrix: Score matrix of the original scores; it does not depend on the parameters
+            sheet_name: Sheet the data was read from (Excel only)
+        """
+        self.matrix = matrix
+        self.sheet_name = sheet_name
+
+    @property
+    def question_numbers(self):
+        """Question numbers found in the file."""
+        return self.matrix.question_numbers
+
+
+class InputCache:
+    """Bounded least-recently-used cache of parsed input files."""
+
+    def __init__(self, max_entries: int = 3):
+        """
+        Create an empty cache.
+
+        Args:
+            max_entries: Maximum number of files kept parsed; the least recently used are evicted first
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], ParsedInput]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, file_path: str) -> ParsedInput:
+        """
+        Return the parsed file, reading it only if it is not cached or changed on disk.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            ParsedInput of the file
+        """
+        from app.services.file_handler import FileHandler
+        from app.services.header_schema import read_header
+        from app.services.score_matrix import ScoreMatrix
+
+        path = Path(file_path).resolve()
+        stat = path.stat()
+        key = str(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] == signature:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            print(f"Using the already loaded data of {path.name}.")
+            return cached[1]
+
+        self.misses += 1
+        # A wrong file is rejected from its header row, then only the used columns are read
+        schema = read_header(file_path)
+        df, sheet_name = FileHandler.read_dataframe(file_path, schema)
+        parsed = ParsedInput(ScoreMatrix.from_dataframe(df, schema.question_numbers), sheet_name)
+        self._entries[key] = (signature, parsed)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return parsed
+
+
+class SessionState:
+    """What the console session carries from one iteration to the next."""
+
+    def __init__(self, max_files: int = 3):
+        """
+        Create the state of a new session.
+
+        Args:
+            max_files: Maximum number of files kept parsed
+        """
+        self.inputs = InputCache(max_files)
+        # Parameters as entered and file of the previous iteration, offered as defaults
+        self.quiz_params: Optional["QuizParameters"] = None
+        self.file_path: Optional[str] = None
@@ -0,0 +1,195 @@
+"""
+Shared-memory hand-off of numpy arrays between processes.
+
+Worker processes write their result arrays into named shared-memory segments
+and return only small descriptors; the parent attaches to the segments instead
+of unpickling the data. Segment names are derived from a per-run prefix, so the
+parent can remove every segment of a run even when a worker fails or the run
+is interrupted.
+"""
+import atexit
+import signal
+import threading
+import uuid
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+
+class SharedArray:
+    """Descriptor of an array stored in a shared-memory segment; cheap to pickle."""
+
+    def __init__(self, name: str, shape: Tuple[int, ...], dtype: str):
+        """
+        Create a descriptor.
+
+        Args:
+            name: Name of the shared-memory segment
+            shape: Shape of the array
+            dtype: Numpy dtype string of the array
+        """
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+
+def share_array(array: np.ndarray, name: str) -> SharedArray:
+    """
+    Copy an array into a new shared-memory segment.
+
+    Args:
+        array: Array to share
+        name: Name of the segment to create
+
+    Returns:
+        Descriptor of the shared array
+    """
+    # Zero-sized segments are not allowed
+    segment = shared_memory.SharedMemory(name=name, create=True, size=max(array.nbytes, 1))
+    try:
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+    except BaseException:
+        segment.close()
+        segment.unlink()
+        raise
+    segment.close()
+    return SharedArray(name, array.shape, array.dtype.str)
+
+
+def share_arrays(arrays: Dict[str, np.ndarray], names: Dict[str, str]) -> Dict[str, SharedArray]:
+    """
+    Copy several arrays into new shared-memory segments, removing them all if one fails.
+
+    Args:
+        arrays: Arrays to share by field
+        names: Segment name of each field
+
+    Returns:
+        Descriptor of each field
+    """
+    descriptors = {}
+    try:
+        for field, array in arrays.items():
+            descriptors[field] = share_array(array, names[field])
+    except BaseException:
+        for descriptor in descriptors.values():
+            unlink_segment(descriptor.name)
+        raise
+    return descriptors
+
+
+@contextmanager
+def attach_arrays(descriptors: Dict[str, SharedArray]) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Attach to shared arrays without copying them.
+
+    The arrays are views of the segments and are only valid inside the with block;
+    copy anything that has to outlive it.
+
+    Args:
+        descriptors: Descriptor of each field
+
+    Yields:
+        Array view of each field
+    """
+    segments: List[shared_memory.SharedMemory] = []
+    views: Dict[str, np.ndarray] = {}
+    try:
+        for field, descriptor in descriptors.items():
+            segment = shared_memory.SharedMemory(name=descriptor.name)
+            segments.append(segment)
+            views[field] = np.ndarray(descriptor.shape, dtype=np.dtype(descriptor.dtype), buffer=segment.buf)
+        yield views
+    finally:
+        views.clear()
+        for segment in segments:
+            try:
+                segment.close()
+            except BufferError:
+                # A view is still referenced (e.g. by a traceback); the mapping goes away with it
+                pass
+
+
+def unlink_segment(name: str) -> None:
+    """
+    Remove a shared-memory segment if it exists.
+
+    Args:
+        name: Name of the segment
+    """
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
+
+
+class SharedSegmentRun:
+    """
+    Names and cleans up the shared-memory segments of one parallel run.
+
+    Use as a context manager around the process pool: every segment named by the
+    run is unlinked on exit, on errors, on Ctrl+C and on SIGTERM, whether or not
+    the worker that created it finished. Create the process pool inside the with
+    block so the workers share the parent's resource tracker.
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        """
+        Create a run.
+
+        Args:
+            fields: Names of the arrays each worker shares
+        """
+        # Short prefix: some platforms limit segment names to 31 characters
+        self.prefix = f"qz{uuid.uuid4().hex[:10]}"
+        self.fields = list(fields)
+        self._num_slots = 0
+        self._previous_sigterm = None
+
+    def names(self, slot: int) -> Dict[str, str]:
+        """
+        Segment names for the arrays of one worker task.
+
+        Args:
+            slot: Index of the task within the run
+
+        Returns:
+            Segment name of each field
+        """
+        self._num_slots = max(self._num_slots, slot + 1)
+        return {field: f"{self.prefix}_{slot}_{index}" for index, field in enumerate(self.fields)}
+
+    def cleanup(self) -> None:
+        """Unlink every segment named by this run that still exists."""
+        for slot in range(self._num_slots):
+            for name in self.names(slot).values():
+                unlink_segment(name)
+
+    def __enter__(self) -> "SharedSegmentRun":
+        # Start the tracker before the workers so creators and the parent share it
+        resource_tracker.ensure_running()
+        atexit.register(self.cleanup)
+        if threading.current_thread() is threading.main_thread():
+            self._previous_sigterm = signal.getsignal(signal.SIGTERM)
+            if self._previous_sigterm == signal.SIG_DFL:
+                # Turn SIGTERM into SystemExit so the with block unwinds and cleans up
+                signal.signal(signal.SIGTERM, _raise_system_exit)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            self.cleanup()
+        finally:
+            atexit.unregister(self.cleanup)
+            if self._previous_sigterm == signal.SIG_DFL:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            self._previous_sigterm = None
+
+
+def _raise_system_exit(signum, frame):
+    """SIGTERM handler used while a run owns shared-memory segments."""
+    raise SystemExit(128 + signum)
@@ -0,0 +1,262 @@
+"""
+Mergeable summary statistics for converted scores.
+
+SummaryAccumulator is fed batch by batch while the conversion pipeline streams
+through a file. It keeps exact count/min/max/mean/variance, a fixed-bin
+histogram and a bounded-memory quantile sketch, and two accumulators built in
+different workers or from different files can be merged into one.
+"""
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+DEFAULT_QUANTILES = [0.25, 0.5, 0.75]
+
+
+class QuantileSketch:
+    """
+    KLL-style quantile sketch with bounded memory.
+
+    Level h holds items that each stand for 2**h original values. When a level
+    grows beyond its capacity it is sorted and every other item (random offset)
+    is promoted to the next level, so memory stays around 3·k items while the
+    rank error stays roughly proportional to 1/k.
+    """
+
+    def __init__(self, k: int = 512, seed: Optional[int] = None):
+        """
+        Create an empty sketch.
+
+        Args:
+            k: Capacity of the top level; larger values are more accurate
+            seed: Seed for the random compaction offsets
+        """
+        if k < 8:
+            raise ValueError("Sketch size k must be at least 8.")
+        self.k = k
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        """Capacity of a level; lower levels get geometrically smaller buffers."""
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _compress(self):
+        """Compact every level that exceeds its capacity."""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # Keep one item back when the count is odd so total weight is preserved
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                paired = items[:len(items) - len(keep)]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    @property
+    def num_retained(self) -> int:
+        """Number of items currently held by the sketch."""
+        return sum(len(items) for items in self.levels)
+
+    def update(self, values: np.ndarray):
+        """
+        Add a batch of values to the sketch.
+
+        Args:
+            values: Values to add
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+
+    def merge(self, other: "QuantileSketch"):
+        """
+        Merge another sketch into this one.
+
+        Args:
+            other: Sketch to merge
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def quantiles(self, qs: List[float]) -> List[float]:
+        """
+        Estimate quantiles of the values seen so far.
+
+        Args:
+            qs: Quantiles to estimate, between 0 and 1
+
+        Returns:
+            List with one estimate per requested quantile
+        """
+        if self.count == 0:
+            return [float('nan')] * len(qs)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2.0 ** level)
+                                  for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        targets = np.clip(np.asarray(qs, dtype=np.float64), 0, 1) * cumulative[-1]
+        indices = np.minimum(np.searchsorted(cumulative, targets, side='left'), len(items) - 1)
+        return items[indices].tolist()
+
+
+class SummaryAccumulator:
+    """Streaming, mergeable summary of converted scores."""
+
+    def __init__(self, bin_edges: Optional[np.ndarray] = None, sketch_size: int = 512, seed: Optional[int] = None):
+        """
+        Create an empty accumulator.
+
+        Args:
+            bin_edges: Histogram bin edges; accumulators can only be merged if their edges match
+            sketch_size: Size parameter k of the quantile sketch
+            seed: Seed for the quantile sketch
+        """
+        self.count = 0
+        self.minimum = float('inf')
+        self.maximum = float('-inf')
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.bin_edges = None if bin_edges is None else np.asarray(bin_edges, dtype=np.float64)
+        self.histogram = None if bin_edges is None else np.zeros(len(self.bin_edges) - 1, dtype=np.int64)
+        self.below_range = 0
+        self.above_range = 0
+        self.sketch = QuantileSketch(sketch_size, seed)
+
+    @classmethod
+    def for_scale(cls, max_score: float, bins: int = 10, **kwargs) -> "SummaryAccumulator":
+        """
+        Create an accumulator with evenly spaced histogram bins from 0 to max_score.
+
+        Args:
+            max_score: Maximum score of the scale
+            bins: Number of histogram bins
+
+        Returns:
+            Empty SummaryAccumulator
+        """
+        return cls(np.linspace(0.0, max_score, bins + 1), **kwargs)
+
+    @property
+    def variance(self) -> float:
+        """Population variance of the values seen so far."""
+        return self._m2 / self.count if self.count else float('nan')
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation of the values seen so far."""
+        return float(np.sqrt(self.variance)) if self.count else float('nan')
+
+    def _combine_moments(self, count: int, mean: float, m2: float):
+        """Combine another set of moments with the current ones (Chan et al.)."""
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def update(self, values: np.ndarray):
+        """
+        Add a batch of converted scores.
+
+        Args:
+            values: Converted scores of one batch
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return
+
+        batch_mean = float(values.mean())
+        self._combine_moments(len(values), batch_mean, float(((values - batch_mean) ** 2).sum()))
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+
+        if self.bin_edges is not None:
+            self.below_range += int((values < self.bin_edges[0]).sum())
+            self.above_range += int((values > self.bin_edges[-1]).sum())
+            self.histogram += np.histogram(values, bins=self.bin_edges)[0]
+
+        self.sketch.update(values)
+
+    def merge(self, other: "SummaryAccumulator"):
+        """
+        Merge another accumulator, e.g. from a parallel worker or another file.
+
+        Args:
+            other: Accumulator to merge
+        """
+        if other.count == 0:
+            return
+        if (self.bin_edges is None) != (other.bin_edges is None) or (
+                self.bin_edges is not None and not np.array_equal(self.bin_edges, other.bin_edges)):
+            raise ValueError("Cannot merge summaries with different histogram bins.")
+
+        self._combine_moments(other.count, other.mean, other._m2)
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        if self.histogram is not None:
+            self.histogram += other.histogram
+            self.below_range += other.below_range
+            self.above_range += other.above_range
+        self.sketch.merge(other.sketch)
+
+    def quantiles(self, qs: List[float] = None) -> List[float]:
+        """
+        Approximate quantiles, clamped to the exact minimum and maximum.
+
+        Args:
+            qs: Quantiles to estimate (defaults to the quartiles)
+
+        Returns:
+            List with one estimate per requested quantile
+        """
+        qs = DEFAULT_QUANTILES if qs is None else qs
+        estimates = self.sketch.quantiles(qs)
+        return [
+            self.minimum if q <= 0 else self.maximum if q >= 1 else min(max(value, self.minimum), self.maximum)
+            for q, value in zip(qs, estimates)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Summarize the accumulator in a JSON-serializable dictionary.
+
+        Returns:
+            Dictionary with the exact moments, approximate quartiles and histogram
+        """
+        q1, median, q3 = self.quantiles(DEFAULT_QUANTILES) if self.count else [None, None, None]
+        summary = {
+            "count": self.count,
+            "min": self.minimum if self.count else None,
+            "max": self.maximum if self.count else None,
+            "mean": self.mean if self.count else None,
+            "variance": self.variance if self.count else None,
+            "std": self.std if self.count else None,
+            "q1": q1,
+            "median": median,
+            "q3": q3
+        }
+        if self.histogram is not None:
+            summary["histogram"] = {
+                "bin_edges": self.bin_edges.tolist(),
+                "counts": self.histogram.tolist(),
+                "below_range": self.below_range,
+                "above_range": self.above_range
+            }
+        return summary
@@ -0,0 +1,170 @@
+"""
+Parameter sweep service for comparing several conversions of the same quiz.
+
+The input is parsed once into a ScoreMatrix and every linear QuizParameters
+variant is applied in a single batched matrix operation. Variants with a curve,
+a fixed-point scale or an answer key go through the same regrading and
+conversion as `convert`, one at a time.
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.models.quiz_data import QuizParameters
+from app.services.answer_key import regrade_matrix
+from app.services.quiz_service import convert_score_matrix
+from app.services.score_matrix import ScoreMatrix
+
+
+class SweepResult:
+    """Converted totals of one score matrix under several parameter variants."""
+
+    def __init__(self, matrix: ScoreMatrix, variants: List[QuizParameters],
+                 factors: np.ndarray, new_scores: np.ndarray,
+                 converted: Optional[Dict[int, np.ndarray]] = None):
+        """
+        Create a sweep result.
+
+        Args:
+            matrix: Score matrix the variants were applied to
+            variants: Quiz parameter variants, in sweep order
+            factors: Per-question linear conversion factors of shape (questions, variants)
+            new_scores: Converted totals of shape (students, variants)
+            converted: Converted question scores of the variants that were not converted by their factors alone,
+                by variant index
+        """
+        self.matrix = matrix
+        self.variants = variants
+        self.factors = factors
+        self.new_scores = new_scores
+        self.converted = converted or {}
+
+    @property
+    def labels(self) -> List[str]:
+        """Unique column label for each variant, based on the quiz name."""
+        labels = []
+        seen = {}
+        for variant in self.variants:
+            count = seen.get(variant.quiz_name, 0) + 1
+            seen[variant.quiz_name] = count
+            labels.append(variant.quiz_name if count == 1 else f"{variant.quiz_name} ({count})")
+        return labels
+
+    def question_scores(self) -> np.ndarray:
+        """
+        Materialize the converted question scores for all variants.
+
+        Returns:
+            Float array of shape (students, questions, variants)
+        """
+        scores = self.matrix.scores[:, :, np.newaxis] * self.factors[np.newaxis, :, :]
+        for index, question_new_scores in self.converted.items():
+            scores[:, :, index] = question_new_scores
+        return scores
+
+    def comparison_table(self) -> pd.DataFrame:
+        """
+        Build the comparison table of converted totals per variant.
+
+        Returns:
+            DataFrame with the identity columns, the original score and one column per variant
+        """
+        table = self.matrix.identity[['Team', 'Student Name', 'Student ID']].copy()
+        table['Original Score'] = self.matrix.original_scores
+        for index, label in enumerate(self.labels):
+            table[label] = np.round(self.new_scores[:, index], 2)
+        return table
+
+
+def sweep_conversions(matrix: ScoreMatrix, variants: List[QuizParameters]) -> SweepResult:
+    """
+    Convert one score matrix under many quiz parameter variants.
+
+    Args:
+        matrix: Score matrix with the original question scores
+        variants: Quiz parameter variants to compare
+
+    Returns:
+        SweepResult with the converted totals for every variant
+    """
+    if not variants:
+        raise ValueError("At least one set of quiz parameters is required for a sweep.")
+
+    # Questions × variants factor matrix, one column per variant
+    factors = np.column_stack([
+        np.asarray(variant.conversion_factors(matrix.question_numbers), dtype=np.float64)
+        for variant in variants
+    ])
+    weighted = np.array([variant.use_weighted_questions for variant in variants])
+    total_factors = np.array([variant.new_max_score / variant.original_max_score for variant in variants])
+
+    # Weighted variants sum their question scores, the others scale the original total
+    new_scores = np.where(
+        weighted[np.newaxis, :],
+        matrix.scores @ factors,
+        matrix.original_scores[:, np.newaxis] * total_factors[np.newaxis, :]
+    )
+
+    # The other variants are regraded and converted on their own, exactly as `convert` would
+    converted = {}
+    for index, variant in enumerate(variants):
+        if _needs_full_conversion(variant):
+            converted[index], new_scores[:, index] = convert_score_matrix(regrade_matrix(matrix, variant), variant)
+
+    return SweepResult(matrix, list(variants), factors, new_scores, converted)
+
+
+def _needs_full_conversion(variant: QuizParameters) -> bool:
+    """Whether a variant needs more than its linear conversion factors."""
+    return variant.curve != 'linear' or variant.fixed_point_scale is not None or bool(variant.answer_key)
+
+
+def build_variants(base: QuizParameters, new_max_scores: Optional[List[float]] = None) -> List[QuizParameters]:
+    """
+    Build sweep variants that differ from a base set of parameters only in the new maximum score.
+
+    Args:
+        base: Base quiz parameters
+        new_max_scores: New maximum scores to compare (defaults to the base value only)
+
+    Returns:
+        List of quiz parameter variants
+    """
+    if not new_max_scores:
+        return [base]
+    return [
+        base.model_copy(update={
+            "quiz_name": f"{base.quiz_name} /{new_max_score:g}",
+            "new_max_score": new_max_score
+        })
+        for new_max_score in new_max_scores
+    ]
+
+
+def load_variants(file_path: str) -> List[QuizParameters]:
+    """
+    Load sweep variants from a JSON file containing a list of quiz parameter objects.
+
+    Args:
+        file_path: Path to the JSON file
+
+    Returns:
+        List of quiz parameter variants
+    """
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+
+    with open(path, 'r', encoding='utf-8') as variants_file:
+        data = json.load(variants_file)
+
+    if not isinstance(data, list) or not data:
+        raise ValueError("The variants file must contain a non-empty list of quiz parameters.")
+
+    try:
+        return [QuizParameters(**item) for item in data]
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid quiz parameters in variants file: {str(e)}")
@@ -1,10 +1,26 @@
 """
 User interface for the quiz score processor application.
 """
-from typing import List, Dict, Any, Tuple
+import sys
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from pathlib import Path
 
-from app.models.quiz_data import QuizParameters, StudentResponse, ProcessedResponse
+from app.services.result_renderer import DEFAULT_PAGE_SIZE
+
+if TYPE_CHECKING:
+    # pydantic and numpy are only imported once parameters are actually collected
+    import numpy as np
+    from app.models.quiz_data import QuizParameters
+    from app.services.score_matrix import ScoreMatrix
+
+
+def _ask(label: str, default: Any = None) -> str:
+    """Prompt for a value; when a default is given it is shown in brackets and kept on an empty answer."""
+    if default is None or default == "":
+        return input(f"{label}: ")
+    shown = f"{default:g}" if isinstance(default, float) else str(default)
+    answer = input(f"{label} [{shown}]: ")
+    return answer if answer.strip() else shown
 
 
 class UserInterface:
@@ -20,41 +36,49 @@ class UserInterface:
         print("Please provide the following information:")
     
     @staticmethod
-    def get_quiz_parameters() -> QuizParameters:
+    def get_quiz_parameters(defaults: Optional["QuizParameters"] = None) -> "QuizParameters":
         """
         Get quiz parameters from user input.
+
+        Args:
+            defaults: Parameters of the previous iteration, kept for every answer left empty
         
         Returns:
             QuizParameters object with user-provided values
         """
+        from app.models.quiz_data import QuizParameters
+
         try:
-            quiz_name = input("\nQuiz Name: ")
+            quiz_name = _ask("\nQuiz Name", defaults and defaults.quiz_name)
             if not quiz_name.strip():
                 raise ValueError("Quiz name cannot be empty.")
 
             try:
-                original_max_score = float(input("Original Maximum Quiz Score: "))
+                original_max_score = float(_ask("Original Maximum Quiz Score",
+                                                defaults and defaults.original_max_score))
                 if original_max_score <= 0:
                     raise ValueError("Original maximum score must be greater than zero.")
             except ValueError:
                 raise ValueError("Invalid input for Original Maximum Quiz Score. Please enter a valid number.")
 
             try:
-                new_max_score = float(input("New Desired Maximum Score: "))
+                new_max_score = float(_ask("New Desired Maximum Score", defaults and defaults.new_max_score))
                 if new_max_score <= 0:
                     raise ValueError("New maximum score must be greater than zero.")
             except ValueError:
                 raise ValueError("Invalid input for New Desired Maximum Score. Please enter a valid number.")
 
             try:
-                original_question_value = float(input("Value of Each Question on Original Scale: "))
+                original_question_value = float(_ask("Value of Each Question on Original Scale",
+                                                     defaults and defaults.original_question_value))
                 if original_question_value <= 0:
                     raise ValueError("Question value must be greater than zero.")
             except ValueError:
                 raise ValueError("Invalid input for Value of Each Question. Please enter a valid number.")
 
             # Ask if user wants to use weighted questions
-            use_weighted_questions = input("\nDo you want to assign different weights to questions? (y/n): ").lower() == 'y'
+            use_weighted_questions = _ask("\nDo you want to assign different weights to questions? (y/n)",
+                                          defaults and ('y' if defaults.use_weighted_questions else 'n')).lower() == 'y'
 
             # Create quiz parameters with default values
             quiz_params = QuizParameters(
@@ -67,6 +91,19 @@ class UserInterface:
 
             # If using weighted questions, get the weights
             if use_weighted_questions:
+                if defaults is not None and defaults.use_weighted_questions:
+                    # Keep the previous weights, or the previous choice of the max-points row
+                    source = _ask("\nLoad weights from a (f)ile, a saved (p)rofile, the (m)ax-points row of the data "
+                                  "file, enter them (o)ne by one, or (k)eep the previous weights? (f/p/m/o/k)",
+                                  'k' if defaults.question_weights else 'm').lower()
+                    if source == 'k':
+                        return quiz_params.model_copy(update={"question_weights": defaults.question_weights})
+                else:
+                    source = input("\nLoad weights from a (f)ile, a saved (p)rofile, the (m)ax-points row of the data "
+                                   "file, or enter them (o)ne by one? (f/p/m/o): ").lower()
+                if source in ('f', 'p', 'm'):
+                    return UserInterface.get_weight_profile(quiz_params, source)
+
                 print("\nYou'll now be asked to enter weights for each question.")
                 print("Weights determine the relative importance of each question.")
                 print("For example, if question 1 has weight 2 and question 2 has weight 1,")
@@ -124,7 +161,46 @@ class UserInterface:
             raise ValueError(str(e))
     
     @staticmethod
-    def verify_calculation(quiz_params: QuizParameters) -> bool:
+    def get_weight_profile(quiz_params: "QuizParameters", source: str) -> "QuizParameters":
+        """
+        Get all question weights at once from a file, a saved profile or the data file.
+
+        Args:
+            quiz_params: Quiz parameters in weighted mode
+            source: 'f' for a CSV/JSON file, 'p' for a saved profile, 'm' for the max-points row of the data file
+
+        Returns:
+            QuizParameters with the weights; with 'm' the weights are left empty and taken from the data file
+        """
+        from app.services.weight_profiles import ProfileStore, load_weight_profile
+
+        if source == 'm':
+            print("Weights will be taken from the max-points row of the data file.")
+            return quiz_params.model_copy(update={"question_weights": {}})
+
+        store = ProfileStore()
+        if source == 'f':
+            try:
+                profile = load_weight_profile(input("Path to the weights file (CSV or JSON): ").strip())
+            except FileNotFoundError as e:
+                raise ValueError(str(e))
+            name = input("Save these weights as a profile for reuse (name, leave empty to skip): ").strip()
+            if name:
+                profile.name = name
+                print(f"Profile saved to {store.save(profile)}")
+        else:
+            names = store.names()
+            if not names:
+                raise ValueError("No saved weight profiles found.")
+            print("Saved profiles: " + ", ".join(names))
+            profile = store.get(input("Profile name: ").strip())
+
+        total_weight = sum(profile.weights)
+        print(f"\nLoaded {len(profile.weights)} question weights from '{profile.name}' (total weight {total_weight:g}).")
+        return profile.apply(quiz_params)
+
+    @staticmethod
+    def verify_calculation(quiz_params: "QuizParameters") -> bool:
         """
         Verify calculation and ask user what to do if verification fails.
         
@@ -152,15 +228,18 @@ class UserInterface:
         return True
     
     @staticmethod
-    def get_file_path() -> str:
+    def get_file_path(default: Optional[str] = None) -> str:
         """
         Get file path from user input.
+
+        Args:
+            default: File of the previous iteration, kept when the answer is left empty
         
         Returns:
             Path to the file or empty string to quit
         """
         while True:
-            file_path = input("\nPath to Quiz Data File (Excel or CSV): ")
+            file_path = _ask("\nPath to Quiz Data File (Excel or CSV)", default)
             if not file_path.strip():
                 print("Error: File path cannot be empty.")
                 if input("Do you want to try again? (y/n): ").lower() != 'y':
@@ -178,20 +257,23 @@ class UserInterface:
             return file_path  # Valid file path provided
     
     @staticmethod
-    def verify_conversion(processed_responses: List[ProcessedResponse], quiz_params: QuizParameters) -> bool:
+    def verify_conversion(matrix: "ScoreMatrix", question_new_scores: "np.ndarray", new_scores: "np.ndarray",
+                          quiz_params: "QuizParameters") -> bool:
         """
         Verify conversion and ask user what to do if verification fails.
         
         Args:
-            processed_responses: List of processed responses
+            matrix: Score matrix of the students
+            question_new_scores: Converted question scores (students × questions)
+            new_scores: Converted totals (students)
             quiz_params: Quiz parameters
             
         Returns:
             True to continue, False to restart or quit
         """
-        from app.services.quiz_service import verify_conversion
+        from app.services.quiz_service import verify_matrix_conversion
         
-        if not verify_conversion(processed_responses, quiz_params):
+        if not verify_matrix_conversion(matrix, question_new_scores, new_scores, quiz_params):
             print("\nWarning: Conversion verification failed. Please check your data.")
             choice = input("Do you want to (c)ontinue anyway, (r)estart with new parameters, or (q)uit? (c/r/q): ").lower()
             if choice == 'r':
@@ -204,76 +286,104 @@ class UserInterface:
         return True
     
     @staticmethod
-    def display_results(quiz_params: QuizParameters, output_data: List[Dict[str, Any]], question_numbers: List[int]):
+    def display_results(quiz_params: "QuizParameters", output_data: List[Dict[str, Any]], question_numbers: List[int],
+                        max_rows: Optional[int] = DEFAULT_PAGE_SIZE):
         """
         Display the results in a formatted way.
 
+        The output is rendered into one buffer and written at once; with more than
+        max_rows students only the first page is shown, followed by a summary.
+
         Args:
             quiz_params: Quiz parameters
             output_data: List of dictionaries with formatted output data
             question_numbers: List of question numbers
+            max_rows: Number of students shown (None shows every student)
         """
-        print("\n" + "="*80)
-        print(f"QUIZ RESULTS: {quiz_params.quiz_name}")
-        print("="*80)
+        from app.services.result_renderer import render_results
 
-        print("\nQUIZ PARAMETERS:")
-        print(f"Original Maximum Score: {quiz_params.original_max_score}")
-        print(f"New Maximum Score: {quiz_params.new_max_score}")
-        print(f"Original Question Value: {quiz_params.original_question_value}")
-        print(f"Total Questions: {quiz_params.total_questions}")
-        print(f"New Question Value: {quiz_params.new_question_value}")
-
-        # Display weighted question information if applicable
-        if quiz_params.use_weighted_questions:
-            print("\nWEIGHTED QUESTIONS:")
-            print("-"*80)
-            print(f"{'Question':<10} {'Weight':<10} {'% of Total':<15} {'New Max Score':<15}")
-            print("-"*80)
-
-            total_weight = sum(quiz_params.question_weights.values())
-            for q_num in sorted(quiz_params.question_weights.keys()):
-                weight = quiz_params.question_weights[q_num]
-                percentage = (weight / total_weight) * 100
-                new_max = (weight / total_weight) * quiz_params.new_max_score
-                print(f"{q_num:<10} {weight:<10.2f} {percentage:<15.2f}% {new_max:<15.2f}")
-
-            print(f"{'Total':<10} {total_weight:<10.2f} {'100.00':<15}% {quiz_params.new_max_score:<15.2f}")
-
-        print("\nVERIFICATION:")
-        print(f"Total Questions × New Question Value = New Maximum Score")
-        print(f"{quiz_params.total_questions} × {quiz_params.new_question_value} = {quiz_params.total_questions * quiz_params.new_question_value}")
-
-        if quiz_params.verify_calculation():
-            print("✓ Calculation verified successfully!")
-        else:
-            print("✗ Calculation verification failed!")
+        sys.stdout.write(render_results(quiz_params, output_data, question_numbers, max_rows))
+        sys.stdout.flush()
 
-        print("\nSTUDENT INFORMATION AND TOTAL SCORES:")
+    @staticmethod
+    def offer_full_results(output_data: List[Dict[str, Any]], question_numbers: List[int],
+                           max_rows: Optional[int] = DEFAULT_PAGE_SIZE):
+        """
+        Offer the complete tables in a pager or a file when display_results truncated them.
+
+        Args:
+            output_data: List of dictionaries with formatted output data
+            question_numbers: List of question numbers
+            max_rows: Number of students display_results showed
+        """
+        if max_rows is None or len(output_data) <= max_rows:
+            return
+
+        from app.services.result_renderer import render_full_tables, save_text, show_in_pager
+
+        choice = input(f"\nShow all {len(output_data)} students in a (p)ager, save them to a (f)ile, "
+                       f"or (s)kip? (p/f/s): ").lower()
+        if choice == 'p':
+            show_in_pager(render_full_tables(output_data, question_numbers))
+        elif choice == 'f':
+            file_path = input("File name (default: results.txt): ").strip() or "results.txt"
+            try:
+                path = save_text(render_full_tables(output_data, question_numbers), file_path)
+                print(f"Full results written to {path}")
+            except OSError as e:
+                print(f"Error writing file: {str(e)}")
+
+    @staticmethod
+    def display_item_analysis(item_records: List[Dict[str, Any]]):
+        """
+        Display the item analysis statistics for each question.
+
+        Args:
+            item_records: List of dictionaries with the statistics of each question
+        """
+        print("\nITEM ANALYSIS:")
         print("-"*80)
-        print(f"{'Team':<10} {'Student Name':<20} {'First Name':<15} {'Last Name':<15} {'Student ID':<10} {'Original':<10} {'Converted':<10}")
+        print(f"{'Question':<10} {'Mean':<10} {'Difficulty':<12} {'Discrimination':<16} {'No Response':<12} {'Top Responses'}")
         print("-"*80)
 
-        for student in output_data:
-            print(f"{student['Team']:<10} {student['Student Name']:<20} {student['First Name']:<15} {student['Last Name']:<15} {student['Student ID']:<10} {student['Original Score']:<10} {student['Converted Score']:<10}")
+        for record in item_records:
+            discrimination = record['discrimination']
+            discrimination_text = f"{discrimination:.3f}" if discrimination is not None else "n/a"
+            difficulty_text = f"{record['difficulty']:.3f}" if record['difficulty'] is not None else "n/a"
+            top_responses = ", ".join(
+                f"{response}: {count}" for response, count in list(record['response_distribution'].items())[:3]
+            )
+            non_response_text = f"{record['non_response_rate'] * 100:.1f}%"
+            print(f"{record['question']:<10} {record['mean_score']:<10.2f} {difficulty_text:<12} "
+                  f"{discrimination_text:<16} {non_response_text:<12} {top_responses}")
 
-        print("\nQUESTION RESPONSES AND SCORES:")
-        print("-"*80)
-        header = "Student Name"
-        for q_num in question_numbers:
-            header += f" | Q{q_num} Resp | Q{q_num} Orig | Q{q_num} Conv"
-        print(header)
+    @staticmethod
+    def display_summary_statistics(summary: Dict[str, Any]):
+        """
+        Display the summary statistics and histogram of the converted scores.
+
+        Args:
+            summary: Dictionary produced by SummaryAccumulator.to_dict
+        """
+        print("\nCONVERTED SCORE SUMMARY:")
         print("-"*80)
+        if not summary['count']:
+            print("No scores to summarize.")
+            return
+
+        print(f"Students: {summary['count']}")
+        print(f"Min: {summary['min']:.2f}   Max: {summary['max']:.2f}   Mean: {summary['mean']:.2f}   Std Dev: {summary['std']:.2f}")
+        print(f"Q1: {summary['q1']:.2f}   Median: {summary['median']:.2f}   Q3: {summary['q3']:.2f}   (approximate)")
+
+        histogram = summary.get('histogram')
+        if histogram:
+            print("\nHistogram:")
+            edges = histogram['bin_edges']
+            largest = max(histogram['counts']) or 1
+            for index, count in enumerate(histogram['counts']):
+                bar = "#" * int(round(40 * count / largest))
+                print(f"{edges[index]:>7.2f} - {edges[index + 1]:<7.2f} {count:>8} {bar}")
 
-        for student in output_data:
-            row = f"{student['Student Name']:<12}"
-            for q_num in question_numbers:
-                response = student.get(f"Q{q_num} Response", "")
-                orig_score = student.get(f"Q{q_num} Original Score", "")
-                conv_score = student.get(f"Q{q_num} Converted Score", "")
-                row += f" | {response:<8} | {orig_score:<9} | {conv_score:<9}"
-            print(row)
-    
     @staticmethod
     def ask_export() -> bool:
         """
@@ -0,0 +1,300 @@
+"""
+Watch-folder mode: automatically convert quiz exports dropped into a directory.
+
+The folder is polled for new or modified .csv/.xlsx files. A file is only
+picked up once its size and modification time have stayed the same for the
+settle time, so exports that are still being written are left alone. Ready
+files are converted in a bounded pool of worker processes with the
+QuizParameters of the nearest quiz_params.json, and the output is written next
+to the input. A manifest records finished files, so a restart does not
+process them again.
+"""
+import json
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.quiz_data import QuizParameters
+
+# Extensions of the exports that are picked up
+WATCHED_EXTENSIONS = ['.csv', '.xlsx']
+
+# Per-folder configuration file with the quiz parameters
+CONFIG_FILENAME = "quiz_params.json"
+
+# Default manifest file, created in the watched folder
+MANIFEST_FILENAME = ".quiz_watch_manifest.json"
+
+# Appended to the input file name for the converted output
+OUTPUT_SUFFIX = "_converted"
+
+
+def output_path_for(file_path: Path) -> Path:
+    """
+    Path of the converted output written next to an input file.
+
+    Args:
+        file_path: Path of the input file
+
+    Returns:
+        Output path with the same extension
+    """
+    return file_path.with_name(f"{file_path.stem}{OUTPUT_SUFFIX}{file_path.suffix}")
+
+
+def convert_export(file_path: str, quiz_params: QuizParameters, output_path: str) -> int:
+    """
+    Convert one export and write the output; runs inside a worker process.
+
+    Args:
+        file_path: Path of the input file
+        quiz_params: Quiz parameters for conversion
+        output_path: Path of the output file
+
+    Returns:
+        Number of converted students
+    """
+    from app.services.pipeline import convert_file, export_converted
+
+    batch = convert_file(file_path, quiz_params)
+    # Write to a temporary name first so a half-written output is never mistaken for a result
+    partial_path = Path(output_path).with_name(f".{Path(output_path).name}.partial{Path(output_path).suffix}")
+    export_converted(batch, str(partial_path), quiz_params.fixed_point_scale)
+    os.replace(partial_path, output_path)
+    return batch.matrix.num_students
+
+
+class FolderWatcher:
+    """Polls a folder and converts new or modified exports in a bounded worker pool."""
+
+    def __init__(self, folder: str, workers: int = 2, poll_interval: float = 2.0, settle_time: float = 2.0,
+                 manifest_path: Optional[str] = None):
+        """
+        Create a watcher.
+
+        Args:
+            folder: Folder to watch (subfolders included)
+            workers: Maximum number of files converted at the same time
+            poll_interval: Seconds between folder scans
+            settle_time: Seconds a file's size and modification time must stay unchanged before it is processed
+            manifest_path: Manifest file (defaults to MANIFEST_FILENAME in the watched folder)
+        """
+        self.folder = Path(folder)
+        if not self.folder.is_dir():
+            raise ValueError(f"'{folder}' is not a directory.")
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.manifest_path = Path(manifest_path) if manifest_path else self.folder / MANIFEST_FILENAME
+        self.manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+        # Path -> (signature, time the signature was first seen)
+        self._pending: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+        self._in_flight: Dict[Future, Tuple[Path, Tuple[int, int], Path]] = {}
+        self._unconfigured: set = set()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Read the manifest, starting empty if it does not exist yet."""
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not read manifest {self.manifest_path}: {str(e)}. Starting with an empty manifest.")
+            return {}
+
+    def _save_manifest(self):
+        """Write the manifest atomically, so an interrupted write never corrupts it."""
+        temp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as manifest_file:
+            json.dump(self.manifest, manifest_file, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+    def _manifest_key(self, file_path: Path) -> str:
+        return file_path.relative_to(self.folder).as_posix()
+
+    def find_exports(self) -> List[Path]:
+        """
+        List the export files in the watched folder.
+
+        Returns:
+            Paths of the input files, excluding outputs and temporary files
+        """
+        exports = []
+        for file_path in self.folder.rglob("*"):
+            if (file_path.suffix.lower() in WATCHED_EXTENSIONS and file_path.is_file()
+                    and not file_path.stem.endswith(OUTPUT_SUFFIX)
+                    and not file_path.name.startswith(('.', '~$'))):
+                exports.append(file_path)
+        return sorted(exports)
+
+    def load_parameters(self, file_path: Path) -> Optional[QuizParameters]:
+        """
+        Load the quiz parameters from the nearest quiz_params.json, from the file's folder up to the watched folder.
+
+        Args:
+            file_path: Path of the input file
+
+        Returns:
+            QuizParameters (quiz name defaults to the file name), or None if no configuration applies
+        """
+        folder = file_path.parent
+        while True:
+            config_path = folder / CONFIG_FILENAME
+            if config_path.exists():
+                with open(config_path, 'r', encoding='utf-8') as config_file:
+                    config = json.load(config_file)
+                return QuizParameters(**{"quiz_name": file_path.stem, **config})
+            if folder == self.folder or folder == folder.parent:
+                return None
+            folder = folder.parent
+
+    def _ready_files(self, now: float) -> List[Tuple[Path, Tuple[int, int]]]:
+        """Files whose signature changed since the manifest entry and has been stable for the settle time."""
+        busy = {path for path, _, _ in self._in_flight.values()}
+        ready = []
+        seen = set()
+        for file_path in self.find_exports():
+            seen.add(file_path)
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            entry = self.manifest.get(self._manifest_key(file_path))
+            if file_path in busy or (entry and (entry["size"], entry["mtime_ns"]) == signature):
+                self._pending.pop(file_path, None)
+                continue
+
+            previous = self._pending.get(file_path)
+            if previous is None or previous[0] != signature:
+                # New or still growing: restart the settle timer
+                previous = self._pending[file_path] = (signature, now)
+            if now - previous[1] >= self.settle_time:
+                ready.append((file_path, signature))
+
+        for file_path in list(self._pending):
+            if file_path not in seen:
+                del self._pending[file_path]
+        return ready
+
+    def _collect(self, block: bool = False) -> List[Dict[str, Any]]:
+        """Record finished conversions in the manifest."""
+        finished = []
+        for future in list(self._in_flight):
+            if not block and not future.done():
+                continue
+            file_path, signature, output_path = self._in_flight.pop(future)
+            entry = {
+                "size": signature[0],
+                "mtime_ns": signature[1],
+                "processed_at": datetime.now().isoformat(timespec="seconds")
+            }
+            try:
+                entry["students"] = future.result()
+                entry["status"] = "done"
+                entry["output"] = self._manifest_key(output_path)
+                print(f"Converted {file_path} -> {output_path} ({entry['students']} students)")
+            except Exception as e:
+                # A failed file is retried only once it changes again
+                entry["status"] = "failed"
+                entry["error"] = str(e)
+                print(f"Error: Could not convert {file_path}: {str(e)}")
+            self.manifest[self._manifest_key(file_path)] = entry
+            finished.append({"file": self._manifest_key(file_path), **entry})
+
+        if finished:
+            self._save_manifest()
+        return finished
+
+    def poll_once(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Scan the folder once: record finished conversions and submit files that are ready.
+
+        Args:
+            now: Current time in seconds (defaults to time.monotonic())
+
+        Returns:
+            Manifest entries of the conversions that finished since the previous poll
+        """
+        now = time.monotonic() if now is None else now
+        finished = self._collect()
+
+        for file_path, signature in self._ready_files(now):
+            # Bounded: never queue more files than there are workers
+            if len(self._in_flight) >= self.workers:
+                break
+            try:
+                quiz_params = self.load_parameters(file_path)
+            except (OSError, ValueError) as e:
+                print(f"Error: Invalid {CONFIG_FILENAME} for {file_path}: {str(e)}")
+                quiz_params = None
+            if quiz_params is None:
+                if file_path not in self._unconfigured:
+                    print(f"Warning: No {CONFIG_FILENAME} found for {file_path}. Skipping it.")
+                    self._unconfigured.add(file_path)
+                continue
+
+            self._unconfigured.discard(file_path)
+            self._pending.pop(file_path, None)
+            output_path = output_path_for(file_path)
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            future = self._executor.submit(convert_export, str(file_path), quiz_params, str(output_path))
+            self._in_flight[future] = (file_path, signature, output_path)
+            print(f"Processing {file_path}...")
+
+        return finished
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """
+        Wait for the conversions in progress.
+
+        Returns:
+            Manifest entries of the conversions that finished
+        """
+        return self._collect(block=True)
+
+    def close(self):
+        """Finish the conversions in progress and stop the worker pool."""
+        try:
+            self.drain()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def run_once(self):
+        """Process the exports currently in the folder once, waiting out the settle time, then stop."""
+        try:
+            self.poll_once()
+            if self._pending:
+                time.sleep(self.settle_time)
+            # Keep scanning until every ready file was submitted; the pool is bounded
+            while self.poll_once() or self._in_flight:
+                time.sleep(min(self.poll_interval, 0.1))
+        finally:
+            self.close()
+
+    def run(self, max_polls: Optional[int] = None):
+        """
+        Watch the folder until interrupted.
+
+        Args:
+            max_polls: Stop after this many scans (runs forever when None)
+        """
+        print(f"Watching {self.folder} for new exports (Ctrl+C to stop)...")
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                self.poll_once()
+                polls += 1
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            print("\nStopping watcher; waiting for conversions in progress...")
+        finally:
+            self.close()
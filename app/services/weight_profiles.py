@@ -0,0 +1,315 @@
+"""
+Question-weight profiles.
+
+A profile holds one weight per question as a dense vector ordered by question
+number. Profiles are loaded in bulk from a CSV or JSON file or derived from the
+max-points row of an export, validated against the questions found in the data
+all at once, and saved by name so they can be reused.
+"""
+import csv
+import json
+import math
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.models.quiz_data import QuizParameters, StudentResponse
+    from app.services.score_matrix import ScoreMatrix
+
+# Student names (case-insensitive) of the export row that holds each question's points
+MAX_POINTS_LABELS = ['max points', 'maximum points', 'points possible', 'max score']
+
+# Folder where named profiles are saved
+DEFAULT_PROFILE_FOLDER = ".weight_profiles"
+
+
+def _format_questions(question_numbers: List[int]) -> str:
+    return ", ".join(str(q_num) for q_num in question_numbers)
+
+
+class WeightProfile:
+    """Named set of question weights, stored as a dense vector ordered by question number."""
+
+    def __init__(self, name: str, question_numbers: List[int], weights: List[float]):
+        """
+        Create a profile.
+
+        Args:
+            name: Name of the profile
+            question_numbers: Question numbers, one per weight
+            weights: Weight of each question
+        """
+        if len(question_numbers) != len(weights):
+            raise ValueError("Each question needs exactly one weight.")
+        if len(set(question_numbers)) != len(question_numbers):
+            raise ValueError("The weight profile lists a question more than once.")
+        order = sorted(range(len(question_numbers)), key=lambda index: question_numbers[index])
+        self.name = name
+        self.question_numbers = [int(question_numbers[index]) for index in order]
+        self.weights = [float(weights[index]) for index in order]
+
+    @classmethod
+    def from_dict(cls, name: str, weights: Dict[int, float]) -> "WeightProfile":
+        """
+        Create a profile from a question number -> weight mapping.
+
+        Args:
+            name: Name of the profile
+            weights: Weight of each question
+
+        Returns:
+            WeightProfile with the weights
+        """
+        return cls(name, [int(q_num) for q_num in weights], [float(weight) for weight in weights.values()])
+
+    def as_dict(self) -> Dict[int, float]:
+        """Question number -> weight mapping, in question order."""
+        return dict(zip(self.question_numbers, self.weights))
+
+    def problems(self, question_numbers: List[int]) -> List[str]:
+        """
+        List every mismatch between the profile and the questions of the data.
+
+        Args:
+            question_numbers: Question numbers detected in the input
+
+        Returns:
+            Problem descriptions (empty when the profile fits)
+        """
+        detected = set(question_numbers)
+        weighted = set(self.question_numbers)
+        problems = []
+        missing = sorted(detected - weighted)
+        if missing:
+            problems.append(f"missing weights for questions {_format_questions(missing)}")
+        unknown = sorted(weighted - detected)
+        if unknown:
+            problems.append(f"weights for questions not in the data: {_format_questions(unknown)}")
+        invalid = [q_num for q_num, weight in zip(self.question_numbers, self.weights)
+                   if not math.isfinite(weight) or weight <= 0]
+        if invalid:
+            problems.append(f"weights must be positive numbers (questions {_format_questions(invalid)})")
+        return problems
+
+    def vector(self, question_numbers: List[int]) -> List[float]:
+        """
+        Validate the profile against the data and return the weights in the order of its questions.
+
+        Args:
+            question_numbers: Question numbers detected in the input
+
+        Returns:
+            Weight of each question, aligned with question_numbers
+        """
+        problems = self.problems(question_numbers)
+        if problems:
+            raise ValueError(f"Question weights '{self.name}' do not match the quiz: {'; '.join(problems)}.")
+        weights = self.as_dict()
+        return [weights[q_num] for q_num in question_numbers]
+
+    def apply(self, quiz_params: "QuizParameters") -> "QuizParameters":
+        """
+        Use the profile's weights for a set of quiz parameters.
+
+        Args:
+            quiz_params: Quiz parameters to copy
+
+        Returns:
+            Copy of the parameters in weighted mode with the profile's weights
+        """
+        return quiz_params.model_copy(update={"use_weighted_questions": True, "question_weights": self.as_dict()})
+
+    def to_json(self) -> Dict:
+        """JSON-serializable form of the profile, as read back by load_weight_profile."""
+        return {"name": self.name, "weights": {str(q_num): weight for q_num, weight in self.as_dict().items()}}
+
+
+def _parse_weights(raw: Dict, source: str) -> Dict[int, float]:
+    """Convert raw question -> weight pairs, reporting every unreadable entry at once."""
+    weights = {}
+    errors = []
+    for question, weight in raw.items():
+        try:
+            q_num = int(str(question).strip().lstrip('Qq'))
+            weights[q_num] = float(weight)
+        except (TypeError, ValueError):
+            errors.append(f"{question}: {weight}")
+    if errors:
+        raise ValueError(f"Invalid question weights in {source}: {', '.join(errors)}")
+    if not weights:
+        raise ValueError(f"No question weights found in {source}.")
+    return weights
+
+
+def load_weight_profile(file_path: str, name: Optional[str] = None) -> WeightProfile:
+    """
+    Load a weight profile from a file.
+
+    CSV files have one "question,weight" row per question (a header row is optional).
+    JSON files hold either {"name": ..., "weights": {"1": 2.0, ...}}, a plain
+    {"1": 2.0, ...} mapping, or a list of weights for questions 1, 2, 3, ...
+
+    Args:
+        file_path: Path to the CSV or JSON file
+        name: Profile name (defaults to the name in the file, then the file name)
+
+    Returns:
+        The loaded WeightProfile
+    """
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+
+    if path.suffix.lower() == '.json':
+        with open(path, 'r', encoding='utf-8') as json_file:
+            data = json.load(json_file)
+        if isinstance(data, list):
+            raw = {index + 1: weight for index, weight in enumerate(data)}
+        elif isinstance(data, dict) and isinstance(data.get("weights"), dict):
+            name = name or data.get("name")
+            raw = data["weights"]
+        elif isinstance(data, dict):
+            raw = data
+        else:
+            raise ValueError(f"Unsupported weight profile format in {path}.")
+    elif path.suffix.lower() == '.csv':
+        with open(path, 'r', newline='', encoding='utf-8') as csv_file:
+            rows = [row for row in csv.reader(csv_file) if row and any(cell.strip() for cell in row)]
+        if rows and not rows[0][0].strip().lstrip('Qq').isdigit():
+            rows = rows[1:]  # Header row
+        if any(len(row) < 2 for row in rows):
+            raise ValueError(f"Each row of {path} needs a question number and a weight.")
+        raw = {row[0]: row[1] for row in rows}
+    else:
+        raise ValueError(f"Unsupported weight profile format: {path.suffix}. Please provide a CSV or JSON file.")
+
+    return WeightProfile.from_dict(name or path.stem, _parse_weights(raw, str(path)))
+
+
+def profile_from_max_points_row(
+    student_responses: List["StudentResponse"],
+    name: str = "max points"
+) -> Tuple[WeightProfile, List["StudentResponse"]]:
+    """
+    Derive weights from the export row that lists each question's points.
+
+    Args:
+        student_responses: Parsed input rows, including the max-points row
+        name: Name of the profile
+
+    Returns:
+        Tuple of the profile and the student responses without the max-points row
+    """
+    for index, response in enumerate(student_responses):
+        if response.student_name.strip().lower() in MAX_POINTS_LABELS:
+            profile = WeightProfile.from_dict(name, response.question_scores)
+            return profile, student_responses[:index] + student_responses[index + 1:]
+    raise _no_max_points_row()
+
+
+def profile_from_max_points_matrix(
+    matrix: "ScoreMatrix",
+    name: str = "max points"
+) -> Tuple[WeightProfile, "ScoreMatrix"]:
+    """
+    Derive weights from the max-points row of a score matrix (the matrix path's profile_from_max_points_row).
+
+    Args:
+        matrix: Score matrix of the input, including the max-points row
+        name: Name of the profile
+
+    Returns:
+        Tuple of the profile and the score matrix without the max-points row
+    """
+    import numpy as np
+
+    labels = matrix.identity["Student Name"].astype(str).str.strip().str.lower()
+    matches = np.flatnonzero(labels.isin(MAX_POINTS_LABELS).to_numpy())
+    if not len(matches):
+        raise _no_max_points_row()
+
+    students = np.ones(matrix.num_students, dtype=bool)
+    students[matches[0]] = False
+    return WeightProfile(name, matrix.question_numbers, matrix.scores[matches[0]].tolist()), matrix.take(students)
+
+
+def _no_max_points_row() -> ValueError:
+    return ValueError(f"No max-points row found. Expected a row whose Student Name is one of: "
+                      f"{', '.join(label.title() for label in MAX_POINTS_LABELS)}.")
+
+
+def validate_question_weights(quiz_params: "QuizParameters", question_numbers: List[int]) -> None:
+    """
+    Check the weights of weighted parameters against the questions of the data, in bulk.
+
+    Every missing, unknown or non-positive weight is reported in one ValueError.
+
+    Args:
+        quiz_params: Quiz parameters in weighted mode
+        question_numbers: Question numbers detected in the input
+    """
+    problems = WeightProfile.from_dict(quiz_params.quiz_name, quiz_params.question_weights).problems(question_numbers)
+    if problems:
+        raise ValueError(f"Question weights '{quiz_params.quiz_name}' do not match the quiz: {'; '.join(problems)}.")
+
+
+class ProfileStore:
+    """Named weight profiles saved as JSON files in a folder, cached in memory once read."""
+
+    def __init__(self, folder: str = DEFAULT_PROFILE_FOLDER):
+        """
+        Create a store.
+
+        Args:
+            folder: Folder holding one <name>.json file per profile
+        """
+        self.folder = Path(folder)
+        self._cache: Dict[str, WeightProfile] = {}
+
+    def _path(self, name: str) -> Path:
+        safe_name = "".join(char if char.isalnum() or char in "-_ " else "_" for char in name).strip()
+        if not safe_name:
+            raise ValueError("Profile name cannot be empty.")
+        return self.folder / f"{safe_name}.json"
+
+    def names(self) -> List[str]:
+        """Names of the saved profiles."""
+        if not self.folder.is_dir():
+            return sorted(self._cache)
+        return sorted(set(self._cache) | {path.stem for path in self.folder.glob("*.json")})
+
+    def save(self, profile: WeightProfile) -> Path:
+        """
+        Save a profile under its name, replacing an earlier profile of the same name.
+
+        Args:
+            profile: Profile to save
+
+        Returns:
+            Path of the saved file
+        """
+        path = self._path(profile.name)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as json_file:
+            json.dump(profile.to_json(), json_file, indent=2)
+        self._cache[profile.name] = profile
+        return path
+
+    def get(self, name: str) -> WeightProfile:
+        """
+        Fetch a saved profile by name.
+
+        Args:
+            name: Name of the profile
+
+        Returns:
+            The profile
+        """
+        profile = self._cache.get(name)
+        if profile is None:
+            path = self._path(name)
+            if not path.exists():
+                raise ValueError(f"No saved weight profile named '{name}'.")
+            profile = load_weight_profile(str(path), name)
+            self._cache[name] = profile
+        return profile
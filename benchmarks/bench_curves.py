@@ -0,0 +1,34 @@
+"""
+Benchmark: conversion time of each curve on one in-memory cohort.
+
+Run with: python -m benchmarks.bench_curves [--students N] [--questions N]
+"""
+import argparse
+import time
+
+from app.models.quiz_data import QuizParameters
+from app.services.quiz_service import convert_score_matrix
+from app.services.score_matrix import ScoreMatrix
+from benchmarks.synthetic import make_quiz_frame
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=1000000, help="Number of students")
+    parser.add_argument("--questions", type=int, default=30, help="Number of questions")
+    args = parser.parse_args()
+
+    matrix = ScoreMatrix.from_dataframe(make_quiz_frame(args.students, args.questions))
+    print(f"{args.students} students, {args.questions} questions")
+    for curve in ['linear', 'sqrt', 'add_to_top', 'zscore', 'percentile']:
+        quiz_params = QuizParameters(quiz_name="Bench", original_max_score=10.0 * args.questions, new_max_score=100.0,
+                                     original_question_value=10.0, curve=curve, curve_target_mean=70.0,
+                                     curve_target_sd=10.0)
+        start = time.perf_counter()
+        _, new_scores = convert_score_matrix(matrix, quiz_params)
+        elapsed = time.perf_counter() - start
+        print(f"{curve:<11} {elapsed:7.3f} s  mean {new_scores.mean():6.2f}")
+
+
+if __name__ == "__main__":
+    main()
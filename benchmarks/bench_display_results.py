@@ -0,0 +1,96 @@
+"""
+Benchmark: per-line printing of the console results vs the buffered, paged renderer.
+
+Run with: python -m benchmarks.bench_display_results [--students N] [--questions N]
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from app.models.quiz_data import QuizParameters
+from app.services.result_renderer import DEFAULT_PAGE_SIZE, render_results
+
+
+def print_per_line(quiz_params, output_data, question_numbers):
+    """The previous display_results table output: one print call per line."""
+    print("\nSTUDENT INFORMATION AND TOTAL SCORES:")
+    print("-"*80)
+    print(f"{'Team':<10} {'Student Name':<20} {'First Name':<15} {'Last Name':<15} {'Student ID':<10} {'Original':<10} {'Converted':<10}")
+    print("-"*80)
+    for student in output_data:
+        print(f"{student['Team']:<10} {student['Student Name']:<20} {student['First Name']:<15} {student['Last Name']:<15} {student['Student ID']:<10} {student['Original Score']:<10} {student['Converted Score']:<10}")
+
+    print("\nQUESTION RESPONSES AND SCORES:")
+    print("-"*80)
+    header = "Student Name"
+    for q_num in question_numbers:
+        header += f" | Q{q_num} Resp | Q{q_num} Orig | Q{q_num} Conv"
+    print(header)
+    print("-"*80)
+    for student in output_data:
+        row = f"{student['Student Name']:<12}"
+        for q_num in question_numbers:
+            response = student.get(f"Q{q_num} Response", "")
+            orig_score = student.get(f"Q{q_num} Original Score", "")
+            conv_score = student.get(f"Q{q_num} Converted Score", "")
+            row += f" | {response:<8} | {orig_score:<9} | {conv_score:<9}"
+        print(row)
+
+
+def make_output_data(num_students: int, num_questions: int) -> list:
+    output_data = []
+    for i in range(num_students):
+        student = {
+            "Team": f"Team {i % 25}", "Student Name": f"Student {i}", "First Name": f"First {i}",
+            "Last Name": f"Last {i}", "Student ID": str(100000 + i), "Original Score": float(i % 50),
+            "Converted Score": round((i % 50) / 5, 2)
+        }
+        for q_num in range(1, num_questions + 1):
+            student[f"Q{q_num} Response"] = "ABCD"[(i + q_num) % 4]
+            student[f"Q{q_num} Original Score"] = float((i + q_num) % 2 * 10)
+            student[f"Q{q_num} Converted Score"] = float((i + q_num) % 2)
+        output_data.append(student)
+    return output_data
+
+
+def _time(function, stream) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(stream):
+        function()
+        stream.flush()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=20000, help="Number of students")
+    parser.add_argument("--questions", type=int, default=30, help="Number of questions")
+    args = parser.parse_args()
+
+    quiz_params = QuizParameters(quiz_name="bench", original_max_score=args.questions * 10.0,
+                                 new_max_score=args.questions * 1.0, original_question_value=10.0)
+    question_numbers = list(range(1, args.questions + 1))
+    output_data = make_output_data(args.students, args.questions)
+
+    # The full buffered output must match the per-line output exactly
+    legacy, buffered = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(legacy):
+        print_per_line(quiz_params, output_data, question_numbers)
+    rendered = render_results(quiz_params, output_data, question_numbers, max_rows=None)
+    assert rendered.endswith(legacy.getvalue()), "buffered output differs from the per-line output"
+
+    with open(os.devnull, 'w') as devnull:
+        per_line = _time(lambda: print_per_line(quiz_params, output_data, question_numbers), devnull)
+        full = _time(lambda: devnull.write(render_results(quiz_params, output_data, question_numbers, None)), devnull)
+        paged = _time(lambda: devnull.write(render_results(quiz_params, output_data, question_numbers)), devnull)
+
+    print(f"{args.students} students, {args.questions} questions")
+    print(f"per-line print        {per_line:7.3f} s")
+    print(f"buffered, all rows    {full:7.3f} s  ({per_line / full:4.1f}x)")
+    print(f"buffered, first {DEFAULT_PAGE_SIZE:<5} {paged:7.3f} s  ({per_line / paged:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark: floating-point vs fixed-point conversion, and how often the rounded output columns disagree with the totals.
+
+Run with: python -m benchmarks.bench_fixed_point [--students N] [--questions N] [--scale UNITS]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.models.quiz_data import QuizParameters
+from app.services.fixed_point import to_units, verify_units
+from app.services.quiz_service import convert_score_matrix
+from app.services.score_matrix import ScoreMatrix
+from benchmarks.synthetic import make_quiz_frame
+
+
+def _convert(matrix: ScoreMatrix, quiz_params: QuizParameters):
+    start = time.perf_counter()
+    question_new_scores, new_scores = convert_score_matrix(matrix, quiz_params)
+    return time.perf_counter() - start, question_new_scores, new_scores
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=200000, help="Number of students")
+    parser.add_argument("--questions", type=int, default=30, help="Number of questions")
+    parser.add_argument("--scale", type=int, default=100, help="Fixed-point units per point")
+    args = parser.parse_args()
+
+    # Weights of 1..7 make every conversion factor a repeating fraction
+    weights = {q_num: float(q_num % 7 + 1) for q_num in range(1, args.questions + 1)}
+    base = QuizParameters(quiz_name="Bench", original_max_score=10.0 * args.questions, new_max_score=7.0,
+                          original_question_value=10.0, use_weighted_questions=True, question_weights=weights)
+    matrix = ScoreMatrix.from_dataframe(make_quiz_frame(args.students, args.questions))
+
+    print(f"{args.students} students, {args.questions} weighted questions, 2-decimal output columns")
+    for label, quiz_params in [("float", base), (f"fixed 1/{args.scale}", base.model_copy(
+            update={"fixed_point_scale": args.scale}))]:
+        elapsed, question_new_scores, new_scores = _convert(matrix, quiz_params)
+        # What a reader of the output sees: the 2-decimal columns, added up in cents
+        shown = verify_units(to_units(np.round(question_new_scores, 2), 100), to_units(np.round(new_scores, 2), 100))
+        print(f"{label:<14} {elapsed:7.3f} s  {np.count_nonzero(~shown):>8} rows whose shown scores do not add up")
+
+
+if __name__ == "__main__":
+    main()
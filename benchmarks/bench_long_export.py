@@ -0,0 +1,46 @@
+"""
+Benchmark: writing the wide output table versus the long one for a very wide quiz.
+
+Run with: python -m benchmarks.bench_long_export [--students N] [--questions N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.models.quiz_data import QuizParameters
+from app.services.pipeline import ConvertedBatch, export_converted, export_long
+from app.services.quiz_service import convert_score_matrix
+from app.services.score_matrix import ScoreMatrix
+from benchmarks.synthetic import make_quiz_frame
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=5000, help="Number of students")
+    parser.add_argument("--questions", type=int, default=400, help="Number of questions")
+    args = parser.parse_args()
+
+    matrix = ScoreMatrix.from_dataframe(make_quiz_frame(args.students, args.questions))
+    quiz_params = QuizParameters(quiz_name="Bench", original_max_score=10.0 * args.questions, new_max_score=100.0,
+                                 original_question_value=10.0)
+    batch = ConvertedBatch(matrix, *convert_score_matrix(matrix, quiz_params))
+    print(f"{args.students} students, {args.questions} questions")
+
+    with tempfile.TemporaryDirectory() as folder:
+        wide_path = os.path.join(folder, "wide.csv")
+        start = time.perf_counter()
+        export_converted(batch, wide_path)
+        wide_elapsed = time.perf_counter() - start
+        print(f"wide  {wide_elapsed:7.3f} s  {3 * args.questions + 7} columns  "
+              f"{os.path.getsize(wide_path) / 2 ** 20:7.1f} MB")
+
+        long_path = os.path.join(folder, "long.csv")
+        start = time.perf_counter()
+        rows = export_long([batch], long_path)
+        long_elapsed = time.perf_counter() - start
+        print(f"long  {long_elapsed:7.3f} s  {rows} rows  {os.path.getsize(long_path) / 2 ** 20:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
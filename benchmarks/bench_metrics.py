@@ -0,0 +1,41 @@
+"""
+Benchmark: cost of recording a stage timing and a counter increment, alone and from several threads.
+
+Run with: python -m benchmarks.bench_metrics [--observations N] [--threads N]
+"""
+import argparse
+import threading
+import time
+
+from app.services.metrics import MetricsRegistry
+
+
+def _record(registry: MetricsRegistry, observations: int) -> None:
+    for _ in range(observations):
+        with registry.time_stage("convert"):
+            pass
+        registry.rows_processed.inc()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--observations", type=int, default=200000, help="Observations per thread")
+    parser.add_argument("--threads", type=int, default=8, help="Threads recording at once")
+    args = parser.parse_args()
+
+    for num_threads in (1, args.threads):
+        registry = MetricsRegistry()
+        threads = [threading.Thread(target=_record, args=(registry, args.observations)) for _ in range(num_threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        total = num_threads * args.observations
+        assert registry.stage_seconds.count("convert") == total
+        print(f"{num_threads:>2} threads  {elapsed / total * 1e6:6.2f} µs per timed stage + counter increment")
+
+
+if __name__ == "__main__":
+    main()
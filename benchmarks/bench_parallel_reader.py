@@ -0,0 +1,47 @@
+"""
+Benchmark: scaling of the sharded CSV reader from 1 to N worker processes.
+
+Run with: python -m benchmarks.bench_parallel_reader [--students N] [--max-workers N]
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.models.quiz_data import QuizParameters
+from app.services.parallel_reader import parallel_convert_csv
+from benchmarks.synthetic import write_quiz_csv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=200000, help="Number of synthetic students")
+    parser.add_argument("--questions", type=int, default=20, help="Number of questions")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Largest worker count measured")
+    args = parser.parse_args()
+
+    quiz_params = QuizParameters(
+        quiz_name="bench",
+        original_max_score=args.questions * 10.0,
+        new_max_score=20.0,
+        original_question_value=10.0
+    )
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_quiz_csv(str(Path(folder) / "bench.csv"), args.students, args.questions)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"{args.students} students, {args.questions} questions, {size_mb:.1f} MB")
+
+        baseline = None
+        workers = 1
+        while workers <= args.max_workers:
+            start = time.perf_counter()
+            parallel_convert_csv(path, quiz_params, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"workers={workers:<3} {elapsed:7.2f} s  speedup {baseline / elapsed:4.2f}x")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: full read with type inference vs column projection with explicit dtypes, on a wide LMS-shaped export.
+
+Run with: python -m benchmarks.bench_projected_read [--students N] [--questions N] [--extra-columns N] [--excel]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.header_schema import read_header
+from benchmarks.synthetic import make_quiz_frame
+
+
+def make_wide_frame(num_students: int, num_questions: int, extra_columns: int) -> pd.DataFrame:
+    """Quiz export with attempt metadata columns interleaved with the question columns, as LMS exports have."""
+    rng = np.random.default_rng(1)
+    frame = make_quiz_frame(num_students, num_questions)
+    frame["Student ID"] = "00" + frame["Student ID"]
+    extra = {}
+    for i in range(extra_columns):
+        kind = i % 4
+        if kind == 0:
+            extra[f"Attempt {i} Started"] = pd.Timestamp("2024-03-01") + pd.to_timedelta(
+                rng.integers(0, 86400 * 30, num_students), unit="s")
+        elif kind == 1:
+            extra[f"Attempt {i} IP"] = [f"10.{a}.{b}.{c}" for a, b, c in rng.integers(0, 255, (num_students, 3))]
+        elif kind == 2:
+            extra[f"Attempt {i} Duration"] = rng.normal(900, 200, num_students).round(1)
+        else:
+            extra[f"Attempt {i} Agent"] = rng.choice(["Mozilla/5.0 (Windows NT 10.0)", "Mozilla/5.0 (Macintosh)"],
+                                                     num_students)
+    return pd.concat([frame, pd.DataFrame(extra)], axis=1)
+
+
+def _measure(read):
+    start = time.perf_counter()
+    df = read()
+    elapsed = time.perf_counter() - start
+    return elapsed, df.memory_usage(deep=True).sum() / 1024 ** 2, df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=100000, help="Number of students")
+    parser.add_argument("--questions", type=int, default=30, help="Number of questions")
+    parser.add_argument("--extra-columns", type=int, default=60, help="Unused metadata columns")
+    parser.add_argument("--excel", action="store_true", help="Benchmark an .xlsx file instead of a CSV file")
+    args = parser.parse_args()
+
+    frame = make_wide_frame(args.students, args.questions, args.extra_columns)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "export.xlsx" if args.excel else "export.csv")
+        if args.excel:
+            frame.to_excel(path, index=False)
+            reader, options = pd.read_excel, {"sheet_name": 0}
+        else:
+            frame.to_csv(path, index=False)
+            reader, options = pd.read_csv, {}
+        size = os.path.getsize(path) / 1024 ** 2
+
+        full_time, full_memory, full = _measure(lambda: reader(path, **options))
+        schema = read_header(path, fallback_to_first_sheet=True)
+        projected_time, projected_memory, projected = _measure(
+            lambda: schema.read_frame(reader, path, sheet_name=schema.sheet_name) if args.excel
+            else schema.read_frame(reader, path))
+
+    assert projected["Student ID"].iloc[0].startswith("00"), "leading zeros of the student IDs were lost"
+    print(f"{args.students} students, {args.questions} questions, {args.extra_columns} unused columns "
+          f"({size:.1f} MB {'xlsx' if args.excel else 'csv'})")
+    print(f"full read, inferred types   {full_time:7.2f} s  {full_memory:8.1f} MB  {full.shape[1]} columns")
+    print(f"projected, explicit dtypes  {projected_time:7.2f} s  {projected_memory:8.1f} MB  "
+          f"{projected.shape[1]} columns  ({full_time / projected_time:.1f}x faster, "
+          f"{full_memory / projected_memory:.1f}x less memory)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: every installed reader engine of each format on the same quiz export.
+
+Run with: python -m benchmarks.bench_reader_engines [--students N] [--questions N]
+"""
+import argparse
+import bz2
+import gzip
+import os
+import shutil
+import tempfile
+import time
+
+from app.services.readers import ENGINES, TableSource, choose_sheet
+from benchmarks.synthetic import make_quiz_frame
+
+
+def write_inputs(folder: str, num_students: int, num_questions: int) -> dict:
+    """Write the same export as CSV, gzip and bzip2 CSV, xlsx and (when a writer is installed) Parquet."""
+    frame = make_quiz_frame(num_students, num_questions)
+    paths = {'csv': os.path.join(folder, "export.csv")}
+    frame.to_csv(paths['csv'], index=False)
+    paths['gzip'] = paths['csv'] + ".gz"
+    with open(paths['csv'], 'rb') as source, gzip.open(paths['gzip'], 'wb') as target:
+        shutil.copyfileobj(source, target)
+    paths['bz2'] = paths['csv'] + ".bz2"
+    with open(paths['csv'], 'rb') as source, bz2.open(paths['bz2'], 'wb') as target:
+        shutil.copyfileobj(source, target)
+    paths['xlsx'] = os.path.join(folder, "export.xlsx")
+    frame.to_excel(paths['xlsx'], index=False, sheet_name="Team Analysis")
+    try:
+        paths['parquet'] = os.path.join(folder, "export.parquet")
+        frame.to_parquet(paths['parquet'], index=False)
+    except ImportError:
+        del paths['parquet']
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=20000, help="Number of students")
+    parser.add_argument("--questions", type=int, default=30, help="Number of questions")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_inputs(folder, args.students, args.questions)
+        print(f"{args.students} students, {args.questions} questions")
+        print(f"{'format':<9} {'engine':<12} {'size MB':>8} {'read s':>8}")
+        inputs = [(file_format, file_format, None) for file_format in ENGINES]
+        inputs[1:1] = [('gzip', 'csv', 'gzip'), ('bz2', 'csv', 'bz2')]
+        for label, file_format, compression in inputs:
+            path = paths.get(label)
+            for engine in ENGINES[file_format]:
+                if path is None or not engine.available:
+                    reason = "no writer installed" if path is None else f"{engine.module} not installed"
+                    print(f"{label:<9} {engine.name:<12} {'':>8} {'-':>8}  ({reason})")
+                    continue
+                sheet_name = choose_sheet(engine.sheet_names(path)) if file_format in ('xlsx', 'xls') else None
+                source = TableSource(path, file_format, engine, sheet_name, compression)
+                start = time.perf_counter()
+                df = source.read()
+                elapsed = time.perf_counter() - start
+                assert len(df) == args.students, f"{engine.name} read {len(df)} rows"
+                print(f"{label:<9} {engine.name:<12} {os.path.getsize(path) / 1024 ** 2:8.1f} {elapsed:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: bulk storage of converted results and indexed per-student / per-team lookups.
+
+Run with: python -m benchmarks.bench_results_db [--quizzes N] [--students N] [--questions N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.models.quiz_data import QuizParameters
+from app.services.results_db import ResultsDatabase
+from benchmarks.bench_display_results import make_output_data
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quizzes", type=int, default=10, help="Number of stored quizzes")
+    parser.add_argument("--students", type=int, default=100000, help="Students per quiz")
+    parser.add_argument("--questions", type=int, default=10, help="Number of questions")
+    parser.add_argument("--lookups", type=int, default=200, help="Number of timed lookups")
+    args = parser.parse_args()
+
+    question_numbers = list(range(1, args.questions + 1))
+    output_data = make_output_data(args.students, args.questions)
+
+    with tempfile.TemporaryDirectory() as folder:
+        results_db = ResultsDatabase(os.path.join(folder, "results.db"))
+
+        start = time.perf_counter()
+        for quiz in range(1, args.quizzes + 1):
+            quiz_params = QuizParameters(quiz_name=f"Quiz {quiz}", original_max_score=args.questions * 10.0,
+                                         new_max_score=args.questions * 1.0, original_question_value=10.0)
+            results_db.store_output_data(quiz_params, output_data, question_numbers)
+        store = time.perf_counter() - start
+        rows = args.quizzes * args.students
+
+        quiz_range = [f"Quiz {quiz}" for quiz in range(3, min(args.quizzes, 7) + 1)]
+        start = time.perf_counter()
+        for i in range(args.lookups):
+            results_db.student_results(str(100000 + (i * 7919) % args.students), quiz_range)
+        student = (time.perf_counter() - start) / args.lookups
+
+        start = time.perf_counter()
+        for i in range(args.lookups):
+            results_db.team_results(f"Team {i % 25}", ["Quiz 1"])
+        team = (time.perf_counter() - start) / args.lookups
+
+    print(f"{rows} stored rows ({args.quizzes} quizzes x {args.students} students, {args.questions} questions)")
+    print(f"store                 {store:7.2f} s  ({rows / store:,.0f} rows/s)")
+    print(f"student lookup        {student * 1000:7.2f} ms  (quizzes {quiz_range[0]}..{quiz_range[-1]})")
+    print(f"team lookup, one quiz {team * 1000:7.2f} ms  ({args.students // 25} students)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: comparing two results files of the same quiz after a regrade.
+
+Run with: python -m benchmarks.bench_run_diff [--students N] [--questions N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.models.quiz_data import QuizParameters
+from app.services.answer_key import regrade_matrix
+from app.services.pipeline import ConvertedBatch, export_converted
+from app.services.quiz_service import convert_score_matrix
+from app.services.run_diff import diff_runs, load_converted
+from app.services.score_matrix import ScoreMatrix
+from benchmarks.synthetic import make_quiz_frame
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=100000, help="Number of students")
+    parser.add_argument("--questions", type=int, default=30, help="Number of questions")
+    args = parser.parse_args()
+
+    matrix = ScoreMatrix.from_dataframe(make_quiz_frame(args.students, args.questions))
+    quiz_params = QuizParameters(quiz_name="Bench", original_max_score=10.0 * args.questions, new_max_score=100.0,
+                                 original_question_value=10.0)
+    # The second run regrades the first question from the (random) responses
+    regraded_params = quiz_params.model_copy(update={"answer_key": {1: {"A": 1.0}}})
+    regraded = regrade_matrix(matrix, regraded_params)
+    print(f"{args.students} students, {args.questions} questions")
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = []
+        for name, run_matrix in [("before", matrix), ("after", regraded)]:
+            path = os.path.join(folder, f"{name}.csv")
+            export_converted(ConvertedBatch(run_matrix, *convert_score_matrix(run_matrix, quiz_params)), path)
+            paths.append(path)
+
+        start = time.perf_counter()
+        before, after = load_converted(paths[0]), load_converted(paths[1])
+        loaded = time.perf_counter()
+        run_diff = diff_runs(before, after)
+        done = time.perf_counter()
+
+    print(f"load  {loaded - start:7.3f} s")
+    print(f"diff  {done - loaded:7.3f} s  {len(run_diff.changed_students)} students, "
+          f"{len(run_diff.changed)} cells changed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: handing a converted score matrix to another process by pickling vs shared memory.
+
+Run with: python -m benchmarks.bench_shared_handoff [--students N] [--questions N]
+"""
+import argparse
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.services.shared_buffers import SharedSegmentRun, attach_arrays, share_arrays
+
+FIELDS = ('scores', 'codes', 'question_new_scores')
+
+
+def _make_arrays(num_students: int, num_questions: int) -> dict:
+    rng = np.random.default_rng(0)
+    return {
+        'scores': rng.choice([0.0, 10.0], size=(num_students, num_questions)),
+        'codes': rng.integers(0, 4, size=(num_students, num_questions), dtype=np.int8),
+        'question_new_scores': rng.uniform(0, 1, size=(num_students, num_questions))
+    }
+
+
+def _pickled_task(num_students: int, num_questions: int) -> dict:
+    return _make_arrays(num_students, num_questions)
+
+
+def _shared_task(num_students: int, num_questions: int, names: dict) -> dict:
+    return share_arrays(_make_arrays(num_students, num_questions), names)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=500000, help="Number of students")
+    parser.add_argument("--questions", type=int, default=100, help="Number of questions")
+    args = parser.parse_args()
+
+    # The pool is created inside the run so the workers share the parent's resource tracker
+    with SharedSegmentRun(FIELDS) as run, ProcessPoolExecutor(max_workers=1) as executor:
+        # Warm up the worker so process start-up is not measured
+        executor.submit(_make_arrays, 1, 1).result()
+
+        start = time.perf_counter()
+        arrays = executor.submit(_pickled_task, args.students, args.questions).result()
+        pickled_time = time.perf_counter() - start
+        size_mb = len(pickle.dumps(arrays, protocol=pickle.HIGHEST_PROTOCOL)) / 1024 / 1024
+        del arrays
+
+        start = time.perf_counter()
+        descriptors = executor.submit(_shared_task, args.students, args.questions, run.names(0)).result()
+        with attach_arrays(descriptors) as views:
+            total = float(views['question_new_scores'].sum())
+        shared_time = time.perf_counter() - start
+
+    print(f"{args.students} students × {args.questions} questions, {size_mb:.1f} MB of arrays")
+    print(f"pickled hand-off {pickled_time:6.2f} s")
+    print(f"shared hand-off  {shared_time:6.2f} s (checksum {total:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Synthetic quiz exports for the benchmarks.
+"""
+import numpy as np
+import pandas as pd
+
+
+def make_quiz_frame(num_students: int, num_questions: int = 20, question_value: float = 10.0,
+                    seed: int = 0) -> pd.DataFrame:
+    """
+    Build a quiz export with the same columns as the real files.
+
+    Args:
+        num_students: Number of student rows
+        num_questions: Number of questions
+        question_value: Value of each question on the original scale
+        seed: Random seed
+
+    Returns:
+        DataFrame shaped like a quiz export
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.arange(num_students)
+    columns = {
+        "Team": np.where(ids % 4 == 0, "", "Team " + (ids % 25).astype(str)),
+        "Student Name": "Student " + ids.astype(str),
+        "First Name": "First " + ids.astype(str),
+        "Last Name": "Last " + ids.astype(str),
+        "Student ID": (100000 + ids).astype(str),
+    }
+    scores = rng.choice([0.0, question_value], size=(num_students, num_questions), p=[0.35, 0.65])
+    columns["Score"] = scores.sum(axis=1)
+    choices = np.array(["A", "B", "C", "D"])
+    for j in range(num_questions):
+        columns[f"{j + 1}_Response"] = choices[rng.integers(0, len(choices), num_students)]
+        columns[f"{j + 1}_Score"] = scores[:, j]
+    return pd.DataFrame(columns)
+
+
+def write_quiz_csv(path: str, num_students: int, num_questions: int = 20, question_value: float = 10.0) -> str:
+    """
+    Write a synthetic quiz export to a CSV file.
+
+    Args:
+        path: Output path
+        num_students: Number of student rows
+        num_questions: Number of questions
+        question_value: Value of each question on the original scale
+
+    Returns:
+        The output path
+    """
+    make_quiz_frame(num_students, num_questions, question_value).to_csv(path, index=False)
+    return path
@@ -1,84 +1,651 @@
+import argparse
+import json
 import sys
-from typing import List, Dict, Any
+from pathlib import Path
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 
-from app.models.quiz_data import QuizParameters, StudentResponse, ProcessedResponse
-from app.services.quiz_service import convert_scores, generate_output_data
-from app.services.file_handler import FileHandler
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from app.services.session_cache import SessionState
+
+# Heavy dependencies (pandas, pydantic, FastAPI) are imported inside the functions that
+# need them, so `--help`, argument validation and the welcome banner start instantly.
 from app.services.user_interface import UserInterface
 
 
 def main():
     """Main function for the console application."""
+    # Parsed input files and the last parameters are kept between iterations, so reprocessing a file
+    # with new parameters skips the read and the prompts can be accepted as they are
+    session = None
+
     try:
-        # Display welcome message
-        UserInterface.display_welcome()
-
-        # Get quiz parameters from user
-        try:
-            quiz_params = UserInterface.get_quiz_parameters()
-        except ValueError as e:
-            UserInterface.display_error(str(e))
-            if UserInterface.ask_try_again():
-                return main()  # Restart the application
-            else:
-                print("\nExiting application.")
-                return
+        while True:
+            # Display welcome message
+            UserInterface.display_welcome()
+
+            if session is None:
+                from app.services.session_cache import SessionState
+                session = SessionState()
+
+            if not run_session_iteration(session):
+                break
+
+    except KeyboardInterrupt:
+        print("\n\nProcess interrupted by user. Exiting application.")
+    except Exception as e:
+        print(f"\nUnexpected error: {str(e)}")
+        print("Exiting application.")
+
+
+def run_session_iteration(session: "SessionState") -> bool:
+    """
+    Run one pass of the console application: parameters, file, conversion, results and export.
+
+    Args:
+        session: State shared by the iterations of the session (parsed files, previous parameters and file)
+
+    Returns:
+        True to start another iteration, False to exit
+    """
+    from app.services.answer_key import regrade_matrix
+    from app.services.quiz_service import convert_score_matrix, generate_output_frame
+    from app.services.file_handler import FileHandler
+    from app.services.item_analysis import analyze_items
+    from app.services.summary_stats import SummaryAccumulator
+    from app.services.weight_profiles import profile_from_max_points_matrix, validate_question_weights
+
+    # Get quiz parameters from user; the previous iteration's answers are the defaults
+    try:
+        quiz_params = UserInterface.get_quiz_parameters(session.quiz_params)
+    except ValueError as e:
+        UserInterface.display_error(str(e))
+        if UserInterface.ask_try_again():
+            return True  # Restart the application
+        print("\nExiting application.")
+        return False
+    session.quiz_params = quiz_params
+
+    # Verify calculation
+    if not UserInterface.verify_calculation(quiz_params):
+        return True  # Restart the application
+
+    # Get file path from user
+    file_path = UserInterface.get_file_path(session.file_path)
+    if not file_path:  # Empty string means user wants to quit
+        return False
+    session.file_path = file_path
+
+    try:
+        # Process the file (parsed files are reused while unchanged on disk)
+        print("\nProcessing file...")
+        parsed_input = session.inputs.load(file_path)
+        matrix = parsed_input.matrix
+        question_numbers = matrix.question_numbers
+        sheet_name = parsed_input.sheet_name
+
+        # Weighted mode: take the weights from the max-points row if asked to, and check them all at once
+        if quiz_params.use_weighted_questions:
+            if not quiz_params.question_weights:
+                profile, matrix = profile_from_max_points_matrix(matrix, quiz_params.quiz_name)
+                quiz_params = profile.apply(quiz_params)
+            validate_question_weights(quiz_params, question_numbers)
+
+        # Convert the whole score matrix at once; the parsed file is not touched
+        print("Converting scores...")
+        matrix = regrade_matrix(matrix, quiz_params)
+        question_new_scores, new_scores = convert_score_matrix(matrix, quiz_params)
+
+        # Verify conversion
+        if not UserInterface.verify_conversion(matrix, question_new_scores, new_scores, quiz_params):
+            return True  # Restart the application
+
+        # Generate output data
+        print("Generating results...")
+        output_data = generate_output_frame(matrix, question_new_scores, new_scores,
+                                            quiz_params.fixed_point_scale).to_dict('records')
+
+        # Display results
+        UserInterface.display_results(quiz_params, output_data, question_numbers)
+        UserInterface.offer_full_results(output_data, question_numbers)
+
+        # Display item analysis statistics
+        item_analysis = analyze_items(matrix, quiz_params.original_question_value)
+        UserInterface.display_item_analysis(item_analysis.to_records())
+
+        # Display converted score summary
+        summary = SummaryAccumulator.for_scale(quiz_params.new_max_score)
+        summary.update(new_scores)
+        UserInterface.display_summary_statistics(summary.to_dict())
+
+        # Automatically export the results after processing each file
+        # Get the output folder
+        output_folder = FileHandler.get_output_folder()
+
+        # Export to Excel by default
+        print("\nAutomatically exporting results to Excel...")
+        FileHandler.export_to_excel(quiz_params, output_data, question_numbers, output_folder, sheet_name)
 
-        # Verify calculation
-        if not UserInterface.verify_calculation(quiz_params):
-            return main()  # Restart the application
+        # Ask if user wants to process another file
+        if UserInterface.ask_process_another():
+            return True  # Restart the application
+        UserInterface.display_goodbye()
+        return False
+
+    except Exception as e:
+        UserInterface.display_error(str(e))
+        if UserInterface.ask_try_again():
+            return True  # Restart the application
+        print("\nExiting application.")
+        return False
+
+
+def run_sweep(args: argparse.Namespace) -> int:
+    """
+    Convert one input file under several quiz parameter variants and write a comparison table.
+
+    Args:
+        args: Parsed command line arguments of the sweep command
+
+    Returns:
+        Process exit code
+    """
+    from app.models.quiz_data import QuizParameters
+    from app.services.file_handler import FileHandler
+    from app.services.score_matrix import ScoreMatrix
+    from app.services.sweep_service import sweep_conversions, build_variants, load_variants
+
+    try:
+        if args.variants:
+            variants = load_variants(args.variants)
+        else:
+            if args.original_max is None or args.question_value is None or not args.new_max:
+                raise ValueError("Provide --variants or --original-max, --question-value and --new-max.")
+            base = QuizParameters(
+                quiz_name=args.quiz_name or Path(args.file).stem,
+                original_max_score=args.original_max,
+                new_max_score=args.new_max[0],
+                original_question_value=args.question_value
+            )
+            variants = build_variants(base, args.new_max)
+
+        # Parse the input once and apply every variant in one batched operation
+        print("\nProcessing file...")
+        df, _ = FileHandler.read_dataframe(args.file)
+        matrix = ScoreMatrix.from_dataframe(df)
+        print(f"Sweeping {len(variants)} parameter variants over {matrix.num_students} students...")
+        result = sweep_conversions(matrix, variants)
+
+        table = result.comparison_table()
+        output_path = Path(args.output or f"{Path(args.file).stem}_sweep.csv")
+        if output_path.suffix.lower() in ['.xlsx', '.xls']:
+            table.to_excel(output_path, index=False)
+        else:
+            table.to_csv(output_path, index=False)
+        print(f"\nSweep comparison exported to {output_path}")
+        return 0
+
+    except (ValueError, FileNotFoundError) as e:
+        UserInterface.display_error(str(e))
+        return 1
+
+
+def run_item_analysis(args: argparse.Namespace) -> int:
+    """
+    Print the item analysis report of one input file and optionally save it as JSON.
+
+    Args:
+        args: Parsed command line arguments of the items command
+
+    Returns:
+        Process exit code
+    """
+    from app.services.file_handler import FileHandler
+    from app.services.score_matrix import ScoreMatrix
+    from app.services.item_analysis import analyze_items
+
+    try:
+        print("\nProcessing file...")
+        df, _ = FileHandler.read_dataframe(args.file)
+        matrix = ScoreMatrix.from_dataframe(df)
+        records = analyze_items(matrix, args.question_value).to_records()
+        UserInterface.display_item_analysis(records)
+
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as json_file:
+                json.dump(records, json_file, indent=2)
+            print(f"\nItem analysis exported to {args.json}")
+        return 0
+
+    except (ValueError, FileNotFoundError) as e:
+        UserInterface.display_error(str(e))
+        return 1
 
-        # Get file path from user
-        file_path = UserInterface.get_file_path()
-        if not file_path:  # Empty string means user wants to quit
-            return
 
-        try:
-            # Process the file
-            print("\nProcessing file...")
-            student_responses, question_numbers, sheet_name = FileHandler.process_file(file_path)
+def run_stats(args: argparse.Namespace) -> int:
+    """
+    Stream one or more input files through the conversion and print the score summary.
+
+    Args:
+        args: Parsed command line arguments of the stats command
+
+    Returns:
+        Process exit code
+    """
+    from app.models.quiz_data import QuizParameters
+    from app.services.answer_key import load_answer_key
+    from app.services.pipeline import summarize_files
+
+    try:
+        quiz_params = QuizParameters(
+            quiz_name=args.quiz_name or Path(args.files[0]).stem,
+            original_max_score=args.original_max,
+            new_max_score=args.new_max,
+            original_question_value=args.question_value,
+            curve=args.curve,
+            curve_target_mean=args.target_mean,
+            curve_target_sd=args.target_sd,
+            answer_key=load_answer_key(args.answer_key).answers if args.answer_key else {}
+        )
+        merged, per_file = summarize_files(args.files, quiz_params, args.batch_size, args.bins, args.workers)
 
-            # Convert scores
-            print("Converting scores...")
-            processed_responses = convert_scores(student_responses, quiz_params)
+        if len(args.files) > 1:
+            for file_path, accumulator in zip(args.files, per_file):
+                print(f"\n{file_path}: {accumulator.count} students, mean {accumulator.mean:.2f}")
+        UserInterface.display_summary_statistics(merged.to_dict())
 
-            # Verify conversion
-            if not UserInterface.verify_conversion(processed_responses, quiz_params):
-                return main()  # Restart the application
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as json_file:
+                json.dump(merged.to_dict(), json_file, indent=2)
+            print(f"\nSummary exported to {args.json}")
+        return 0
 
-            # Generate output data
-            print("Generating results...")
-            output_data = generate_output_data(processed_responses, question_numbers)
+    except (ValueError, FileNotFoundError) as e:
+        UserInterface.display_error(str(e))
+        return 1
 
-            # Display results
-            UserInterface.display_results(quiz_params, output_data, question_numbers)
 
-            # Automatically export the results after processing each file
-            # Get the output folder
-            output_folder = FileHandler.get_output_folder()
+def run_convert(args: argparse.Namespace) -> int:
+    """
+    Convert one input file and write the converted scores, splitting large CSV files across workers.
 
-            # Export to Excel by default
-            print("\nAutomatically exporting results to Excel...")
-            FileHandler.export_to_excel(quiz_params, output_data, question_numbers, output_folder, sheet_name)
+    A zip archive of exports is converted export by export, in parallel, into one output file per export.
 
-            # Ask if user wants to process another file
-            if UserInterface.ask_process_another():
-                return main()  # Restart the application
+    Args:
+        args: Parsed command line arguments of the convert command
+
+    Returns:
+        Process exit code
+    """
+    from app.models.quiz_data import QuizParameters
+    from app.services.answer_key import load_answer_key
+    from app.services.header_schema import read_header
+    from app.services.pipeline import (convert_archive, convert_file, convert_with_max_points_row, export_converted,
+                                       export_long)
+    from app.services.readers import archive_members, sniff_format
+    from app.services.weight_profiles import ProfileStore, load_weight_profile, validate_question_weights
+
+    try:
+        quiz_params = QuizParameters(
+            quiz_name=args.quiz_name or Path(args.file).stem,
+            original_max_score=args.original_max,
+            new_max_score=args.new_max,
+            original_question_value=args.question_value,
+            fixed_point_scale=args.fixed_point,
+            curve=args.curve,
+            curve_target_mean=args.target_mean,
+            curve_target_sd=args.target_sd,
+            answer_key=load_answer_key(args.answer_key).answers if args.answer_key else {}
+        )
+        if args.weights:
+            # A weights file, or the name of a saved profile
+            if Path(args.weights).exists():
+                profile = load_weight_profile(args.weights)
             else:
-                UserInterface.display_goodbye()
+                profile = ProfileStore().get(args.weights)
+            quiz_params = profile.apply(quiz_params)
+
+        if args.weights and args.max_points_row:
+            raise ValueError("Use either --weights or --max-points-row, not both.")
+
+        is_archive = sniff_format(args.file) == 'zip'
+        members = archive_members(args.file) if is_archive else [None]
+        if quiz_params.use_weighted_questions:
+            # The weights are checked against the header of every export before anything is converted
+            for member in members:
+                validate_question_weights(quiz_params, read_header(args.file, member=member).question_numbers)
+
+        if args.max_points_row:
+            # Each export's max-points row gives its weights and is not converted as a student
+            converted = [(member, *convert_with_max_points_row(args.file, quiz_params, member=member))
+                         for member in members]
+        elif is_archive:
+            converted = [(member, quiz_params, batch)
+                         for member, batch in convert_archive(args.file, quiz_params, workers=args.workers)]
+        else:
+            converted = [(None, quiz_params, convert_file(args.file, quiz_params, workers=args.workers))]
+
+        output_folder = None
+        if is_archive:
+            # One export per section: each one is written under its own quiz name
+            output_folder = Path(args.output or ".")
+            output_folder.mkdir(parents=True, exist_ok=True)
+            converted = [(member, member_params.model_copy(
+                             update={"quiz_name": f"{quiz_params.quiz_name} - {Path(member).stem}"}), batch)
+                         for member, member_params, batch in converted]
 
-        except Exception as e:
-            UserInterface.display_error(str(e))
-            if UserInterface.ask_try_again():
-                return main()  # Restart the application
+        for _, member_params, batch in converted:
+            if output_folder is not None:
+                output_path = output_folder / f"{member_params.quiz_name}.csv"
             else:
-                print("\nExiting application.")
+                output_path = Path(args.output or f"{member_params.quiz_name}.csv")
+            if args.long:
+                rows = export_long([batch], str(output_path), fixed_point_scale=member_params.fixed_point_scale)
+                print(f"\nConverted {batch.matrix.num_students} students. {rows} long rows exported to {output_path}")
+            else:
+                export_converted(batch, str(output_path), member_params.fixed_point_scale)
+                print(f"\nConverted {batch.matrix.num_students} students. Results exported to {output_path}")
+            if args.db:
+                from app.services.results_db import ResultsDatabase
+
+                stored = ResultsDatabase(args.db).store_batch(member_params, batch)
+                print(f"Stored {stored} results of '{member_params.quiz_name}' in {args.db}")
+        return 0
+
+    except (ValueError, FileNotFoundError) as e:
+        UserInterface.display_error(str(e))
+        return 1
+
+
+def run_diff(args: argparse.Namespace) -> int:
+    """
+    Compare the converted scores of two runs of the same quiz and print what changed.
+
+    Each input is a results file written by `convert`, or a quiz export converted with the given parameters.
+
+    Args:
+        args: Parsed command line arguments of the diff command
+
+    Returns:
+        Process exit code
+    """
+    from app.models.quiz_data import QuizParameters
+    from app.services.answer_key import load_answer_key
+    from app.services.run_diff import diff_runs, format_diff, load_converted
+
+    try:
+        quiz_params = None
+        if args.original_max is not None and args.new_max is not None and args.question_value is not None:
+            quiz_params = QuizParameters(
+                quiz_name=Path(args.before).stem,
+                original_max_score=args.original_max,
+                new_max_score=args.new_max,
+                original_question_value=args.question_value
+            )
+        after_params = quiz_params
+        if args.answer_key and quiz_params is not None:
+            # The key only regrades the second run, so an export can be compared with its regrade
+            after_params = quiz_params.model_copy(update={"answer_key": load_answer_key(args.answer_key).answers})
+
+        diff = diff_runs(load_converted(args.before, quiz_params, args.workers),
+                         load_converted(args.after, after_params, args.workers))
+        print(format_diff(diff, args.limit))
+
+        if args.output:
+            diff.changed.to_csv(args.output, index=False)
+            print(f"\nChanged cells exported to {args.output}")
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as json_file:
+                json.dump(diff.to_dict(), json_file, indent=2)
+            print(f"\nComparison exported to {args.json}")
+        return 0
+
+    except (ValueError, FileNotFoundError) as e:
+        UserInterface.display_error(str(e))
+        return 1
+
+
+def run_query(args: argparse.Namespace) -> int:
+    """
+    Print the stored results of a student or a team.
+
+    Args:
+        args: Parsed command line arguments of the query command
+
+    Returns:
+        Process exit code
+    """
+    from app.services.results_db import ResultsDatabase
+
+    if not Path(args.db).exists():
+        UserInterface.display_error(f"Results database not found: {args.db}")
+        return 1
+    results_db = ResultsDatabase(args.db)
+    if args.student:
+        records = results_db.student_results(args.student, args.quiz)
+    elif args.team:
+        records = results_db.team_results(args.team, args.quiz)
+    else:
+        for quiz in results_db.quizzes():
+            print(f"{quiz['quiz']:<30} {quiz['students']:>8} students  mean {quiz['mean_score']:.2f}  "
+                  f"stored {quiz['stored_at']}")
+        return 0
+
+    if args.json:
+        print(json.dumps(records, indent=2))
+        return 0
+    if not records:
+        print("No stored results found.")
+        return 0
+    print(f"{'Quiz':<30} {'Team':<10} {'Student Name':<20} {'Student ID':<12} {'Original':<10} {'Converted':<10}")
+    print("".join(
+        f"{record['quiz']:<30} {record['team']:<10} {record['student_name']:<20} {record['student_id']:<12} "
+        f"{record['original_score']:<10} {record['converted_score']:<10.2f}\n"
+        for record in records
+    ), end="")
+    return 0
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    """
+    Watch a folder and convert new or modified exports until interrupted.
+
+    Args:
+        args: Parsed command line arguments of the watch command
+
+    Returns:
+        Process exit code
+    """
+    from app.services.watcher import FolderWatcher
+
+    try:
+        watcher = FolderWatcher(args.folder, workers=args.workers, poll_interval=args.interval,
+                                settle_time=args.settle, manifest_path=args.manifest)
+    except ValueError as e:
+        UserInterface.display_error(str(e))
+        return 1
+    if args.once:
+        watcher.run_once()
+    else:
+        watcher.run()
+    return 0
+
+
+def add_curve_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the curve and answer-key options of a conversion command.
+
+    Args:
+        parser: Parser of the command
+    """
+    parser.add_argument("--curve", default="linear", choices=["linear", "sqrt", "add_to_top", "zscore", "percentile"],
+                        help="Curve applied to the converted totals of the cohort")
+    parser.add_argument("--target-mean", type=float, help="Target mean of the zscore curve")
+    parser.add_argument("--target-sd", type=float, help="Target standard deviation of the zscore curve")
+    parser.add_argument("--answer-key", metavar="FILE",
+                        help="CSV/JSON answer key; keyed questions are regraded from the response columns")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command line parser.
+
+    Running without a command starts the interactive console application.
+
+    Returns:
+        Configured argument parser
+    """
+    parser = argparse.ArgumentParser(description="Quiz Score Processor")
+    subparsers = parser.add_subparsers(dest="command")
+
+    sweep_parser = subparsers.add_parser("sweep", help="Compare conversions of one file under several parameter sets")
+    sweep_parser.add_argument("file", help="Path to the quiz data file (Excel or CSV)")
+    sweep_parser.add_argument("--variants", help="JSON file with a list of quiz parameter objects")
+    sweep_parser.add_argument("--quiz-name", help="Base quiz name (defaults to the file name)")
+    sweep_parser.add_argument("--original-max", type=float, help="Original maximum quiz score")
+    sweep_parser.add_argument("--question-value", type=float, help="Value of each question on the original scale")
+    sweep_parser.add_argument("--new-max", type=float, nargs="+", help="New maximum scores to compare")
+    sweep_parser.add_argument("--output", help="Output file for the comparison table (.csv or .xlsx)")
+    sweep_parser.set_defaults(handler=run_sweep)
+
+    items_parser = subparsers.add_parser("items", help="Item analysis statistics for each question")
+    items_parser.add_argument("file", help="Path to the quiz data file (Excel or CSV)")
+    items_parser.add_argument("--question-value", type=float,
+                              help="Value of each question on the original scale (defaults to the highest observed score)")
+    items_parser.add_argument("--json", help="Also write the statistics to this JSON file")
+    items_parser.set_defaults(handler=run_item_analysis)
+
+    stats_parser = subparsers.add_parser("stats", help="Streaming summary statistics of the converted scores")
+    stats_parser.add_argument("files", nargs="+", help="Paths to the quiz data files (Excel or CSV)")
+    stats_parser.add_argument("--quiz-name", help="Quiz name (defaults to the first file name)")
+    stats_parser.add_argument("--original-max", type=float, required=True, help="Original maximum quiz score")
+    stats_parser.add_argument("--new-max", type=float, required=True, help="New desired maximum score")
+    stats_parser.add_argument("--question-value", type=float, required=True,
+                              help="Value of each question on the original scale")
+    add_curve_arguments(stats_parser)
+    stats_parser.add_argument("--batch-size", type=int, default=10000, help="Students per streamed batch")
+    stats_parser.add_argument("--bins", type=int, default=10, help="Number of histogram bins")
+    stats_parser.add_argument("--workers", type=int, default=1, help="Worker processes when summarizing several files")
+    stats_parser.add_argument("--json", help="Also write the summary to this JSON file")
+    stats_parser.set_defaults(handler=run_stats)
+
+    convert_parser = subparsers.add_parser("convert", help="Convert one file, splitting large CSV files across workers")
+    convert_parser.add_argument("file", help="Path to the quiz data file (Excel, CSV, compressed CSV or a zip of exports)")
+    convert_parser.add_argument("--quiz-name", help="Quiz name (defaults to the file name)")
+    convert_parser.add_argument("--original-max", type=float, required=True, help="Original maximum quiz score")
+    convert_parser.add_argument("--new-max", type=float, required=True, help="New desired maximum score")
+    convert_parser.add_argument("--question-value", type=float, required=True,
+                                help="Value of each question on the original scale")
+    convert_parser.add_argument("--weights", help="Question weights: a CSV/JSON weights file or a saved profile name")
+    convert_parser.add_argument("--max-points-row", action="store_true",
+                                help="Take the question weights from the export's max-points row (read as weights, "
+                                     "not as a student)")
+    add_curve_arguments(convert_parser)
+    convert_parser.add_argument("--fixed-point", type=int, metavar="UNITS",
+                                help="Convert exactly in integer units per point (e.g. 10000), so question scores "
+                                     "add up to the totals")
+    convert_parser.add_argument("--workers", type=int, default=1, help="Worker processes for CSV files and zip archives")
+    convert_parser.add_argument("--output", help="Output file (.csv or .xlsx, defaults to <quiz name>.csv); "
+                                                 "output folder for a zip archive")
+    convert_parser.add_argument("--long", action="store_true",
+                                help="Write one row per student and question (.csv or .parquet output) instead of "
+                                     "three columns per question")
+    convert_parser.add_argument("--db", help="Also store the results in this SQLite results database")
+    convert_parser.set_defaults(handler=run_convert)
+
+    diff_parser = subparsers.add_parser("diff", help="Show the students and scores that changed between two runs")
+    diff_parser.add_argument("before", help="First run: a results file written by convert, or a quiz export")
+    diff_parser.add_argument("after", help="Second run: a results file written by convert, or a quiz export")
+    diff_parser.add_argument("--original-max", type=float, help="Original maximum quiz score (to convert exports)")
+    diff_parser.add_argument("--new-max", type=float, help="New desired maximum score (to convert exports)")
+    diff_parser.add_argument("--question-value", type=float,
+                             help="Value of each question on the original scale (to convert exports)")
+    diff_parser.add_argument("--answer-key", metavar="FILE", help="CSV/JSON answer key regrading the second run only")
+    diff_parser.add_argument("--workers", type=int, default=1, help="Worker processes when converting CSV exports")
+    diff_parser.add_argument("--limit", type=int, default=20, help="Changed cells printed")
+    diff_parser.add_argument("--output", help="Write every changed cell to this CSV file")
+    diff_parser.add_argument("--json", help="Also write the comparison to this JSON file")
+    diff_parser.set_defaults(handler=run_diff)
+
+    query_parser = subparsers.add_parser("query", help="Look up stored results of a student or a team")
+    query_parser.add_argument("--db", required=True, help="SQLite results database")
+    query_target = query_parser.add_mutually_exclusive_group()
+    query_target.add_argument("--student", help="Student ID")
+    query_target.add_argument("--team", help="Team name")
+    query_parser.add_argument("--quiz", nargs="+", help="Only these quizzes")
+    query_parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    query_parser.set_defaults(handler=run_query)
+
+    watch_parser = subparsers.add_parser("watch", help="Convert new or modified exports dropped into a folder")
+    watch_parser.add_argument("folder", help="Folder to watch; each export uses the nearest quiz_params.json")
+    watch_parser.add_argument("--workers", type=int, default=2, help="Maximum number of files converted at once")
+    watch_parser.add_argument("--interval", type=float, default=2.0, help="Seconds between folder scans")
+    watch_parser.add_argument("--settle", type=float, default=2.0,
+                              help="Seconds a file must stay unchanged before it is processed")
+    watch_parser.add_argument("--manifest", help="Manifest file (defaults to .quiz_watch_manifest.json in the folder)")
+    watch_parser.add_argument("--once", action="store_true", help="Scan once, finish the conversions and exit")
+    watch_parser.set_defaults(handler=run_watch)
+
+    return parser
+
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv)
+
+    Returns:
+        Process exit code
+    """
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        main()
+        return 0
+    return args.handler(args)
+
+
+def create_app() -> "FastAPI":
+    """
+    Create the FastAPI web application.
+
+    Returns:
+        Configured FastAPI application
+    """
+    from fastapi import FastAPI
+    from fastapi.responses import RedirectResponse, Response
+    from fastapi.staticfiles import StaticFiles
+
+    from app.routers import quiz
+
+    web_app = FastAPI(title="Quiz Score Processor")
+    web_app.mount("/static", StaticFiles(directory="app/static"), name="static")
+    web_app.include_router(quiz.router)
+
+    @web_app.get("/")
+    async def root():
+        """Redirect to the upload form."""
+        return RedirectResponse(url="/quiz/upload")
+
+    @web_app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        """Per-stage latency histograms and counters in the Prometheus text format."""
+        from app.services.metrics import CONTENT_TYPE, metrics
+
+        return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+    return web_app
+
+
+def __getattr__(name: str):
+    """Create the web application on first access of `main.app` (uvicorn main:app, tests)."""
+    if name == "app":
+        web_app = create_app()
+        globals()["app"] = web_app
+        return web_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    except KeyboardInterrupt:
-        print("\n\nProcess interrupted by user. Exiting application.")
-    except Exception as e:
-        print(f"\nUnexpected error: {str(e)}")
-        print("Exiting application.")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(cli())
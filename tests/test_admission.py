@@ -0,0 +1,93 @@
+"""
+Tests for upload admission control.
+"""
+import asyncio
+
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionRejected, estimate_memory
+
+MB = 1024 ** 2
+
+
+def test_should_queue_and_reject_given_uploads_beyond_limit():
+    """Test that uploads beyond max_in_flight wait in order and a full queue rejects at once."""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, memory_budget=1024 * MB, max_queue=1)
+        first = await controller.acquire(MB, "a.csv")
+        second = asyncio.ensure_future(controller.acquire(MB, "b.csv"))
+        await asyncio.sleep(0)
+        queued = controller.stats()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire(MB, "c.csv")
+        first.release()
+        second_ticket = await asyncio.wait_for(second, 1)
+        second_ticket.release()
+        return queued, rejected.value, controller.stats()
+
+    # Act
+    queued, rejected, final = asyncio.run(scenario())
+
+    # Assert
+    assert queued["in_flight"] == 1
+    assert queued["queue_depth"] == 1
+    assert rejected.retry_after >= 1
+    assert final["in_flight"] == 0
+    assert final["admitted"] == 2
+    assert final["rejected"] == 1
+
+
+def test_should_wait_for_memory_given_uploads_over_budget():
+    """Test that an upload waits while the estimated memory of the running uploads exceeds the budget."""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=4, memory_budget=estimate_memory(10 * MB, "a.csv"))
+        first = await controller.acquire(6 * MB, "a.csv")
+        second = asyncio.ensure_future(controller.acquire(6 * MB, "b.csv"))
+        await asyncio.sleep(0.01)
+        waiting = not second.done()
+        first.release()
+        (await asyncio.wait_for(second, 1)).release()
+        return waiting, controller.stats()
+
+    # Act
+    waiting, stats = asyncio.run(scenario())
+
+    # Assert
+    assert waiting
+    assert stats["reserved_bytes"] == 0
+    assert stats["max_wait_seconds"] > 0
+
+
+def test_should_reserve_combined_memory_given_several_files():
+    """Test that files admitted together take one slot and the sum of their estimated memory."""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=2, memory_budget=1024 * MB)
+        ticket = await controller.acquire_files([(MB, "a.csv"), (2 * MB, "b.xlsx")])
+        stats = controller.stats()
+        ticket.release()
+        return stats
+
+    # Act
+    stats = asyncio.run(scenario())
+
+    # Assert
+    assert stats["in_flight"] == 1
+    assert stats["reserved_bytes"] == estimate_memory(MB, "a.csv") + estimate_memory(2 * MB, "b.xlsx")
+
+def test_should_reject_given_wait_longer_than_max_wait():
+    """Test that a queued upload is rejected once it has waited max_wait seconds."""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_wait=0.01)
+        first = await controller.acquire(MB, "a.csv")
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire(MB, "b.csv")
+        stats = controller.stats()
+        first.release()
+        return stats
+
+    # Act
+    stats = asyncio.run(scenario())
+
+    # Assert
+    assert stats["queue_depth"] == 0
+    assert stats["rejected"] == 1
@@ -0,0 +1,116 @@
+"""
+Tests for answer-key regrading.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.quiz_data import QuizParameters, StudentResponse
+from app.services.answer_key import AnswerKey, load_answer_key
+from app.services.pipeline import convert_file, stream_convert
+from app.services.quiz_service import convert_scores
+from app.services.score_matrix import ScoreMatrix
+
+
+def _params(answer_key, **overrides) -> QuizParameters:
+    values = dict(quiz_name="Quiz", original_max_score=3, new_max_score=30, original_question_value=1,
+                  answer_key=answer_key)
+    values.update(overrides)
+    return QuizParameters(**values)
+
+
+def _responses():
+    rows = [({1: "B", 2: "a", 3: "C"}, {1: 0, 2: 1, 3: 1}),
+            ({1: " b ", 2: "C", 3: "D"}, {1: 0, 2: 0, 3: 0}),
+            ({1: "A", 2: "nan", 3: "C"}, {1: 1, 2: 0, 3: 1})]
+    return [
+        StudentResponse(student_name=f"Student {i}", first_name="S", last_name=str(i), student_id=str(i),
+                        original_score=sum(scores.values()), responses=responses, question_scores=scores)
+        for i, (responses, scores) in enumerate(rows)
+    ]
+
+
+def test_should_regrade_with_partial_credit_given_answer_key():
+    """Test that keyed questions are scored from the responses, ignoring case and spaces."""
+    # Arrange
+    key = AnswerKey({1: {"B": 1.0}, 2: {"A": 1.0, "C": 0.5}})
+    matrix = ScoreMatrix.from_responses(_responses(), [1, 2, 3])
+
+    # Act
+    regraded = key.regrade(matrix, question_value=1.0)
+
+    # Assert
+    assert regraded.scores.tolist() == [[1.0, 1.0, 1.0], [1.0, 0.5, 0.0], [0.0, 0.0, 1.0]]
+    assert regraded.original_scores.tolist() == [3.0, 1.5, 1.0]
+
+
+def test_should_convert_regraded_scores_given_answer_key_in_parameters():
+    """Test that the conversion of parsed responses uses the regraded question scores."""
+    # Arrange
+    quiz_params = _params({1: {"B": 1.0}})
+
+    # Act
+    processed = convert_scores(_responses(), quiz_params)
+
+    # Assert
+    assert [response.new_score for response in processed] == [30.0, 10.0, 10.0]
+    assert processed[0].question_scores[1] == 1.0
+
+
+def test_should_reject_answer_key_given_unknown_question():
+    """Test that an answer key listing a question missing from the data is rejected."""
+    # Arrange
+    key = AnswerKey({7: {"A": 1.0}})
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="not in the data: 7"):
+        key.regrade(ScoreMatrix.from_responses(_responses(), [1, 2, 3]), question_value=1.0)
+
+
+def test_should_reject_answer_key_given_credit_outside_range():
+    """Test that a credit above 1 is rejected."""
+    # Act & Assert
+    with pytest.raises(ValueError, match="outside 0-1"):
+        AnswerKey({1: {"A": 2.0}})
+
+
+def test_should_load_same_key_given_csv_and_json_files(tmp_path):
+    """Test that CSV and JSON answer keys load to the same answers."""
+    # Arrange
+    csv_path = tmp_path / "key.csv"
+    csv_path.write_text("question,answer,credit\n1,B\n2,A,1\n2,C,0.5\n", encoding="utf-8")
+    json_path = tmp_path / "key.json"
+    json_path.write_text(json.dumps({"1": "B", "2": {"A": 1, "C": 0.5}}), encoding="utf-8")
+
+    # Act
+    from_csv = load_answer_key(str(csv_path))
+    from_json = load_answer_key(str(json_path))
+
+    # Assert
+    assert from_csv.answers == from_json.answers == {1: {"b": 1.0}, 2: {"a": 1.0, "c": 0.5}}
+
+
+def test_should_regrade_files_given_streamed_and_whole_conversion(tmp_path):
+    """Test that streamed and whole-file conversions regrade every chunk the same way."""
+    # Arrange
+    rng = np.random.default_rng(5)
+    answers = rng.choice(["A", "B", "C"], size=(20, 2))
+    columns = {"Student Name": [f"S{i}" for i in range(20)], "First Name": "S", "Last Name": "L",
+               "Student ID": [str(i) for i in range(20)], "Score": 0.0}
+    for j in range(2):
+        columns[f"{j + 1}_Response"] = answers[:, j]
+        columns[f"{j + 1}_Score"] = 0.0
+    csv_path = tmp_path / "export.csv"
+    pd.DataFrame(columns).to_csv(csv_path, index=False)
+    quiz_params = _params({1: {"A": 1.0}, 2: {"B": 1.0, "C": 0.5}}, original_max_score=2, new_max_score=20)
+    expected = (10.0 * (answers[:, 0] == "A") + 10.0 * (answers[:, 1] == "B") + 5.0 * (answers[:, 1] == "C"))
+
+    # Act
+    streamed = np.concatenate([batch.new_scores for batch in stream_convert(str(csv_path), quiz_params, batch_size=6)])
+    whole = convert_file(str(csv_path), quiz_params).new_scores
+
+    # Assert
+    np.testing.assert_allclose(streamed, expected)
+    np.testing.assert_allclose(whole, expected)
@@ -0,0 +1,91 @@
+"""
+Tests for curves applied to the converted totals.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.quiz_data import QuizParameters, StudentResponse
+from app.services.pipeline import stream_convert
+from app.services.quiz_service import convert_score_matrix, convert_scores, verify_conversion
+from app.services.score_matrix import ScoreMatrix
+
+
+def _params(curve: str, **overrides) -> QuizParameters:
+    values = dict(quiz_name="Quiz", original_max_score=4, new_max_score=100, original_question_value=1, curve=curve)
+    values.update(overrides)
+    return QuizParameters(**values)
+
+
+def _responses(rows):
+    return [
+        StudentResponse(student_name=f"Student {i}", first_name="S", last_name=str(i), student_id=str(i),
+                        original_score=sum(row), question_scores={j + 1: score for j, score in enumerate(row)})
+        for i, row in enumerate(rows)
+    ]
+
+
+ROWS = [(1, 1, 1, 0), (1, 0, 0, 0), (0, 0, 0, 0), (1, 1, 0, 0), (1, 1, 0, 0)]
+
+
+@pytest.mark.parametrize("curve, overrides, expected", [
+    ("sqrt", {}, [86.6, 50.0, 0.0, 70.71, 70.71]),
+    ("add_to_top", {}, [100.0, 50.0, 25.0, 75.0, 75.0]),
+    ("zscore", {"curve_target_mean": 70, "curve_target_sd": 10}, [77.07, 62.93, 55.86, 70.0, 84.14]),
+    ("percentile", {}, [90.0, 30.0, 10.0, 60.0, 60.0]),
+])
+def test_should_curve_totals_given_curve(curve, overrides, expected):
+    """Test that each curve maps the converted totals of the cohort as documented."""
+    # Arrange
+    rows = ROWS if curve != "zscore" else [(1, 1, 1, 0), (1, 0, 0, 0), (0, 0, 0, 0), (1, 1, 0, 0), (1, 1, 1, 1)]
+    student_responses = _responses(rows)
+
+    # Act
+    question_new_scores, new_scores = convert_score_matrix(
+        ScoreMatrix.from_responses(student_responses, [1, 2, 3, 4]), _params(curve, **overrides))
+
+    # Assert
+    assert np.round(new_scores, 2).tolist() == expected
+    np.testing.assert_allclose(question_new_scores.sum(axis=1), new_scores)
+
+
+def test_should_match_whole_cohort_given_streamed_file(tmp_path):
+    """Test that the two-pass streaming conversion curves chunks against the whole file, not each chunk."""
+    # Arrange
+    rng = np.random.default_rng(3)
+    scores = rng.choice([0.0, 1.0], size=(25, 4))
+    columns = {"Student Name": [f"S{i}" for i in range(25)], "First Name": "S", "Last Name": "L",
+               "Student ID": [str(i) for i in range(25)], "Score": scores.sum(axis=1)}
+    for j in range(4):
+        columns[f"{j + 1}_Response"] = "A"
+        columns[f"{j + 1}_Score"] = scores[:, j]
+    csv_path = tmp_path / "export.csv"
+    pd.DataFrame(columns).to_csv(csv_path, index=False)
+    quiz_params = _params("percentile")
+
+    # Act
+    streamed = np.concatenate([batch.new_scores for batch in stream_convert(str(csv_path), quiz_params, batch_size=4)])
+    _, whole = convert_score_matrix(ScoreMatrix.from_dataframe(pd.read_csv(csv_path)), quiz_params)
+
+    # Assert
+    np.testing.assert_allclose(streamed, whole)
+
+
+def test_should_keep_exact_sums_given_curve_in_fixed_point_mode():
+    """Test that curved question scores still add up exactly to the curved totals in fixed-point mode."""
+    # Arrange
+    quiz_params = _params("sqrt", new_max_score=10, fixed_point_scale=100)
+
+    # Act
+    processed = convert_scores(_responses(ROWS), quiz_params)
+
+    # Assert
+    assert [response.new_score for response in processed] == [8.66, 5.0, 0.0, 7.07, 7.07]
+    assert verify_conversion(processed, quiz_params) is True
+
+
+def test_should_require_targets_given_zscore_curve():
+    """Test that the zscore curve is rejected without a target mean and standard deviation."""
+    # Act & Assert
+    with pytest.raises(ValueError, match="target mean"):
+        convert_scores(_responses(ROWS), _params("zscore"))
@@ -4,11 +4,12 @@ Tests for file service.
 import pytest
 import pandas as pd
 import io
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, patch
 from pathlib import Path
 from fastapi import UploadFile
 
-from app.services.file_service import save_upload_file_temp, process_file, process_dataframe
+from app.services.file_handler import FileHandler
+from app.services.file_service import save_upload_file_temp, process_file
 from app.models.quiz_data import StudentResponse
 
 
@@ -43,7 +44,7 @@ def test_should_process_dataframe_given_valid_dataframe(sample_dataframe):
     df = sample_dataframe
 
     # Act
-    student_responses, question_numbers = process_dataframe(df)
+    student_responses, question_numbers = FileHandler.process_dataframe(df)
 
     # Assert
     assert len(student_responses) == 2
@@ -75,6 +76,22 @@ def test_should_process_dataframe_given_valid_dataframe(sample_dataframe):
     assert student2.question_scores[2] == 0
 
 
+@pytest.fixture
+def single_student_dataframe():
+    """Create a one-student quiz export."""
+    return pd.DataFrame({
+        'Team': ['Team A'],
+        'Student Name': ['John Doe'],
+        'First Name': ['John'],
+        'Last Name': ['Doe'],
+        'Email Address': ['john@example.com'],
+        'Student ID': [12345],
+        'Score': [12],
+        '1_Response': ['Answer 1'],
+        '1_Score': [3]
+    })
+
+
 @pytest.mark.asyncio
 async def test_should_save_upload_file_temp_given_valid_file():
     """Test that uploaded file is saved temporarily."""
@@ -84,54 +101,37 @@ async def test_should_save_upload_file_temp_given_valid_file():
     mock_file.filename = "test.xlsx"
     mock_file.read.return_value = mock_content
 
-    # Mock the tempfile.NamedTemporaryFile context manager
-    mock_temp_file = MagicMock()
-    mock_temp_file.name = "/tmp/test_temp_file.xlsx"
-
     # Act
-    with patch("tempfile.NamedTemporaryFile", return_value=mock_temp_file):
-        result = await save_upload_file_temp(mock_file)
+    result = await save_upload_file_temp(mock_file)
 
     # Assert
-    assert isinstance(result, Path)
-    assert str(result) == "/tmp/test_temp_file.xlsx"
-    mock_file.read.assert_called_once()
-    mock_temp_file.write.assert_called_once_with(mock_content)
+    try:
+        assert isinstance(result, Path)
+        assert result.suffix == ".xlsx"
+        assert result.read_bytes() == mock_content
+        mock_file.read.assert_called_once()
+    finally:
+        result.unlink()
 
 
 @pytest.mark.asyncio
-async def test_should_process_excel_file_given_valid_upload():
+async def test_should_process_excel_file_given_valid_upload(tmp_path, single_student_dataframe):
     """Test that Excel file is processed correctly."""
     # Arrange
     mock_file = AsyncMock(spec=UploadFile)
     mock_file.filename = "test.xlsx"
-
-    # Mock the save_upload_file_temp function
-    mock_temp_path = Path("/tmp/test_temp_file.xlsx")
-
-    # Create a sample dataframe
-    df = pd.DataFrame({
-        'Team': ['Team A'],
-        'Student Name': ['John Doe'],
-        'First Name': ['John'],
-        'Last Name': ['Doe'],
-        'Email Address': ['john@example.com'],
-        'Student ID': [12345],
-        'Score': [12],
-        '1_Response': ['Answer 1'],
-        '1_Score': [3]
-    })
+    temp_path = tmp_path / "upload.xlsx"
+    single_student_dataframe.to_excel(temp_path, sheet_name="Team Analysis", index=False)
 
     # Act
-    with patch("app.services.file_service.save_upload_file_temp", return_value=mock_temp_path), \
-         patch("pandas.read_excel", return_value=df), \
-         patch("os.unlink") as mock_unlink:
-        student_responses, question_numbers = await process_file(mock_file)
+    with patch("app.services.file_service.save_upload_file_temp", return_value=temp_path):
+        student_responses, question_numbers, sheet_name, fingerprints = await process_file(mock_file)
 
     # Assert
     assert len(student_responses) == 1
-    assert len(question_numbers) == 1
     assert question_numbers == [1]
+    assert sheet_name == "Team Analysis"
+    assert len(fingerprints) == 1
 
     student = student_responses[0]
     assert student.team == "Team A"
@@ -141,52 +141,28 @@ async def test_should_process_excel_file_given_valid_upload():
     assert student.question_scores[1] == 3
 
     # Check that the temp file was deleted
-    mock_unlink.assert_called_once_with(mock_temp_path)
+    assert not temp_path.exists()
 
 
 @pytest.mark.asyncio
-async def test_should_process_excel_file_with_student_analysis_sheet():
+async def test_should_process_excel_file_with_student_analysis_sheet(tmp_path, single_student_dataframe):
     """Test that Excel file with Student Analysis sheet is processed correctly."""
     # Arrange
     mock_file = AsyncMock(spec=UploadFile)
     mock_file.filename = "test.xlsx"
-
-    # Mock the save_upload_file_temp function
-    mock_temp_path = Path("/tmp/test_temp_file.xlsx")
-
-    # Create a sample dataframe
-    df = pd.DataFrame({
-        'Team': ['Team A'],
-        'Student Name': ['John Doe'],
-        'First Name': ['John'],
-        'Last Name': ['Doe'],
-        'Email Address': ['john@example.com'],
-        'Student ID': [12345],
-        'Score': [12],
-        '1_Response': ['Answer 1'],
-        '1_Score': [3]
-    })
-
-    # Mock pandas.read_excel to raise ValueError for Team Analysis sheet
-    # but return df for Student Analysis sheet
-    def mock_read_excel(path, sheet_name=None):
-        if sheet_name == "Team Analysis":
-            raise ValueError("Worksheet named 'Team Analysis' not found")
-        elif sheet_name == "Student Analysis":
-            return df
-        else:
-            return df
+    temp_path = tmp_path / "upload.xlsx"
+    with pd.ExcelWriter(temp_path) as writer:
+        pd.DataFrame({"Notes": ["not quiz data"]}).to_excel(writer, sheet_name="Summary", index=False)
+        single_student_dataframe.to_excel(writer, sheet_name="Student Analysis", index=False)
 
     # Act
-    with patch("app.services.file_service.save_upload_file_temp", return_value=mock_temp_path), \
-         patch("pandas.read_excel", side_effect=mock_read_excel), \
-         patch("os.unlink") as mock_unlink:
-        student_responses, question_numbers = await process_file(mock_file)
+    with patch("app.services.file_service.save_upload_file_temp", return_value=temp_path):
+        student_responses, question_numbers, sheet_name, _ = await process_file(mock_file)
 
     # Assert
     assert len(student_responses) == 1
-    assert len(question_numbers) == 1
     assert question_numbers == [1]
+    assert sheet_name == "Student Analysis"
 
     student = student_responses[0]
     assert student.team == "Team A"
@@ -196,44 +172,30 @@ async def test_should_process_excel_file_with_student_analysis_sheet():
     assert student.question_scores[1] == 3
 
     # Check that the temp file was deleted
-    mock_unlink.assert_called_once_with(mock_temp_path)
+    assert not temp_path.exists()
 
 
 @pytest.mark.asyncio
-async def test_should_process_csv_file_given_valid_upload():
+async def test_should_process_csv_file_given_valid_upload(tmp_path, single_student_dataframe):
     """Test that CSV file is processed correctly."""
     # Arrange
     mock_file = AsyncMock(spec=UploadFile)
     mock_file.filename = "test.csv"
-
-    # Mock the save_upload_file_temp function
-    mock_temp_path = Path("/tmp/test_temp_file.csv")
-
-    # Create a sample dataframe
-    df = pd.DataFrame({
-        'Team': ['Team A'],
-        'Student Name': ['John Doe'],
-        'First Name': ['John'],
-        'Last Name': ['Doe'],
-        'Email Address': ['john@example.com'],
-        'Student ID': [12345],
-        'Score': [12],
-        '1_Response': ['Answer 1'],
-        '1_Score': [3]
-    })
+    temp_path = tmp_path / "upload.csv"
+    single_student_dataframe.to_csv(temp_path, index=False)
 
     # Act
-    with patch("app.services.file_service.save_upload_file_temp", return_value=mock_temp_path), \
-         patch("pandas.read_csv", return_value=df), \
-         patch("os.unlink") as mock_unlink:
-        student_responses, question_numbers = await process_file(mock_file)
+    with patch("app.services.file_service.save_upload_file_temp", return_value=temp_path):
+        student_responses, question_numbers, sheet_name, fingerprints = await process_file(mock_file)
 
     # Assert
     assert len(student_responses) == 1
-    assert len(question_numbers) == 1
+    assert question_numbers == [1]
+    assert sheet_name is None
+    assert len(fingerprints) == 1
 
     # Check that the temp file was deleted
-    mock_unlink.assert_called_once_with(mock_temp_path)
+    assert not temp_path.exists()
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,114 @@
+"""
+Tests for exact fixed-point score conversion.
+"""
+import numpy as np
+
+from app.models.quiz_data import QuizParameters, StudentResponse
+from app.services.fixed_point import apportion, convert_units
+from app.services.quiz_service import (
+    convert_score_matrix, convert_scores, generate_long_frame, generate_output_data, verify_conversion
+)
+from app.services.score_matrix import ScoreMatrix
+
+
+def _params(**overrides) -> QuizParameters:
+    values = dict(quiz_name="Quiz", original_max_score=3, new_max_score=10, original_question_value=1,
+                  fixed_point_scale=100)
+    values.update(overrides)
+    return QuizParameters(**values)
+
+
+def test_should_add_up_exactly_given_repeating_conversion_factor():
+    """Test that question scores converted with a factor of 10/3 add up exactly to the rounded totals."""
+    # Arrange
+    scores = np.array([[1.0, 1.0, 1.0], [1.0, 1.0, 0.0], [1.0, 0.0, 0.0]])
+    original_scores = scores.sum(axis=1)
+
+    # Act
+    question_units, total_units = convert_units(scores, original_scores, _params(), [1, 2, 3])
+
+    # Assert
+    assert total_units.tolist() == [1000, 667, 333]
+    assert question_units.tolist() == [[334, 333, 333], [334, 333, 0], [333, 0, 0]]
+    assert (question_units.sum(axis=1) == total_units).all()
+
+
+def test_should_raise_largest_remainders_given_shortfall():
+    """Test that the shortfall goes to the values with the largest remainders, earlier questions first on ties."""
+    # Arrange
+    exact = np.array([[13, 27, 25, 15]])
+
+    # Act
+    rounded = apportion(exact, 10, np.array([9]))
+
+    # Assert
+    assert rounded.tolist() == [[1, 3, 3, 2]]
+
+
+def test_should_match_matrix_conversion_given_weighted_responses():
+    """Test that object and matrix conversion give the same exact results, which pass exact verification."""
+    # Arrange
+    quiz_params = _params(new_max_score=7, use_weighted_questions=True, question_weights={1: 1.0, 2: 2.0, 3: 4.0})
+    student_responses = [
+        StudentResponse(student_name=f"Student {i}", first_name="S", last_name=str(i), student_id=str(i),
+                        original_score=sum(row), question_scores={1: row[0], 2: row[1], 3: row[2]})
+        for i, row in enumerate([(1, 0.5, 1), (0, 1, 0.5), (0.5, 0.5, 0.5)])
+    ]
+
+    # Act
+    processed = convert_scores(student_responses, quiz_params)
+    question_new_scores, new_scores = convert_score_matrix(
+        ScoreMatrix.from_responses(student_responses, [1, 2, 3]), quiz_params)
+
+    # Assert
+    assert [response.new_score for response in processed] == new_scores.tolist()
+    assert [list(response.question_new_scores.values()) for response in processed] == question_new_scores.tolist()
+    assert verify_conversion(processed, quiz_params) is True
+
+
+def test_should_fail_exact_verification_given_tampered_total():
+    """Test that exact verification rejects a total that is off by a single unit."""
+    # Arrange
+    student_response = StudentResponse(student_name="John Doe", first_name="John", last_name="Doe",
+                                       student_id="1", original_score=2, question_scores={1: 1, 2: 1, 3: 0})
+    processed = convert_scores([student_response], _params())
+    processed[0].new_score += 0.01
+
+    # Act
+    result = verify_conversion(processed, _params())
+
+    # Assert
+    assert result is False
+
+
+def test_should_display_question_scores_adding_up_to_total_given_finer_scale():
+    """Test that scores kept to 4 decimals are displayed to 2 decimals that still add up to the displayed total."""
+    # Arrange
+    student_response = StudentResponse(student_name="John Doe", first_name="John", last_name="Doe",
+                                       student_id="1", original_score=2, question_scores={1: 1, 2: 1, 3: 0})
+    processed = convert_scores([student_response], _params(fixed_point_scale=10000))
+
+    # Act
+    output_data = generate_output_data(processed, [1, 2, 3], fixed_point_scale=10000)
+
+    # Assert
+    question_total = sum(output_data[0][f"Q{q_num} Converted Score"] for q_num in [1, 2, 3])
+    assert output_data[0]["Converted Score"] == 6.67
+    assert round(question_total, 2) == 6.67
+
+
+def test_should_display_long_rows_adding_up_to_total_given_finer_scale():
+    """Test that the long export rounds fixed-point question scores the same way as the wide output."""
+    # Arrange
+    matrix = ScoreMatrix.from_responses([
+        StudentResponse(student_name="John Doe", first_name="John", last_name="Doe",
+                        student_id="1", original_score=2, question_scores={1: 1, 2: 1, 3: 0})
+    ], [1, 2, 3])
+    params = _params(fixed_point_scale=10000)
+    question_new_scores, new_scores = convert_score_matrix(matrix, params)
+
+    # Act
+    long = generate_long_frame(matrix, question_new_scores, new_scores, fixed_point_scale=10000)
+
+    # Assert
+    assert round(long["Converted Score"].sum(), 2) == 6.67
@@ -0,0 +1,114 @@
+"""
+Tests for header-first validation of quiz exports.
+"""
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from app.services.file_handler import FileHandler
+from app.services.header_schema import analyze_header, read_header
+
+IDENTITY = ['Team', 'Student Name', 'First Name', 'Last Name', 'Student ID', 'Score']
+
+
+def test_should_list_every_problem_given_invalid_header():
+    """Test that missing columns, duplicate questions and unpaired score columns are reported together."""
+    # Arrange
+    columns = ['Student Name', 'Score', '1_Response', '1_Score', '2_Response', '1_Response']
+
+    # Act
+    with pytest.raises(ValueError) as error:
+        analyze_header(columns)
+
+    # Assert
+    message = str(error.value)
+    assert "Missing required columns: First Name, Last Name, Student ID" in message
+    assert "Questions listed more than once: 1" in message
+    assert "Missing score columns for questions 2 (expected 2_Score)" in message
+
+
+def test_should_return_question_numbers_given_valid_header():
+    """Test that a valid header yields its question numbers and ignores score columns without responses."""
+    # Arrange
+    columns = IDENTITY + ['2_Response', '2_Score', '1_Response', '1_Score', '9_Score', 'Attempt Started']
+
+    # Act
+    schema = analyze_header(columns)
+
+    # Assert
+    assert schema.question_numbers == [2, 1]
+    assert schema.score_columns == ['2_Score', '1_Score']
+
+
+def test_should_reject_file_before_full_read_given_wrong_header(tmp_path):
+    """Test that a file with a wrong header is rejected without reading its data rows."""
+    # Arrange
+    csv_path = tmp_path / "gradebook.csv"
+    csv_path.write_text("Name,Grade\n" + "Someone,10\n" * 1000)
+
+    # Act
+    with patch.object(FileHandler, "read_dataframe") as read_dataframe, \
+         pytest.raises(ValueError, match="Missing required columns"):
+        FileHandler.process_file(str(csv_path))
+
+    # Assert
+    read_dataframe.assert_not_called()
+
+
+def test_should_read_chosen_sheet_given_workbook_with_student_analysis(tmp_path):
+    """Test that the sheet chosen from the header is the one read in full."""
+    # Arrange
+    xlsx_path = tmp_path / "quiz.xlsx"
+    data = pd.DataFrame([["Red", "John Doe", "John", "Doe", "1", 3, "A", 3]],
+                        columns=IDENTITY + ['1_Response', '1_Score'])
+    with pd.ExcelWriter(xlsx_path) as writer:
+        pd.DataFrame({"Notes": ["cover"]}).to_excel(writer, sheet_name="Cover", index=False)
+        data.to_excel(writer, sheet_name="Student Analysis", index=False)
+
+    # Act
+    schema = read_header(str(xlsx_path))
+    student_responses, question_numbers, sheet_name = FileHandler.process_file(str(xlsx_path))
+
+    # Assert
+    assert schema.sheet_name == "Student Analysis"
+    assert sheet_name == "Student Analysis"
+    assert question_numbers == [1]
+    assert student_responses[0].question_scores[1] == 3.0
+
+
+def test_should_load_only_used_columns_given_wide_export(tmp_path):
+    """Test that the full read skips unused columns and keeps the leading zeros of student IDs."""
+    # Arrange
+    csv_path = tmp_path / "export.csv"
+    csv_path.write_text(
+        "Team,Student Name,First Name,Last Name,Student ID,Attempt Started,IP,Score,1_Response,1_Score\n"
+        "Red,John Doe,John,Doe,00123,2024-03-01 10:00,10.0.0.1,3,A,3\n"
+    )
+    schema = read_header(str(csv_path))
+
+    # Act
+    df, _ = FileHandler.read_dataframe(str(csv_path), schema)
+    student_responses, _, _ = FileHandler.process_file(str(csv_path))
+
+    # Assert
+    assert "Attempt Started" not in df.columns and "IP" not in df.columns
+    assert df["1_Score"].dtype == "float64"
+    assert student_responses[0].student_id == "00123"
+
+
+def test_should_read_scores_untyped_given_non_numeric_score_cell(tmp_path):
+    """Test that a non-numeric score cell falls back to an untyped read instead of failing."""
+    # Arrange
+    csv_path = tmp_path / "export.csv"
+    csv_path.write_text(
+        "Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score\n"
+        "John Doe,John,Doe,1,3,A,3\n"
+        "Jane Smith,Jane,Smith,2,0,B,absent\n"
+    )
+
+    # Act
+    student_responses, _, _ = FileHandler.process_file(str(csv_path))
+
+    # Assert
+    assert [response.question_scores.get(1) for response in student_responses] == [3.0, 0.0]
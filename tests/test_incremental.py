@@ -0,0 +1,144 @@
+"""
+Tests for incremental reconversion.
+"""
+import pandas as pd
+import pytest
+
+from app.models.quiz_data import QuizParameters, StudentResponse
+from app.services.incremental import ConversionHistory, incremental_convert, row_fingerprints
+from app.services.quiz_service import convert_scores
+
+
+def _student(student_id: str, score: float, response: str = "A") -> StudentResponse:
+    return StudentResponse(
+        team="Team A",
+        student_name=f"Student {student_id}",
+        first_name="First",
+        last_name="Last",
+        student_id=student_id,
+        original_score=score,
+        responses={1: response, 2: "B"},
+        question_scores={1: score / 2, 2: score / 2}
+    )
+
+
+@pytest.fixture
+def quiz_params():
+    return QuizParameters(
+        quiz_name="Midterm",
+        original_max_score=20.0,
+        new_max_score=10.0,
+        original_question_value=10.0
+    )
+
+
+def test_should_convert_only_changed_rows_given_reupload(quiz_params, monkeypatch):
+    """Test that a re-upload converts only added and changed rows and reports the delta."""
+    # Arrange
+    history = ConversionHistory()
+    first_upload = [_student("1", 10.0), _student("2", 20.0), _student("3", 0.0)]
+    incremental_convert(first_upload, quiz_params, history)
+    second_upload = [_student("1", 10.0), _student("2", 14.0), _student("4", 6.0)]
+    converted_rows = []
+
+    def counting_convert(student_responses, params):
+        converted_rows.extend(response.student_id for response in student_responses)
+        return convert_scores(student_responses, params)
+
+    monkeypatch.setattr("app.services.incremental.convert_scores", counting_convert)
+
+    # Act
+    processed, delta = incremental_convert(second_upload, quiz_params, history)
+
+    # Assert
+    assert converted_rows == ["2", "4"]
+    assert delta.added == ["4"]
+    assert delta.changed == ["2"]
+    assert delta.removed == ["3"]
+    assert delta.unchanged == 1
+    assert [response.model_dump() for response in processed] == \
+        [response.model_dump() for response in convert_scores(second_upload, quiz_params)]
+
+
+def test_should_reconvert_all_rows_given_changed_parameters(quiz_params):
+    """Test that results are not reused when the conversion parameters change."""
+    # Arrange
+    history = ConversionHistory()
+    students = [_student("1", 10.0), _student("2", 20.0)]
+    incremental_convert(students, quiz_params, history)
+    new_params = quiz_params.model_copy(update={"new_max_score": 5.0})
+
+    # Act
+    processed, delta = incremental_convert(students, new_params, history)
+
+    # Assert
+    assert delta.parameters_changed
+    assert delta.converted == 2
+    assert [response.new_score for response in processed] == [2.5, 5.0]
+
+
+def test_should_count_every_row_as_converted_given_cohort_curve(quiz_params):
+    """Test that a cohort curve reconverting every row is reported in the delta counts."""
+    # Arrange
+    history = ConversionHistory()
+    curved_params = quiz_params.model_copy(update={"curve": "percentile"})
+    incremental_convert([_student("1", 10.0), _student("2", 20.0), _student("3", 0.0)], curved_params, history)
+    second_upload = [_student("1", 10.0), _student("2", 14.0), _student("3", 0.0)]
+
+    # Act
+    _, delta = incremental_convert(second_upload, curved_params, history)
+
+    # Assert
+    assert delta.changed == ["2"]
+    assert delta.converted == 3
+    assert delta.unchanged == 0
+    assert "all 3 rows reconverted" in delta.summary()
+
+
+def test_should_keep_rows_apart_given_repeated_student_ids(quiz_params):
+    """Test that rows sharing a student ID are fingerprinted separately."""
+    # Arrange
+    history = ConversionHistory()
+    incremental_convert([_student("1", 10.0), _student("1", 12.0)], quiz_params, history)
+
+    # Act
+    processed, delta = incremental_convert([_student("1", 10.0), _student("1", 16.0)], quiz_params, history)
+
+    # Assert
+    assert delta.changed == ["1#2"]
+    assert delta.unchanged == 1
+    assert [response.new_score for response in processed] == [5.0, 8.0]
+
+
+def test_should_change_only_edited_row_fingerprint_given_input_table():
+    """Test that the vectorized fingerprints of an input table change exactly for the edited rows."""
+    # Arrange
+    table = pd.DataFrame({"Student ID": ["1", "2", "3"], "Score": [10.0, 20.0, 0.0],
+                          "1_Response": ["A", "B", "C"], "1_Score": [5.0, 10.0, 0.0]})
+    edited = table.copy()
+    edited.loc[1, "1_Response"] = "D"
+
+    # Act
+    before = row_fingerprints(table)
+    after = row_fingerprints(edited)
+    renamed = row_fingerprints(table.rename(columns={"1_Score": "2_Score"}))
+
+    # Assert
+    assert (before == after).tolist() == [True, False, True]
+    assert not (before == renamed).any()
+
+
+def test_should_evict_oldest_runs_given_row_limit(quiz_params):
+    """Test that the history keeps no more rows than its bound, evicting the least recently used quizzes."""
+    # Arrange
+    history = ConversionHistory(max_rows=5)
+    students = [_student(str(i), 10.0) for i in range(3)]
+
+    # Act
+    for quiz_name in ["Quiz 1", "Quiz 2", "Quiz 3"]:
+        incremental_convert(students, quiz_params.model_copy(update={"quiz_name": quiz_name}), history)
+
+    # Assert
+    assert history.num_rows == 3
+    assert history.get("Quiz 1") is None
+    assert history.get("Quiz 3") is not None
@@ -0,0 +1,76 @@
+"""
+Tests for item analysis.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.score_matrix import ScoreMatrix
+from app.services.item_analysis import analyze_items
+
+
+@pytest.fixture
+def sample_matrix():
+    """Create a sample score matrix for testing."""
+    df = pd.DataFrame({
+        'Student Name': ['A', 'B', 'C', 'D'],
+        'First Name': ['A', 'B', 'C', 'D'],
+        'Last Name': ['A', 'B', 'C', 'D'],
+        'Student ID': [1, 2, 3, 4],
+        'Score': [6, 3, 3, 0],
+        '1_Response': ['A', 'A', 'B', None],
+        '1_Score': [3, 3, 0, 0],
+        '2_Response': ['C', 'D', 'C', 'D'],
+        '2_Score': [3, 0, 3, 0]
+    })
+    return ScoreMatrix.from_dataframe(df)
+
+
+def test_should_compute_difficulty_given_question_value(sample_matrix):
+    """Test that difficulty is the mean score divided by the question value."""
+    # Act
+    analysis = analyze_items(sample_matrix, question_value=3)
+
+    # Assert
+    assert np.allclose(analysis.mean_scores, [1.5, 1.5])
+    assert np.allclose(analysis.difficulty, [0.5, 0.5])
+
+
+def test_should_compute_point_biserial_given_score_matrix(sample_matrix):
+    """Test that discrimination matches the correlation of each question with the total."""
+    # Act
+    analysis = analyze_items(sample_matrix, question_value=3)
+
+    # Assert
+    totals = sample_matrix.scores.sum(axis=1)
+    for j in range(2):
+        expected = np.corrcoef(sample_matrix.scores[:, j], totals)[0, 1]
+        assert analysis.discrimination[j] == pytest.approx(expected)
+
+
+def test_should_count_responses_and_non_responses_given_responses(sample_matrix):
+    """Test that the response distribution and non-response rate are computed per question."""
+    # Act
+    records = analyze_items(sample_matrix, question_value=3).to_records()
+
+    # Assert
+    assert records[0]['response_distribution'] == {'A': 2, 'B': 1}
+    assert records[0]['non_response_rate'] == pytest.approx(0.25)
+    assert records[1]['response_distribution'] == {'C': 2, 'D': 2}
+    assert records[1]['non_response_rate'] == 0
+
+
+def test_should_report_no_discrimination_given_constant_question():
+    """Test that a question everyone scored the same on has no discrimination value."""
+    # Arrange
+    matrix = ScoreMatrix(
+        pd.DataFrame(index=range(3)), [1, 2],
+        np.array([[3.0, 0.0], [3.0, 3.0], [3.0, 1.0]]), np.array([3.0, 6.0, 4.0])
+    )
+
+    # Act
+    records = analyze_items(matrix).to_records()
+
+    # Assert
+    assert records[0]['discrimination'] is None
+    assert records[0]['difficulty'] == 1.0
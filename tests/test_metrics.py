@@ -0,0 +1,101 @@
+"""
+Tests for the Prometheus metrics of the web app.
+"""
+import io
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.metrics import Counter, Histogram, MetricsRegistry, metrics
+from main import app
+
+
+def test_should_render_cumulative_buckets_given_observations():
+    """Test that a histogram renders cumulative buckets, sum and count per label set."""
+    # Arrange
+    histogram = Histogram("stage_seconds", "Stage time", ("stage",), buckets=(0.1, 1.0))
+
+    # Act
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "parse")
+
+    # Assert
+    assert histogram.samples() == [
+        'stage_seconds_bucket{stage="parse",le="0.1"} 2',
+        'stage_seconds_bucket{stage="parse",le="1"} 3',
+        'stage_seconds_bucket{stage="parse",le="+Inf"} 4',
+        'stage_seconds_sum{stage="parse"} 3.65',
+        'stage_seconds_count{stage="parse"} 4',
+    ]
+
+
+def test_should_count_every_increment_given_concurrent_threads():
+    """Test that increments from several threads are not lost."""
+    # Arrange
+    counter = Counter("rows_total", "Rows")
+    histogram = Histogram("seconds", "Time")
+
+    def record():
+        for _ in range(10000):
+            counter.inc()
+            histogram.observe(0.01)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    assert counter.value() == 80000
+    assert histogram.count() == 80000
+
+
+def test_should_reject_negative_increment_given_counter():
+    """Test that a counter cannot decrease."""
+    # Act & Assert
+    with pytest.raises(ValueError, match="only increase"):
+        Counter("rows_total", "Rows").inc(-1)
+
+
+def test_should_describe_every_metric_given_empty_registry():
+    """Test that the exposition lists the help and type of every metric, with zero counters."""
+    # Act
+    text = MetricsRegistry().render()
+
+    # Assert
+    assert "# TYPE quiz_stage_duration_seconds histogram" in text
+    assert "quiz_rows_processed_total 0" in text
+    assert "quiz_uploads_rejected_total 0" in text
+    assert text.endswith("\n")
+
+
+def test_should_expose_stage_timings_given_processed_upload():
+    """Test that an upload is reflected in the /metrics endpoint."""
+    # Arrange
+    client = TestClient(app)
+    csv_content = (
+        b"Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score,2_Response,2_Score\n"
+        b"John Doe,John,Doe,1,6,A,3,B,3\n"
+        b"Jane Smith,Jane,Smith,2,3,A,3,,0\n"
+    )
+    files = {"file": ("metrics.csv", io.BytesIO(csv_content), "text/csv")}
+    form_data = {"quiz_name": "Metrics Quiz", "original_max_score": "6", "new_max_score": "10",
+                 "original_question_value": "3"}
+    rows_before = metrics.rows_processed.value()
+    bytes_before = metrics.bytes_ingested.value()
+
+    # Act
+    client.post("/quiz/upload", files=files, data=form_data)
+    response = client.get("/metrics")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert metrics.rows_processed.value() == rows_before + 2
+    assert metrics.bytes_ingested.value() == bytes_before + len(csv_content)
+    for stage in ("receive", "parse", "convert", "verify", "render"):
+        assert f'quiz_stage_duration_seconds_count{{stage="{stage}"}}' in response.text
@@ -0,0 +1,125 @@
+"""
+Tests for the sharded parallel CSV reader.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.quiz_data import QuizParameters
+from app.services import parallel_reader
+from app.services.parallel_reader import find_record_boundaries, parallel_convert_csv
+from app.services.quiz_service import convert_score_matrix
+from app.services.score_matrix import ScoreMatrix
+
+
+@pytest.fixture
+def quiz_params():
+    return QuizParameters(
+        quiz_name="Test Quiz",
+        original_max_score=20.0,
+        new_max_score=10.0,
+        original_question_value=10.0
+    )
+
+
+@pytest.fixture
+def quoted_csv(tmp_path):
+    """CSV whose names and responses contain quoted newlines and escaped quotes."""
+    rows = []
+    for i in range(300):
+        rows.append({
+            'Team': f"Team {i % 3}",
+            'Student Name': f"Student {i}",
+            'First Name': "Multi\nLine" if i % 7 == 0 else f"First {i}",
+            'Last Name': 'O"Brien' if i % 5 == 0 else f"Last {i}",
+            'Student ID': f"S{i}",
+            'Score': (i % 3) * 10.0,
+            '1_Response': 'Answer\n"quoted"' if i % 4 == 0 else "A",
+            '1_Score': (i % 3) * 5.0,
+            '2_Response': "B",
+            '2_Score': (i % 3) * 5.0
+        })
+    df = pd.DataFrame(rows)
+    path = tmp_path / "quoted.csv"
+    df.to_csv(path, index=False)
+    return str(path), df
+
+
+def test_should_split_on_record_boundaries_given_quoted_newlines(quoted_csv, monkeypatch):
+    """Test that every shard parses to whole records even when fields contain newlines."""
+    # Arrange
+    path, df = quoted_csv
+    monkeypatch.setattr(parallel_reader, "SCAN_BLOCK_SIZE", 101)
+
+    # Act
+    header_size, shards = find_record_boundaries(path, 9)
+    with open(path, 'rb') as csv_file:
+        header = csv_file.read(header_size)
+    parts = [parallel_reader.read_shard(path, header, start, end) for start, end in shards]
+
+    # Assert
+    assert len(shards) == 9
+    assert all(start < end for start, end in shards)
+    assert [start for start, _ in shards[1:]] == [end for _, end in shards[:-1]]
+    assert pd.concat(parts)['First Name'].tolist() == df['First Name'].tolist()
+
+
+def test_should_keep_single_shard_given_file_without_trailing_newline(tmp_path):
+    """Test that the last record is kept when the file does not end with a newline."""
+    # Arrange
+    path = tmp_path / "short.csv"
+    path.write_bytes(b"Student Name,1_Response\nAlice,A\nBob,B")
+
+    # Act
+    header_size, shards = find_record_boundaries(str(path), 4)
+
+    # Assert
+    assert header_size == len(b"Student Name,1_Response\n")
+    assert shards[-1][1] == path.stat().st_size
+    assert sum(end - start for start, end in shards) == path.stat().st_size - header_size
+
+
+def test_should_match_sequential_conversion_given_worker_processes(quoted_csv, quiz_params):
+    """Test that the merged parallel result keeps the row order and equals the sequential conversion."""
+    # Arrange
+    path, df = quoted_csv
+    expected_matrix = ScoreMatrix.from_dataframe(pd.read_csv(path))
+    expected_question_scores, expected_scores = convert_score_matrix(expected_matrix, quiz_params)
+
+    # Act
+    batch, summary = parallel_convert_csv(path, quiz_params, workers=2, num_shards=5)
+
+    # Assert
+    assert batch.matrix.identity['Student ID'].tolist() == df['Student ID'].tolist()
+    assert batch.matrix.responses.decode_column(0) == df['1_Response'].tolist()
+    np.testing.assert_allclose(batch.question_new_scores, expected_question_scores)
+    np.testing.assert_allclose(batch.new_scores, expected_scores)
+    assert summary.count == len(df)
+    assert summary.mean == pytest.approx(expected_scores.mean())
+
+
+def test_should_raise_error_given_header_only_csv(tmp_path, quiz_params):
+    """Test that a CSV without data rows is rejected."""
+    # Arrange
+    path = tmp_path / "empty.csv"
+    path.write_text("Student Name,1_Response,1_Score\n")
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="no data"):
+        parallel_convert_csv(str(path), quiz_params)
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="Shared-memory segments are not listed on this platform")
+def test_should_leave_no_shared_segments_given_parallel_run(quoted_csv, quiz_params):
+    """Test that the shared-memory segments of the workers are removed after merging."""
+    # Arrange
+    path, _ = quoted_csv
+    before = set(os.listdir("/dev/shm"))
+
+    # Act
+    parallel_convert_csv(path, quiz_params, workers=2, num_shards=3)
+
+    # Assert
+    assert not [name for name in set(os.listdir("/dev/shm")) - before if name.startswith("qz")]
@@ -1,9 +1,13 @@
 """
 Tests for quiz service.
 """
+import pandas as pd
 import pytest
 from app.models.quiz_data import QuizParameters, StudentResponse, ProcessedResponse
-from app.services.quiz_service import convert_scores, verify_conversion, generate_output_data
+from app.services.pipeline import ConvertedBatch, export_long
+from app.services.quiz_service import (convert_score_matrix, convert_scores, verify_conversion, generate_output_data,
+                                       generate_output_frame)
+from app.services.score_matrix import ScoreMatrix
 
 
 def test_should_convert_scores_given_valid_student_responses_and_quiz_parameters():
@@ -155,4 +159,30 @@ def test_should_generate_output_data_given_processed_responses_and_question_numb
     
     assert student_data["Q2 Response"] == "Answer 2"
     assert student_data["Q2 Original Score"] == 3
-    assert student_data["Q2 Converted Score"] == 2
\ No newline at end of file
+    assert student_data["Q2 Converted Score"] == 2
+
+
+def test_should_write_long_rows_given_converted_batch(tmp_path):
+    """Test that the long export has one row per student and question, written in blocks."""
+    # Arrange
+    df = pd.DataFrame({
+        "Student Name": ["A", "B", "C"], "First Name": "F", "Last Name": "L", "Student ID": ["1", "2", "3"],
+        "Score": [2.0, 1.0, 0.0], "1_Response": ["x", "y", None], "1_Score": [1.0, 0.0, 0.0],
+        "2_Response": ["y", "y", "x"], "2_Score": [1.0, 1.0, 0.0]
+    })
+    matrix = ScoreMatrix.from_dataframe(df)
+    quiz_params = QuizParameters(quiz_name="Long", original_max_score=2, new_max_score=10, original_question_value=1)
+    batch = ConvertedBatch(matrix, *convert_score_matrix(matrix, quiz_params))
+    output_path = tmp_path / "long.csv"
+
+    # Act
+    written = export_long([batch], str(output_path), frame_rows=3)
+
+    # Assert
+    long = pd.read_csv(output_path, dtype={"Student ID": str})
+    wide = generate_output_frame(batch.matrix, batch.question_new_scores, batch.new_scores)
+    assert written == len(long) == 6
+    assert long["Question"].tolist() == [1, 2, 1, 2, 1, 2]
+    assert long["Response"].fillna("").tolist() == ["x", "y", "y", "y", "", "x"]
+    expected = wide[["Q1 Converted Score", "Q2 Converted Score"]].to_numpy().ravel()
+    assert long["Converted Score"].tolist() == expected.tolist()
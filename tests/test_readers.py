@@ -0,0 +1,135 @@
+"""
+Tests for the reader registry.
+"""
+import bz2
+import gzip
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+from app.services import readers
+from app.models.quiz_data import QuizParameters
+from app.services.file_handler import FileHandler
+from app.services.pipeline import convert_archive
+from app.services.readers import ReaderEngine, archive_members, choose_engine, open_table, read_table, sniff_format
+
+CSV_CONTENT = (
+    "Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score\n"
+    "John Doe,John,Doe,1,3,A,3\n"
+)
+
+
+def test_should_read_by_content_given_misnamed_workbook(tmp_path, capsys):
+    """Test that a workbook saved with a .csv name is detected and read as a workbook."""
+    # Arrange
+    path = tmp_path / "export.csv"
+    pd.read_csv(io.StringIO(CSV_CONTENT)).to_excel(path, sheet_name="Team Analysis", index=False, engine="openpyxl")
+
+    # Act
+    student_responses, question_numbers, sheet_name = FileHandler.process_file(str(path))
+
+    # Assert
+    assert sniff_format(str(path)) == "xlsx"
+    assert sheet_name == "Team Analysis"
+    assert student_responses[0].student_name == "John Doe"
+    assert "contains xlsx data" in capsys.readouterr().out
+
+
+def test_should_read_gzip_csv_given_compressed_export(tmp_path):
+    """Test that a gzip-compressed CSV export is read without unpacking it first."""
+    # Arrange
+    path = tmp_path / "export.csv.gz"
+    path.write_bytes(gzip.compress(CSV_CONTENT.encode()))
+
+    # Act
+    df, sheet_name = read_table(str(path))
+
+    # Assert
+    source = open_table(str(path))
+    assert (source.file_format, source.compression) == ("csv", "gzip")
+    assert sheet_name is None
+    assert df["Student Name"].tolist() == ["John Doe"]
+
+
+def test_should_fall_back_to_next_engine_given_unloadable_engine(tmp_path, monkeypatch):
+    """Test that the next installed engine is used when the fastest one fails to load."""
+    # Arrange
+    class BrokenEngine(ReaderEngine):
+        def read(self, *args, **kwargs):
+            raise ImportError("missing optional dependency")
+
+    broken = BrokenEngine('csv', 'broken', None)
+    monkeypatch.setitem(readers.ENGINES, 'csv', [broken] + readers.ENGINES['csv'])
+    path = tmp_path / "export.csv"
+    path.write_text(CSV_CONTENT)
+
+    # Act
+    source = open_table(str(path))
+    df = source.read()
+
+    # Assert
+    assert len(df) == 1
+    assert source.engine.name != "broken"
+
+
+def test_should_name_packages_given_no_engine_installed(monkeypatch):
+    """Test that a format without an installed engine fails with the packages to install."""
+    # Arrange
+    monkeypatch.setitem(readers.ENGINES, 'parquet', [ReaderEngine('parquet', 'pyarrow', 'no_such_package_pa'),
+                                                     ReaderEngine('parquet', 'fastparquet', 'no_such_package_fp')])
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Install one of: no_such_package_pa, no_such_package_fp"):
+        choose_engine('parquet')
+
+
+def test_should_reject_given_binary_content_with_csv_name(tmp_path):
+    """Test that binary content that matches no known format is rejected with a precise error."""
+    # Arrange
+    path = tmp_path / "export.csv"
+    path.write_bytes(b"\x00\x01\x02binary")
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Unrecognized content in export.csv"):
+        open_table(str(path))
+
+
+def test_should_stream_chunks_given_bz2_export(tmp_path):
+    """Test that a bzip2-compressed CSV export is read in chunks straight from the compressed file."""
+    # Arrange
+    path = tmp_path / "export.csv.bz2"
+    rows = "".join(f"Student {i},S,{i},{i},3,A,3\n" for i in range(5))
+    path.write_bytes(bz2.compress((CSV_CONTENT.splitlines()[0] + "\n" + rows).encode()))
+
+    # Act
+    chunks = list(FileHandler.iter_dataframe_chunks(str(path), chunk_size=2))
+
+    # Assert
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_should_convert_each_member_given_zip_of_exports(tmp_path):
+    """Test that every export of a zip archive is converted and labelled with its member name."""
+    # Arrange
+    path = tmp_path / "sections.zip"
+    workbook = io.BytesIO()
+    pd.read_csv(io.StringIO(CSV_CONTENT)).to_excel(workbook, sheet_name="Team Analysis", index=False)
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("section-a.csv", CSV_CONTENT)
+        archive.writestr("section-b/export.xlsx", workbook.getvalue())
+        archive.writestr("__MACOSX/._section-a.csv", b"\x00\x05")
+    quiz_params = QuizParameters(quiz_name="Quiz", original_max_score=3, new_max_score=6,
+                                 original_question_value=3)
+
+    # Act
+    converted = convert_archive(str(path), quiz_params, workers=2)
+
+    # Assert
+    assert archive_members(str(path)) == ["section-a.csv", "section-b/export.xlsx"]
+    assert [member for member, _ in converted] == ["section-a.csv", "section-b/export.xlsx"]
+    assert [batch.new_scores.tolist() for _, batch in converted] == [[6.0], [6.0]]
+    with pytest.raises(ValueError, match="is an archive of 2 exports"):
+        open_table(str(path))
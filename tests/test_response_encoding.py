@@ -0,0 +1,72 @@
+"""
+Tests for dictionary-encoded responses.
+"""
+import numpy as np
+
+from app.services.response_encoding import EncodedResponses, MISSING_CODE, MISSING_TEXT
+
+
+def test_should_encode_responses_as_codes_given_repeated_answers():
+    """Test that each distinct answer gets one code per question."""
+    # Act
+    encoded = EncodedResponses.encode([['A', 'B', 'A', None], ['C', 'C', 'C', 'D']])
+
+    # Assert
+    assert encoded.vocabularies == [['A', 'B'], ['C', 'D']]
+    assert encoded.codes.tolist() == [[0, 0], [1, 0], [0, 0], [MISSING_CODE, 1]]
+    assert encoded.codes.dtype == np.int8
+
+
+def test_should_decode_to_original_text_given_codes():
+    """Test that decoding gives back str() of each original cell."""
+    # Arrange
+    encoded = EncodedResponses.encode([['A', float('nan'), 3.0], [1, '1', 'x']])
+
+    # Act
+    first_row = encoded.decode_row(0, [10, 20])
+    column = encoded.decode_column(0)
+
+    # Assert
+    assert first_row == {10: 'A', 20: '1'}
+    assert column == ['A', MISSING_TEXT, '3.0']
+    assert encoded.codes[0, 1] == encoded.codes[1, 1]
+
+
+def test_should_share_string_objects_given_decoded_rows():
+    """Test that decoded responses reuse the vocabulary strings instead of new copies."""
+    # Arrange
+    encoded = EncodedResponses.encode([['Answer ' + 'A', 'Answer ' + 'A']])
+
+    # Act
+    first = encoded.decode_row(0, [1])[1]
+    second = encoded.decode_row(1, [1])[1]
+
+    # Assert
+    assert first is second
+
+
+def test_should_count_and_compare_as_integers_given_code_lookup():
+    """Test that counts and comparisons work on the codes."""
+    # Arrange
+    encoded = EncodedResponses.encode([['A', 'B', 'A', 'A', None]])
+
+    # Act
+    code_a = encoded.code_of(0, 'A')
+
+    # Assert
+    assert encoded.counts(0).tolist() == [3, 1]
+    assert (encoded.codes[:, 0] == code_a).sum() == 3
+    assert encoded.code_of(0, 'Z') == MISSING_CODE
+
+
+def test_should_report_smaller_storage_given_many_repeated_answers():
+    """Test that the memory report shows the reduction from encoding."""
+    # Arrange
+    encoded = EncodedResponses.encode([['A', 'B', 'C'] * 1000 for _ in range(5)])
+
+    # Act
+    report = encoded.memory_report()
+
+    # Assert
+    assert report['cells'] == 15000
+    assert report['encoded_bytes'] < report['string_bytes'] / 10
@@ -0,0 +1,76 @@
+"""
+Tests for the buffered results renderer.
+"""
+import pytest
+
+from app.models.quiz_data import QuizParameters
+from app.services.result_renderer import render_full_tables, render_results
+from app.services.user_interface import UserInterface
+
+
+@pytest.fixture
+def quiz_params():
+    return QuizParameters(
+        quiz_name="Test Quiz",
+        original_max_score=20.0,
+        new_max_score=10.0,
+        original_question_value=10.0
+    )
+
+
+@pytest.fixture
+def output_data():
+    return [
+        {
+            "Team": "Team A", "Student Name": f"Student {i}", "First Name": "First", "Last Name": "Last",
+            "Student ID": str(i), "Original Score": float(i), "Converted Score": i / 2,
+            "Q1 Response": "A", "Q1 Original Score": 10.0, "Q1 Converted Score": 5.0
+        }
+        for i in range(10)
+    ]
+
+
+def test_should_show_first_page_and_summary_given_more_students_than_page(quiz_params, output_data):
+    """Test that only the first page of students is rendered, followed by a summary."""
+    # Act
+    text = render_results(quiz_params, output_data, [1], max_rows=3)
+
+    # Assert
+    assert "Student 2 " in text
+    assert "Student 3 " not in text
+    assert "... 7 more students not shown (10 in total; converted score min 0.00, mean 2.25, max 4.50)" in text
+
+
+def test_should_render_every_student_given_no_limit(quiz_params, output_data):
+    """Test that the full rendering includes every student in both tables."""
+    # Act
+    text = render_results(quiz_params, output_data, [1], max_rows=None)
+
+    # Assert
+    assert text.count("Student 9 ") == 2
+    assert "more students not shown" not in text
+    assert text.endswith(render_full_tables(output_data, [1]))
+
+
+def test_should_keep_verification_details_in_order_given_buffered_output(quiz_params, output_data, capsys):
+    """Test that the calculation details printed by the parameters end up in the buffer, before the status."""
+    # Act
+    UserInterface.display_results(quiz_params, output_data, [1])
+    printed = capsys.readouterr().out
+
+    # Assert
+    assert printed.index("QUIZ RESULTS: Test Quiz") < printed.index("CALCULATION VERIFICATION DETAILS:") \
+        < printed.index("✓ Calculation verified successfully!") < printed.index("STUDENT INFORMATION")
+
+
+def test_should_write_full_tables_given_file_choice(output_data, tmp_path, monkeypatch):
+    """Test that choosing a file writes every student of a truncated result."""
+    # Arrange
+    answers = iter(["f", str(tmp_path / "all.txt")])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+
+    # Act
+    UserInterface.offer_full_results(output_data, [1], max_rows=3)
+
+    # Assert
+    assert (tmp_path / "all.txt").read_text(encoding="utf-8") == render_full_tables(output_data, [1])
@@ -0,0 +1,95 @@
+"""
+Tests for the SQLite results database.
+"""
+import pytest
+
+from app.models.quiz_data import QuizParameters, StudentResponse
+from app.services.pipeline import convert_file
+from app.services.quiz_service import convert_scores, generate_output_data
+from app.services.results_db import ResultsDatabase
+
+
+def _student(student_id: str, team: str, score: float) -> StudentResponse:
+    return StudentResponse(
+        team=team,
+        student_name=f"Student {student_id}",
+        first_name="First",
+        last_name="Last",
+        student_id=student_id,
+        original_score=score,
+        responses={1: "A", 2: "B"},
+        question_scores={1: score / 2, 2: score / 2}
+    )
+
+
+def _params(quiz_name: str) -> QuizParameters:
+    return QuizParameters(
+        quiz_name=quiz_name,
+        original_max_score=20.0,
+        new_max_score=10.0,
+        original_question_value=10.0
+    )
+
+
+def _store(results_db: ResultsDatabase, quiz_name: str, students):
+    quiz_params = _params(quiz_name)
+    output_data = generate_output_data(convert_scores(students, quiz_params), [1, 2])
+    return results_db.store_output_data(quiz_params, output_data, [1, 2])
+
+
+def test_should_find_student_and_team_results_given_stored_quizzes(tmp_path):
+    """Test that stored results are found per student and per team, optionally filtered by quiz."""
+    # Arrange
+    results_db = ResultsDatabase(str(tmp_path / "results.db"))
+    _store(results_db, "Quiz 1", [_student("1", "Red", 20.0), _student("2", "Blue", 10.0)])
+    _store(results_db, "Quiz 2", [_student("1", "Red", 10.0), _student("3", "Red", 4.0)])
+
+    # Act
+    student = results_db.student_results("1")
+    student_quiz_2 = results_db.student_results("1", ["Quiz 2"])
+    team = results_db.team_results("Red", ["Quiz 2"])
+
+    # Assert
+    assert [(record["quiz"], record["converted_score"]) for record in student] == [("Quiz 1", 10.0), ("Quiz 2", 5.0)]
+    assert student[0]["questions"][1] == {"response": "A", "original_score": 10.0, "converted_score": 5.0}
+    assert [record["quiz"] for record in student_quiz_2] == ["Quiz 2"]
+    assert [record["student_id"] for record in team] == ["1", "3"]
+    assert [quiz["students"] for quiz in results_db.quizzes()] == [2, 2]
+
+
+def test_should_replace_earlier_rows_given_quiz_stored_again(tmp_path):
+    """Test that storing a quiz again replaces its rows instead of duplicating them."""
+    # Arrange
+    results_db = ResultsDatabase(str(tmp_path / "results.db"))
+    _store(results_db, "Quiz 1", [_student("1", "Red", 20.0), _student("2", "Blue", 10.0)])
+
+    # Act
+    stored = _store(results_db, "Quiz 1", [_student("1", "Red", 12.0)])
+
+    # Assert
+    assert stored == 1
+    assert [record["converted_score"] for record in results_db.student_results("1")] == [6.0]
+    assert results_db.student_results("2") == []
+
+
+def test_should_store_same_results_given_converted_batch(tmp_path):
+    """Test that a converted score matrix is stored like the row-by-row output."""
+    # Arrange
+    csv_path = tmp_path / "quiz.csv"
+    csv_path.write_text(
+        "Team,Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score,2_Response,2_Score\n"
+        "Red,John Doe,John,Doe,1,20,A,10,B,10\n"
+        "Blue,Jane Smith,Jane,Smith,2,10,A,10,,0\n"
+    )
+    quiz_params = _params("Quiz 1")
+    results_db = ResultsDatabase(str(tmp_path / "results.db"))
+
+    # Act
+    stored = results_db.store_batch(quiz_params, convert_file(str(csv_path), quiz_params))
+
+    # Assert
+    assert stored == 2
+    jane = results_db.student_results("2")[0]
+    assert jane["team"] == "Blue"
+    assert jane["converted_score"] == 5.0
+    assert jane["questions"][2]["converted_score"] == 0.0
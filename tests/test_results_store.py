@@ -0,0 +1,35 @@
+"""
+Tests for the results store.
+"""
+from app.services.results_store import ResultsStore
+
+
+def test_should_return_payload_given_stored_result():
+    """Test that a stored payload can be fetched by its id."""
+    # Arrange
+    store = ResultsStore()
+
+    # Act
+    result_id = store.put({"output_data": []})
+
+    # Assert
+    assert store.get(result_id) == {"output_data": []}
+    assert store.get("unknown") is None
+
+
+def test_should_evict_least_recently_used_given_full_store():
+    """Test that the store stays bounded and keeps recently used results."""
+    # Arrange
+    store = ResultsStore(max_entries=2)
+    first = store.put({"n": 1})
+    second = store.put({"n": 2})
+
+    # Act
+    store.get(first)
+    third = store.put({"n": 3})
+
+    # Assert
+    assert len(store) == 2
+    assert store.get(second) is None
+    assert store.get(first) == {"n": 1}
+    assert store.get(third) == {"n": 3}
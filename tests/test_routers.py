@@ -3,11 +3,14 @@ Tests for routers.
 """
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, AsyncMock, MagicMock
+from unittest.mock import ANY, patch, AsyncMock, MagicMock
 import io
 
+import numpy as np
+
 from main import app
 from app.models.quiz_data import QuizParameters, StudentResponse, ProcessedResponse
+from app.services.incremental import ConversionDelta
 
 
 @pytest.fixture
@@ -115,10 +118,13 @@ async def test_should_process_file_given_valid_upload(client):
     }
 
     # Mock the process_file function
-    process_file_mock = AsyncMock(return_value=(student_responses, question_numbers))
+    fingerprints = np.arange(len(student_responses), dtype=np.uint64)
+    process_file_mock = AsyncMock(return_value=(student_responses, question_numbers, None, fingerprints))
 
-    # Mock the convert_scores function
-    convert_scores_mock = MagicMock(return_value=processed_responses)
+    # Mock the incremental conversion (a first run of the quiz)
+    conversion_delta = ConversionDelta(added=["12345"], changed=[], removed=[], unchanged=0, previous_run=False,
+                                       parameters_changed=False)
+    incremental_convert_mock = MagicMock(return_value=(processed_responses, conversion_delta))
 
     # Mock the verify_conversion function
     verify_conversion_mock = MagicMock(return_value=True)
@@ -128,7 +134,7 @@ async def test_should_process_file_given_valid_upload(client):
 
     # Act
     with patch("app.routers.quiz.process_file", process_file_mock), \
-         patch("app.routers.quiz.convert_scores", convert_scores_mock), \
+         patch("app.routers.quiz.incremental_convert", incremental_convert_mock), \
          patch("app.routers.quiz.verify_conversion", verify_conversion_mock), \
          patch("app.routers.quiz.generate_output_data", generate_output_data_mock):
         response = client.post("/quiz/upload", files=files, data=form_data)
@@ -140,7 +146,7 @@ async def test_should_process_file_given_valid_upload(client):
 
     # Check that the functions were called with the correct arguments
     process_file_mock.assert_called_once()
-    convert_scores_mock.assert_called_once_with(student_responses, pytest.ANY)
+    incremental_convert_mock.assert_called_once_with(student_responses, ANY, ANY, fingerprints)
     verify_conversion_mock.assert_called_once_with(processed_responses)
     generate_output_data_mock.assert_called_once_with(processed_responses, question_numbers)
 
@@ -171,3 +177,226 @@ def test_should_return_error_given_invalid_parameters(client):
     if response.status_code == 200:
         # If it's a 200 OK, it should contain an error message
         assert "error" in response.text
+
+
+def test_should_return_item_statistics_given_csv_upload(client):
+    """Test that the item analysis endpoint returns JSON statistics for each question."""
+    # Arrange
+    csv_content = (
+        b"Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score,2_Response,2_Score\n"
+        b"John Doe,John,Doe,1,6,A,3,B,3\n"
+        b"Jane Smith,Jane,Smith,2,3,A,3,,0\n"
+    )
+    files = {"file": ("test.csv", io.BytesIO(csv_content), "text/csv")}
+
+    # Act
+    response = client.post("/quiz/item-analysis", files=files, data={"original_question_value": "3"})
+
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    assert body["num_students"] == 2
+    assert [question["question"] for question in body["questions"]] == [1, 2]
+    assert body["questions"][0]["difficulty"] == 1.0
+    assert body["questions"][1]["non_response_rate"] == 0.5
+
+
+def test_should_return_null_difficulty_given_all_zero_question(client):
+    """Test that a question nobody scored on gets a null difficulty instead of breaking the JSON response."""
+    # Arrange
+    csv_content = (
+        b"Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score,2_Response,2_Score\n"
+        b"John Doe,John,Doe,1,3,A,3,B,0\n"
+        b"Jane Smith,Jane,Smith,2,0,C,0,C,0\n"
+    )
+    files = {"file": ("test.csv", io.BytesIO(csv_content), "text/csv")}
+
+    # Act
+    response = client.post("/quiz/item-analysis", files=files)
+
+    # Assert
+    assert response.status_code == 200
+    questions = response.json()["questions"]
+    assert questions[0]["difficulty"] == 0.5
+    assert questions[1]["difficulty"] is None
+
+
+def test_should_return_long_rows_given_csv_upload(client):
+    """Test that the long export endpoint returns one row per student and question."""
+    # Arrange
+    csv_content = (
+        b"Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score,2_Response,2_Score\n"
+        b"John Doe,John,Doe,1,6,A,3,B,3\n"
+        b"Jane Smith,Jane,Smith,2,3,A,3,,0\n"
+    )
+    files = {"file": ("test.csv", io.BytesIO(csv_content), "text/csv")}
+    form_data = {"quiz_name": "Long Quiz", "original_max_score": "6", "new_max_score": "10",
+                 "original_question_value": "3"}
+
+    # Act
+    response = client.post("/quiz/export/long", files=files, data=form_data)
+
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    assert body["quiz_name"] == "Long Quiz"
+    assert body["columns"][4:] == ["Student ID", "Question", "Response", "Original Score", "Converted Score"]
+    assert [row[4:] for row in body["rows"]] == [["1", 1, "A", 3.0, 5.0], ["1", 2, "B", 3.0, 5.0],
+                                                 ["2", 1, "A", 3.0, 5.0], ["2", 2, None, 0.0, 0.0]]
+
+
+def test_should_return_changed_cells_given_two_uploads(client):
+    """Test that the diff endpoint converts two exports and returns only what changed."""
+    # Arrange
+    header = b"Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score,2_Response,2_Score\n"
+    before = header + b"John Doe,John,Doe,1,6,A,3,B,3\nJane Smith,Jane,Smith,2,3,A,3,,0\n"
+    after = header + b"John Doe,John,Doe,1,6,A,3,B,3\nJane Smith,Jane,Smith,2,6,A,3,C,3\n"
+    files = {"before": ("before.csv", io.BytesIO(before), "text/csv"),
+             "after": ("after.csv", io.BytesIO(after), "text/csv")}
+    form_data = {"original_max_score": "6", "new_max_score": "10", "original_question_value": "3"}
+
+    # Act
+    response = client.post("/quiz/diff", files=files, data=form_data)
+
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    assert body["num_compared"] == 2
+    assert body["num_changed_students"] == 1
+    assert [(cell["Student ID"], cell["Field"], cell["Change"]) for cell in body["changed"]] == [
+        ("2", "Total", 5.0), ("2", "Q2", 5.0)]
+
+
+def test_should_render_results_without_debug_dump_given_csv_upload(client):
+    """Test that the results page is rendered without the repr of the output data."""
+    # Arrange
+    csv_content = (
+        b"Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score,2_Response,2_Score\n"
+        b"John Doe,John,Doe,1,6,A,3,B,3\n"
+    )
+    files = {"file": ("test.csv", io.BytesIO(csv_content), "text/csv")}
+    form_data = {"quiz_name": "Test Quiz", "original_max_score": "6", "new_max_score": "10", "original_question_value": "3"}
+
+    # Act
+    response = client.post("/quiz/upload", files=files, data=form_data)
+
+    # Assert
+    assert response.status_code == 200
+    assert "Quiz Results: Test Quiz" in response.text
+    assert "John Doe" in response.text
+    assert "{&#39;Team&#39;" not in response.text
+    assert "/quiz/results/" in response.text
+
+
+def test_should_return_debug_payload_given_result_id(client):
+    """Test that the debug endpoint returns the stored output data and 404 for unknown ids."""
+    # Arrange
+    from app.services.results_store import results_store
+    result_id = results_store.put({"quiz_name": "Quiz", "output_data": [{"Student Name": "John Doe"}], "question_numbers": [1]})
+
+    # Act
+    response = client.get(f"/quiz/results/{result_id}/debug")
+    missing = client.get("/quiz/results/unknown/debug")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["output_data"] == [{"Student Name": "John Doe"}]
+    assert response.json()["output_data_length"] == 1
+    assert missing.status_code == 404
+
+
+def test_should_store_and_look_up_results_given_results_db_enabled(client, tmp_path, monkeypatch):
+    """Test that uploads are persisted when QUIZ_RESULTS_DB is set and served by the lookup endpoints."""
+    # Arrange
+    csv_content = (
+        b"Team,Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score,2_Response,2_Score\n"
+        b"Red,John Doe,John,Doe,1,6,A,3,B,3\n"
+    )
+    files = {"file": ("test.csv", io.BytesIO(csv_content), "text/csv")}
+    form_data = {"quiz_name": "Stored Quiz", "original_max_score": "6", "new_max_score": "10", "original_question_value": "3"}
+    disabled = client.get("/quiz/students/1/results")
+    monkeypatch.setenv("QUIZ_RESULTS_DB", str(tmp_path / "results.db"))
+
+    # Act
+    client.post("/quiz/upload", files=files, data=form_data)
+    student = client.get("/quiz/students/1/results", params={"quiz": "Stored Quiz"})
+    team = client.get("/quiz/teams/Red/results")
+
+    # Assert
+    assert disabled.status_code == 404
+    assert student.status_code == 200
+    assert [record["converted_score"] for record in student.json()["results"]] == [10.0]
+    assert [record["student_name"] for record in team.json()["results"]] == ["John Doe"]
+
+
+def test_should_answer_503_with_retry_after_given_full_upload_queue(client, monkeypatch):
+    """Test that an upload is rejected with 503 and Retry-After while the admission queue is full."""
+    # Arrange
+    import asyncio
+    from app.services.admission import AdmissionController
+    controller = AdmissionController(max_in_flight=1, max_queue=0)
+    held = asyncio.run(controller.acquire(1024, "held.csv"))
+    monkeypatch.setattr("app.routers.quiz.upload_admission", controller)
+    files = {"file": ("test.csv", io.BytesIO(b"Student Name,Score\n"), "text/csv")}
+    form_data = {"quiz_name": "Test Quiz", "original_max_score": "6", "new_max_score": "10", "original_question_value": "3"}
+
+    # Act
+    response = client.post("/quiz/upload", files=files, data=form_data)
+    stats = client.get("/quiz/admission").json()
+    held.release()
+
+    # Assert
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert stats["in_flight"] == 1
+    assert stats["rejected"] == 1
+
+
+def test_should_answer_503_given_full_upload_queue_for_analysis_endpoints(client, monkeypatch):
+    """Test that the item analysis, long export and diff endpoints wait for admission like uploads do."""
+    # Arrange
+    import asyncio
+    from app.services.admission import AdmissionController
+    controller = AdmissionController(max_in_flight=1, max_queue=0)
+    held = asyncio.run(controller.acquire(1024, "held.csv"))
+    monkeypatch.setattr("app.routers.quiz.upload_admission", controller)
+    csv = b"Student Name,Score\n"
+    form_data = {"quiz_name": "Q", "original_max_score": "6", "new_max_score": "10", "original_question_value": "3"}
+
+    # Act
+    responses = [
+        client.post("/quiz/item-analysis", files={"file": ("a.csv", io.BytesIO(csv), "text/csv")}),
+        client.post("/quiz/export/long", files={"file": ("a.csv", io.BytesIO(csv), "text/csv")}, data=form_data),
+        client.post("/quiz/diff", files={"before": ("a.csv", io.BytesIO(csv), "text/csv"),
+                                         "after": ("b.csv", io.BytesIO(csv), "text/csv")})
+    ]
+    held.release()
+
+    # Assert
+    assert [response.status_code for response in responses] == [503, 503, 503]
+    assert controller.stats()["rejected"] == 3
+
+
+def test_should_release_admission_given_analysis_endpoints_done(client, monkeypatch):
+    """Test that the analysis endpoints give their capacity back after success and after a bad file."""
+    # Arrange
+    from app.services.admission import AdmissionController
+    controller = AdmissionController(max_in_flight=1, max_queue=0)
+    monkeypatch.setattr("app.routers.quiz.upload_admission", controller)
+    csv = (b"Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score\n"
+           b"John Doe,John,Doe,1,3,A,3\n")
+    form_data = {"quiz_name": "Q", "original_max_score": "3", "new_max_score": "10", "original_question_value": "3"}
+
+    # Act
+    responses = [
+        client.post("/quiz/item-analysis", files={"file": ("a.csv", io.BytesIO(csv), "text/csv")}),
+        client.post("/quiz/export/long", files={"file": ("a.csv", io.BytesIO(csv), "text/csv")}, data=form_data),
+        client.post("/quiz/export/long", files={"file": ("a.txt", io.BytesIO(csv), "text/plain")}, data=form_data),
+        client.post("/quiz/diff", files={"before": ("a.csv", io.BytesIO(csv), "text/csv"),
+                                         "after": ("b.csv", io.BytesIO(csv), "text/csv")}, data=form_data)
+    ]
+
+    # Assert
+    assert [response.status_code for response in responses] == [200, 200, 400, 200]
+    assert controller.stats()["in_flight"] == 0
+    assert controller.stats()["admitted"] == 4
@@ -0,0 +1,77 @@
+"""
+Tests for comparing two processed runs of a quiz.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.quiz_data import QuizParameters
+from app.services.pipeline import convert_file, export_converted
+from app.services.run_diff import ConvertedScores, diff_runs, load_converted
+
+
+def _scores(ids, questions, totals, question_numbers=(1, 2)):
+    return ConvertedScores(np.array(ids, dtype=object), list(question_numbers), np.array(questions, dtype=float),
+                           np.array(totals, dtype=float))
+
+
+def test_should_report_only_changed_cells_given_two_runs():
+    """Test that students are aligned by ID and only changed totals and question scores are listed."""
+    # Arrange
+    before = _scores(["1", "2", "3"], [[5, 5], [5, 0], [0, 0]], [10, 5, 0])
+    after = _scores(["2", "1", "4"], [[5, 2.5], [5, 5], [5, 5]], [7.5, 10, 10])
+
+    # Act
+    run_diff = diff_runs(before, after)
+
+    # Assert
+    assert run_diff.num_compared == 2
+    assert run_diff.added == ["4"]
+    assert run_diff.removed == ["3"]
+    assert run_diff.changed_students == ["2"]
+    assert run_diff.changed.values.tolist() == [["2", "Total", 5.0, 7.5, 2.5], ["2", "Q2", 0.0, 2.5, 2.5]]
+
+
+def test_should_report_question_only_in_one_run_given_different_questions():
+    """Test that a question present in only one run counts as changed for every student."""
+    # Arrange
+    before = _scores(["1"], [[5, 5]], [10])
+    after = _scores(["1"], [[5, 5, 0]], [10], question_numbers=(1, 2, 3))
+
+    # Act
+    changed = diff_runs(before, after).changed
+
+    # Assert
+    assert changed["Field"].tolist() == ["Q3"]
+    assert np.isnan(changed["Before"].iloc[0])
+
+
+def test_should_reject_runs_given_repeated_student_ids():
+    """Test that a run with a repeated student ID cannot be compared."""
+    # Act & Assert
+    with pytest.raises(ValueError, match="repeated: 1"):
+        _scores(["1", "1"], [[5, 5], [5, 5]], [10, 10])
+
+
+def test_should_find_no_changes_given_results_file_and_its_export(tmp_path):
+    """Test that a results file written by convert matches a fresh conversion of its export."""
+    # Arrange
+    rng = np.random.default_rng(11)
+    scores = rng.choice([0.0, 3.0], size=(30, 3))
+    columns = {"Student Name": [f"S{i}" for i in range(30)], "First Name": "S", "Last Name": "L",
+               "Student ID": [str(1000 + i) for i in range(30)], "Score": scores.sum(axis=1)}
+    for j in range(3):
+        columns[f"{j + 1}_Response"] = "A"
+        columns[f"{j + 1}_Score"] = scores[:, j]
+    export_path = tmp_path / "export.csv"
+    pd.DataFrame(columns).to_csv(export_path, index=False)
+    quiz_params = QuizParameters(quiz_name="Quiz", original_max_score=9, new_max_score=7, original_question_value=3)
+    results_path = tmp_path / "results.csv"
+    export_converted(convert_file(str(export_path), quiz_params), str(results_path))
+
+    # Act
+    run_diff = diff_runs(load_converted(str(results_path)), load_converted(str(export_path), quiz_params))
+
+    # Assert
+    assert run_diff.num_compared == 30
+    assert run_diff.changed.empty
@@ -0,0 +1,124 @@
+"""
+Tests for the interactive session cache.
+"""
+import os
+from unittest.mock import patch
+
+import pytest
+
+import main
+from app.services.file_handler import FileHandler
+from app.services.session_cache import InputCache
+
+
+CSV_TEXT = (
+    "Team,Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score,2_Response,2_Score\n"
+    "Team A,John Doe,John,Doe,12345,20,A,10,B,10\n"
+    "Team A,Jane Roe,Jane,Roe,12346,10,A,10,C,0\n"
+)
+
+
+@pytest.fixture
+def quiz_file(tmp_path):
+    path = tmp_path / "quiz.csv"
+    path.write_text(CSV_TEXT)
+    return path
+
+
+def test_should_parse_once_given_repeated_loads(quiz_file):
+    """Test that an unchanged file is parsed only once."""
+    # Arrange
+    cache = InputCache()
+
+    # Act
+    with patch.object(FileHandler, "read_dataframe", wraps=FileHandler.read_dataframe) as read_dataframe:
+        first = cache.load(str(quiz_file))
+        second = cache.load(str(quiz_file))
+
+    # Assert
+    assert read_dataframe.call_count == 1
+    assert second is first
+    assert cache.hits == 1
+
+
+def test_should_reparse_given_modified_file(quiz_file):
+    """Test that a file changed on disk is read again."""
+    # Arrange
+    cache = InputCache()
+    first = cache.load(str(quiz_file))
+    quiz_file.write_text(CSV_TEXT.replace("Jane Roe", "Jane Smith"))
+    stat = quiz_file.stat()
+    os.utime(quiz_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    # Act
+    second = cache.load(str(quiz_file))
+
+    # Assert
+    assert second is not first
+    assert second.matrix.identity["Student Name"].tolist()[1] == "Jane Smith"
+
+
+def test_should_evict_least_recently_used_given_full_cache(tmp_path):
+    """Test that the cache keeps at most max_entries files."""
+    # Arrange
+    cache = InputCache(max_entries=2)
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"quiz{index}.csv"
+        path.write_text(CSV_TEXT)
+        paths.append(str(path))
+
+    # Act
+    for path in paths:
+        cache.load(path)
+
+    # Assert
+    assert len(cache) == 2
+    cache.load(paths[0])
+    assert cache.misses == 4
+
+
+def test_should_reuse_loaded_file_given_new_scale_in_same_session(quiz_file, tmp_path):
+    """Test that the console loop iterates without recursion and reuses the parsed file."""
+    # Arrange
+    answers = iter([
+        "Quiz", "20", "10", "10", "n", str(quiz_file), str(tmp_path), "y",
+        "Quiz", "20", "100", "10", "n", str(quiz_file), str(tmp_path), "n"
+    ])
+    exported = []
+
+    # Act
+    with patch("builtins.input", lambda prompt="": next(answers)), \
+         patch.object(FileHandler, "read_dataframe", wraps=FileHandler.read_dataframe) as read_dataframe, \
+         patch.object(FileHandler, "export_to_excel",
+                      lambda quiz_params, output_data, *args: exported.append(output_data)), \
+         patch.object(main, "main", wraps=main.main) as main_mock:
+        main_mock()
+
+    # Assert
+    assert main_mock.call_count == 1
+    assert read_dataframe.call_count == 1
+    assert [row["Converted Score"] for row in exported[0]] == [10.0, 5.0]
+    assert [row["Converted Score"] for row in exported[1]] == [100.0, 50.0]
+
+
+def test_should_keep_previous_answers_given_empty_input_in_next_iteration(quiz_file, tmp_path):
+    """Test that the next iteration offers the previous parameters and file and converts the cached matrix."""
+    # Arrange
+    answers = iter([
+        "Quiz", "20", "10", "10", "n", str(quiz_file), str(tmp_path), "y",
+        "", "", "100", "", "", "", str(tmp_path), "n"
+    ])
+    exported = []
+
+    # Act
+    with patch("builtins.input", lambda prompt="": next(answers)), \
+         patch("app.services.quiz_service.convert_scores", side_effect=AssertionError("object path used")), \
+         patch.object(FileHandler, "export_to_excel",
+                      lambda quiz_params, output_data, *args: exported.append((quiz_params, output_data))):
+        main.main()
+
+    # Assert
+    assert exported[1][0].quiz_name == "Quiz"
+    assert exported[1][0].original_max_score == 20.0
+    assert [row["Converted Score"] for row in exported[1][1]] == [100.0, 50.0]
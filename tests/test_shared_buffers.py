@@ -0,0 +1,75 @@
+"""
+Tests for the shared-memory hand-off.
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from app.services.shared_buffers import SharedSegmentRun, attach_arrays, share_arrays
+
+
+def _segment_exists(name: str) -> bool:
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    segment.close()
+    return True
+
+
+def test_should_round_trip_arrays_given_shared_segments():
+    """Test that shared arrays are read back with the same shape, dtype and values."""
+    # Arrange
+    arrays = {
+        'scores': np.arange(12, dtype=np.float64).reshape(4, 3),
+        'codes': np.array([[0, -1], [1, 2]], dtype=np.int8)
+    }
+
+    # Act
+    with SharedSegmentRun(arrays) as run:
+        descriptors = share_arrays(arrays, run.names(0))
+        with attach_arrays(descriptors) as views:
+            copies = {field: view.copy() for field, view in views.items()}
+
+    # Assert
+    for field, array in arrays.items():
+        assert copies[field].dtype == array.dtype
+        np.testing.assert_array_equal(copies[field], array)
+
+
+def test_should_unlink_segments_given_error_inside_run():
+    """Test that every segment of a run is removed when the run fails."""
+    # Arrange
+    arrays = {'scores': np.ones(10), 'new_scores': np.zeros(5)}
+    names = {}
+
+    # Act
+    with pytest.raises(RuntimeError):
+        with SharedSegmentRun(arrays) as run:
+            names = run.names(0)
+            share_arrays(arrays, names)
+            # A second task that never got to create its segments is cleaned up as well
+            run.names(1)
+            assert all(_segment_exists(name) for name in names.values())
+            raise RuntimeError("worker failed")
+
+    # Assert
+    assert names
+    assert not any(_segment_exists(name) for name in names.values())
+
+
+def test_should_remove_created_segments_given_failure_while_sharing():
+    """Test that a partially shared set of arrays does not leave segments behind."""
+    # Arrange
+    arrays = {'scores': np.ones(3), 'codes': np.ones(3, dtype=np.int8)}
+    run = SharedSegmentRun(arrays)
+    names = run.names(0)
+    names['codes'] = names['scores']
+
+    # Act
+    with pytest.raises(FileExistsError):
+        share_arrays(arrays, names)
+
+    # Assert
+    assert not _segment_exists(names['scores'])
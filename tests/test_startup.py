@@ -0,0 +1,93 @@
+"""
+Tests for CLI startup cost.
+
+These tests run the interpreter with `-X importtime` and parse its report, so a
+heavy import added at module level of main.py or the services fails fast.
+"""
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Packages that must only be imported once a processing stage needs them
+HEAVY_PACKAGES = ['pandas', 'numpy', 'pydantic', 'fastapi', 'starlette', 'jinja2', 'openpyxl']
+
+# Cumulative import time budget for `import main`, in microseconds
+IMPORT_TIME_BUDGET_US = 150_000
+
+
+def run_with_importtime(args: List[str]) -> Dict[str, int]:
+    """
+    Run the interpreter with -X importtime and parse the cumulative time of each imported module.
+
+    Args:
+        args: Arguments passed to the interpreter after the -X option
+
+    Returns:
+        Dictionary of module name -> cumulative import time in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+
+    cumulative_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            cumulative_times[module.strip()] = int(cumulative.strip())
+    return cumulative_times
+
+
+def heavy_imports(cumulative_times: Dict[str, int]) -> List[str]:
+    """Return the heavy packages found in an import time report."""
+    return [name for name in cumulative_times if name.split('.')[0] in HEAVY_PACKAGES]
+
+
+def test_should_not_import_heavy_packages_given_import_of_main():
+    """Test that importing main does not pull in pandas, pydantic or the web stack."""
+    # Act
+    cumulative_times = run_with_importtime(["-c", "import main"])
+
+    # Assert
+    assert "main" in cumulative_times
+    assert heavy_imports(cumulative_times) == []
+
+
+def test_should_stay_within_import_budget_given_import_of_main():
+    """Test that importing main stays within the startup time budget."""
+    # Act
+    cumulative_times = run_with_importtime(["-c", "import main"])
+
+    # Assert
+    assert cumulative_times["main"] < IMPORT_TIME_BUDGET_US
+
+
+@pytest.mark.parametrize("command", [[], ["sweep"], ["stats"]])
+def test_should_not_import_heavy_packages_given_help(command):
+    """Test that printing the help text does not import any processing dependency."""
+    # Act
+    cumulative_times = run_with_importtime(["main.py", *command, "--help"])
+
+    # Assert
+    assert heavy_imports(cumulative_times) == []
+
+
+def test_should_create_web_app_lazily_given_attribute_access():
+    """Test that the FastAPI app is still available as main.app."""
+    # Arrange
+    import main
+
+    # Act
+    web_app = main.app
+
+    # Assert
+    assert web_app is main.app
+    assert any(getattr(route, "path", None) == "/quiz/upload" for route in web_app.routes)
@@ -0,0 +1,107 @@
+"""
+Tests for summary statistics.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.quiz_data import QuizParameters
+from app.services.summary_stats import SummaryAccumulator, QuantileSketch
+from app.services.pipeline import stream_convert, summarize_files
+
+
+def test_should_compute_exact_moments_given_batches():
+    """Test that min, max, mean and variance are exact when fed in batches."""
+    # Arrange
+    values = np.random.default_rng(0).uniform(0, 10, 10000)
+    accumulator = SummaryAccumulator.for_scale(10)
+
+    # Act
+    for batch in np.array_split(values, 17):
+        accumulator.update(batch)
+
+    # Assert
+    assert accumulator.count == 10000
+    assert accumulator.minimum == values.min()
+    assert accumulator.maximum == values.max()
+    assert accumulator.mean == pytest.approx(values.mean())
+    assert accumulator.variance == pytest.approx(values.var())
+    assert accumulator.histogram.sum() == 10000
+
+
+def test_should_equal_single_pass_given_merged_accumulators():
+    """Test that merging accumulators from separate workers gives the same moments and histogram."""
+    # Arrange
+    values = np.random.default_rng(1).normal(5, 2, 5000)
+    whole = SummaryAccumulator.for_scale(10)
+    first = SummaryAccumulator.for_scale(10)
+    second = SummaryAccumulator.for_scale(10)
+
+    # Act
+    whole.update(values)
+    first.update(values[:1234])
+    second.update(values[1234:])
+    first.merge(second)
+
+    # Assert
+    assert first.count == whole.count
+    assert first.mean == pytest.approx(whole.mean)
+    assert first.variance == pytest.approx(whole.variance)
+    assert first.histogram.tolist() == whole.histogram.tolist()
+    assert first.above_range + first.below_range == whole.above_range + whole.below_range
+
+
+def test_should_approximate_quantiles_with_bounded_memory_given_large_stream():
+    """Test that the sketch stays small and its quantiles stay close to the exact ones."""
+    # Arrange
+    values = np.random.default_rng(2).uniform(0, 100, 200000)
+    sketch = QuantileSketch(k=256, seed=0)
+
+    # Act
+    for batch in np.array_split(values, 50):
+        sketch.update(batch)
+    estimates = sketch.quantiles([0.25, 0.5, 0.75])
+
+    # Assert
+    assert sketch.num_retained < 3 * 256
+    assert np.allclose(estimates, np.quantile(values, [0.25, 0.5, 0.75]), atol=2.0)
+
+
+def test_should_raise_error_given_different_histogram_bins():
+    """Test that accumulators with different bins cannot be merged."""
+    # Arrange
+    first = SummaryAccumulator.for_scale(10)
+    second = SummaryAccumulator.for_scale(20)
+    second.update([1.0])
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="different histogram bins"):
+        first.merge(second)
+
+
+def test_should_feed_accumulator_given_streamed_csv(tmp_path):
+    """Test that the streaming pipeline converts every chunk and feeds the accumulator."""
+    # Arrange
+    file_path = tmp_path / "quiz.csv"
+    pd.DataFrame({
+        'Student Name': [f"S{i}" for i in range(25)],
+        'First Name': ['F'] * 25,
+        'Last Name': ['L'] * 25,
+        'Student ID': list(range(25)),
+        'Score': [i % 4 * 3 for i in range(25)],
+        '1_Response': ['A'] * 25,
+        '1_Score': [i % 4 * 3 for i in range(25)]
+    }).to_csv(file_path, index=False)
+    quiz_params = QuizParameters(quiz_name="Quiz", original_max_score=9, new_max_score=3, original_question_value=9)
+    accumulator = SummaryAccumulator.for_scale(3, bins=3)
+
+    # Act
+    batches = list(stream_convert(str(file_path), quiz_params, batch_size=10, accumulator=accumulator))
+    merged, per_file = summarize_files([str(file_path), str(file_path)], quiz_params, batch_size=7, bins=3)
+
+    # Assert
+    assert [batch.matrix.num_students for batch in batches] == [10, 10, 5]
+    assert accumulator.count == 25
+    assert accumulator.maximum == 3.0
+    assert merged.count == 50
+    assert merged.histogram.tolist() == (accumulator.histogram * 2).tolist()
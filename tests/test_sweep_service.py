@@ -0,0 +1,174 @@
+"""
+Tests for sweep service.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.quiz_data import QuizParameters, StudentResponse
+from app.services.quiz_service import convert_score_matrix, convert_scores
+from app.services.score_matrix import ScoreMatrix
+from app.services.sweep_service import sweep_conversions, build_variants, load_variants
+
+
+@pytest.fixture
+def sample_dataframe():
+    """Create a sample dataframe for testing."""
+    return pd.DataFrame({
+        'Team': ['Team A', 'Team B'],
+        'Student Name': ['John Doe', 'Jane Smith'],
+        'First Name': ['John', 'Jane'],
+        'Last Name': ['Doe', 'Smith'],
+        'Student ID': ['00123', '67890'],
+        'Score': [12, 9],
+        '1_Response': ['A', 'B'],
+        '1_Score': [3, 3],
+        '2_Response': ['A', 'C'],
+        '2_Score': [3, 0],
+        '3_Response': ['B', 'B'],
+        '3_Score': [6, 6]
+    })
+
+
+def test_should_build_score_matrix_given_dataframe(sample_dataframe):
+    """Test that the score matrix is built from the score columns."""
+    # Act
+    matrix = ScoreMatrix.from_dataframe(sample_dataframe)
+
+    # Assert
+    assert matrix.question_numbers == [1, 2, 3]
+    assert matrix.scores.tolist() == [[3, 3, 6], [3, 0, 6]]
+    assert matrix.original_scores.tolist() == [12, 9]
+    assert matrix.identity['Student ID'].tolist() == ['00123', '67890']
+
+
+def test_should_convert_totals_per_variant_given_new_max_scores(sample_dataframe):
+    """Test that every variant converts the totals with its own scale."""
+    # Arrange
+    base = QuizParameters(quiz_name="Quiz", original_max_score=12, new_max_score=10, original_question_value=3)
+    variants = build_variants(base, [10, 20, 25])
+    matrix = ScoreMatrix.from_dataframe(sample_dataframe)
+
+    # Act
+    result = sweep_conversions(matrix, variants)
+
+    # Assert
+    assert result.new_scores.shape == (2, 3)
+    assert np.allclose(result.new_scores[0], [10, 20, 25])
+    assert np.allclose(result.new_scores[1], [7.5, 15, 18.75])
+    assert result.question_scores().shape == (2, 3, 3)
+
+
+def test_should_match_convert_scores_given_weighted_variant():
+    """Test that a weighted variant gives the same result as convert_scores."""
+    # Arrange
+    weighted = QuizParameters(
+        quiz_name="Weighted", original_max_score=9, new_max_score=10, original_question_value=3,
+        use_weighted_questions=True, question_weights={1: 2, 2: 1, 3: 1}
+    )
+    plain = QuizParameters(quiz_name="Plain", original_max_score=9, new_max_score=10, original_question_value=3)
+    student_responses = [
+        StudentResponse(student_name="John Doe", first_name="John", last_name="Doe", student_id="1",
+                        original_score=6, question_scores={1: 3, 2: 0, 3: 3}),
+        StudentResponse(student_name="Jane Smith", first_name="Jane", last_name="Smith", student_id="2",
+                        original_score=3, question_scores={1: 0, 2: 3, 3: 0})
+    ]
+    matrix = ScoreMatrix.from_responses(student_responses, [1, 2, 3])
+
+    # Act
+    result = sweep_conversions(matrix, [weighted, plain])
+
+    # Assert
+    for index, variant in enumerate([weighted, plain]):
+        expected = [response.new_score for response in convert_scores(student_responses, variant)]
+        assert np.allclose(result.new_scores[:, index], expected)
+
+
+def test_should_match_convert_score_matrix_given_curved_variant(sample_dataframe):
+    """Test that a curved variant is converted with its curve, not with the linear factors only."""
+    # Arrange
+    matrix = ScoreMatrix.from_dataframe(sample_dataframe)
+    linear = QuizParameters(quiz_name="Linear", original_max_score=15, new_max_score=10, original_question_value=3)
+    curved = linear.model_copy(update={"quiz_name": "Sqrt", "curve": "sqrt"})
+
+    # Act
+    result = sweep_conversions(matrix, [linear, curved])
+
+    # Assert
+    question_new_scores, new_scores = convert_score_matrix(matrix, curved)
+    np.testing.assert_allclose(result.new_scores[:, 1], new_scores)
+    np.testing.assert_allclose(result.question_scores()[:, :, 1], question_new_scores)
+    assert not np.allclose(result.new_scores[:, 0], result.new_scores[:, 1])
+
+
+def test_should_add_up_exactly_given_fixed_point_variant(sample_dataframe):
+    """Test that a fixed-point variant's question scores add up exactly to its totals, as with convert."""
+    # Arrange
+    matrix = ScoreMatrix.from_dataframe(sample_dataframe)
+    variant = QuizParameters(quiz_name="Exact", original_max_score=15, new_max_score=7, original_question_value=3,
+                             fixed_point_scale=100)
+
+    # Act
+    result = sweep_conversions(matrix, [variant])
+
+    # Assert
+    question_scores = np.rint(result.question_scores()[:, :, 0] * 100).astype(np.int64)
+    assert (question_scores.sum(axis=1) == np.rint(result.new_scores[:, 0] * 100)).all()
+    np.testing.assert_allclose(result.new_scores[:, 0], convert_score_matrix(matrix, variant)[1])
+
+
+def test_should_regrade_given_variant_with_answer_key(sample_dataframe):
+    """Test that a variant with an answer key is converted from the regraded question scores."""
+    # Arrange
+    matrix = ScoreMatrix.from_dataframe(sample_dataframe)
+    exported = QuizParameters(quiz_name="Exported", original_max_score=15, new_max_score=15, original_question_value=3)
+    regraded = exported.model_copy(update={"quiz_name": "Regraded", "answer_key": {1: {"B": 1.0}}})
+
+    # Act
+    result = sweep_conversions(matrix, [exported, regraded])
+
+    # Assert
+    assert result.new_scores[:, 0].tolist() == [12.0, 9.0]
+    assert result.new_scores[:, 1].tolist() == [9.0, 9.0]
+    assert result.question_scores()[:, 0, 1].tolist() == [0.0, 3.0]
+
+
+def test_should_label_duplicate_variant_names_given_comparison_table(sample_dataframe):
+    """Test that the comparison table has one uniquely labeled column per variant."""
+    # Arrange
+    params = QuizParameters(quiz_name="Quiz", original_max_score=12, new_max_score=10, original_question_value=3)
+    matrix = ScoreMatrix.from_dataframe(sample_dataframe)
+
+    # Act
+    table = sweep_conversions(matrix, [params, params]).comparison_table()
+
+    # Assert
+    assert list(table.columns) == ['Team', 'Student Name', 'Student ID', 'Original Score', 'Quiz', 'Quiz (2)']
+
+
+def test_should_load_variants_given_json_file(tmp_path):
+    """Test that variants are loaded from a JSON list."""
+    # Arrange
+    variants_file = tmp_path / "variants.json"
+    variants_file.write_text(json.dumps([
+        {"quiz_name": "Out of 10", "original_max_score": 15, "new_max_score": 10, "original_question_value": 3},
+        {"quiz_name": "Out of 20", "original_max_score": 15, "new_max_score": 20, "original_question_value": 3}
+    ]))
+
+    # Act
+    variants = load_variants(str(variants_file))
+
+    # Assert
+    assert [variant.new_max_score for variant in variants] == [10, 20]
+
+
+def test_should_raise_error_given_empty_variants_list():
+    """Test that an empty sweep is rejected."""
+    # Arrange
+    matrix = ScoreMatrix.from_responses([], [1])
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="At least one"):
+        sweep_conversions(matrix, [])
@@ -0,0 +1,132 @@
+"""
+Tests for the watch-folder mode.
+"""
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from app.services.watcher import FolderWatcher, MANIFEST_FILENAME
+
+
+CSV_TEXT = (
+    "Team,Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score,2_Response,2_Score\n"
+    "Team A,John Doe,John,Doe,12345,20,A,10,B,10\n"
+    "Team A,Jane Roe,Jane,Roe,12346,10,A,10,C,0\n"
+)
+
+
+@pytest.fixture
+def watched_folder(tmp_path):
+    (tmp_path / "quiz_params.json").write_text(json.dumps({
+        "original_max_score": 20.0,
+        "new_max_score": 10.0,
+        "original_question_value": 10.0
+    }))
+    return tmp_path
+
+
+def _process(watcher: FolderWatcher, now: float) -> list:
+    finished = watcher.poll_once(now=now)
+    return finished + watcher.drain()
+
+
+def test_should_convert_settled_export_given_new_file(watched_folder):
+    """Test that a new export is converted next to the input once it has settled."""
+    # Arrange
+    (watched_folder / "quiz1.csv").write_text(CSV_TEXT)
+    watcher = FolderWatcher(str(watched_folder), workers=1, settle_time=5.0)
+
+    # Act
+    first = _process(watcher, now=0.0)
+    second = _process(watcher, now=6.0)
+    watcher.close()
+
+    # Assert
+    assert first == []
+    assert [entry["file"] for entry in second] == ["quiz1.csv"]
+    output = pd.read_csv(watched_folder / "quiz1_converted.csv")
+    assert output["Converted Score"].tolist() == [10.0, 5.0]
+    assert json.loads((watched_folder / MANIFEST_FILENAME).read_text())["quiz1.csv"]["status"] == "done"
+
+
+def test_should_wait_given_file_still_being_written(watched_folder):
+    """Test that a file whose size keeps changing is not processed."""
+    # Arrange
+    export = watched_folder / "quiz1.csv"
+    export.write_text(CSV_TEXT[:60])
+    watcher = FolderWatcher(str(watched_folder), workers=1, settle_time=5.0)
+
+    # Act
+    watcher.poll_once(now=0.0)
+    export.write_text(CSV_TEXT)
+    finished = _process(watcher, now=6.0)
+    watcher.close()
+
+    # Assert
+    assert finished == []
+    assert not (watched_folder / "quiz1_converted.csv").exists()
+
+
+def test_should_not_reprocess_given_restart_with_manifest(watched_folder):
+    """Test that a restarted watcher skips finished files and picks up modified ones."""
+    # Arrange
+    export = watched_folder / "quiz1.csv"
+    export.write_text(CSV_TEXT)
+    watcher = FolderWatcher(str(watched_folder), workers=1, settle_time=0.0)
+    _process(watcher, now=0.0)
+    watcher.close()
+
+    # Act
+    restarted = FolderWatcher(str(watched_folder), workers=1, settle_time=0.0)
+    unchanged = _process(restarted, now=0.0)
+    export.write_text(CSV_TEXT.replace("12346,10,A,10,C,0", "12346,20,A,10,B,10"))
+    stat = export.stat()
+    os.utime(export, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    modified = _process(restarted, now=1.0)
+    restarted.close()
+
+    # Assert
+    assert unchanged == []
+    assert [entry["file"] for entry in modified] == ["quiz1.csv"]
+    assert pd.read_csv(watched_folder / "quiz1_converted.csv")["Converted Score"].tolist() == [10.0, 10.0]
+
+
+def test_should_skip_export_given_folder_without_config(tmp_path):
+    """Test that exports without a quiz_params.json are left alone."""
+    # Arrange
+    (tmp_path / "quiz1.csv").write_text(CSV_TEXT)
+    watcher = FolderWatcher(str(tmp_path), workers=1, settle_time=0.0)
+
+    # Act
+    finished = _process(watcher, now=0.0)
+    watcher.close()
+
+    # Assert
+    assert finished == []
+    assert not (tmp_path / "quiz1_converted.csv").exists()
+
+
+def test_should_use_nearest_config_given_nested_folders(watched_folder):
+    """Test that a subfolder's quiz_params.json overrides the one of the watched folder."""
+    # Arrange
+    section = watched_folder / "section2"
+    section.mkdir()
+    (section / "quiz_params.json").write_text(json.dumps({
+        "quiz_name": "Section 2",
+        "original_max_score": 20.0,
+        "new_max_score": 100.0,
+        "original_question_value": 10.0
+    }))
+    watcher = FolderWatcher(str(watched_folder))
+
+    # Act
+    nested = watcher.load_parameters(section / "quiz.csv")
+    top = watcher.load_parameters(watched_folder / "quiz.csv")
+
+    # Assert
+    assert nested.quiz_name == "Section 2"
+    assert nested.new_max_score == 100.0
+    assert top.quiz_name == "quiz"
+    assert top.new_max_score == 10.0
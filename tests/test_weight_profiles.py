@@ -0,0 +1,163 @@
+"""
+Tests for question-weight profiles.
+"""
+import json
+
+import pandas as pd
+import pytest
+
+from app.models.quiz_data import QuizParameters, StudentResponse
+from app.services.pipeline import convert_with_max_points_row
+from app.services.weight_profiles import (
+    ProfileStore, WeightProfile, load_weight_profile, profile_from_max_points_matrix, profile_from_max_points_row,
+    validate_question_weights
+)
+from app.services.score_matrix import ScoreMatrix
+
+
+@pytest.fixture
+def quiz_params():
+    return QuizParameters(
+        quiz_name="Final",
+        original_max_score=30.0,
+        new_max_score=10.0,
+        original_question_value=10.0
+    )
+
+
+def _student(name: str, scores: dict) -> StudentResponse:
+    return StudentResponse(
+        student_name=name, first_name="", last_name="", student_id=name,
+        original_score=sum(scores.values()), question_scores=scores
+    )
+
+
+def test_should_load_weights_given_csv_with_header(tmp_path):
+    """Test that a CSV profile is read in bulk and ordered by question."""
+    # Arrange
+    path = tmp_path / "final.csv"
+    path.write_text("question,weight\n3,1\nQ1,2.5\n2,0.5\n")
+
+    # Act
+    profile = load_weight_profile(str(path))
+
+    # Assert
+    assert profile.name == "final"
+    assert profile.question_numbers == [1, 2, 3]
+    assert profile.weights == [2.5, 0.5, 1.0]
+
+
+def test_should_load_weights_given_json_list(tmp_path):
+    """Test that a JSON list assigns weights to questions 1, 2, 3, ..."""
+    # Arrange
+    path = tmp_path / "weights.json"
+    path.write_text(json.dumps([1, 2, 3]))
+
+    # Act
+    profile = load_weight_profile(str(path), name="exam")
+
+    # Assert
+    assert profile.as_dict() == {1: 1.0, 2: 2.0, 3: 3.0}
+
+
+def test_should_report_every_problem_given_mismatched_profile():
+    """Test that validation lists missing, unknown and invalid weights in one error."""
+    # Arrange
+    profile = WeightProfile("exam", [1, 2, 4], [1.0, -1.0, 2.0])
+
+    # Act & Assert
+    with pytest.raises(ValueError) as error:
+        profile.vector([1, 2, 3])
+    message = str(error.value)
+    assert "missing weights for questions 3" in message
+    assert "not in the data: 4" in message
+    assert "questions 2" in message
+
+
+def test_should_return_dense_vector_given_matching_profile():
+    """Test that the weights are aligned with the detected question order."""
+    # Arrange
+    profile = WeightProfile("exam", [2, 1, 3], [2.0, 1.0, 3.0])
+
+    # Act
+    vector = profile.vector([3, 1, 2])
+
+    # Assert
+    assert vector == [3.0, 1.0, 2.0]
+
+
+def test_should_derive_weights_given_max_points_row(quiz_params):
+    """Test that the max-points row becomes the profile and is removed from the students."""
+    # Arrange
+    students = [
+        _student("Points Possible", {1: 5.0, 2: 10.0, 3: 15.0}),
+        _student("Alice", {1: 5.0, 2: 0.0, 3: 15.0})
+    ]
+
+    # Act
+    profile, remaining = profile_from_max_points_row(students)
+    weighted = profile.apply(quiz_params)
+
+    # Assert
+    assert [student.student_name for student in remaining] == ["Alice"]
+    assert weighted.use_weighted_questions
+    assert weighted.question_weights == {1: 5.0, 2: 10.0, 3: 15.0}
+    validate_question_weights(weighted, [1, 2, 3])
+
+
+def test_should_report_every_problem_given_weights_not_matching_header(quiz_params):
+    """Test that the bulk check of weighted parameters raises with every problem at once."""
+    # Arrange
+    weighted = WeightProfile.from_dict("Final", {1: 1.0, 4: -1.0}).apply(quiz_params)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="missing weights for questions 2, 3.*not in the data: 4"):
+        validate_question_weights(weighted, [1, 2, 3])
+
+
+def test_should_strip_max_points_row_given_score_matrix():
+    """Test that the max-points row of a score matrix becomes the profile and is dropped from the students."""
+    # Arrange
+    df = pd.DataFrame({"Student Name": ["Alice", " MAX POINTS ", "Bob"], "Score": [10, 30, 20],
+                       "1_Score": [5, 10, 0], "2_Score": [5, 20, 20]})
+
+    # Act
+    profile, students = profile_from_max_points_matrix(ScoreMatrix.from_dataframe(df, [1, 2]))
+
+    # Assert
+    assert profile.as_dict() == {1: 10.0, 2: 20.0}
+    assert students.identity["Student Name"].tolist() == ["Alice", "Bob"]
+    assert students.scores.tolist() == [[5.0, 5.0], [0.0, 20.0]]
+
+
+def test_should_not_convert_max_points_row_given_matrix_conversion(tmp_path, quiz_params):
+    """Test that the matrix conversion reads the max-points row as weights, not as a student."""
+    # Arrange
+    csv_path = tmp_path / "final.csv"
+    csv_path.write_text("Student Name,First Name,Last Name,Student ID,Score,1_Response,1_Score,2_Response,2_Score\n"
+                        "Max Points,,,,30,,10,,20\n"
+                        "Alice,A,L,1,10,A,10,B,0\n", encoding="utf-8")
+
+    # Act
+    weighted, batch = convert_with_max_points_row(str(csv_path),
+                                                  quiz_params.model_copy(update={"original_max_score": 20.0}))
+
+    # Assert
+    assert weighted.question_weights == {1: 10.0, 2: 20.0}
+    assert batch.matrix.identity["Student Name"].tolist() == ["Alice"]
+    assert batch.question_new_scores.tolist() == [[pytest.approx(10 / 3), 0.0]]
+
+
+def test_should_reuse_profile_by_name_given_saved_profile(tmp_path):
+    """Test that a saved profile is read back by name, from a fresh store as well."""
+    # Arrange
+    store = ProfileStore(str(tmp_path / "profiles"))
+    store.save(WeightProfile("Midterm 2", [1, 2], [1.0, 3.0]))
+
+    # Act
+    cached = store.get("Midterm 2")
+    reloaded = ProfileStore(str(tmp_path / "profiles")).get("Midterm 2")
+
+    # Assert
+    assert cached.as_dict() == reloaded.as_dict() == {1: 1.0, 2: 3.0}
+    assert ProfileStore(str(tmp_path / "profiles")).names() == ["Midterm 2"]